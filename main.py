@@ -1,8 +1,6 @@
-from monopoly.display import Display
-from monopoly.game import Game
+import sys
+
+from monopoly.cli import play
 
 if __name__ == '__main__':
-    display = Display()
-    game = Game(display)
-    game.init_game()
-    game.play_game()
+    play(sys.argv[1:])
@@ -0,0 +1,226 @@
+import abc
+
+import numpy as np
+
+from monopoly.plane import DEFAULT_RULES
+from monopoly.state import BUY, HOUSES, HOTEL, HOTEL_LEVEL
+
+"""
+Columns of the feature matrix of a batch of decisions,
+built by VectorGame.features, one row per decision:
+the deciding seat, its cash, the price, house price and current fee
+of the field, the level of the field (houses, HOTEL_LEVEL for a hotel),
+the share of the field's color group the seat owns,
+the cash of the other players and the round.
+The amounts are in the units of the game, so a policy can compare
+them exactly like the bots of the object engine.
+"""
+FEATURES = ("seat", "cash", "price", "house_price", "fee", "level",
+            "group_owned", "opponents_cash", "round")
+(SEAT, CASH, PRICE, HOUSE_PRICE, FEE, LEVEL, GROUP_OWNED, OPPONENTS_CASH,
+ ROUND) = range(len(FEATURES))
+
+"""
+Kinds of decisions a policy answers, a batch has decisions of one kind.
+They are also the order of the kind columns of the network inputs.
+"""
+DECISION_KINDS = (BUY, HOUSES, HOTEL)
+
+"""
+Columns divided by the starting cash in the network inputs,
+and the number of rounds the round is divided by.
+"""
+MONEY_FEATURES = (CASH, PRICE, HOUSE_PRICE, FEE, OPPONENTS_CASH)
+ROUND_SCALE = 100
+
+"""
+Number of inputs of a network: the features without the seat
+and a column for every decision kind.
+"""
+NETWORK_INPUTS = len(FEATURES) - 1 + len(DECISION_KINDS)
+
+
+class BatchPolicy(abc.ABC):
+    """
+    The BatchPolicy class.
+
+    Base class of the policies answering many decisions at once,
+    like BotPolicy answers one. The engine groups the decisions
+    waiting in all its games by kind and calls decide once per kind,
+    so the cost of a call is shared by the whole batch.
+    """
+    def columns(self):
+        """
+        Get the features the policy reads, the engine
+        leaves the others 0.
+        :return: Tuple of feature columns, all of them by default.
+        """
+        return tuple(range(len(FEATURES)))
+
+    @abc.abstractmethod
+    def decide(self, kind, features, legal):
+        """
+        Answers a batch of decisions of one kind.
+        :param kind: The kind of the decisions (BUY, HOUSES, HOTEL).
+        :param features: [decisions, FEATURES] float64 array.
+        :param legal: Array of the highest action that has an effect
+        in every decision, see VectorGame.effective_actions.
+        :return: Array of actions: 1 to buy or build the hotel,
+        the number of houses for HOUSES, 0 to refuse.
+        """
+
+
+class ReservePolicy(BatchPolicy):
+    """
+    The ReservePolicy class.
+
+    Decides like BotPolicy with a cash reserve for every seat:
+    buys and builds as long as the purchase leaves more than
+    the reserve. The default policy of the bots of VectorGame.
+    """
+    def __init__(self, reserves):
+        """
+        :param reserves: Array of the cash reserve of every seat.
+        """
+        self._reserves = np.asarray(reserves, np.int64)
+
+    def columns(self):
+        """
+        Get the features the policy reads.
+        :return: Tuple of feature columns.
+        """
+        return (SEAT, CASH, PRICE, HOUSE_PRICE, LEVEL)
+
+    def decide(self, kind, features, legal):
+        """
+        Answers the decisions like BotPolicy.
+        """
+        seats = features[:, SEAT].astype(np.int64)
+        cash = features[:, CASH].astype(np.int64) - self._reserves[seats]
+        if kind == BUY:
+            return (cash - features[:, PRICE].astype(np.int64) > 0).astype(
+                np.int64
+            )
+        house_prices = np.maximum(features[:, HOUSE_PRICE].astype(np.int64),
+                                  1)
+        if kind == HOUSES:
+            levels = features[:, LEVEL].astype(np.int64)
+            return np.clip((cash - 1) // house_prices, 0, 4 - levels)
+        return (cash - house_prices > 0).astype(np.int64)
+
+
+def network_inputs(kind, features, starting_cash):
+    """
+    Scales the features of a batch of decisions for a network:
+    the amounts are divided by the starting cash, the level by
+    HOTEL_LEVEL and the round by ROUND_SCALE. The seat is left out
+    and a column per decision kind is 1 for the kind of the batch.
+    :param kind: The kind of the decisions.
+    :param features: [decisions, FEATURES] array.
+    :param starting_cash: The starting cash of the rules.
+    :return: [decisions, NETWORK_INPUTS] float64 array.
+    """
+    inputs = np.zeros((len(features), NETWORK_INPUTS))
+    scaled = np.array(features, np.float64)
+    scaled[:, MONEY_FEATURES] /= starting_cash
+    scaled[:, LEVEL] /= HOTEL_LEVEL
+    scaled[:, ROUND] /= ROUND_SCALE
+    columns = len(FEATURES) - 1
+    inputs[:, :columns] = np.delete(scaled, SEAT, axis=1)
+    inputs[:, columns + DECISION_KINDS.index(kind)] = 1
+    return inputs
+
+
+class MLPPolicy(BatchPolicy):
+    """
+    The MLPPolicy class.
+
+    A small multilayer perceptron scoring the decisions: the network
+    inputs (see network_inputs) go through hidden layers with tanh
+    and a last layer with one output, the score.
+    A card or a hotel is taken when its score is positive,
+    the number of houses is the whole part of the score.
+    The actions are cut to the legal ones.
+    """
+    def __init__(self, layers, starting_cash=None):
+        """
+        :param layers: List of (weights, bias) pairs, the weights
+        of a layer are a [inputs, outputs] array, the first layer
+        has NETWORK_INPUTS inputs and the last one 1 output.
+        :param starting_cash: The amount the money features
+        are divided by, the starting cash of DEFAULT_RULES by default.
+        """
+        self._layers = [
+            (np.asarray(weights, np.float64), np.asarray(bias, np.float64))
+            for weights, bias in layers
+        ]
+        if starting_cash is None:
+            starting_cash = DEFAULT_RULES.starting_cash()
+        self._starting_cash = starting_cash
+
+    def layers(self):
+        """
+        Get the layers of the network.
+        :return: List of (weights, bias) pairs.
+        """
+        return self._layers
+
+    def scores(self, kind, features):
+        """
+        Scores a batch of decisions.
+        :param kind: The kind of the decisions.
+        :param features: [decisions, FEATURES] array.
+        :return: Array of scores.
+        """
+        values = network_inputs(kind, features, self._starting_cash)
+        for weights, bias in self._layers[:-1]:
+            values = np.tanh(values @ weights + bias)
+        weights, bias = self._layers[-1]
+        return (values @ weights + bias)[:, 0]
+
+    def decide(self, kind, features, legal):
+        """
+        Answers the decisions by their scores.
+        """
+        scores = self.scores(kind, features)
+        if kind == HOUSES:
+            actions = np.floor(np.clip(scores, 0, 4)).astype(np.int64)
+        else:
+            actions = (scores > 0).astype(np.int64)
+        return np.minimum(actions, legal)
+
+
+class LinearPolicy(MLPPolicy):
+    """
+    The LinearPolicy class.
+
+    Scores the decisions with a weighted sum of the network inputs,
+    an MLPPolicy without hidden layers.
+    """
+    def __init__(self, weights, bias=0.0, starting_cash=None):
+        """
+        :param weights: Array of NETWORK_INPUTS weights.
+        :param bias: The score of a decision with all inputs 0.
+        :param starting_cash: See MLPPolicy.
+        """
+        weights = np.asarray(weights, np.float64).reshape(NETWORK_INPUTS, 1)
+        super().__init__([(weights, [bias])], starting_cash)
+
+
+def random_mlp(hidden=(16,), seed=None, starting_cash=None):
+    """
+    Creates a network with random weights, to evolve or to train.
+    :param hidden: The sizes of the hidden layers,
+    () for a linear policy.
+    :param seed: Seed of the NumPy random generator.
+    :param starting_cash: See MLPPolicy.
+    :return: MLPPolicy.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = [NETWORK_INPUTS, *hidden, 1]
+    layers = [
+        (rng.normal(0, 1 / np.sqrt(inputs), (inputs, outputs)),
+         np.zeros(outputs))
+        for inputs, outputs in zip(sizes, sizes[1:])
+    ]
+    return MLPPolicy(layers, starting_cash)
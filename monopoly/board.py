@@ -0,0 +1,229 @@
+import sys
+
+from monopoly.display import Display
+from monopoly.plane import PLANE_LENGTH
+
+"""
+Cells on a side of the square board, the corners included,
+and the size of a cell on the screen: CELL_HEIGHT lines
+of CELL_WIDTH characters, the last column separates the cells.
+"""
+SIDE_CELLS = PLANE_LENGTH // 4 + 1
+CELL_WIDTH = 7
+CELL_HEIGHT = 2
+
+"""
+Lines of the screen taken by the board, the messages scroll below them.
+"""
+BOARD_LINES = SIDE_CELLS * CELL_HEIGHT
+
+"""
+Marks of a cell's owner: a field nobody can buy and a field to buy.
+The owner of a bought field is marked with the number of the player.
+"""
+NOT_BUYABLE = " "
+AVAILABLE = "."
+HOTEL = "H"
+
+"""
+The ANSI escapes the board is drawn with.
+"""
+CLEAR_SCREEN = "\x1b[2J"
+SAVE_CURSOR = "\x1b7"
+RESTORE_CURSOR = "\x1b8"
+
+
+def move_to(line, column):
+    """
+    Get the escape moving the cursor, both counted from 1.
+    """
+    return f"\x1b[{line};{column}H"
+
+
+def cell_place(position):
+    """
+    Get the place of a field on the square board: the start
+    in the bottom right corner and the fields counterclockwise.
+    :param position: The position of the field, from 1.
+    :return: (row, column) tuple of the cell, from 0.
+    """
+    last = SIDE_CELLS - 1
+    step = position - 1
+    if step < last:
+        return last, last - step
+    if step < 2 * last:
+        return 2 * last - step, 0
+    if step < 3 * last:
+        return 0, step - 2 * last
+    return step - 3 * last, last
+
+
+class BoardDisplay(Display):
+    """
+    The BoardDisplay class.
+
+    Draws the board as a square of cells on the whole screen with
+    plain ANSI escapes, in place of the list of show_fields
+    and the round stats printed one after another.
+    A cell shows the name of its field and, below it, the number
+    of the owner (AVAILABLE when it's for sale), the houses
+    or HOTEL, and the numbers of the players standing on it.
+    The round stats are in the middle of the board.
+    The board keeps what every cell and line of the stats shows,
+    so a redraw writes only the ones that changed - after a round
+    only a few cells are written, which keeps the output small
+    over a slow terminal connection.
+    The messages and the questions scroll below the board.
+    """
+    def __init__(self, plane, stream=None):
+        """
+        :param plane: The Plane of the game.
+        :param stream: The terminal to draw on, sys.stdout by default.
+        Attributes:
+            cells: the text of the second line of every drawn cell,
+            by position.
+            status: the drawn lines of the stats.
+            numbers: the number of every player by name,
+            in the order the players were first seen.
+            positions: the positions of the players in the last stats,
+            from 1 like the cells, the last field is PLANE_LENGTH
+            and not 0.
+            drawn: True after the screen was prepared.
+            written: the number of characters written.
+        """
+        self._plane = plane
+        self._stream = stream if stream is not None else sys.stdout
+        self._cells = {}
+        self._status = []
+        self._numbers = {}
+        self._positions = {}
+        self._drawn = False
+        self._written = 0
+
+    def written(self):
+        """
+        Get the number of characters the board has written.
+        :return: The number of characters.
+        """
+        return self._written
+
+    def _write(self, text):
+        self._stream.write(text)
+        self._stream.flush()
+        self._written += len(text)
+
+    def _number(self, name):
+        if name not in self._numbers:
+            self._numbers[name] = len(self._numbers) + 1
+        return self._numbers[name]
+
+    def _cell_text(self, position, field):
+        owner = field.owner()
+        if owner is not None:
+            mark = str(self._number(owner.name()))
+        elif field.is_property():
+            mark = AVAILABLE
+        else:
+            mark = NOT_BUYABLE
+        if field.hotel():
+            mark += HOTEL
+        elif field.houses():
+            mark += str(field.houses())
+        else:
+            mark += " "
+        tokens = "".join(str(number) for number, at
+                         in sorted(self._positions.items())
+                         if at == position)
+        return (mark + tokens)[:CELL_WIDTH - 1].ljust(CELL_WIDTH - 1)
+
+    def _status_lines(self, game_state):
+        lines = [f"Round #: {game_state.round()}"]
+        for stat in game_state.player_stats():
+            line = f"{self._number(stat.name())} {stat.name()}: position: {stat.position()}, {stat.cash()}"  # noqa
+            if stat.win_chance() is not None:
+                chance, margin = stat.win_chance()
+                line += f", win chance: {chance:.0%} ± {margin:.0%}"
+            lines.append(line)
+        return lines
+
+    def _prepare(self):
+        """
+        Clears the screen, writes the names of the fields and keeps
+        the lines below the board for the messages.
+        """
+        screen = [CLEAR_SCREEN]
+        for position, field in enumerate(self._plane.fields(), 1):
+            row, column = cell_place(position)
+            screen.append(move_to(row * CELL_HEIGHT + 1,
+                                  column * CELL_WIDTH + 1))
+            screen.append(field.name()[:CELL_WIDTH - 1])
+        screen.append(f"\x1b[{BOARD_LINES + 1}r")
+        screen.append(move_to(BOARD_LINES + 1, 1))
+        self._write("".join(screen))
+        self._drawn = True
+
+    def draw(self, game_state=None):
+        """
+        Draws what changed on the board since the last drawing.
+        :param game_state: GameStats with the positions of the players
+        and the stats, the last ones by default.
+        """
+        if not self._drawn:
+            self._prepare()
+        if game_state is not None:
+            self._positions = {
+                self._number(stat.name()):
+                    (stat.position() - 1) % PLANE_LENGTH + 1
+                for stat in game_state.player_stats()
+            }
+        changes = []
+        for position, field in enumerate(self._plane.fields(), 1):
+            text = self._cell_text(position, field)
+            if self._cells.get(position) == text:
+                continue
+            self._cells[position] = text
+            row, column = cell_place(position)
+            changes.append(move_to(row * CELL_HEIGHT + 2,
+                                   column * CELL_WIDTH + 1) + text)
+        if game_state is not None:
+            width = (SIDE_CELLS - 2) * CELL_WIDTH - 2
+            lines = [line[:width] for line in self._status_lines(game_state)]
+            lines += [""] * (len(self._status) - len(lines))
+            for index, line in enumerate(lines):
+                drawn = (self._status[index] if index < len(self._status)
+                         else "")
+                if drawn == line:
+                    continue
+                changes.append(move_to(CELL_HEIGHT + 2 + index,
+                                       CELL_WIDTH + 2)
+                               + line.ljust(len(drawn)))
+            self._status = [line for line in lines if line]
+        if changes:
+            self._write(SAVE_CURSOR + "".join(changes) + RESTORE_CURSOR)
+
+    def refresh_game_round_stats(self, game_state):
+        """
+        Redraws the cells and the stats that changed in the round.
+        :param game_state: An instance of GameStats class,
+        containing the current game statistics.
+        """
+        self.draw(game_state)
+
+    def show_fields(self, field_infos):
+        """
+        Redraws the cells that changed, the board already shows
+        the owners and the buildings of the fields.
+        :param field_infos: A list of FieldInfo instances, not used.
+        """
+        self.draw()
+
+    def print_end_stats(self, losers, winners):
+        """
+        Gives the whole screen back to the messages
+        and prints the game statistics.
+        :param losers: A list of players that lost.
+        :param winners: A list of players that won.
+        """
+        if self._drawn:
+            self._write(SAVE_CURSOR + "\x1b[r" + RESTORE_CURSOR)
+        super().print_end_stats(losers, winners)
@@ -0,0 +1,282 @@
+import fcntl
+import hashlib
+import os
+
+import numpy as np
+
+from monopoly.state import cash_bucket, card_level
+
+"""
+Layout of a DecisionBook file: a 64-byte header
+followed by the slots, ways slots per bucket.
+A slot with stamp 0 is empty.
+"""
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("ways", "<u4"),
+    ("buckets", "<u8"),
+    ("tag", "S16"),
+    ("lookups", "<u8"),
+    ("hits", "<u8"),
+    ("stamp", "<u8"),
+])
+SLOT_DTYPE = np.dtype([
+    ("key0", "<u8"),
+    ("key1", "<u8"),
+    ("action", "<i4"),
+    ("uses", "<u4"),
+    ("stamp", "<u8"),
+])
+MAGIC = b"MONOBOOK"
+FORMAT_VERSION = 1
+
+"""
+Default size of a DecisionBook: the number of decisions kept
+and the slots of a bucket, among which the least used one is evicted.
+"""
+DEFAULT_CAPACITY = 1 << 16
+DEFAULT_WAYS = 8
+
+
+def book_key(game, card, player, kind):
+    """
+    Get the key of a decision in a DecisionBook.
+    The key is coarse and doesn't depend on the seats:
+    the decision, the field, the number of players,
+    the cash buckets (see monopoly.state.cash_bucket)
+    of the player and of the other players still in the game,
+    the owners (nobody, the player or another player) and levels
+    of the card's color group and the number of cards
+    the player and the others own.
+    :param game: The Game.
+    :param card: The card the decision is about.
+    :param player: The deciding player.
+    :param kind: The decision, BUY, HOUSES or HOTEL.
+    :return: 16 bytes.
+    """
+    fields = game.plane().fields()
+
+    def relation(other):
+        if other.owner() is None:
+            return 0
+        return 1 if other.owner() is player else 2
+
+    others = sorted(
+        cash_bucket(other.cash()) for other in game.players()
+        if other is not player and other.is_in_game()
+    )
+    group = [
+        (relation(other), card_level(other)) for other in fields
+        if other.color() == card.color()
+    ]
+    owned = [relation(other) for other in fields]
+    parts = (
+        kind, fields.index(card), len(game.players()),
+        cash_bucket(player.cash()), tuple(others), tuple(group),
+        owned.count(1), owned.count(2),
+    )
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).digest()
+
+
+class DecisionBook:
+    """
+    The DecisionBook class.
+
+    Decisions of expensive bots kept in a file, so games,
+    runs and worker processes find the decisions already made
+    in similar positions ("opening book"), keyed by book_key.
+    The file is memory-mapped: processes opening the same path
+    share its pages, lookups don't lock and changes
+    are made under a file lock.
+    The file has a fixed number of slots split into buckets,
+    a full bucket evicts its least used decision,
+    which bounds the size of the file.
+    """
+    def __init__(self, path, capacity=DEFAULT_CAPACITY, ways=DEFAULT_WAYS,
+                 tag=""):
+        """
+        Opens the book, creating the file if needed.
+        :param path: The path of the file.
+        :param capacity: The number of decisions kept,
+        used when the file is created.
+        :param ways: The number of slots of a bucket,
+        used when the file is created.
+        :param tag: Text telling apart books of different bots,
+        usually the key() of the policy.
+        :raise: ValueError if the file isn't a book,
+        or a book with another tag.
+        Attributes:
+            header, slots: memory maps of the file.
+            hits, misses: lookups of this process that found
+            a decision or not.
+            reported_hits, reported_misses: the part of them
+            added to the header by flush().
+        """
+        self._path = path
+        self._capacity = capacity
+        self._ways = ways
+        self._tag = tag
+        digest = hashlib.blake2b(tag.encode(), digest_size=16).digest()
+        buckets = max(-(-capacity // ways), 1)
+        with open(path, "a+b") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            if os.fstat(file.fileno()).st_size == 0:
+                header = np.zeros(1, HEADER_DTYPE)
+                header[0] = (MAGIC, FORMAT_VERSION, ways, buckets, digest,
+                             0, 0, 0)
+                file.write(header.tobytes())
+                file.truncate(HEADER_DTYPE.itemsize
+                              + buckets * ways * SLOT_DTYPE.itemsize)
+            fcntl.flock(file, fcntl.LOCK_UN)
+        header = np.memmap(path, HEADER_DTYPE, "r+", shape=(1,))
+        if (header["magic"][0] != MAGIC
+                or header["version"][0] != FORMAT_VERSION):
+            raise ValueError(f"{path} isn't a decision book.")
+        if header["tag"][0] != digest.rstrip(b"\0"):
+            raise ValueError(f"{path} is a book of another bot.")
+        self._header = header
+        self._slots = np.memmap(
+            path, SLOT_DTYPE, "r+", offset=HEADER_DTYPE.itemsize,
+            shape=(int(header["buckets"][0]) * int(header["ways"][0]),)
+        )
+        self._hits = 0
+        self._misses = 0
+        self._reported_hits = 0
+        self._reported_misses = 0
+
+    def __getstate__(self):
+        return {"path": self._path, "capacity": self._capacity,
+                "ways": self._ways, "tag": self._tag}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["capacity"], state["ways"],
+                      state["tag"])
+
+    def path(self):
+        """
+        Get the path of the file.
+        :return: The path.
+        """
+        return self._path
+
+    def capacity(self):
+        """
+        Get the number of decisions the file can keep.
+        :return: The number of slots.
+        """
+        return len(self._slots)
+
+    def size(self):
+        """
+        Get the number of decisions in the file.
+        :return: The number of used slots.
+        """
+        return int(np.count_nonzero(self._slots["stamp"]))
+
+    def _bucket(self, key):
+        """
+        Get the slots of a key's bucket and the key as two numbers.
+        """
+        key0 = int.from_bytes(key[:8], "little")
+        key1 = int.from_bytes(key[8:16], "little")
+        ways = int(self._header["ways"][0])
+        start = key0 % int(self._header["buckets"][0]) * ways
+        return start, self._slots[start:start + ways], key0, key1
+
+    def get(self, key):
+        """
+        Looks up a decision, counting the lookup.
+        :param key: The key, see book_key.
+        :return: The action, None if the book doesn't have the decision.
+        """
+        start, bucket, key0, key1 = self._bucket(key)
+        found = np.flatnonzero(
+            (bucket["key0"] == key0) & (bucket["key1"] == key1)
+            & (bucket["stamp"] != 0)
+        )
+        if len(found) == 0:
+            self._misses += 1
+            return None
+        self._hits += 1
+        slot = self._slots[start + found[0]]
+        slot["uses"] = min(int(slot["uses"]) + 1, 0xFFFFFFFF)
+        return int(slot["action"])
+
+    def put(self, key, action):
+        """
+        Stores a decision. A full bucket evicts the decision
+        with the fewest uses, the oldest one of them,
+        and takes its uses from the others, so decisions
+        that stopped coming up eventually leave.
+        :param key: The key, see book_key.
+        :param action: The action, see VectorGame.decide.
+        """
+        start, bucket, key0, key1 = self._bucket(key)
+        with open(self._path, "r+b") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            found = np.flatnonzero(
+                (bucket["key0"] == key0) & (bucket["key1"] == key1)
+                & (bucket["stamp"] != 0)
+            )
+            if len(found):
+                way = found[0]
+            else:
+                empty = np.flatnonzero(bucket["stamp"] == 0)
+                if len(empty):
+                    way = empty[0]
+                else:
+                    way = np.lexsort((bucket["stamp"], bucket["uses"]))[0]
+                    bucket["uses"] -= bucket["uses"][way]
+                bucket[way]["uses"] = 0
+            stamp = int(self._header["stamp"][0]) + 1
+            self._header["stamp"] = stamp
+            slot = self._slots[start + way]
+            slot["stamp"] = 0
+            slot["key0"] = key0
+            slot["key1"] = key1
+            slot["action"] = action
+            slot["stamp"] = stamp
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+    def hit_rate(self):
+        """
+        Get the fraction of this process's lookups that found a decision.
+        :return: The hit rate, 0.0 before the first lookup.
+        """
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+    def flush(self):
+        """
+        Adds the lookups of this process to the totals in the file
+        and writes the changes to the disk.
+        """
+        hits = self._hits - self._reported_hits
+        misses = self._misses - self._reported_misses
+        with open(self._path, "r+b") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            self._header["hits"] += hits
+            self._header["lookups"] += hits + misses
+            fcntl.flock(file, fcntl.LOCK_UN)
+        self._reported_hits = self._hits
+        self._reported_misses = self._misses
+        self._header.flush()
+        self._slots.flush()
+
+    def stats(self):
+        """
+        Get the statistics of the book.
+        :return: Dictionary with the size and capacity, the hits
+        and lookups of this process and the totals of all processes
+        added by flush().
+        """
+        return {
+            "size": self.size(),
+            "capacity": self.capacity(),
+            "hits": self._hits,
+            "lookups": self._hits + self._misses,
+            "hit_rate": self.hit_rate(),
+            "total_hits": int(self._header["hits"][0]),
+            "total_lookups": int(self._header["lookups"][0]),
+        }
@@ -0,0 +1,291 @@
+from monopoly.input import Input
+
+
+class BotPolicy:
+    """
+    The BotPolicy class.
+
+    The default computer player strategy.
+    It buys every card and builds every house it can afford,
+    as long as the purchase leaves it with more than cash_reserve.
+    """
+    def __init__(self, cash_reserve=0):
+        """
+        Initializes the policy.
+        :param cash_reserve: The amount the bot never spends, 0 by default.
+        """
+        self._cash_reserve = cash_reserve
+
+    def cash_reserve(self):
+        """
+        Get the amount the bot never spends.
+        :return: The cash reserve.
+        """
+        return self._cash_reserve
+
+    def key(self):
+        """
+        Get a text describing the policy and its settings.
+        Used to tell apart the results of different policies.
+        :return: The description of the policy.
+        """
+        return f"{type(self).__name__}(cash_reserve={self._cash_reserve})"
+
+    def clone(self):
+        """
+        Get a policy that decides like this one from now on,
+        to ask from another thread without changing this one.
+        The decisions of the policy depend only on its settings,
+        so the policy itself is returned.
+        :return: The BotPolicy.
+        """
+        return self
+
+    def can_spend(self, player, amount):
+        """
+        Check if spending the amount leaves the player above the reserve.
+        :param player: The player that would pay.
+        :param amount: The amount to be paid.
+        :return: True if the player can spend it, else False.
+        """
+        return player.cash() - amount > self._cash_reserve
+
+    def wants_card(self, game, card, player):
+        """
+        Decide if the player buys the card they landed on.
+        :param game: The game being played.
+        :param card: The card that can be bought.
+        :param player: The player that landed on the card.
+        :return: True to buy the card, else False.
+        """
+        return self.can_spend(player, card.price())
+
+    def houses_to_build(self, game, card, player):
+        """
+        Decide how many houses the player builds on their card.
+        :param game: The game being played.
+        :param card: The card the houses can be built on.
+        :param player: The owner of the card.
+        :return: The number of houses, 0 when the player doesn't build.
+        """
+        houses = card.possible_num_houses()
+        while houses and not self.can_spend(
+                player, houses * card.house_price()):
+            houses -= 1
+        return houses
+
+    def wants_hotel(self, game, card, player):
+        """
+        Decide if the player builds a hotel on their card.
+        :param game: The game being played.
+        :param card: The card the hotel can be built on.
+        :param player: The owner of the card.
+        :return: True to build the hotel, else False.
+        """
+        return self.can_spend(player, card.house_price())
+
+
+class ParametricPolicy(BotPolicy):
+    """
+    The ParametricPolicy class.
+
+    A bot policy with a setting for every color,
+    tuned by monopoly.evolve instead of by hand.
+    A card is bought if the purchase leaves more than the part
+    of the cash reserve given by the color's buy priority,
+    houses and hotels are built up to the part of the houses
+    given by the color's aggressiveness.
+    With the default settings it plays like BotPolicy.
+    """
+    def __init__(self, cash_reserve=0, buy_priority=None,
+                 aggressiveness=None):
+        """
+        :param cash_reserve: The amount the bot keeps.
+        :param buy_priority: Dictionary of color to a number between
+        0 and 1. A card of a color with priority p is bought if
+        the purchase leaves more than (1 - p) * cash_reserve,
+        colors missing from it have priority 0.
+        :param aggressiveness: Dictionary of color to a number between
+        0 and 1, the part of the houses the bot builds at once,
+        at least one house; a hotel is built above 0.5.
+        Colors missing from it have aggressiveness 1.
+        """
+        super().__init__(cash_reserve)
+        self._buy_priority = dict(buy_priority or {})
+        self._aggressiveness = dict(aggressiveness or {})
+
+    def buy_priority(self, color):
+        """
+        Get the buy priority of a color.
+        :param color: The color.
+        :return: The priority, between 0 and 1.
+        """
+        return self._buy_priority.get(color, 0.0)
+
+    def aggressiveness(self, color):
+        """
+        Get the building aggressiveness of a color.
+        :param color: The color.
+        :return: The aggressiveness, between 0 and 1.
+        """
+        return self._aggressiveness.get(color, 1.0)
+
+    def key(self):
+        """
+        Get a text describing the policy and its settings.
+        :return: The description of the policy.
+        """
+        priority = ",".join(
+            f"{color}={value:g}"
+            for color, value in sorted(self._buy_priority.items())
+        )
+        aggressiveness = ",".join(
+            f"{color}={value:g}"
+            for color, value in sorted(self._aggressiveness.items())
+        )
+        return (
+            f"ParametricPolicy(cash_reserve={self._cash_reserve},"
+            f"buy_priority={{{priority}}},"
+            f"aggressiveness={{{aggressiveness}}})"
+        )
+
+    def wants_card(self, game, card, player):
+        """
+        Buys the card if it leaves the reserve of its color.
+        """
+        reserve = (1 - self.buy_priority(card.color())) * self._cash_reserve
+        return player.cash() - card.price() > reserve
+
+    def houses_to_build(self, game, card, player):
+        """
+        Builds the color's part of the houses the card can take,
+        as many of them as the player can afford.
+        """
+        share = self.aggressiveness(card.color())
+        houses = max(round(share * card.possible_num_houses()), 1)
+        while houses and not self.can_spend(
+                player, houses * card.house_price()):
+            houses -= 1
+        return houses
+
+    def wants_hotel(self, game, card, player):
+        """
+        Builds the hotel on the aggressive colors only.
+        """
+        return (self.aggressiveness(card.color()) > 0.5
+                and self.can_spend(player, card.house_price()))
+
+
+class BotInput(Input):
+    """
+    The BotInput class.
+
+    Answers the questions of Input with the decisions of bot policies,
+    without asking anyone at the keyboard.
+    Every player of the game is controlled by a policy.
+    """
+    def __init__(self, players_count, policies=None):
+        """
+        Initializes the bot input.
+        :param players_count: The number of players in the game.
+        :param policies: List of BotPolicy objects, one per player,
+        a default BotPolicy for everyone by default.
+        Attributes:
+            game: the game the bots play, set by attach().
+            player_policies: policy of each Player object.
+            houses: the number of houses decided by the last
+            ask_player_to_buy_houses, returned by ask_number_houses.
+        """
+        if policies is None:
+            policies = [BotPolicy()] * players_count
+        self._players_count = players_count
+        self._policies = policies
+        self._game = None
+        self._player_policies = {}
+        self._houses = 0
+
+    def attach(self, game):
+        """
+        Assigns the policies to the players of the game,
+        in the order of their turns.
+        Has to be called after the players are initialized.
+        :param game: The game the bots play.
+        """
+        self._game = game
+        self._player_policies = dict(zip(game.players(), self._policies))
+
+    def policy(self, player):
+        """
+        Get the policy that controls a player.
+        :param player: The player.
+        :return: The BotPolicy of the player.
+        """
+        return self._player_policies[player]
+
+    def ask_player_to_buy_card(self, card, player):
+        """
+        Asks the player's policy if it buys the card.
+        :param card: The card that can be bought.
+        :param player: The player that is given the option to buy.
+        :return: "y" or "n".
+        """
+        if self.policy(player).wants_card(self._game, card, player):
+            return "y"
+        return "n"
+
+    def ask_to_take_back(self, card, player):
+        """
+        Bots don't take back their answers.
+        :return: "n".
+        """
+        return "n"
+
+    def ask_player_to_buy_houses(self, card, player):
+        """
+        Asks the player's policy how many houses it builds.
+        The number is kept for the following ask_number_houses.
+        :param card: The card the houses are being purchased for.
+        :param player: The card owner, player that's being asked.
+        :return: "y" if the policy builds any houses, else "n".
+        """
+        policy = self.policy(player)
+        self._houses = policy.houses_to_build(self._game, card, player)
+        if self._houses > 0:
+            return "y"
+        return "n"
+
+    def ask_number_houses(self, card, player):
+        """
+        Get the number of houses decided by ask_player_to_buy_houses.
+        :param card: The card the houses are being purchased for.
+        :param player: The card owner, player that's being asked.
+        :return: The number of houses, as an int.
+        """
+        return self._houses
+
+    def ask_player_to_buy_hotel(self, card, player):
+        """
+        Asks the player's policy if it builds a hotel.
+        :param card: The card the hotel is being purchased for.
+        :param player: The card owner, player that's being asked.
+        :return: "y" or "n".
+        """
+        if self.policy(player).wants_hotel(self._game, card, player):
+            return "y"
+        return "n"
+
+    def ask_for_number_of_players(self):
+        """
+        Get the number of players the bot input was created for.
+        :return: The number of players, as an int.
+        """
+        return self._players_count
+
+    def choose_menu_option(self, menu_description, options):
+        """
+        Bots always roll the dice and move.
+        :param menu_description: A description of the menu options.
+        :param options: A list of options.
+        :return: 0, the roll dice and move option.
+        """
+        return 0
@@ -0,0 +1,314 @@
+import argparse
+import os
+import sys
+
+"""
+Name of the program in the help of the commands.
+"""
+PROG = "monopoly"
+
+"""
+Default number of runs of a command of which bench reports the fastest
+start, and default number of games it plays to measure the engine.
+"""
+DEFAULT_STARTUP_RUNS = 5
+DEFAULT_BENCH_GAMES = 200
+
+
+def _parser(command, description):
+    return argparse.ArgumentParser(prog=f"{PROG} {command}",
+                                   description=description)
+
+
+def play(argv):
+    """
+    Plays a game at the keyboard.
+    :param argv: The arguments of the command.
+    :return: The finished Game.
+    """
+    import contextlib
+    import random
+
+    from monopoly.board import BoardDisplay
+    from monopoly.display import Display
+    from monopoly.game import Game
+    from monopoly.plane import Plane
+    from monopoly.transcript import RecordingInput
+
+    parser = _parser("play", "Play Monopoly.")
+    parser.add_argument("--seed", type=int,
+                        help="the seed of the game, a random one by default")
+    parser.add_argument(
+        "--record", metavar="FILE",
+        help="write the answers and the seed of the game to a transcript"
+    )
+    parser.add_argument(
+        "--profile", metavar="FILE",
+        help="write the sampled stacks of the game in the collapsed format"
+        " of flame graphs, without the waits for the keyboard"
+    )
+    parser.add_argument(
+        "--board", action="store_true",
+        help="draw the board on the whole screen, redrawing only"
+        " the fields that changed"
+    )
+    parser.add_argument(
+        "--forecast", action="store_true",
+        help="show the chance of every player to win, needs NumPy"
+    )
+    parser.add_argument(
+        "--undo", action="store_true",
+        help="ask after every answer to buy a card if the player takes"
+        " it back, to correct a misclick"
+    )
+    args = parser.parse_args(argv)
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    recorder = (RecordingInput(args.record, seed, take_back=args.undo)
+                if args.record else None)
+    plane = Plane()
+    display = BoardDisplay(plane) if args.board else Display()
+    game = Game(display, recorder, plane=plane, rng=random.Random(seed),
+                take_back=args.undo)
+    game.init_game()
+    if args.forecast:
+        try:
+            from monopoly.forecast import WinForecast
+        except ImportError:
+            pass
+        else:
+            WinForecast().attach(game)
+    sampler = None
+    if args.profile:
+        from monopoly.profiling import StackSampler
+        sampler = StackSampler()
+    try:
+        with (sampler.sampling() if sampler is not None
+              else contextlib.nullcontext()):
+            game.play_game()
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if sampler is not None:
+            sampler.stop()
+            sampler.write(args.profile)
+    return game
+
+
+def simulate(argv):
+    """
+    Simulates games of bots, see monopoly.simulation.main.
+    :param argv: The arguments of the command.
+    :return: GameAggregator of the games, or the ResultsStore
+    they were recorded in.
+    """
+    from monopoly.simulation import main
+
+    return main(argv, f"{PROG} simulate")
+
+
+def replay(argv):
+    """
+    Plays a recorded game again and prints it.
+    :param argv: The arguments of the command.
+    :return: The finished Game.
+    """
+    from monopoly.display import Display, HeadlessDisplay
+    from monopoly.transcript import replay_game
+
+    parser = _parser("replay", "Play a recorded game again.")
+    parser.add_argument("transcript", help="the transcript of the game")
+    parser.add_argument("--quiet", action="store_true",
+                        help="print only the end of the game")
+    args = parser.parse_args(argv)
+    game = replay_game(args.transcript,
+                       HeadlessDisplay() if args.quiet else Display())
+    if args.quiet:
+        Display().print_end_stats(game.losers(), game.find_winners())
+    return game
+
+
+def analyze(argv):
+    """
+    Prints the win rates and the game length of every config
+    recorded in a results store.
+    :param argv: The arguments of the command.
+    :return: The summary, see ResultsStore.summary.
+    """
+    from monopoly.store import ResultsStore
+
+    parser = _parser("analyze", "Sum up the games of a results store.")
+    parser.add_argument("store", help="the directory of the store")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.store):
+        parser.error(f"there's no store in {args.store}")
+    summary = ResultsStore(args.store).summary()
+    for key, results in summary.items():
+        print(key)
+        print(f"Games: {results['games']}")
+        for seat, rate in enumerate(results["win_rates"]):
+            print(f"Player {seat + 1} win rate: {rate:.3f}")
+        print(f"Mean rounds: {results['mean_rounds']:.1f}")
+    return summary
+
+
+def serve(argv):
+    """
+    Plays a game of bots streamed to the spectators connecting
+    over TCP, as lines of JSON.
+    :param argv: The arguments of the command.
+    :return: The finished Game.
+    """
+    import asyncio
+
+    from monopoly.simulation import (
+        DEFAULT_MAX_ROUNDS, SimulationConfig, new_game
+    )
+    from monopoly.spectate import (
+        SpectatorHub, play_watched, serve_spectators
+    )
+
+    parser = _parser("serve", "Stream a game of bots to spectators.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="the address to listen on")
+    parser.add_argument("--port", type=int, default=0,
+                        help="the port to listen on, any free one by default")
+    parser.add_argument("--spectators", type=int, default=1,
+                        help="the number of spectators to wait for")
+    parser.add_argument("--players", type=int, default=4,
+                        help="the number of players in the game")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_MAX_ROUNDS,
+                        help="the round limit of the game")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="the seed of the game")
+    args = parser.parse_args(argv)
+    game = new_game(args.seed, SimulationConfig(args.players, args.rounds))
+
+    async def watch():
+        hub = SpectatorHub()
+        server = await serve_spectators(hub, args.host, args.port)
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"Waiting for {args.spectators} spectators on {host}:{port}",
+              flush=True)
+        while hub.subscriptions() < args.spectators:
+            await asyncio.sleep(0.1)
+        await play_watched(game, hub)
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(watch())
+    winners = ", ".join(player.name() for player in game.find_winners())
+    print(f"Winners: {winners}")
+    return game
+
+
+def startup_time(args, runs=DEFAULT_STARTUP_RUNS):
+    """
+    Measures how long a new interpreter takes to run the arguments.
+    :param args: The arguments of the interpreter.
+    :param runs: The number of runs.
+    :return: The seconds of the fastest run.
+    """
+    import subprocess
+    import time
+
+    environment = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [root, environment.get("PYTHONPATH")])
+    )
+    fastest = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], env=environment,
+                       stdout=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - start
+        if fastest is None or elapsed < fastest:
+            fastest = elapsed
+    return fastest
+
+
+def bench(argv):
+    """
+    Measures the start of every command, next to the start
+    of the interpreter and of the game engine alone,
+    and the games per second of the engine.
+    A command starts when it has imported what it needs
+    and parsed its arguments, measured by running it with --help.
+    :param argv: The arguments of the command.
+    :return: Dictionary of what was measured to its seconds.
+    """
+    import time
+
+    from monopoly.simulation import (
+        DEFAULT_MAX_ROUNDS, SimulationConfig, simulate
+    )
+
+    parser = _parser("bench", "Measure the start of the commands"
+                              " and the speed of the engine.")
+    parser.add_argument("--runs", type=int, default=DEFAULT_STARTUP_RUNS,
+                        help="the runs of a command to take the fastest of")
+    parser.add_argument("--games", type=int, default=DEFAULT_BENCH_GAMES,
+                        help="the number of games played by the engine,"
+                        " 0 to measure only the start")
+    parser.add_argument("--players", type=int, default=4,
+                        help="the number of players in a game")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_MAX_ROUNDS,
+                        help="the round limit of a game")
+    args = parser.parse_args(argv)
+    results = {
+        "python": startup_time(["-c", "pass"], args.runs),
+        "engine": startup_time(["-c", "import monopoly.game"], args.runs),
+    }
+    for command in COMMANDS:
+        results[command] = startup_time(
+            ["-m", "monopoly", command, "--help"], args.runs
+        )
+    for name, seconds in results.items():
+        print(f"Start of {name}: {seconds * 1000:.1f} ms")
+    if args.games > 0:
+        start = time.perf_counter()
+        simulate(range(args.games),
+                 SimulationConfig(args.players, args.rounds))
+        results["games"] = time.perf_counter() - start
+        print(f"Games per second: {args.games / results['games']:.1f}")
+    return results
+
+
+"""
+The commands with their help, every command imports the modules
+it needs when it's run, so a command doesn't wait for the imports
+of the others.
+"""
+COMMANDS = {
+    "play": (play, "play a game at the keyboard"),
+    "simulate": (simulate, "simulate games of bots"),
+    "bench": (bench, "measure the start of the commands and the engine"),
+    "replay": (replay, "play a recorded game again"),
+    "analyze": (analyze, "sum up the games of a results store"),
+    "serve": (serve, "stream a game of bots to spectators"),
+}
+
+
+def main(argv=None):
+    """
+    Runs a command of the monopoly program.
+    :param argv: The command and its arguments,
+    the ones of the program by default.
+    :return: The result of the command.
+    """
+    parser = argparse.ArgumentParser(
+        prog=PROG, description="Monopoly in the terminal.",
+        epilog="commands:\n" + "\n".join(
+            f"  {name:<10}{description}"
+            for name, (_, description) in COMMANDS.items()
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command",
+                        help="the command, see below")
+    parser.add_argument("args", nargs=argparse.REMAINDER,
+                        help="the arguments of the command, see"
+                        f" {PROG} <command> --help")
+    args = parser.parse_args(argv)
+    command, _ = COMMANDS[args.command]
+    return command(args.args)
@@ -0,0 +1,362 @@
+import multiprocessing
+import pickle
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+from monopoly.simulation import (
+    DEFAULT_CHUNK_SIZE, _simulate_range, seed_chunks
+)
+from monopoly.stats import GameAggregator
+
+"""
+Default settings of the cluster: the seconds a worker has
+to finish a chunk before it's leased to another one,
+the seconds a worker waits when every chunk is leased,
+and the connection attempts of a worker and the seconds between them.
+"""
+DEFAULT_LEASE_TIMEOUT = 600.0
+DEFAULT_POLL_DELAY = 0.5
+DEFAULT_RETRIES = 10
+DEFAULT_RETRY_DELAY = 1.0
+
+"""
+Format of the length of a message, sent before the pickled message.
+"""
+LENGTH_FORMAT = "!I"
+LENGTH_BYTES = struct.calcsize(LENGTH_FORMAT)
+
+
+def send_message(connection, message):
+    """
+    Sends a message, a pickled object preceded by its length.
+    :param connection: The socket.
+    :param message: The object.
+    """
+    data = pickle.dumps(message)
+    connection.sendall(struct.pack(LENGTH_FORMAT, len(data)) + data)
+
+
+def _receive_exactly(connection, size):
+    data = b""
+    while len(data) < size:
+        part = connection.recv(size - len(data))
+        if not part:
+            return None
+        data += part
+    return data
+
+
+def receive_message(connection):
+    """
+    Receives a message sent by send_message.
+    :param connection: The socket.
+    :return: The object, None if the connection was closed.
+    """
+    header = _receive_exactly(connection, LENGTH_BYTES)
+    if header is None:
+        return None
+    data = _receive_exactly(connection,
+                            struct.unpack(LENGTH_FORMAT, header)[0])
+    if data is None:
+        return None
+    return pickle.loads(data)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        self.server.coordinator._serve(self.request)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Coordinator:
+    """
+    The Coordinator class.
+
+    Hands out the chunks of seeds of a simulation (see seed_chunks)
+    to worker daemons connecting over TCP, and merges
+    the GameAggregator each worker sends back for a chunk.
+    Every game depends only on its seed, so any chunk can be
+    played by any worker, and played again:
+    a chunk leased by a worker that disconnects or doesn't finish
+    within the lease timeout goes back to the queue,
+    and a chunk finished twice is merged only once.
+    The messages are pickled, so the coordinator and the workers
+    have to trust each other, as on a private network.
+    """
+    def __init__(self, games, config, first_seed=0,
+                 chunk_size=DEFAULT_CHUNK_SIZE, host="127.0.0.1", port=0,
+                 lease_timeout=DEFAULT_LEASE_TIMEOUT):
+        """
+        :param games: The number of games.
+        :param config: SimulationConfig of the games.
+        :param first_seed: The seed of the first game.
+        :param chunk_size: The number of games of a chunk.
+        :param host: The address to listen on.
+        :param port: The port to listen on, 0 for any free port.
+        :param lease_timeout: The seconds after which a chunk
+        a worker hasn't finished is leased again.
+        Attributes:
+            chunks: list of (first seed, number of games) pairs.
+            pending: queue of the chunk numbers waiting for a worker.
+            leases: dictionary of a leased chunk number
+            to its deadline.
+            finished: set of the finished chunk numbers.
+            aggregator: GameAggregator of the finished chunks.
+            duplicates: number of results of finished chunks
+            that were thrown away.
+            condition: lock of the state, notified when a chunk
+            is finished.
+        """
+        self._config = config
+        self._chunks = seed_chunks(first_seed, games, chunk_size)
+        self._pending = deque(range(len(self._chunks)))
+        self._leases = {}
+        self._finished = set()
+        self._aggregator = GameAggregator(config.players_count(),
+                                          config.max_rounds())
+        self._duplicates = 0
+        self._lease_timeout = lease_timeout
+        self._condition = threading.Condition()
+        self._server = _Server((host, port), _Handler)
+        self._server.coordinator = self
+        self._thread = None
+
+    def address(self):
+        """
+        Get the address the workers connect to.
+        :return: (host, port) tuple.
+        """
+        return self._server.server_address
+
+    def start(self):
+        """
+        Starts accepting workers in a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """
+        Stops accepting workers.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def is_done(self):
+        """
+        Check if every chunk is finished.
+        :return: True if the simulation is finished, else False.
+        """
+        with self._condition:
+            return len(self._finished) == len(self._chunks)
+
+    def progress(self):
+        """
+        Get the number of finished chunks.
+        :return: (finished chunks, all chunks) tuple.
+        """
+        with self._condition:
+            return len(self._finished), len(self._chunks)
+
+    def duplicates(self):
+        """
+        Get the number of results thrown away because
+        their chunk was already finished.
+        :return: The number of duplicate results.
+        """
+        with self._condition:
+            return self._duplicates
+
+    def wait(self, timeout=None):
+        """
+        Waits until every chunk is finished.
+        :param timeout: The most seconds to wait, None for no limit.
+        :return: GameAggregator of all the games.
+        :raise: TimeoutError if the chunks aren't finished in time.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                    lambda: len(self._finished) == len(self._chunks),
+                    timeout):
+                raise TimeoutError(
+                    f"{len(self._finished)} of {len(self._chunks)} chunks"
+                    " finished"
+                )
+            return self._aggregator
+
+    def _lease(self):
+        """
+        Get the next chunk for a worker, expired leases first.
+        :return: The chunk number, None if every chunk is leased
+        or finished.
+        """
+        now = time.monotonic()
+        for chunk, deadline in list(self._leases.items()):
+            if deadline < now:
+                del self._leases[chunk]
+                self._pending.appendleft(chunk)
+        while self._pending:
+            chunk = self._pending.popleft()
+            if chunk not in self._finished:
+                self._leases[chunk] = now + self._lease_timeout
+                return chunk
+        return None
+
+    def _release(self, chunks):
+        """
+        Puts the unfinished chunks of a lost worker back in the queue.
+        """
+        for chunk in chunks:
+            if chunk in self._leases and chunk not in self._finished:
+                del self._leases[chunk]
+                self._pending.appendleft(chunk)
+
+    def _finish(self, chunk, aggregator):
+        """
+        Merges the result of a chunk, unless it's already finished.
+        """
+        if chunk in self._finished:
+            self._duplicates += 1
+            return
+        self._aggregator.merge(aggregator)
+        self._finished.add(chunk)
+        self._leases.pop(chunk, None)
+        self._condition.notify_all()
+
+    def _serve(self, connection):
+        """
+        Answers the messages of a worker until it disconnects.
+        Messages of a worker:
+            ("lease",): asks for a chunk, answered with
+            ("chunk", number, first seed, games, config),
+            ("wait", seconds) if every chunk is leased,
+            or ("done",).
+            ("result", number, aggregator): the result of a chunk,
+            answered with ("ok",).
+        """
+        leased = set()
+        try:
+            while True:
+                message = receive_message(connection)
+                if message is None:
+                    return
+                with self._condition:
+                    if message[0] == "lease":
+                        if len(self._finished) == len(self._chunks):
+                            reply = ("done",)
+                        else:
+                            chunk = self._lease()
+                            if chunk is None:
+                                reply = ("wait", DEFAULT_POLL_DELAY)
+                            else:
+                                leased.add(chunk)
+                                reply = ("chunk", chunk,
+                                         *self._chunks[chunk], self._config)
+                    else:
+                        _, chunk, aggregator = message
+                        self._finish(chunk, aggregator)
+                        leased.discard(chunk)
+                        reply = ("ok",)
+                send_message(connection, reply)
+        except OSError:
+            return
+        finally:
+            with self._condition:
+                self._release(leased)
+
+
+def run_worker(host, port, retries=DEFAULT_RETRIES,
+               retry_delay=DEFAULT_RETRY_DELAY):
+    """
+    Runs a worker daemon: leases chunks from a coordinator,
+    plays their games and sends back the aggregates, until
+    the coordinator has no more chunks.
+    A lost connection is opened again, up to retries times in a row.
+    :param host: The address of the coordinator.
+    :param port: The port of the coordinator.
+    :param retries: The connection attempts before giving up.
+    :param retry_delay: The seconds between the attempts.
+    :return: The number of chunks the worker played.
+    """
+    played = 0
+    failures = 0
+    while True:
+        try:
+            with socket.create_connection((host, port)) as connection:
+                failures = 0
+                while True:
+                    send_message(connection, ("lease",))
+                    reply = receive_message(connection)
+                    if reply is None:
+                        raise ConnectionError("The coordinator disconnected.")
+                    if reply[0] == "done":
+                        return played
+                    if reply[0] == "wait":
+                        time.sleep(reply[1])
+                        continue
+                    _, chunk, first_seed, games, config = reply
+                    aggregator = _simulate_range(first_seed, games, config)
+                    send_message(connection, ("result", chunk, aggregator))
+                    if receive_message(connection) is None:
+                        raise ConnectionError("The coordinator disconnected.")
+                    played += 1
+        except OSError:
+            failures += 1
+            if failures > retries:
+                return played
+            time.sleep(retry_delay)
+
+
+def run_cluster(games, config, workers=2, first_seed=0,
+                chunk_size=DEFAULT_CHUNK_SIZE,
+                lease_timeout=DEFAULT_LEASE_TIMEOUT, timeout=None):
+    """
+    Plays games with a coordinator and worker daemons on this machine.
+    The result is the same as the one of run_batch.
+    :param games: The number of games.
+    :param config: SimulationConfig of the games.
+    :param workers: The number of worker processes.
+    :param first_seed: The seed of the first game.
+    :param chunk_size: The number of games of a chunk.
+    :param lease_timeout: The seconds after which a chunk is leased again.
+    :param timeout: The most seconds to wait, None for no limit.
+    :return: GameAggregator of all the games.
+    """
+    coordinator = Coordinator(games, config, first_seed, chunk_size,
+                              lease_timeout=lease_timeout)
+    coordinator.start()
+    host, port = coordinator.address()
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(host, port),
+                                daemon=True)
+        for _ in range(workers)
+    ]
+    try:
+        for process in processes:
+            process.start()
+        return coordinator.wait(timeout)
+    finally:
+        coordinator.close()
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python -m monopoly.cluster HOST PORT")
+    run_worker(sys.argv[1], int(sys.argv[2]))
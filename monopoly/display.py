@@ -10,7 +10,8 @@ class Display:
         It is called at the end of every round's last turn.
 
         It gives the players information about their position on the plane
-        and their bank balance.
+        and their bank balance, and their estimated chance to win
+        with its error margin when the stats have one.
 
         It also prints a dotted line at the end,
         to visually separate rounds in the terminal.
@@ -21,7 +22,11 @@ class Display:
         print(f"Round #: {(game_state.round())}")
         print("Player stats:")
         for player_stat in game_state.player_stats():
-            print(f"{player_stat.name()}: position: {player_stat.position()}, {player_stat.cash()}")  # noqa
+            line = f"{player_stat.name()}: position: {player_stat.position()}, {player_stat.cash()}"  # noqa
+            if player_stat.win_chance() is not None:
+                chance, margin = player_stat.win_chance()
+                line += f", win chance: {chance:.0%} ± {margin:.0%}"
+            print(line)
         print("-----------------------------------------------------------------------------------")  # noqa
 
     def print_end_stats(self, losers, winners):
@@ -85,6 +90,31 @@ class Display:
         print(msg)
 
 
+class HeadlessDisplay(Display):
+    """
+    The HeadlessDisplay class.
+
+    Display that prints nothing, used by simulated games.
+    """
+    def refresh_game_round_stats(self, game_state):
+        pass
+
+    def print_end_stats(self, losers, winners):
+        pass
+
+    def show_card_info(self, card):
+        pass
+
+    def show_card_info_own(self, card):
+        pass
+
+    def show_fields(self, field_infos):
+        pass
+
+    def show_message(self, msg):
+        pass
+
+
 class PlayerStat:
     """
     The PlayerStat class.
@@ -101,10 +131,29 @@ class PlayerStat:
         :param name: Player's name.
         :param position: Player's current position.
         :param cash: Player's current bank balance.
+        Attributes:
+            win_chance: (chance, margin) estimate of the player's chance
+            to win, None until it's set.
         """
         self._cash = cash
         self._position = position
         self._name = name
+        self._win_chance = None
+
+    def win_chance(self):
+        """
+        Get the estimated chance of the player to win.
+        :return: (chance, margin) tuple, None if there's no estimate.
+        """
+        return self._win_chance
+
+    def set_win_chance(self, chance, margin):
+        """
+        Set the estimated chance of the player to win.
+        :param chance: The estimated chance, between 0 and 1.
+        :param margin: The error margin of the estimate.
+        """
+        self._win_chance = (chance, margin)
 
     def cash(self):
         """
@@ -0,0 +1,444 @@
+from collections import Counter
+
+from monopoly.bot import BotPolicy
+from monopoly.game import DICE_MIN, DICE_MAX
+from monopoly.plane import DEFAULT_RULES, PLANE_LENGTH, new_board
+from monopoly.state import (
+    TranspositionCache, game_state, BUY, HOUSES, HOTEL, HOTEL_LEVEL,
+    UNBUILDABLE_COLORS
+)
+
+"""
+Default number of turns the solver looks ahead.
+"""
+DEFAULT_DEPTH = 3
+
+"""
+Default number of positions kept in the solver's table. An entry
+takes a few hundred bytes, so 200000 entries stay below 100 MB.
+"""
+DEFAULT_TABLE_SIZE = 200000
+
+"""
+Default number of cards left to buy for a game to count as an endgame.
+"""
+DEFAULT_FREE_CARDS = 4
+
+
+class EndgameState:
+    """
+    The EndgameState class.
+
+    An immutable copy of a game position that the solver searches,
+    at the start of the turn of seat, indexed like GameState.
+    Equal positions are equal and have the same hash,
+    so the state itself is the key of the solver's table.
+    """
+    __slots__ = ("positions", "cash", "owners", "levels", "seat", "_hash")
+
+    def __init__(self, positions, cash, owners, levels, seat):
+        """
+        :param positions, cash: Tuples with the value of every player.
+        :param owners, levels: Tuples with the value of every field.
+        :param seat: The seat to move.
+        """
+        self.positions = tuple(positions)
+        self.cash = tuple(cash)
+        self.owners = tuple(owners)
+        self.levels = tuple(levels)
+        self.seat = seat
+        self._hash = hash(
+            (self.positions, self.cash, self.owners, self.levels, seat)
+        )
+
+    def __eq__(self, other):
+        return (
+            self._hash == other._hash and self.seat == other.seat
+            and self.cash == other.cash and self.positions == other.positions
+            and self.owners == other.owners and self.levels == other.levels
+        )
+
+    def __hash__(self):
+        return self._hash
+
+    def replace(self, **changes):
+        """
+        Get a copy of the state with some of the values changed.
+        :param changes: New values, by the argument names of the class.
+        :return: The new EndgameState.
+        """
+        values = {
+            "positions": self.positions, "cash": self.cash,
+            "owners": self.owners, "levels": self.levels,
+            "seat": self.seat,
+        }
+        values.update(changes)
+        return EndgameState(**values)
+
+
+def endgame_state(game, seat=0):
+    """
+    Copies the position of a Game.
+    :param game: The Game.
+    :param seat: The seat to move.
+    :return: EndgameState.
+    """
+    state = game_state(game, seat)
+    return EndgameState(state.positions, state.cash, state.owners,
+                        state.levels, seat)
+
+
+def is_endgame(game, free_cards=DEFAULT_FREE_CARDS):
+    """
+    Check if a game is small enough for the solver:
+    two players left and few cards to buy.
+    :param game: The Game.
+    :param free_cards: The most cards nobody owns.
+    :return: True if it's an endgame, else False.
+    """
+    left = sum(player.is_in_game() for player in game.players())
+    free = sum(
+        card.is_property() and card.owner() is None
+        for card in game.plane().fields()
+    )
+    return left == 2 and free <= free_cards
+
+
+def _add(total, values, weight):
+    for seat, value in enumerate(values):
+        total[seat] += weight * value
+
+
+class EndgameSolver:
+    """
+    The EndgameSolver class.
+
+    Expectimax search of a game over all the throws of the dice
+    and all the chance values, with every player choosing the answers
+    that maximize their own chance to win.
+    The value of a position is the probability of every player
+    to be the only one left, the rules of Game and Player are followed
+    exactly. The search stops after depth turns: positions there
+    get the players' shares of the wealth as an estimate
+    and the result is only exact if every line of play
+    ended the game before. The round limit of the game is ignored.
+    Searched positions are kept in a TranspositionCache, the least
+    recently used are dropped when the table is full.
+    """
+    def __init__(self, rules=None, depth=DEFAULT_DEPTH,
+                 table_size=DEFAULT_TABLE_SIZE):
+        """
+        :param rules: Rules of the game, DEFAULT_RULES by default.
+        :param depth: The number of turns to look ahead.
+        :param table_size: The most positions kept in the table.
+        Attributes:
+            table: TranspositionCache of state to (depth, values, exact).
+            nodes: the number of positions searched.
+        """
+        rules = rules if rules is not None else DEFAULT_RULES
+        cards = new_board(rules)
+        self._rules = rules
+        self._depth = depth
+        self._table = TranspositionCache(table_size)
+        self._nodes = 0
+        self._kinds = [card.type() for card in cards]
+        self._prices = [card.price() or 0 for card in cards]
+        self._fees = [card._fee for card in cards]
+        self._house_prices = [card.house_price() or 0 for card in cards]
+        self._multipliers = rules.rent_multipliers()
+        groups = {}
+        for field, card in enumerate(cards):
+            if card.is_property() and card.color() not in UNBUILDABLE_COLORS:
+                groups.setdefault(card.color(), []).append(field)
+        self._groups = [groups.get(card.color()) for card in cards]
+        throws = range(DICE_MIN, DICE_MAX + 1)
+        self._throws = [(throw, 1 / len(throws)) for throw in throws]
+        chances = Counter(rules.chances())
+        self._chances = [
+            (value, count / len(rules.chances()))
+            for value, count in sorted(chances.items())
+        ]
+
+    def table(self):
+        """
+        Get the table of searched positions.
+        :return: The TranspositionCache.
+        """
+        return self._table
+
+    def nodes(self):
+        """
+        Get the number of positions searched.
+        :return: The number of positions.
+        """
+        return self._nodes
+
+    def solve(self, state, depth=None):
+        """
+        Get the win probabilities of a position.
+        :param state: EndgameState at the start of a turn.
+        :param depth: The number of turns, the solver's depth by default.
+        :return: (values, exact) tuple, values has the win probability
+        of every player, exact is False if it used estimates.
+        """
+        return self._value(state, self._depth if depth is None else depth)
+
+    def options(self, state, kind, field):
+        """
+        Get the answers to a decision that the player can afford.
+        :param state: EndgameState during the turn of the deciding seat.
+        :param kind: The decision, BUY, HOUSES or HOTEL.
+        :param field: The field index of the card.
+        :return: List of actions, see VectorGame.decide.
+        """
+        cash = state.cash[state.seat]
+        if kind == BUY:
+            return [0, 1] if cash >= self._prices[field] else [0]
+        house_price = self._house_prices[field]
+        if kind == HOTEL:
+            return [0, 1] if cash >= house_price else [0]
+        highest = min(4 - state.levels[field], cash // house_price)
+        return list(range(max(highest, 0) + 1))
+
+    def decision_values(self, state, kind, field, depth=None):
+        """
+        Get the value of every answer to a decision.
+        :param state: EndgameState during the turn of the deciding seat,
+        after the move.
+        :param kind: The decision, BUY, HOUSES or HOTEL.
+        :param field: The field index of the card.
+        :param depth: The number of turns, the solver's depth by default.
+        :return: Dictionary of action to (values, exact) tuple.
+        """
+        depth = self._depth if depth is None else depth
+        return {
+            action: self._value(
+                self._end_turn(self._apply(state, kind, field, action)),
+                depth - 1
+            )
+            for action in self.options(state, kind, field)
+        }
+
+    def best_action(self, state, kind, field, depth=None):
+        """
+        Get the answer to a decision that maximizes the chance
+        of the deciding player to win.
+        :return: The action, the smallest one among equal values.
+        """
+        values = self.decision_values(state, kind, field, depth)
+        return max(values, key=lambda action: (
+            values[action][0][state.seat], -action
+        ))
+
+    def _apply(self, state, kind, field, action):
+        """
+        Carries out an answer, like VectorGame.apply_decisions.
+        """
+        if action == 0:
+            return state
+        seat = state.seat
+        cash = list(state.cash)
+        if kind == BUY:
+            cash[seat] -= self._prices[field]
+            owners = list(state.owners)
+            owners[field] = seat
+            return state.replace(cash=cash, owners=owners)
+        levels = list(state.levels)
+        if kind == HOTEL:
+            cash[seat] -= self._house_prices[field]
+            levels[field] = HOTEL_LEVEL
+        else:
+            cash[seat] -= action * self._house_prices[field]
+            levels[field] += action
+        return state.replace(cash=cash, levels=levels)
+
+    def _end_turn(self, state):
+        return state.replace(seat=(state.seat + 1) % len(state.cash))
+
+    def _estimate(self, state):
+        """
+        Estimates the win probabilities with the shares of the wealth
+        of the players still in the game.
+        """
+        wealth = [
+            max(cash, 1) if cash > 0 else 0 for cash in state.cash
+        ]
+        for field, owner in enumerate(state.owners):
+            if owner >= 0 and wealth[owner]:
+                wealth[owner] += (
+                    self._prices[field]
+                    + self._house_prices[field] * state.levels[field]
+                )
+        total = sum(wealth) or 1
+        return tuple(value / total for value in wealth)
+
+    def _value(self, state, depth):
+        """
+        Searches a position at the start of a turn.
+        :return: (values, exact) tuple.
+        """
+        if state.seat == 0:
+            alive = [cash > 0 for cash in state.cash]
+            if sum(alive) < 2:
+                return tuple(
+                    1.0 if sum(alive) == 1 and left else 0.0
+                    for left in alive
+                ), True
+        if state.cash[state.seat] <= 0:
+            return self._value(self._end_turn(state), depth)
+        if depth <= 0:
+            return self._estimate(state), False
+        entry = self._table.get(state)
+        if entry is not None and (entry[2] or entry[0] >= depth):
+            return entry[1], entry[2]
+        self._nodes += 1
+        seat = state.seat
+        total = [0.0] * len(state.cash)
+        exact = True
+        for throw, chance in self._throws:
+            position = state.positions[seat] + throw
+            cash = list(state.cash)
+            if position >= PLANE_LENGTH:
+                cash[seat] += self._rules.lap_bonus()
+                position -= PLANE_LENGTH
+            positions = list(state.positions)
+            positions[seat] = position
+            moved = state.replace(positions=positions, cash=cash)
+            for values, weight, known in self._landing(moved, depth):
+                _add(total, values, chance * weight)
+                exact = exact and known
+        values = tuple(total)
+        self._table.put(state, (depth, values, exact))
+        return values, exact
+
+    def _landing(self, state, depth):
+        """
+        Processes the field the player moved to, like Game.check_card.
+        :return: List of (values, probability, exact) of the outcomes.
+        """
+        seat = state.seat
+        field = (state.positions[seat] - 1) % PLANE_LENGTH
+        owner = state.owners[field]
+        kind = self._kinds[field]
+        cash = list(state.cash)
+        decision = None
+        if owner >= 0 and owner != seat:
+            fee = self._fees[field] * self._multipliers[state.levels[field]]
+            cash[seat] -= fee
+            cash[owner] += fee
+        elif owner == seat:
+            groups = self._groups[field]
+            if state.levels[field] == 4:
+                decision = HOTEL
+            elif groups is not None and state.levels[field] < 4 and all(
+                    state.owners[member] == seat for member in groups):
+                decision = HOUSES
+        elif kind == "FIELD":
+            decision = BUY
+        elif kind == "TAX":
+            cash[seat] -= self._fees[field]
+        elif kind == "START":
+            cash[seat] += self._rules.start_payout()
+        elif kind == "CHANCE":
+            outcomes = []
+            for value, weight in self._chances:
+                cash[seat] = state.cash[seat] - value
+                values, exact = self._value(
+                    self._end_turn(state.replace(cash=cash)), depth - 1
+                )
+                outcomes.append((values, weight, exact))
+            return outcomes
+        if decision is None:
+            values, exact = self._value(
+                self._end_turn(state.replace(cash=cash)), depth - 1
+            )
+            return [(values, 1.0, exact)]
+        answers = self.decision_values(state, decision, field, depth)
+        best = max(answers, key=lambda action: (
+            answers[action][0][seat], -action
+        ))
+        exact = all(known for _, known in answers.values())
+        return [(answers[best][0], 1.0, exact)]
+
+
+def adjudicate(game, solver=None):
+    """
+    Estimates who wins a game from the start of the next round,
+    to end games that run too long.
+    :param game: The Game, between two rounds.
+    :param solver: The EndgameSolver, one with the game's rules
+    by default.
+    :return: (probabilities, exact) tuple, probabilities is
+    a dictionary of Player to the probability of winning.
+    """
+    if solver is None:
+        solver = EndgameSolver(game.rules())
+    values, exact = solver.solve(endgame_state(game))
+    return dict(zip(game.players(), values)), exact
+
+
+class EndgamePolicy(BotPolicy):
+    """
+    The EndgamePolicy class.
+
+    A bot policy that decides with the EndgameSolver in endgames
+    (see is_endgame) and like BotPolicy before.
+    """
+    def __init__(self, solver=None, free_cards=DEFAULT_FREE_CARDS,
+                 cash_reserve=0):
+        """
+        :param solver: The EndgameSolver, one with the default
+        settings by default. It has to use the rules of the game.
+        :param free_cards: The most cards left to buy in an endgame.
+        :param cash_reserve: The cash reserve of the BotPolicy decisions.
+        """
+        super().__init__(cash_reserve)
+        self._solver = solver if solver is not None else EndgameSolver()
+        self._free_cards = free_cards
+
+    def key(self):
+        """
+        Get a text describing the policy and its settings.
+        :return: The description of the policy.
+        """
+        return (
+            f"EndgamePolicy(free_cards={self._free_cards},"
+            f"cash_reserve={self._cash_reserve})"
+        )
+
+    def _solve(self, game, card, player, kind):
+        """
+        Solves the decision, None when the game isn't an endgame yet.
+        """
+        if not is_endgame(game, self._free_cards):
+            return None
+        state = endgame_state(game, game.players().index(player))
+        field = game.plane().fields().index(card)
+        return self._solver.best_action(state, kind, field)
+
+    def wants_card(self, game, card, player):
+        """
+        Solves if the player buys the card.
+        """
+        action = self._solve(game, card, player, BUY)
+        if action is None:
+            return super().wants_card(game, card, player)
+        return action > 0
+
+    def houses_to_build(self, game, card, player):
+        """
+        Solves how many houses the player builds.
+        """
+        action = self._solve(game, card, player, HOUSES)
+        if action is None:
+            return super().houses_to_build(game, card, player)
+        return action
+
+    def wants_hotel(self, game, card, player):
+        """
+        Solves if the player builds the hotel.
+        """
+        action = self._solve(game, card, player, HOTEL)
+        if action is None:
+            return super().wants_hotel(game, card, player)
+        return action > 0
@@ -0,0 +1,244 @@
+import numpy as np
+
+from monopoly.plane import PLANE_LENGTH
+from monopoly.vector import VectorGame, BUY, HOUSES, HOTEL, HOTEL_LEVEL
+
+"""
+Number of actions: 0 refuses, 1 buys the card or builds the hotel,
+1-4 is the number of houses to build.
+"""
+ACTIONS_COUNT = 5
+
+"""
+Number of times a game ending before the agent's first decision
+is restarted before the environment gives up.
+"""
+MAX_RESTARTS = 1000
+
+
+def observation_size(players_count):
+    """
+    Get the length of an observation.
+    :param players_count: The number of players in a game.
+    :return: The number of values of an observation.
+    """
+    return PLANE_LENGTH * (2 * players_count + 2) + 2 * players_count + 4
+
+
+class VectorEnv:
+    """
+    The VectorEnv class.
+
+    Reinforcement learning environment playing many games at once,
+    with the reset()/step(actions) interface of Gym vector environments.
+    The agent plays one seat, the other seats are bots.
+    A step answers the pending decision of every game and plays
+    until the agent has to decide again: buy the card it landed on,
+    build houses (how many) or build a hotel, the questions of Input.
+
+    Observations are float32 arrays of observation_size(players_count):
+    for every field, a token flag and an ownership flag per player,
+    the building level and a flag of the field being decided,
+    then the cash and the in-game flag of every player,
+    the kind of the decision and the progress of the round limit.
+    Players are ordered from the agent's seat.
+
+    The reward is 1 when the agent is the last player left,
+    -1 when it goes bankrupt and 0 otherwise. Games reaching
+    the round limit are truncated. Finished games restart
+    automatically, their last observation is in
+    info["final_observation"].
+    """
+    def __init__(self, num_envs, players_count=4, agent_seat=0,
+                 max_rounds=1000, rules=None, opponent_reserve=0,
+                 seed=None):
+        """
+        :param num_envs: The number of games played at once.
+        :param players_count: The number of players in a game.
+        :param agent_seat: The seat of the agent in the order of turns.
+        :param max_rounds: The round limit of a game, at least 1.
+        :param rules: Rules of the games, DEFAULT_RULES by default.
+        :param opponent_reserve: Cash reserve of the bot players.
+        :param seed: Seed of the random generator.
+        :raise: ValueError if the round limit is below 1.
+        """
+        if max_rounds < 1:
+            raise ValueError(
+                f"The round limit has to be at least 1, not {max_rounds}."
+            )
+        self._num_envs = num_envs
+        self._players_count = players_count
+        self._agent_seat = agent_seat
+        self._engine = VectorGame(
+            num_envs, players_count, rules, max_rounds, opponent_reserve,
+            [agent_seat], seed
+        )
+        self._order = (agent_seat + np.arange(players_count)) % players_count
+        self._size = observation_size(players_count)
+
+    def num_envs(self):
+        """
+        Get the number of games played at once.
+        :return: The number of games.
+        """
+        return self._num_envs
+
+    def observation_shape(self):
+        """
+        Get the shape of a batch of observations.
+        :return: (num_envs, observation_size) tuple.
+        """
+        return (self._num_envs, self._size)
+
+    def engine(self):
+        """
+        Get the engine of the games.
+        :return: The VectorGame.
+        """
+        return self._engine
+
+    def reset(self, seed=None):
+        """
+        Starts new games and plays until the agent's first decision.
+        :param seed: Seed of the random generator, to restart it.
+        :return: (observations, info) tuple.
+        """
+        if seed is not None:
+            self._engine.reseed(seed)
+        self._restart(np.arange(self._num_envs))
+        return self.observe(), {"action_mask": self.action_mask()}
+
+    def step(self, actions):
+        """
+        Answers the pending decisions and plays until the next ones.
+        :param actions: Array of num_envs actions.
+        :return: (observations, rewards, terminated, truncated, info).
+        """
+        engine = self._engine
+        waiting = np.flatnonzero(engine.pending != 0)
+        engine.decide(waiting, np.asarray(actions)[waiting])
+        engine.advance()
+        finished = engine.done.copy()
+        alive = engine.alive()
+        agent_alive = alive[:, self._agent_seat]
+        won = finished & agent_alive & (alive.sum(axis=1) == 1)
+        lost = finished & ~agent_alive
+        rewards = won.astype(np.float32) - lost.astype(np.float32)
+        terminated = won | lost
+        truncated = finished & ~terminated
+        info = {}
+        if finished.any():
+            info["final_observation"] = self.observe()
+            self._restart(np.flatnonzero(finished))
+        info["action_mask"] = self.action_mask()
+        return self.observe(), rewards, terminated, truncated, info
+
+    def _restart(self, games):
+        """
+        Restarts the games and plays until the agent's decision,
+        restarting again the games that end before it.
+        :raise: ValueError if games end before the agent's decision
+        MAX_RESTARTS times.
+        """
+        engine = self._engine
+        for _ in range(MAX_RESTARTS):
+            engine.reset(games)
+            engine.advance(games)
+            games = games[engine.done[games]]
+            if not len(games):
+                return
+        raise ValueError(
+            f"{len(games)} games ended before a decision of the agent"
+            f" {MAX_RESTARTS} times, the agent never decides with"
+            f" {self._players_count} players and"
+            f" {self._engine.max_rounds()} rounds."
+        )
+
+    def action_mask(self):
+        """
+        Get the actions that have an effect in the pending decisions.
+        :return: [num_envs, ACTIONS_COUNT] boolean array,
+        action 0 (refuse) is always allowed.
+        """
+        games = np.arange(self._num_envs)
+        highest = self._engine.legal_actions(games)
+        return np.arange(ACTIONS_COUNT)[None, :] <= highest[:, None]
+
+    def observe(self):
+        """
+        Builds the observations of all the games.
+        :return: [num_envs, observation_size] float32 array.
+        """
+        engine = self._engine
+        count = self._num_envs
+        players = self._players_count
+        games = np.arange(count)
+        fields = np.zeros((count, PLANE_LENGTH, 2 * players + 2), np.float32)
+        tokens = (engine.position[:, self._order] - 1) % PLANE_LENGTH
+        for idx in range(players):
+            fields[games, tokens[:, idx], idx] = 1
+        owned = engine.owner >= 0
+        relative = (engine.owner - self._agent_seat) % players
+        owner_games, owner_fields = np.nonzero(owned)
+        fields[
+            owner_games, owner_fields,
+            players + relative[owner_games, owner_fields]
+        ] = 1
+        fields[:, :, 2 * players] = engine.level / HOTEL_LEVEL
+        waiting = engine.pending != 0
+        fields[games[waiting], engine.pending_field[waiting], -1] = 1
+        starting_cash = engine.board().rules().starting_cash()
+        cash = engine.cash[:, self._order] / starting_cash
+        alive = engine.alive()[:, self._order]
+        kinds = np.stack([engine.pending == kind
+                          for kind in (BUY, HOUSES, HOTEL)], axis=1)
+        progress = engine.round / engine.max_rounds()
+        return np.concatenate([
+            fields.reshape(count, -1),
+            cash,
+            alive,
+            kinds,
+            progress[:, None],
+        ], axis=1).astype(np.float32)
+
+
+class MonopolyEnv:
+    """
+    The MonopolyEnv class.
+
+    The environment of a single game, with the reset()/step(action)
+    interface of Gym. See VectorEnv for the observations and rewards.
+    """
+    def __init__(self, players_count=4, agent_seat=0, max_rounds=1000,
+                 rules=None, opponent_reserve=0, seed=None):
+        """
+        Same arguments as VectorEnv, without num_envs.
+        """
+        self._env = VectorEnv(
+            1, players_count, agent_seat, max_rounds, rules,
+            opponent_reserve, seed
+        )
+
+    def reset(self, seed=None):
+        """
+        Starts a new game and plays until the agent's first decision.
+        :param seed: Seed of the random generator, to restart it.
+        :return: (observation, info) tuple.
+        """
+        observations, info = self._env.reset(seed)
+        return observations[0], {"action_mask": info["action_mask"][0]}
+
+    def step(self, action):
+        """
+        Answers the pending decision and plays until the next one.
+        :param action: The action, between 0 and ACTIONS_COUNT - 1.
+        :return: (observation, reward, terminated, truncated, info).
+        """
+        observations, rewards, terminated, truncated, info = self._env.step(
+            np.array([action])
+        )
+        single = {"action_mask": info["action_mask"][0]}
+        if "final_observation" in info:
+            single["final_observation"] = info["final_observation"][0]
+        return (observations[0], float(rewards[0]), bool(terminated[0]),
+                bool(truncated[0]), single)
@@ -0,0 +1,389 @@
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from monopoly.bot import BotPolicy, ParametricPolicy
+from monopoly.plane import new_board
+from monopoly.simulation import SimulationConfig, play_game
+from monopoly.state import UNBUILDABLE_COLORS
+
+"""
+Default settings of Evolution: the individuals of a generation,
+the best ones kept unchanged, the standard deviation of a mutation
+as a part of a parameter's range, the chance of a parameter coming
+from the second parent, the individuals of a selection tournament
+and the games an individual plays.
+"""
+DEFAULT_POPULATION_SIZE = 20
+DEFAULT_ELITE = 2
+DEFAULT_MUTATION_SCALE = 0.1
+DEFAULT_CROSSOVER = 0.5
+DEFAULT_TOURNAMENT = 3
+DEFAULT_GAMES = 200
+
+"""
+Range of the cash reserve in ParameterSpace.
+"""
+MAX_CASH_RESERVE = 10000000
+
+
+class ParameterSpace:
+    """
+    The ParameterSpace class.
+
+    The parameters of ParametricPolicy for a board: the cash reserve,
+    the buy priority of every color and the aggressiveness
+    of every color houses can be built on.
+    A genome is a tuple with a value of every parameter.
+    """
+    def __init__(self, cards=None, max_cash_reserve=MAX_CASH_RESERVE):
+        """
+        :param cards: The cards of the board, new_board() by default.
+        :param max_cash_reserve: The highest cash reserve.
+        Attributes:
+            colors: the colors of the cards that can be bought.
+            building_colors: the colors of the cards with houses.
+        """
+        if cards is None:
+            cards = new_board()
+        colors = []
+        building_colors = []
+        for card in cards:
+            if card.is_property() and card.color() not in colors:
+                colors.append(card.color())
+                if card.color() not in UNBUILDABLE_COLORS:
+                    building_colors.append(card.color())
+        self._colors = colors
+        self._building_colors = building_colors
+        self._max_cash_reserve = max_cash_reserve
+
+    def names(self):
+        """
+        Get the names of the parameters, in the order of the genomes.
+        :return: List of names.
+        """
+        return (
+            ["cash_reserve"]
+            + [f"buy_priority.{color}" for color in self._colors]
+            + [f"aggressiveness.{color}" for color in self._building_colors]
+        )
+
+    def bounds(self):
+        """
+        Get the range of every parameter.
+        :return: List of (low, high) tuples.
+        """
+        return [(0, self._max_cash_reserve)] + [(0.0, 1.0)] * (
+            len(self._colors) + len(self._building_colors)
+        )
+
+    def random_genome(self, rng):
+        """
+        Creates a genome with uniformly chosen values.
+        :param rng: random.Random.
+        :return: The genome.
+        """
+        return self.clip([rng.uniform(low, high)
+                          for low, high in self.bounds()])
+
+    def clip(self, values):
+        """
+        Moves the values into the ranges of the parameters
+        and rounds them, so equal policies have equal genomes.
+        :param values: A value of every parameter.
+        :return: The genome.
+        """
+        genome = []
+        for value, (low, high) in zip(values, self.bounds()):
+            value = min(max(value, low), high)
+            genome.append(round(value, -4) if high > 1 else round(value, 3))
+        return tuple(genome)
+
+    def policy(self, genome):
+        """
+        Creates the policy of a genome.
+        :param genome: The genome.
+        :return: ParametricPolicy.
+        """
+        priorities = genome[1:1 + len(self._colors)]
+        aggressiveness = genome[1 + len(self._colors):]
+        return ParametricPolicy(
+            int(genome[0]),
+            dict(zip(self._colors, priorities)),
+            dict(zip(self._building_colors, aggressiveness)),
+        )
+
+
+def seat_score(game, seat):
+    """
+    Scores a finished game for a seat.
+    :param game: The finished Game.
+    :param seat: The index of the player in the order of turns.
+    :return: 1 divided by the number of winners if the seat
+    is one of them, else 0.
+    """
+    winners = game.find_winners()
+    if game.players()[seat] in winners:
+        return 1 / len(winners)
+    return 0.0
+
+
+def evaluate_genome(space, genome, first_seed, games, players_count=4,
+                    max_rounds=None, opponent=None):
+    """
+    Plays the policy of a genome against opponents.
+    Its seat moves around the table from game to game.
+    :param space: The ParameterSpace of the genome.
+    :param genome: The genome.
+    :param first_seed: The seed of the first game.
+    :param games: The number of games.
+    :param players_count: The number of players in a game.
+    :param max_rounds: The round limit, the simulation default by default.
+    :param opponent: BotPolicy of the other seats, BotPolicy() by default.
+    :return: The mean score, see seat_score.
+    """
+    policy = space.policy(genome)
+    opponent = opponent if opponent is not None else BotPolicy()
+    total = 0.0
+    for seed in range(first_seed, first_seed + games):
+        seat = seed % players_count
+        policies = [opponent] * players_count
+        policies[seat] = policy
+        if max_rounds is None:
+            config = SimulationConfig(players_count, policies=policies)
+        else:
+            config = SimulationConfig(players_count, max_rounds, policies)
+        total += seat_score(play_game(seed, config), seat)
+    return total / games
+
+
+class Evolution:
+    """
+    The Evolution class.
+
+    A genetic algorithm tuning the parameters of ParametricPolicy.
+    Every generation keeps its elite unchanged and fills the rest
+    with children of parents chosen by tournaments:
+    uniform crossover followed by a Gaussian mutation.
+    Every individual plays the same seeds against the opponents,
+    so its fitness is the same in every generation and the fitness
+    of a genome seen before is reused instead of played again.
+    The games of a generation are played on a pool of worker
+    processes, and the state is saved to the checkpoint after
+    every generation, so an interrupted run continues from it.
+    """
+    def __init__(self, space, population_size=DEFAULT_POPULATION_SIZE,
+                 elite=DEFAULT_ELITE, mutation_scale=DEFAULT_MUTATION_SCALE,
+                 crossover=DEFAULT_CROSSOVER, tournament=DEFAULT_TOURNAMENT,
+                 games=DEFAULT_GAMES, players_count=4, max_rounds=None,
+                 opponent=None, first_seed=0, seed=0, checkpoint=None):
+        """
+        Creates the first generation, or loads the checkpoint
+        if it exists.
+        :param space: The ParameterSpace.
+        :param population_size: The number of individuals.
+        :param elite: The number of best individuals kept unchanged.
+        :param mutation_scale: Standard deviation of a mutation,
+        as a part of the parameter's range.
+        :param crossover: The chance of a parameter of a child coming
+        from the second parent.
+        :param tournament: The number of individuals of a tournament.
+        :param games: The number of games an individual plays.
+        :param players_count: The number of players in a game.
+        :param max_rounds: The round limit, the simulation default by default.
+        :param opponent: BotPolicy of the other seats, BotPolicy() by default.
+        :param first_seed: The seed of the first game.
+        :param seed: Seed of the random choices of the algorithm.
+        :param checkpoint: Path of the checkpoint file, None to not save.
+        Attributes:
+            generation: the number of the current generation.
+            population: the genomes of the current generation.
+            fitness: dictionary of genome to its fitness.
+            evaluations: the number of genomes whose games were played.
+        """
+        self._space = space
+        self._population_size = population_size
+        self._elite = elite
+        self._mutation_scale = mutation_scale
+        self._crossover = crossover
+        self._tournament = tournament
+        self._games = games
+        self._players_count = players_count
+        self._max_rounds = max_rounds
+        self._opponent = opponent
+        self._first_seed = first_seed
+        self._checkpoint = checkpoint
+        self._rng = random.Random(seed)
+        self._fitness = {}
+        self._evaluations = 0
+        self._generation = 0
+        self._population = [
+            space.random_genome(self._rng) for _ in range(population_size)
+        ]
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self._load(checkpoint)
+
+    def generation(self):
+        """
+        Get the number of the current generation, 0 for the first one.
+        :return: The generation number.
+        """
+        return self._generation
+
+    def population(self):
+        """
+        Get the genomes of the current generation.
+        :return: List of genomes.
+        """
+        return self._population
+
+    def fitness(self, genome):
+        """
+        Get the fitness of a genome.
+        :param genome: The genome.
+        :return: The fitness, None if it hasn't been evaluated.
+        """
+        return self._fitness.get(genome)
+
+    def evaluations(self):
+        """
+        Get the number of genomes whose games were played.
+        :return: The number of evaluations.
+        """
+        return self._evaluations
+
+    def best(self):
+        """
+        Get the best evaluated genome.
+        :return: (genome, fitness) tuple, None before the first evaluation.
+        """
+        if not self._fitness:
+            return None
+        return max(self._fitness.items(), key=lambda item: item[1])
+
+    def evaluate(self, pool=None):
+        """
+        Plays the games of the genomes of the current generation
+        that haven't been evaluated.
+        :param pool: Executor to run the games on,
+        they are played in this process if None.
+        """
+        genomes = [
+            genome for genome in dict.fromkeys(self._population)
+            if genome not in self._fitness
+        ]
+        arguments = (
+            [self._space] * len(genomes),
+            genomes,
+            [self._first_seed] * len(genomes),
+            [self._games] * len(genomes),
+            [self._players_count] * len(genomes),
+            [self._max_rounds] * len(genomes),
+            [self._opponent] * len(genomes),
+        )
+        mapper = pool.map if pool is not None else map
+        for genome, fitness in zip(genomes, mapper(evaluate_genome,
+                                                   *arguments)):
+            self._fitness[genome] = fitness
+        self._evaluations += len(genomes)
+
+    def run_generation(self, pool=None):
+        """
+        Evaluates the current generation and replaces it
+        with the next one, then saves the checkpoint.
+        :param pool: Executor to run the games on,
+        they are played in this process if None.
+        """
+        self.evaluate(pool)
+        ranked = sorted(self._population, key=self._fitness.get,
+                        reverse=True)
+        population = ranked[:self._elite]
+        while len(population) < self._population_size:
+            first = self._select()
+            second = self._select()
+            population.append(self._mutate(self._cross(first, second)))
+        self._population = population
+        self._generation += 1
+        if self._checkpoint is not None:
+            self.save(self._checkpoint)
+
+    def run(self, generations, workers=None):
+        """
+        Runs generations until the given number of them is reached,
+        counting the generations of the checkpoint.
+        :param generations: The number of generations.
+        :param workers: The number of processes, one per CPU by default.
+        :return: The best (genome, fitness) tuple.
+        """
+        with ProcessPoolExecutor(workers) as pool:
+            while self._generation < generations:
+                self.run_generation(pool)
+            self.evaluate(pool)
+        return self.best()
+
+    def save(self, path):
+        """
+        Saves the state of the evolution, replacing the file atomically.
+        :param path: The path of the checkpoint.
+        """
+        version, state, gauss = self._rng.getstate()
+        data = {
+            "names": self._space.names(),
+            "generation": self._generation,
+            "population": self._population,
+            "fitness": [[genome, fitness]
+                        for genome, fitness in self._fitness.items()],
+            "evaluations": self._evaluations,
+            "rng": [version, state, gauss],
+        }
+        temporary = path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(data, file)
+        os.replace(temporary, path)
+
+    def _load(self, path):
+        """
+        Loads the state saved by save().
+        :raise: ValueError if the checkpoint has other parameters.
+        """
+        with open(path) as file:
+            data = json.load(file)
+        if data["names"] != self._space.names():
+            raise ValueError(f"{path} is a checkpoint of other parameters.")
+        self._generation = data["generation"]
+        self._population = [tuple(genome) for genome in data["population"]]
+        self._fitness = {
+            tuple(genome): fitness for genome, fitness in data["fitness"]
+        }
+        self._evaluations = data["evaluations"]
+        version, state, gauss = data["rng"]
+        self._rng.setstate((version, tuple(state), gauss))
+
+    def _select(self):
+        """
+        Chooses a parent, the fittest of a random tournament.
+        """
+        entrants = self._rng.sample(
+            self._population, min(self._tournament, len(self._population))
+        )
+        return max(entrants, key=self._fitness.get)
+
+    def _cross(self, first, second):
+        """
+        Takes every parameter from one of the parents.
+        """
+        return [
+            second[idx] if self._rng.random() < self._crossover
+            else first[idx]
+            for idx in range(len(first))
+        ]
+
+    def _mutate(self, values):
+        """
+        Adds Gaussian noise to the parameters.
+        """
+        return self._space.clip([
+            value + self._rng.gauss(0, self._mutation_scale * (high - low))
+            for value, (low, high) in zip(values, self._space.bounds())
+        ])
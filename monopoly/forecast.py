@@ -0,0 +1,259 @@
+import threading
+
+import numpy as np
+
+from monopoly.state import (
+    TranspositionCache, encode, game_state, loser_places
+)
+from monopoly.sweep import DEFAULT_Z
+from monopoly.vector import VectorGame
+
+"""
+Default settings of WinForecast: the rollouts played at once,
+the rounds a rollout lasts, the seconds the round summary waits
+for the first rollouts, the most rollouts of a position
+and the number of positions whose rollouts are kept.
+"""
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_HORIZON = 100
+DEFAULT_WAIT = 0.5
+DEFAULT_MAX_ROLLOUTS = 20000
+DEFAULT_CACHE_SIZE = 1000
+
+
+class Estimate:
+    """
+    The Estimate class.
+
+    Rollout scores of every player from one position.
+    """
+    def __init__(self, players_count):
+        """
+        :param players_count: The number of players.
+        Attributes:
+            count: the number of rollouts.
+            sums, squares: sums of the scores and their squares.
+        """
+        self._count = 0
+        self._sums = np.zeros(players_count)
+        self._squares = np.zeros(players_count)
+
+    def add(self, scores):
+        """
+        Adds the scores of a batch of rollouts.
+        :param scores: [rollouts, players] array.
+        """
+        self._count += len(scores)
+        self._sums += scores.sum(axis=0)
+        self._squares += (scores ** 2).sum(axis=0)
+
+    def count(self):
+        """
+        Get the number of rollouts.
+        :return: The number of rollouts.
+        """
+        return self._count
+
+    def chances(self, z=DEFAULT_Z):
+        """
+        Get the estimated chances of the players to win.
+        :param z: The number of standard errors of the margins.
+        :return: List of (chance, margin) tuples, one per player.
+        """
+        means = self._sums / self._count
+        variances = np.maximum(self._squares / self._count - means ** 2, 0)
+        margins = z * np.sqrt(variances / self._count)
+        return [(float(mean), float(margin))
+                for mean, margin in zip(means, margins)]
+
+
+def win_shares(engine):
+    """
+    Scores the games of an engine for every seat as wins:
+    the players still in the game share the win, like the winners
+    of Game.find_winners, so the only player left scores 1
+    and the k players left at the end of a rollout score 1/k.
+    :param engine: The VectorGame.
+    :return: [games, players] array of scores.
+    """
+    winners = engine.winners()
+    return winners / np.maximum(winners.sum(axis=1), 1)[:, None]
+
+
+class WinForecast:
+    """
+    The WinForecast class.
+
+    Estimates the chance of every player to win with rollouts
+    played by a background thread, while the players think
+    at the Input prompts, and adds the estimates to the round stats.
+    The rollouts start from the position at the end of the last turn
+    and play on with bots for horizon rounds on VectorGame.
+    A rollout scores its winners, see win_shares.
+
+    The end of every turn, and a turn taken back or played again,
+    cancels the rollouts of the old position and starts the new one.
+    Rollouts are kept per position key (see monopoly.state.encode)
+    with the rounds left to play and the places of the losers,
+    so a position met again with slightly different cash
+    continues from them.
+    Added as a listener of a Game with attach().
+    """
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE,
+                 horizon=DEFAULT_HORIZON, wait=DEFAULT_WAIT,
+                 max_rollouts=DEFAULT_MAX_ROLLOUTS,
+                 cache_size=DEFAULT_CACHE_SIZE, z=DEFAULT_Z, seed=None):
+        """
+        :param batch_size: The number of rollouts played at once,
+        a change of the position cancels them after the batch.
+        :param horizon: The number of rounds a rollout lasts at most.
+        :param wait: The most seconds the round stats wait
+        for the first batch of the last position.
+        :param max_rollouts: The rollouts after which a position
+        is left alone.
+        :param cache_size: The number of positions whose rollouts
+        are kept.
+        :param z: The number of standard errors of the margins.
+        :param seed: Seed of the rollouts.
+        Attributes:
+            root: (state, places, round) of the current position.
+            estimate: Estimate of the current position.
+            generation: number of the current position, the results
+            of older ones are thrown away.
+            condition: lock and signal shared with the thread.
+        """
+        self._batch_size = batch_size
+        self._horizon = horizon
+        self._wait = wait
+        self._max_rollouts = max_rollouts
+        self._cache = TranspositionCache(cache_size)
+        self._z = z
+        self._seed = seed
+        self._root = None
+        self._estimate = None
+        self._generation = 0
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def attach(self, game):
+        """
+        Starts following a game and the background thread.
+        :param game: The Game, with the players initialized.
+        """
+        self._restart(game, 0)
+        game.add_listener(self)
+        self._thread = threading.Thread(
+            target=self._work, args=(game.rules(), len(game.players())),
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background thread after its current batch.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def estimate(self):
+        """
+        Get the estimate of the current position.
+        :return: The Estimate.
+        """
+        with self._condition:
+            return self._estimate
+
+    def on_turn_end(self, game, player):
+        """
+        Restarts the rollouts from the new position.
+        """
+        seat = (game.players().index(player) + 1) % len(game.players())
+        self._restart(game, seat)
+
+    def on_undo(self, game, player):
+        """
+        Restarts the rollouts from the position before the player's
+        turn, which was taken back.
+        """
+        self._restart(game, game.players().index(player))
+
+    def on_redo(self, game, player):
+        """
+        Restarts the rollouts from the position after the player's
+        turn, which was played again.
+        """
+        self.on_turn_end(game, player)
+
+    def on_round_end(self, game, round_stats):
+        """
+        Adds the estimates to the round stats, waiting a moment
+        for the first rollouts of the position.
+        """
+        with self._condition:
+            estimate = self._estimate
+            self._condition.wait_for(
+                lambda: self._stopped or estimate.count() > 0, self._wait
+            )
+            if estimate.count() == 0:
+                return
+            chances = estimate.chances(self._z)
+        for player_stat, chance in zip(round_stats.player_stats(), chances):
+            player_stat.set_win_chance(*chance)
+
+    def on_game_end(self, game):
+        """
+        Stops the background thread.
+        """
+        self.stop()
+
+    def _restart(self, game, seat):
+        """
+        Replaces the position of the rollouts.
+        Rounds past the horizon or the round limit of the game
+        aren't played: a rollout plays the rounds
+        from round to the horizon of the engine.
+        """
+        state = game_state(game, seat)
+        rounds = self._horizon
+        if game.max_rounds():
+            rounds = min(rounds, game.max_rounds() - game.current_round())
+        places = loser_places(game)
+        key = (encode(state) + rounds.to_bytes(4, "little")
+               + bytes(place + 1 for place in places))
+        with self._condition:
+            estimate = self._cache.get(key)
+            if estimate is None:
+                estimate = Estimate(len(state.positions))
+                self._cache.put(key, estimate)
+            self._root = (state, places, self._horizon - rounds)
+            self._estimate = estimate
+            self._generation += 1
+            self._condition.notify_all()
+
+    def _work(self, rules, players_count):
+        """
+        Plays batches of rollouts of the current position until stopped.
+        """
+        engine = VectorGame(self._batch_size, players_count, rules,
+                            self._horizon, seed=self._seed)
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._stopped or (
+                    self._estimate.count() < self._max_rollouts
+                ))
+                if self._stopped:
+                    return
+                root = self._root
+                generation = self._generation
+            engine.load(*root)
+            engine.advance()
+            scores = win_shares(engine)
+            with self._condition:
+                if generation == self._generation:
+                    self._estimate.add(scores)
+                    self._condition.notify_all()
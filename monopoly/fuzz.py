@@ -0,0 +1,529 @@
+import random
+
+from monopoly.display import HeadlessDisplay
+from monopoly.game import Game
+from monopoly.input import Input
+from monopoly.plane import PLANE_LENGTH, Plane, new_board
+
+"""
+Default settings of Fuzzer: the players of a case,
+the turns a case plays and the cases of a run.
+"""
+DEFAULT_PLAYERS_COUNT = 4
+DEFAULT_STEPS = 400
+DEFAULT_CASES = 1000
+
+"""
+The most cases shrink plays, so shrinking a long case ends
+in a few seconds with the smallest sequence found so far.
+"""
+DEFAULT_SHRINK_ATTEMPTS = 1000
+
+"""
+The most houses a card can have.
+"""
+MAX_HOUSES = 4
+
+
+class Choices:
+    """
+    The Choices class.
+
+    The sequence of choices a fuzzed game is played from:
+    every throw of the dice, chance and answer of a player
+    is the next value of the sequence, taken modulo the number
+    of its possibilities. A new case draws random values
+    and remembers them, so the case can be played again
+    from the sequence alone, and a shrunk sequence that ends early
+    is continued with zeros, the first possibility of every choice.
+    """
+    def __init__(self, values=None, rng=None):
+        """
+        :param values: The values to play, none by default.
+        :param rng: random.Random drawing the values after the given
+        ones, None to continue with zeros.
+        Attributes:
+            values: the values drawn so far.
+            next: index of the next value.
+        """
+        self._values = list(values) if values is not None else []
+        self._rng = rng
+        self._next = 0
+
+    def values(self):
+        """
+        Get the values drawn so far.
+        :return: List of ints.
+        """
+        return self._values[:self._next]
+
+    def draw(self, count):
+        """
+        Takes the next choice.
+        :param count: The number of possibilities.
+        :return: An int from 0 to count - 1.
+        """
+        if self._next == len(self._values):
+            if self._rng is None:
+                self._next += 1
+                self._values.append(0)
+                return 0
+            self._values.append(self._rng.randrange(count))
+        value = self._values[self._next] % count
+        self._values[self._next] = value
+        self._next += 1
+        return value
+
+    def randint(self, a, b):
+        """
+        Chooses an int from a to b, used as the dice.
+        """
+        return a + self.draw(b - a + 1)
+
+    def choice(self, seq):
+        """
+        Chooses an element of seq, used for the chances.
+        """
+        return seq[self.draw(len(seq))]
+
+
+class FuzzInput(Input):
+    """
+    The FuzzInput class.
+
+    Answers the players' questions from Choices.
+    With affordable_only, a player only says yes to the cards,
+    houses and hotels they can pay for, like BotPolicy.
+    Without it they can say yes to anything,
+    as a player at the keyboard can.
+    """
+    def __init__(self, choices, players_count, affordable_only=True):
+        """
+        :param choices: Choices answering the questions.
+        :param players_count: The number of players of the game.
+        :param affordable_only: True to refuse what a player can't pay for.
+        """
+        self._choices = choices
+        self._players_count = players_count
+        self._affordable_only = affordable_only
+
+    def yes_or_no(self, prompt):
+        """
+        Answers y or n.
+        """
+        return "y" if self._choices.draw(2) else "n"
+
+    def number(self, prompt, min, max):
+        """
+        Answers a number from min to max.
+        """
+        return min + self._choices.draw(max - min + 1)
+
+    def _affordable(self, player, amount):
+        return not self._affordable_only or player.cash() >= amount
+
+    def ask_player_to_buy_card(self, card, player):
+        """
+        Answers y or n, n if the player can't pay for the card.
+        """
+        answer = super().ask_player_to_buy_card(card, player)
+        return answer if self._affordable(player, card.price()) else "n"
+
+    def ask_player_to_buy_houses(self, card, player):
+        """
+        Answers y or n, n if the player can't pay for a house.
+        """
+        answer = super().ask_player_to_buy_houses(card, player)
+        return answer if self._affordable(player, card.house_price()) else "n"
+
+    def ask_number_houses(self, card, player):
+        """
+        Answers a number of houses,
+        at most the ones the player can pay for.
+        """
+        houses = super().ask_number_houses(card, player)
+        while houses > 1 and not self._affordable(
+                player, houses * card.house_price()):
+            houses -= 1
+        return houses
+
+    def ask_player_to_buy_hotel(self, card, player):
+        """
+        Answers y or n, n if the player can't pay for the hotel.
+        """
+        answer = super().ask_player_to_buy_hotel(card, player)
+        return answer if self._affordable(player, card.house_price()) else "n"
+
+    def ask_for_number_of_players(self):
+        """
+        Answers the number of players of the case.
+        """
+        return self._players_count
+
+
+class Failure:
+    """
+    The Failure class.
+
+    A broken invariant, or an exception raised by the game,
+    found by a fuzzed case.
+    """
+    def __init__(self, kind, message, step, values):
+        """
+        :param kind: The name of the invariant, or of the exception class.
+        :param message: Description of what went wrong.
+        :param step: The number of the turn it happened in, from 0.
+        :param values: The values of Choices playing the case to it.
+        """
+        self._kind = kind
+        self._message = message
+        self._step = step
+        self._values = values
+
+    def kind(self):
+        """
+        Get the name of the invariant or exception.
+        :return: str
+        """
+        return self._kind
+
+    def message(self):
+        """
+        Get the description of the failure.
+        :return: str
+        """
+        return self._message
+
+    def step(self):
+        """
+        Get the turn of the failure.
+        :return: The turn number, from 0.
+        """
+        return self._step
+
+    def values(self):
+        """
+        Get the sequence of choices that reproduces the failure,
+        see run_case.
+        :return: List of ints.
+        """
+        return self._values
+
+    def __repr__(self):
+        return (f"Failure({self._kind!r}, {self._message!r},"
+                f" step={self._step}, values={self._values!r})")
+
+
+def _board_state(game):
+    """
+    Get the owner, houses and hotel of every card of the board.
+    """
+    return [(card.owner(), card.houses(), card.hotel())
+            for card in game.plane().fields()]
+
+
+def _expected_bank_payout(game, player, old_position, throw, before,
+                          chance):
+    """
+    Get the money the bank should have paid to the players
+    (negative if they paid it) in a turn, from the rules
+    and from the changes of the board, not from the game's code.
+    :param game: The Game.
+    :param player: The player that moved.
+    :param old_position: The position of the player before the turn.
+    :param throw: The throw of the dice.
+    :param before: _board_state before the turn.
+    :param chance: The chance drawn in the turn, None if there wasn't one.
+    :return: The amount.
+    """
+    rules = game.rules()
+    payout = 0
+    if old_position + throw >= PLANE_LENGTH:
+        payout += rules.lap_bonus()
+    fields = game.plane().fields()
+    card = game.plane().get_field_from_position(player.position())
+    owner = before[fields.index(card)][0]
+    if owner is None:
+        if card.type() == "TAX":
+            payout -= card.fee()
+        elif card.type() == "CHANCE" and chance is not None:
+            payout -= chance
+        elif card.type() == "START":
+            payout += rules.start_payout()
+    for card, (old_owner, old_houses, old_hotel) in zip(fields, before):
+        if old_owner is None and card.owner() is not None:
+            payout -= card.price()
+        if card.hotel() and not old_hotel:
+            payout -= card.house_price()
+        elif (card.houses() is not None and old_houses is not None
+              and card.houses() != old_houses):
+            payout -= (card.houses() - old_houses) * card.house_price()
+    return payout
+
+
+def check_invariants(game, player, old_position, throw, before, cash_before,
+                     chance=None):
+    """
+    Checks the state of a game after a turn.
+    Invariants:
+        position: every position is on the board and the player
+        moved by the throw.
+        houses: a card has 0 to 4 houses, or a hotel and no houses.
+        hotel: a hotel is built only on a card that had 4 houses.
+        owner: the owner of a card has the card among their cards,
+        and every card of a player is owned by them.
+        money: the cash of the players changed only by the payments
+        between them and the payments of the bank the rules give,
+        money isn't created or lost.
+    :param game: The Game.
+    :param player: The player that moved.
+    :param old_position: The position of the player before the turn.
+    :param throw: The throw of the dice, 0 if the player didn't move.
+    :param before: _board_state before the turn.
+    :param cash_before: The sum of the players' cash before the turn.
+    :param chance: The chance drawn in the turn, None if there wasn't one.
+    :return: (invariant, message) tuple of the first broken invariant,
+    None if they all hold.
+    """
+    for other in game.players():
+        if not 0 <= other.position() < PLANE_LENGTH:
+            return ("position",
+                    f"{other.name()} is at {other.position()}")
+    expected = (old_position + throw) % PLANE_LENGTH
+    if player.position() != expected:
+        return ("position", f"{player.name()} moved from {old_position} by"
+                f" {throw} to {player.position()}, not {expected}")
+    fields = game.plane().fields()
+    for card, (_, old_houses, old_hotel) in zip(fields, before):
+        houses = card.houses()
+        if card.hotel():
+            if houses is not None:
+                return ("houses",
+                        f"{card.name()} has a hotel and {houses} houses")
+            if not old_hotel and old_houses != MAX_HOUSES:
+                return ("hotel", f"{card.name()} got a hotel with"
+                        f" {old_houses} houses")
+        elif houses is None or not 0 <= houses <= MAX_HOUSES:
+            return ("houses", f"{card.name()} has {houses} houses")
+    for card in fields:
+        owner = card.owner()
+        if owner is not None and card not in owner.cards():
+            return ("owner", f"{card.name()} isn't among the cards of"
+                    f" its owner {owner.name()}")
+    for other in game.players():
+        for card in other.cards():
+            if card.owner() is not other:
+                return ("owner", f"{other.name()} has {card.name()}"
+                        " without owning it")
+    cash = sum(other.cash() for other in game.players())
+    payout = _expected_bank_payout(game, player, old_position, throw,
+                                   before, chance)
+    if cash != cash_before + payout:
+        return ("money", f"the players' cash changed by"
+                f" {cash - cash_before}, the bank paid {payout}")
+    return None
+
+
+class _ChanceRecorder:
+    """
+    Wraps Choices as the game's rng, remembering the last throw
+    and the last chance.
+    """
+    def __init__(self, choices):
+        self._choices = choices
+        self.throw = 0
+        self.chance = None
+
+    def randint(self, a, b):
+        self.throw = self._choices.randint(a, b)
+        return self.throw
+
+    def choice(self, seq):
+        self.chance = self._choices.choice(seq)
+        return self.chance
+
+
+def run_case(values=None, rng=None, players_count=DEFAULT_PLAYERS_COUNT,
+             steps=DEFAULT_STEPS, affordable_only=True, rules=None):
+    """
+    Plays a fuzzed game turn by turn through Game.move_player,
+    which settles the field with Game.check_card,
+    and checks the invariants after every turn.
+    :param values: The values of Choices to play, see Failure.values.
+    :param rng: random.Random drawing the values after the given ones,
+    None to continue with zeros.
+    :param players_count: The number of players.
+    :param steps: The most turns to play.
+    :param affordable_only: True if the players only buy
+    what they can pay for, see FuzzInput.
+    :param rules: Rules of the game, DEFAULT_RULES by default.
+    :return: (Failure or None, number of turns played) tuple.
+    """
+    choices = Choices(values, rng)
+    recorder = _ChanceRecorder(choices)
+    game = Game(HeadlessDisplay(),
+                FuzzInput(choices, players_count, affordable_only),
+                Plane(new_board(rules)), recorder, rules=rules)
+    game.init_game()
+    players = game.players()
+    step = 0
+    while step < steps:
+        game.increase_round_number()
+        for player in players:
+            if step == steps or game.is_game_over():
+                return None, step
+            if not player.is_in_game():
+                continue
+            before = _board_state(game)
+            cash_before = sum(other.cash() for other in players)
+            old_position = player.position()
+            recorder.throw = 0
+            recorder.chance = None
+            try:
+                game.move_player(player)
+            except Exception as error:
+                return Failure(type(error).__name__, str(error), step,
+                               choices.values()), step + 1
+            broken = check_invariants(game, player, old_position,
+                                      recorder.throw, before, cash_before,
+                                      recorder.chance)
+            if broken is not None:
+                return Failure(*broken, step, choices.values()), step + 1
+            step += 1
+    return None, step
+
+
+def _simpler(values, other):
+    """
+    Check if a sequence of choices is shorter than another one,
+    or as long and lexicographically smaller.
+    """
+    return (len(values), values) < (len(other), other)
+
+
+def shrink(failure, players_count=DEFAULT_PLAYERS_COUNT,
+           affordable_only=True, rules=None,
+           max_attempts=DEFAULT_SHRINK_ATTEMPTS):
+    """
+    Shrinks the sequence of choices of a failure, keeping it failing
+    with the same kind: removes blocks of values, halving the blocks
+    down to single values, then lowers the values towards zero,
+    until no change makes the sequence shorter or smaller.
+    Zero is the first possibility of every choice,
+    the lowest throw and the first answer, so the shrunk case
+    takes the fewest turns and the simplest decisions.
+    :param failure: The Failure found by run_case.
+    :param players_count: The number of players of the case.
+    :param affordable_only: The affordable_only of the case.
+    :param rules: The Rules of the case.
+    :param max_attempts: The most cases to play.
+    :return: The Failure of the shrunk sequence.
+    """
+    attempts = 0
+
+    def attempt(values):
+        nonlocal attempts
+        attempts += 1
+        found, _ = run_case(values, None, players_count, failure.step() + 1,
+                            affordable_only, rules)
+        if found is not None and found.kind() == failure.kind():
+            return found
+        return None
+
+    best = failure
+    changed = True
+    while changed and attempts < max_attempts:
+        changed = False
+        size = max(len(best.values()) // 2, 1)
+        while size >= 1:
+            start = 0
+            while start < len(best.values()) and attempts < max_attempts:
+                values = best.values()
+                found = attempt(values[:start] + values[start + size:])
+                if found is not None and _simpler(found.values(), values):
+                    best = found
+                    changed = True
+                else:
+                    start += size
+            size //= 2
+        idx = 0
+        while idx < len(best.values()) and attempts < max_attempts:
+            values = best.values()
+            for lower in (0, values[idx] // 2, values[idx] - 1):
+                if not 0 <= lower < values[idx]:
+                    continue
+                found = attempt(values[:idx] + [lower] + values[idx + 1:])
+                if found is not None and _simpler(found.values(), values):
+                    best = found
+                    changed = True
+                    break
+            idx += 1
+    return best
+
+
+class Fuzzer:
+    """
+    The Fuzzer class.
+
+    Plays many fuzzed games, see run_case, each one from its own
+    seed, and shrinks the first failure to a minimal sequence
+    of choices that reproduces it.
+    """
+    def __init__(self, players_count=DEFAULT_PLAYERS_COUNT,
+                 steps=DEFAULT_STEPS, affordable_only=True, rules=None,
+                 seed=0, shrink_attempts=DEFAULT_SHRINK_ATTEMPTS):
+        """
+        :param players_count: The number of players of a case.
+        :param steps: The most turns of a case.
+        :param affordable_only: True if the players only buy
+        what they can pay for, see FuzzInput.
+        :param rules: Rules of the games, DEFAULT_RULES by default.
+        :param seed: The seed of the first case.
+        :param shrink_attempts: The most cases shrinking a failure plays.
+        Attributes:
+            next_seed: the seed of the next case.
+            cases: the number of cases played.
+            turns: the number of turns played.
+        """
+        self._players_count = players_count
+        self._steps = steps
+        self._affordable_only = affordable_only
+        self._rules = rules
+        self._next_seed = seed
+        self._shrink_attempts = shrink_attempts
+        self._cases = 0
+        self._turns = 0
+
+    def cases(self):
+        """
+        Get the number of cases played.
+        :return: The number of cases.
+        """
+        return self._cases
+
+    def turns(self):
+        """
+        Get the number of turns played, the shrinking ones excluded.
+        :return: The number of turns.
+        """
+        return self._turns
+
+    def run(self, cases=DEFAULT_CASES):
+        """
+        Plays cases until one fails or the given number is played.
+        :param cases: The most cases to play.
+        :return: The shrunk Failure, None if every case passed.
+        """
+        for _ in range(cases):
+            rng = random.Random(self._next_seed)
+            self._next_seed += 1
+            failure, turns = run_case(None, rng, self._players_count,
+                                      self._steps, self._affordable_only,
+                                      self._rules)
+            self._cases += 1
+            self._turns += turns
+            if failure is not None:
+                return shrink(failure, self._players_count,
+                              self._affordable_only, self._rules,
+                              self._shrink_attempts)
+        return None
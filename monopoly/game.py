@@ -1,9 +1,12 @@
+import copy
+import math
 import random
 
 from monopoly.display import GameStats, FieldInfo
 from monopoly.input import Input
-from monopoly.plane import Plane, CHANCES
+from monopoly.plane import PLANE_LENGTH, Plane, DEFAULT_RULES
 from monopoly.player import Player
+from monopoly.state import HOTEL_LEVEL, card_level
 
 """
 The actions that the player can choose from during his turn'
@@ -12,17 +15,134 @@ MENU_DESCRIPTION = "ACTIONS: 0 - roll dice and move,"
 MENU_DESCRIPTION += " 1 - print field layout, 2 - quit game"
 MENU_END = 2
 
+"""
+The lowest and the highest throw of the dice.
+"""
+DICE_MIN = 2
+DICE_MAX = 12
+
+"""
+Layout of a turn in the history of a game, see Game.undo.
+The first byte holds the seat of the player (TURN_SEAT bits)
+and the flags, the second one the throw, the third one the building
+level of the field the player landed on before the turn (0-4 houses,
+5 - hotel) and, shifted by TURN_LEVEL_SHIFT, after it.
+The field is the one at the player's position, so it isn't stored.
+They are followed by the cash change of the player and, after rent,
+of the owner of the field, as varints of the changes in money units
+(see money_unit), and by the length of the turn, so the history
+can be read backwards. A turn takes about 6 bytes.
+"""
+TURN_SEAT = 7
+TURN_LEVEL_SHIFT = 4
+
+"""
+Flags of a turn: the first turn of a round, the player went bankrupt,
+bought the field or paid rent to its owner, and the cash changes
+are stored in units of 1 instead of money units.
+"""
+TURN_NEW_ROUND = 8
+TURN_LOST = 16
+TURN_BOUGHT = 32
+TURN_RENT = 64
+TURN_EXACT = 128
+
+
+def money_unit(plane, rules):
+    """
+    Get the largest amount every amount of a game is a multiple of,
+    the prices, fees and payouts, so a cash change is a whole number
+    of units.
+    :param plane: The Plane of the game.
+    :param rules: The Rules of the game.
+    :return: The unit, 1 for amounts that aren't whole numbers.
+    """
+    amounts = [rules.starting_cash(), rules.lap_bonus(),
+               rules.start_payout(), *rules.chances()]
+    for card in plane.fields():
+        amounts += [card.price() or 0, card.house_price() or 0]
+        amounts += [card.base_fee() * multiplier
+                    for multiplier in rules.rent_multipliers()]
+    if any(int(amount) != amount for amount in amounts):
+        return 1
+    return math.gcd(*(int(amount) for amount in amounts)) or 1
+
+
+def pack_varint(value):
+    """
+    Encodes a signed number as a zigzag varint: 7 bits a byte,
+    the highest bit set on every byte but the last.
+    :param value: The number.
+    :return: bytes.
+    """
+    value = value * 2 if value >= 0 else -value * 2 - 1
+    data = bytearray()
+    while value >= 0x80:
+        data.append(value & 0x7f | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+
+def unpack_varint(data, offset):
+    """
+    Decodes a varint written by pack_varint.
+    :param data: The bytes.
+    :param offset: The index of its first byte.
+    :return: (number, index of the byte after it) tuple.
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if byte < 0x80:
+            break
+    return (value >> 1 if value % 2 == 0 else -(value + 1) // 2), offset
+
 
 class Dice:
     """
     Class for simulating throwing of dice.
     """
+    def __init__(self, rng=None):
+        """
+        Initializes the dice.
+        :param rng: source of randomness with a randint method,
+        a random.Random of the dice by default.
+        Passing a seeded random.Random makes the throws repeatable.
+        """
+        self._rng = rng if rng is not None else random.Random()
+
     def make_throw(self):
         """
         Return a random number between 2 and 12 simulating the throw of dice
         :return: int
         """
-        return random.randint(2, 12)
+        return self._rng.randint(DICE_MIN, DICE_MAX)
+
+
+class FixedDice:
+    """
+    The FixedDice class.
+
+    Dice that always throw the same number, to try out a throw
+    or to play a turn again.
+    """
+    def __init__(self, throw):
+        """
+        :param throw: The number thrown.
+        """
+        self._throw = throw
+
+    def make_throw(self):
+        """
+        Get the fixed throw.
+        :return: int
+        """
+        return self._throw
 
 
 class Game:
@@ -31,10 +151,29 @@ class Game:
 
     Class responsible for managing the game process.
     """
-    def __init__(self, display):
+    def __init__(self, display, input=None, plane=None, rng=None,
+                 max_rounds=None, rules=None, dice=None, history=False,
+                 take_back=False):
         """
         Initializes the game.
         :param display: instance of Display class that handles output.
+        :param input: object answering the players' decisions,
+        a new Input (keyboard) by default.
+        :param plane: the board to play on, a new Plane by default.
+        :param rng: source of randomness for the dice and chance fields,
+        a random.Random of the game by default. Games never share
+        the global random module, so they can be played in threads.
+        :param max_rounds: number of rounds after which the game ends,
+        None (no limit) by default.
+        :param rules: Rules of the game, DEFAULT_RULES by default.
+        The cards of the plane have to be created with the same rules.
+        :param dice: List of Dice, one for each player in the order
+        of turns. By default all the players throw Dice(rng).
+        :param history: True to keep the turns for undo and redo,
+        for the analysis of a game and the players at the keyboard.
+        :param take_back: True to ask a player who answered the buy
+        prompt if they take the answer back, see take_back_turn.
+        The game then keeps the history.
         Attributes:
             input: instance of Input class that handles input.
             players_count: number of players playing.
@@ -43,19 +182,131 @@ class Game:
             losers: list that's displayed at the end,
             that contains the players who lost.
             dice: dice that determines the position displacement each throw.
+            players_dice: optional list of dice of each player.
             current_round: number of the current round.
             end_requested: the condition that changes
             when player requests to end the game.
+            listeners: objects notified about the game events.
+            history: the turns played, see TURN_SEAT, None if
+            the game doesn't keep them.
+            cursor: the length of the turns of the history that
+            weren't undone, the turns after it can be redone.
+            history_round: the round of the last turn before the cursor,
+            0 before the first turn.
+            money_unit: the unit of the cash changes of the history,
+            see money_unit, computed at the first turn.
+            take_back: True if the players are asked to take back
+            their answers to the buy prompt.
         """
         self._display = display
-        self._input = Input()
+        self._input = input if input is not None else Input()
         self._players_count = 0
-        self._plane = Plane()
+        self._plane = plane if plane is not None else Plane()
         self._players = []
         self._losers = []
-        self._dice = Dice()
+        self._rng = rng if rng is not None else random.Random()
+        self._dice = Dice(self._rng)
+        self._players_dice = dice
         self._current_round = 0
+        self._max_rounds = max_rounds
+        self._rules = rules if rules is not None else DEFAULT_RULES
         self._end_requested = False
+        self._listeners = []
+        self._history = bytearray() if history or take_back else None
+        self._cursor = 0
+        self._history_round = 0
+        self._money_unit = None
+        self._take_back = take_back
+
+    def players(self):
+        """
+        Get the players of the game, in the order of their turns.
+        :return: List of Player objects.
+        """
+        return self._players
+
+    def losers(self):
+        """
+        Get the players who lost, in the order they went bankrupt.
+        :return: List of Player objects.
+        """
+        return self._losers
+
+    def current_round(self):
+        """
+        Get the number of the current round.
+        :return: The current round number.
+        """
+        return self._current_round
+
+    def plane(self):
+        """
+        Get the board the game is played on.
+        :return: The Plane object.
+        """
+        return self._plane
+
+    def rules(self):
+        """
+        Get the rules of the game.
+        :return: The Rules object.
+        """
+        return self._rules
+
+    def max_rounds(self):
+        """
+        Get the number of rounds after which the game ends.
+        :return: The round limit, None if there's no limit.
+        """
+        return self._max_rounds
+
+    def copy(self):
+        """
+        Copies the game to try out moves without changing it.
+        The players and the cards of the board are copied,
+        the display, input, dice, random generator and rules are shared
+        and the copy has no listeners.
+        :return: The new Game.
+        """
+        shared = [self._display, self._input, self._rng, self._dice,
+                  self._players_dice, self._rules]
+        memo = {id(value): value for value in shared}
+        memo[id(self._listeners)] = []
+        return copy.deepcopy(self, memo)
+
+    def add_listener(self, listener):
+        """
+        Registers an object that is notified about the game events.
+
+        The listener can define any of the methods:
+            on_move(game, player, old_position),
+            on_rent(game, card, player, amount),
+            on_buy(game, card, player),
+            on_build(game, card, player),
+            on_bankrupt(game, player),
+            on_turn_end(game, player),
+            on_round_end(game, round_stats),
+            on_undo(game, player), on_redo(game, player),
+            on_game_end(game).
+        After on_undo and on_redo, sent with the player of the turn
+        taken back or played again, the state of the game isn't
+        the one the other events led to, so a listener following
+        the game reads it again.
+        The methods it doesn't define are skipped.
+        :param listener: The object to notify.
+        """
+        self._listeners.append(listener)
+
+    def notify(self, event, *args):
+        """
+        Calls the method named after the event on every listener,
+        passing the game and the event arguments.
+        :param event: Name of the listener method, for example "on_rent".
+        """
+        for listener in self._listeners:
+            handler = getattr(listener, event, None)
+            if handler is not None:
+                handler(self, *args)
 
     def init_game(self):
         """
@@ -70,7 +321,7 @@ class Game:
         Initialize the players and add them to the players list.
         """
         for idx in range(self._players_count):
-            self._players.append(Player(f"Player {idx + 1}"))
+            self._players.append(Player(f"Player {idx + 1}", self._rules))
 
     def play_game(self):
         """
@@ -80,6 +331,7 @@ class Game:
         """
         while not self.is_game_over():
             self.play_a_round()
+        self.notify("on_game_end")
         self._display.print_end_stats(self._losers, self.find_winners())
 
     def play_a_round(self):
@@ -98,8 +350,10 @@ class Game:
                 break
             else:
                 self.move_player(player)
+            self.notify("on_turn_end", player)
 
         round_stats = self.calculate_round_stats()
+        self.notify("on_round_end", round_stats)
         self._display.refresh_game_round_stats(round_stats)
 
     def move_player(self, player):
@@ -110,8 +364,209 @@ class Game:
         :param player: Player that's moving.
         """
         if player.is_in_game():
-            position = player.make_move(self._dice)
+            self._play_turn(player, self.dice_for(player))
+
+    def _play_turn(self, player, dice):
+        """
+        Moves a player with the dice and processes the field,
+        recording the turn in the history.
+        In a game created with take_back, a player asked to buy
+        the card is asked if they take back their answer,
+        and as long as they do, the turn is taken back
+        and played again with the same throw, see take_back_turn.
+        """
+        while True:
+            old_position = player.position()
+            cash = [other.cash() for other in self._players]
+            losers = len(self._losers)
+            position = player.make_move(dice)
+            self.notify("on_move", player, old_position)
+            card = self._plane.get_field_from_position(position)
+            owner = card.owner()
+            level = card_level(card)
             self.process_after_move(position, player)
+            if self._history is None:
+                return
+            self._record_turn(player, old_position, cash, card, owner,
+                              level, len(self._losers) > losers)
+            if (not self._take_back or owner is not None
+                    or card.type() != "FIELD"):
+                return
+            answer = self._input.ask_to_take_back(card, player)
+            if answer not in ["y", "Y"]:
+                return
+            dice = self.take_back_turn()
+
+    def _record_turn(self, player, old_position, cash, card, owner, level,
+                     lost):
+        """
+        Appends a turn to the history, dropping the undone turns.
+        """
+        if self._money_unit is None:
+            self._money_unit = money_unit(self._plane, self._rules)
+        seat = self._players.index(player)
+        flags = 0
+        if self._current_round != self._history_round:
+            flags |= TURN_NEW_ROUND
+        if lost:
+            flags |= TURN_LOST
+        if owner is None and card.owner() is player:
+            flags |= TURN_BOUGHT
+        changes = [player.cash() - cash[seat]]
+        if owner is not None and owner is not player:
+            flags |= TURN_RENT
+            changes.append(owner.cash() - cash[self._players.index(owner)])
+        unit = self._money_unit
+        if any(change % unit for change in changes):
+            flags |= TURN_EXACT
+            unit = 1
+        throw = (player.position() - old_position) % PLANE_LENGTH
+        turn = bytearray([
+            seat | flags, throw, level | card_level(card) << TURN_LEVEL_SHIFT
+        ])
+        for change in changes:
+            turn += pack_varint(change // unit)
+        turn.append(len(turn) + 1)
+        del self._history[self._cursor:]
+        self._history += turn
+        self._cursor = len(self._history)
+        self._history_round = self._current_round
+
+    def history_bytes(self):
+        """
+        Get the memory the history of the turns takes.
+        :return: The number of bytes.
+        """
+        return 0 if self._history is None else len(self._history)
+
+    def can_undo(self):
+        """
+        Check if there's a turn to undo.
+        :return: True if undo would take back a turn, else False.
+        """
+        return self._cursor > 0
+
+    def can_redo(self):
+        """
+        Check if there's an undone turn to play again.
+        :return: True if redo would play a turn again, else False.
+        """
+        return (self._history is not None
+                and self._cursor < len(self._history))
+
+    def undo(self):
+        """
+        Takes back the last turn: the position and the cash
+        of the players, the owner and the buildings of the field
+        the player landed on, the bankruptcy and the round
+        are put back as they were after the turn before.
+        The listeners are notified with on_undo.
+        :return: True if a turn was taken back, False if there was none.
+        """
+        if not self.can_undo():
+            return False
+        self._cursor -= self._history[self._cursor - 1]
+        player = self._apply_turn(self._cursor, False)[0]
+        self.notify("on_undo", player)
+        return True
+
+    def redo(self):
+        """
+        Plays the last undone turn again, with the same result.
+        A turn played after undo drops the undone turns.
+        The listeners are notified with on_redo.
+        :return: True if a turn was played, False if there was none.
+        """
+        if not self.can_redo():
+            return False
+        player, length = self._apply_turn(self._cursor, True)
+        self._cursor += length
+        self.notify("on_redo", player)
+        return True
+
+    def take_back_turn(self):
+        """
+        Takes back the turn being played, so its player can play it
+        again with the same throw, answering the questions again,
+        for example after a misclick on the buy prompt.
+        The round stays the current one and the listeners
+        are notified with on_undo, the turn played again sends
+        its events again.
+        :return: FixedDice of the throw of the turn.
+        """
+        start = self._cursor - self._history[self._cursor - 1]
+        throw = self._history[start + 1]
+        round_number = self._current_round
+        self._cursor = start
+        player = self._apply_turn(start, False)[0]
+        self._current_round = round_number
+        self.notify("on_undo", player)
+        self._display.show_message(
+            f"{player.name()} takes back the answer."
+        )
+        return FixedDice(throw)
+
+    def _apply_turn(self, start, forward):
+        """
+        Changes the game to the state after (forward) or before
+        the turn of the history starting at a byte.
+        :return: (player of the turn, length of the turn) tuple.
+        """
+        history = self._history
+        flags = history[start] & ~TURN_SEAT
+        player = self._players[history[start] & TURN_SEAT]
+        throw = history[start + 1]
+        old_level = history[start + 2] & ((1 << TURN_LEVEL_SHIFT) - 1)
+        level = history[start + 2] >> TURN_LEVEL_SHIFT
+        unit = 1 if flags & TURN_EXACT else self._money_unit
+        change, offset = unpack_varint(history, start + 3)
+        if flags & TURN_RENT:
+            other_change, offset = unpack_varint(history, offset)
+        sign = 1 if forward else -1
+        if forward:
+            position = (player.position() + throw) % PLANE_LENGTH
+        else:
+            position = player.position()
+        card = self._plane.get_field_from_position(position)
+        player.set_position(
+            position if forward else (position - throw) % PLANE_LENGTH
+        )
+        player.earn(sign * change * unit)
+        if flags & TURN_RENT:
+            card.owner().earn(sign * other_change * unit)
+        if flags & TURN_BOUGHT:
+            if forward:
+                player.take_card(card)
+            else:
+                player.give_up_card(card)
+        if not forward:
+            level = old_level
+        if level == HOTEL_LEVEL:
+            card.set_houses(None)
+            card.set_hotel()
+        else:
+            card.remove_hotel()
+            card.set_houses(level)
+        if flags & TURN_LOST:
+            if forward:
+                self._losers.append(player)
+            else:
+                self._losers.remove(player)
+        if flags & TURN_NEW_ROUND:
+            self._history_round += sign
+        self._current_round = self._history_round
+        return player, offset + 1 - start
+
+    def dice_for(self, player):
+        """
+        Get the dice the player throws.
+        :param player: The player that's moving.
+        :return: The player's own Dice if the game was created
+        with a list of dice, else the dice shared by all players.
+        """
+        if self._players_dice is None:
+            return self._dice
+        return self._players_dice[self._players.index(player)]
 
     def process_after_move(self, position, player):
         """
@@ -135,14 +590,17 @@ class Game:
     def is_game_over(self):
         """
         Checks if the game is over,
-        by checking if there are less than 2 active players
-        or if the end of the game has been requested.
+        by checking if there are less than 2 active players,
+        if the end of the game has been requested
+        or if the round limit has been reached.
         :return: True if the game ended, else False.
         """
         activePlayers = 0
         for idx in range(self._players_count):
             if self._players[idx].is_in_game():
                 activePlayers += 1
+        if self._max_rounds and self._current_round >= self._max_rounds:
+            return True
         return activePlayers < 2 or self._end_requested
 
     def calculate_round_stats(self):
@@ -182,6 +640,7 @@ class Game:
                 self._losers.index(player)
             except ValueError:
                 self._losers.append(player)
+                self.notify("on_bankrupt", player)
 
     def landed_someones_card(self, card, player):
         """
@@ -195,6 +654,7 @@ class Game:
         :param player: The player that landed on the card.
         """
         player.pay_another_player(card.owner(), card.fee())
+        self.notify("on_rent", card, player, card.fee())
         self._display.show_message(
             f"POSITION: {player.position()} - YOU LANDED ON {card.name()} WHICH IS ALREADY OWNED BY {card.owner().name()}. YOU PAID THE PLAYER A FEE OF {card.fee()}."  # noqa
         )
@@ -220,9 +680,12 @@ class Game:
         if player.can_build_hotel(card) is True:
             if self._input.ask_player_to_buy_hotel(card, player) in ["y", "Y"]:
                 player.build_hotel(card)
+                self.notify("on_build", card, player)
         if player.can_build_houses(card) is True:
             if self._input.ask_player_to_buy_houses(card, player) in ["y", "Y"]:  # noqa
-                player.build_houses(card, self._input.ask_number_houses(card))
+                houses = self._input.ask_number_houses(card, player)
+                player.build_houses(card, houses)
+                self.notify("on_build", card, player)
         else:
             self._display.show_message(
                 "You need to have a monopoly to build houses on this field."
@@ -240,8 +703,9 @@ class Game:
         :param player: The player that landed on the card.
         """
         self._display.show_card_info(card)
-        if self._input.ask_player_to_buy_card(player) in ["y", "Y"]:
+        if self._input.ask_player_to_buy_card(card, player) in ["y", "Y"]:
             player.buy_card(card)
+            self.notify("on_buy", card, player)
 
     def landed_tax(self, card, player):
         """
@@ -249,12 +713,13 @@ class Game:
         landed on a tax field.
 
         Informs him about it and the amount of the fee.
-        Processes the payment to the bank.
+        Processes the payment to the bank,
+        a player who can't afford it goes bankrupt.
 
         :param card: The card on which the player landed.
         :param player: The player that landed on the card.
         """
-        player.change_balance(card.fee())
+        player.pay_bank(card.fee())
         self._display.show_message(
             f"POSITION: {player.position()} - YOU LANDED ON A TAX FIELD. YOU PAID THE BANK {card.fee()}."  # noqa
         )
@@ -267,11 +732,12 @@ class Game:
         Chooses a random chance amount from the list of possible chances.
         Changes player's bank balance,
         gives the information about the amount of the chance.
+        A player who can't afford the chance goes bankrupt.
 
         :param player: The player that landed on the card.
         """
-        chance = random.choice(CHANCES)
-        player.change_balance(chance)
+        chance = self._rng.choice(self._rules.chances())
+        player.pay_bank(chance)
         if chance > 0:
             self._display.show_message(
                 f"POSITION: {player.position()} - OH NO! YOU LANDED ON A CHANCE FIELD. YOU LOSE {chance}."  # noqa
@@ -310,7 +776,7 @@ class Game:
             if card.type() == "CHANCE":
                 self.landed_chance(player)
             if card.type() == "START":
-                player.earn(2000000)
+                player.earn(self._rules.start_payout())
                 self._display.show_message(
                     f"POSITION: {player.position()} - YOU LANDED ON A START FIELD. YOU GET 1000000"  # noqa
                 )
@@ -326,7 +792,7 @@ class Game:
         while True:
             self._display.show_message(MENU_DESCRIPTION)
             option = self._input.choose_menu_option(
-                "Choose your action: ", [0, 1, 2, MENU_END]
+                "Choose your action: ", [0, 1, 2]
                 )
             if option == 0:
                 return 0
@@ -36,16 +36,51 @@ class Input:
     This class is responsible for asking the player for input.
     The functions of this class displays commands and player options,
     and uses the functions mentioned earlier to collect the keyboard input.
+    Every answer goes through yes_or_no or number, so subclasses
+    can take the answers from elsewhere by overriding the two of them.
     """
-    def ask_player_to_buy_card(self, player):
+    def yes_or_no(self, prompt):
+        """
+        Asks a yes or no question, see get_yes_or_no.
+        :param prompt: The question to display to the user.
+        :return: The user's response (y or n).
+        """
+        return get_yes_or_no(prompt)
+
+    def number(self, prompt, min, max):
+        """
+        Asks for a number within a range, see input_number.
+        :param prompt: question/command to display to the user.
+        :param min: The minimum acceptable value (inclusive).
+        :param max: The maximum acceptable value (inclusive).
+        :return: The user's response, as an int.
+        """
+        return input_number(prompt, min, max)
+
+    def ask_player_to_buy_card(self, card, player):
         """
         This function asks if a player wants to buy a card.
         It uses the before mentioned function get_yes_or_no(prompt),
         to collect the player's answer.
+        :param card: The card that can be bought.
         :param player: The player that is given the option to buy.
         :return: The player's response, y/Y or n/N.
         """
-        return get_yes_or_no(f"{player.name()} - You can buy this card. Do you want to? ")  # noqa
+        return self.yes_or_no(f"{player.name()} - You can buy this card. Do you want to? ")  # noqa
+
+    def ask_to_take_back(self, card, player):
+        """
+        Asks a player, right after their answer to buy a card,
+        if they take the answer back to answer again,
+        for example after a misclick. Asked only in the games
+        created with take_back.
+        :param card: The card the player was asked to buy.
+        :param player: The player that answered.
+        :return: The player's response, y/Y or n/N.
+        """
+        return self.yes_or_no(
+            f"{player.name()} - Do you want to take back your answer? "
+        )
 
     def ask_player_to_buy_houses(self, card, player):
         """
@@ -54,20 +89,21 @@ class Input:
         :param player: The card owner, player that's being asked.
         :return: The player's response, y/Y or n/N.
         """
-        return get_yes_or_no(
+        return self.yes_or_no(
             f"{player.name()} - You can buy houses on this card for {card.house_price()} each. Do you want to? "  # noqa
         )
 
-    def ask_number_houses(self, card):
+    def ask_number_houses(self, card, player):
         """
         This function asks the user for the number of houses they want to buy.
         The prompt informs the user, how many houses they can buy.
         It shows the minimum and maximum value,
         that varies when the card already has houses.
         :param card: The card the houses are being purchased for.
+        :param player: The card owner, player that's being asked.
         :return: The number of houses the user wants to buy, as an int.
         """
-        return input_number(
+        return self.number(
             f"Enter the number of houses (maximum: {card.possible_num_houses()}): ", 1, card.possible_num_houses()  # noqa
         )
 
@@ -80,7 +116,7 @@ class Input:
         :param player: The card owner, player that's being asked.
         :return: The player's response, y/Y or n/N.
         """
-        return get_yes_or_no(
+        return self.yes_or_no(
             f"{player.name()} - You can buy a hotel on this card for {card.house_price()}. Do you want to? "  # noqa
         )
 
@@ -91,7 +127,7 @@ class Input:
         its return value sets the number of players for the rest of the game.
         :return: The number of players, as an int.
         """
-        return input_number(
+        return self.number(
             "Welcome to Monopoly! Enter the number of players: ", 2, 8
             )
 
@@ -106,5 +142,5 @@ class Input:
         """
         answer = None
         while answer not in options:
-            answer = input_number(menu_description, min(options), max(options))
+            answer = self.number(menu_description, min(options), max(options))
         return answer
@@ -0,0 +1,219 @@
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from monopoly.simulation import (
+    DEFAULT_CHUNK_SIZE, _simulate_range, seed_chunks
+)
+from monopoly.stats import GameAggregator
+
+"""
+Version of the job manifest, a manifest of another version isn't resumed.
+"""
+MANIFEST_VERSION = 1
+
+
+def write_atomically(path, data):
+    """
+    Replaces a file so that after a crash it has the old
+    or the new content, never a partial one:
+    the data is written to a temporary file, synced to the disk
+    and renamed over the file.
+    :param path: The path of the file.
+    :param data: The new content, bytes.
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+class Job:
+    """
+    The Job class.
+
+    A long simulation that survives being interrupted.
+    The games are played in the chunks of run_batch. The job's
+    directory holds a manifest (manifest.json) and the aggregate
+    of the chunks merged so far (aggregate-<chunks>.pkl):
+    the chunks are merged in their order, like run_batch does,
+    and a chunk finished before the chunks in front of it waits
+    in its own file (chunk-<number>.pkl) until it can be merged.
+    Every file is replaced atomically and the manifest is written
+    after the files it points to, so the manifest always describes
+    complete files. Running the same job again continues
+    from the manifest, and the final result is the same,
+    bit for bit, as the one of an uninterrupted run or of run_batch.
+    """
+    def __init__(self, path, games, config, first_seed=0,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Opens the job, creating its directory and manifest if needed.
+        :param path: The directory of the job.
+        :param games: The number of games.
+        :param config: SimulationConfig of the games.
+        :param first_seed: The seed of the first game.
+        :param chunk_size: The number of games of a chunk.
+        :raise: ValueError if the directory holds another job.
+        Attributes:
+            chunks: list of (first seed, number of games) pairs.
+            manifest: the content of the manifest: the settings,
+            merged, the number of chunks in the aggregate,
+            and finished, the numbers of the finished chunks
+            waiting to be merged.
+        """
+        self._path = path
+        self._config = config
+        self._chunks = seed_chunks(first_seed, games, chunk_size)
+        settings = {
+            "version": MANIFEST_VERSION,
+            "config": config.key(),
+            "games": games,
+            "first_seed": first_seed,
+            "chunk_size": chunk_size,
+        }
+        os.makedirs(path, exist_ok=True)
+        try:
+            with open(self._file("manifest.json")) as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            manifest = dict(settings, merged=0, finished=[])
+            self._write_manifest(manifest)
+        if {name: manifest.get(name) for name in settings} != settings:
+            raise ValueError(f"{path} holds another job.")
+        self._manifest = manifest
+
+    def _file(self, name):
+        return os.path.join(self._path, name)
+
+    def _write_manifest(self, manifest):
+        write_atomically(self._file("manifest.json"),
+                         json.dumps(manifest).encode())
+
+    def chunks(self):
+        """
+        Get the chunks of the job.
+        :return: List of (first seed, number of games) pairs.
+        """
+        return self._chunks
+
+    def finished_chunks(self):
+        """
+        Get the numbers of the chunks whose games are saved.
+        :return: Sorted list of chunk numbers.
+        """
+        return (list(range(self._manifest["merged"]))
+                + sorted(self._manifest["finished"]))
+
+    def is_done(self):
+        """
+        Check if every chunk is merged.
+        :return: True if the job is finished, else False.
+        """
+        return self._manifest["merged"] == len(self._chunks)
+
+    def aggregate(self):
+        """
+        Get the aggregate of the merged chunks.
+        :return: GameAggregator.
+        """
+        merged = self._manifest["merged"]
+        if merged == 0:
+            return GameAggregator(self._config.players_count(),
+                                  self._config.max_rounds())
+        with open(self._file(f"aggregate-{merged}.pkl"), "rb") as file:
+            return pickle.load(file)
+
+    def run(self, workers=None, max_chunks=None):
+        """
+        Plays the chunks that aren't saved yet, on a pool
+        of worker processes, saving every chunk as it finishes.
+        :param workers: The number of processes, one per CPU by default.
+        :param max_chunks: The most chunks to play in this call,
+        every missing one by default.
+        :return: GameAggregator of all the games,
+        None if chunks are still missing.
+        """
+        self._clean()
+        finished = set(self.finished_chunks())
+        missing = [chunk for chunk in range(len(self._chunks))
+                   if chunk not in finished]
+        if max_chunks is not None:
+            missing = missing[:max_chunks]
+        if missing:
+            with ProcessPoolExecutor(workers) as pool:
+                futures = {
+                    pool.submit(_simulate_range, *self._chunks[chunk],
+                                self._config): chunk
+                    for chunk in missing
+                }
+                for future in as_completed(futures):
+                    self._save(futures[future], future.result())
+        return self.aggregate() if self.is_done() else None
+
+    def _save(self, chunk, aggregator):
+        """
+        Saves the aggregate of a finished chunk
+        and merges the chunks that follow the merged ones.
+        """
+        write_atomically(self._file(f"chunk-{chunk}.pkl"),
+                         pickle.dumps(aggregator))
+        manifest = dict(self._manifest)
+        manifest["finished"] = sorted(manifest["finished"] + [chunk])
+        self._write_manifest(manifest)
+        self._manifest = manifest
+        merged = manifest["merged"]
+        if chunk != merged:
+            return
+        total = self.aggregate()
+        while merged in manifest["finished"]:
+            with open(self._file(f"chunk-{merged}.pkl"), "rb") as file:
+                total.merge(pickle.load(file))
+            merged += 1
+        write_atomically(self._file(f"aggregate-{merged}.pkl"),
+                         pickle.dumps(total))
+        manifest = dict(manifest, merged=merged, finished=[
+            number for number in manifest["finished"] if number >= merged
+        ])
+        self._write_manifest(manifest)
+        self._manifest = manifest
+        self._clean()
+
+    def _clean(self):
+        """
+        Removes the files the manifest doesn't point to,
+        left by merges and by interrupted writes.
+        """
+        merged = self._manifest["merged"]
+        keep = {"manifest.json", f"aggregate-{merged}.pkl"}
+        keep.update(f"chunk-{chunk}.pkl"
+                    for chunk in self._manifest["finished"])
+        for name in os.listdir(self._path):
+            ours = (name.endswith(".tmp") or name.startswith("chunk-")
+                    or name.startswith("aggregate-"))
+            if ours and name not in keep:
+                os.remove(self._file(name))
+
+
+def run_job(path, games, config, first_seed=0, workers=None,
+            chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Runs a job to the end, continuing an interrupted run
+    of the same job.
+    :param path: The directory of the job.
+    :param games: The number of games.
+    :param config: SimulationConfig of the games.
+    :param first_seed: The seed of the first game.
+    :param workers: The number of processes, one per CPU by default.
+    :param chunk_size: The number of games of a chunk.
+    :return: GameAggregator of all the games.
+    """
+    return Job(path, games, config, first_seed, chunk_size).run(workers)
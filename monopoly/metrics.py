@@ -0,0 +1,543 @@
+import bisect
+import http.server
+import os
+import threading
+import time
+
+"""
+Content type of the OpenMetrics text format.
+"""
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+"""
+Upper bounds of the buckets of the turn latency in seconds,
+and of the rounds of a game.
+"""
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+ROUNDS_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 10000)
+
+"""
+Default seconds between two dumps of MetricsDumper.
+"""
+DEFAULT_DUMP_INTERVAL = 15.0
+
+
+def _format(value):
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """
+    A metric of a Registry, owning slots of the per-thread shards.
+    """
+    def __init__(self, registry, name, help, offset, size):
+        self._registry = registry
+        self._name = name
+        self._help = help
+        self._offset = offset
+        self._size = size
+
+    def name(self):
+        """
+        Get the name of the metric.
+        :return: str
+        """
+        return self._name
+
+    def size(self):
+        return self._size
+
+    def _header(self, kind):
+        return [f"# TYPE {self._name} {kind}",
+                f"# HELP {self._name} {self._help}"]
+
+
+class Counter(_Metric):
+    """
+    The Counter class.
+
+    A total that only goes up, like the games played.
+    """
+    def inc(self, amount=1):
+        """
+        Adds to the counter.
+        :param amount: The amount, not negative.
+        """
+        self._registry._shard()[self._offset] += amount
+
+    def value(self):
+        """
+        Get the total of every thread.
+        :return: The value.
+        """
+        return self._registry._total(self._offset, 1)[0]
+
+    def render(self, values):
+        return self._header("counter") + [
+            f"{self._name}_total {_format(values[0])}"
+        ]
+
+
+class Gauge(_Metric):
+    """
+    The Gauge class.
+
+    A value that goes up and down, like the tables being played.
+    The changes of every thread add up.
+    """
+    def inc(self, amount=1):
+        """
+        Adds to the gauge.
+        :param amount: The amount.
+        """
+        self._registry._shard()[self._offset] += amount
+
+    def dec(self, amount=1):
+        """
+        Subtracts from the gauge.
+        :param amount: The amount.
+        """
+        self._registry._shard()[self._offset] -= amount
+
+    def set(self, value):
+        """
+        Changes the gauge to a value, by adding the difference.
+        :param value: The new value.
+        """
+        self.inc(value - self.value())
+
+    def value(self):
+        """
+        Get the sum of every thread.
+        :return: The value.
+        """
+        return self._registry._total(self._offset, 1)[0]
+
+    def render(self, values):
+        return self._header("gauge") + [
+            f"{self._name} {_format(values[0])}"
+        ]
+
+
+class Histogram(_Metric):
+    """
+    The Histogram class.
+
+    Counts observed values in buckets with fixed upper bounds,
+    with their sum and count.
+    """
+    def __init__(self, registry, name, help, offset, buckets):
+        """
+        :param buckets: The sorted upper bounds of the buckets,
+        the last bucket, +Inf, is added.
+        """
+        super().__init__(registry, name, help, offset, len(buckets) + 3)
+        self._buckets = tuple(buckets)
+
+    def observe(self, value):
+        """
+        Counts a value.
+        :param value: The value.
+        """
+        shard = self._registry._shard()
+        shard[self._offset + bisect.bisect_left(self._buckets, value)] += 1
+        shard[self._offset + len(self._buckets) + 1] += value
+        shard[self._offset + len(self._buckets) + 2] += 1
+
+    def count(self):
+        """
+        Get the number of observed values of every thread.
+        :return: The count.
+        """
+        return self._registry._total(self._offset + self._size - 1, 1)[0]
+
+    def render(self, values):
+        lines = self._header("histogram")
+        cumulative = 0
+        bounds = [_format(bound) for bound in self._buckets] + ["+Inf"]
+        for bound, count in zip(bounds, values):
+            cumulative += count
+            lines.append(
+                f'{self._name}_bucket{{le="{bound}"}} {_format(cumulative)}'
+            )
+        lines.append(f"{self._name}_sum {_format(values[-2])}")
+        lines.append(f"{self._name}_count {_format(values[-1])}")
+        return lines
+
+
+class Registry:
+    """
+    The Registry class.
+
+    The metrics of a process. Every thread updates its own shard,
+    a list of numbers with slots for every metric,
+    so the updates take no lock and don't slow each other down.
+    The shards are added up when the metrics are read,
+    see render. The metrics of another process are added
+    with merge, from the snapshot the process took.
+    """
+    def __init__(self):
+        """
+        Attributes:
+            metrics: dictionary of name to metric, in their order.
+            size: the number of slots of a shard.
+            shards: the shards of every thread that updated a metric.
+            local: the shard of the current thread.
+            lock: lock of the metrics and the list of shards,
+            taken when a metric or a thread is added.
+        """
+        self._metrics = {}
+        self._size = 0
+        self._shards = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _add(self, kind, name, help, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = kind(self, name, help, self._size, *args)
+                self._metrics[name] = metric
+                self._size += metric.size()
+            elif not isinstance(metric, kind):
+                raise ValueError(f"{name} is already a {type(metric)}.")
+            return metric
+
+    def counter(self, name, help):
+        """
+        Get a counter, adding it if it's new.
+        :param name: The name, without the _total suffix.
+        :param help: Description of the counter.
+        :return: Counter.
+        """
+        return self._add(Counter, name, help, 1)
+
+    def gauge(self, name, help):
+        """
+        Get a gauge, adding it if it's new.
+        :param name: The name.
+        :param help: Description of the gauge.
+        :return: Gauge.
+        """
+        return self._add(Gauge, name, help, 1)
+
+    def histogram(self, name, help, buckets):
+        """
+        Get a histogram, adding it if it's new.
+        :param name: The name.
+        :param help: Description of the histogram.
+        :param buckets: The sorted upper bounds of the buckets.
+        :return: Histogram.
+        """
+        return self._add(Histogram, name, help, buckets)
+
+    def _shard(self):
+        """
+        Get the shard of the current thread, creating it
+        or making room for new metrics if needed.
+        """
+        shard = getattr(self._local, "shard", None)
+        if shard is None or len(shard) < self._size:
+            with self._lock:
+                if shard is None:
+                    shard = []
+                    self._shards.append(shard)
+                    self._local.shard = shard
+                shard.extend([0] * (self._size - len(shard)))
+        return shard
+
+    def _total(self, offset, size):
+        totals = [0] * size
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for idx, value in enumerate(shard[offset:offset + size]):
+                totals[idx] += value
+        return totals
+
+    def snapshot(self):
+        """
+        Adds up the shards, to send the metrics to another process.
+        :return: Dictionary of metric name to its list of values.
+        """
+        return {
+            name: self._total(metric._offset, metric.size())
+            for name, metric in self._metrics.items()
+        }
+
+    def merge(self, snapshot):
+        """
+        Adds the metrics of another process to this one.
+        :param snapshot: The snapshot of the other process's registry,
+        its metrics have to exist here too.
+        """
+        shard = self._shard()
+        for name, values in snapshot.items():
+            metric = self._metrics[name]
+            for idx, value in enumerate(values):
+                shard[metric._offset + idx] += value
+
+    def render(self):
+        """
+        Get every metric in the OpenMetrics text format.
+        :return: str
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.extend(metric.render(snapshot[name]))
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class GameMetrics:
+    """
+    The GameMetrics class.
+
+    The metrics of the games played by a process,
+    updated as a listener of the games (see Game.add_listener).
+    One instance can listen to any number of games,
+    played one after another or at the same time by many threads.
+    A game counts as started at its first move, or when it's
+    attached. The batch metrics, the worker utilization and the queue
+    of results, are updated by the batch runners, see run_batch.
+    """
+    def __init__(self, registry=None):
+        """
+        :param registry: The Registry of the metrics, a new one by default.
+        Attributes:
+            turn_start: dictionary of the id of every game being played
+            to the time its current turn started.
+        """
+        self._registry = registry if registry is not None else Registry()
+        registry = self._registry
+        self._games_started = registry.counter(
+            "monopoly_games_started", "Games started.")
+        self._games_finished = registry.counter(
+            "monopoly_games_finished", "Games finished.")
+        self._active_tables = registry.gauge(
+            "monopoly_active_tables", "Games being played.")
+        self._bankruptcies = registry.counter(
+            "monopoly_bankruptcies", "Players that went bankrupt.")
+        self._turn_latency = registry.histogram(
+            "monopoly_turn_latency_seconds",
+            "Time from the end of a turn to the end of the next one.",
+            LATENCY_BUCKETS)
+        self._rounds = registry.histogram(
+            "monopoly_rounds_per_game", "Rounds of the finished games.",
+            ROUNDS_BUCKETS)
+        self._worker_busy = registry.counter(
+            "monopoly_worker_busy_seconds",
+            "Time the workers spent playing games, divided by the time"
+            " and the number of workers it's their utilization.")
+        self._workers = registry.gauge(
+            "monopoly_workers", "Worker processes of the batch runs.")
+        self._queue_depth = registry.gauge(
+            "monopoly_result_queue_depth",
+            "Finished chunks waiting to be merged.")
+        self._turn_start = {}
+
+    def registry(self):
+        """
+        Get the registry of the metrics.
+        :return: Registry.
+        """
+        return self._registry
+
+    def attach(self, game):
+        """
+        Listens to a game and counts it as started.
+        :param game: The Game.
+        """
+        game.add_listener(self)
+        self._start(game)
+
+    def _start(self, game):
+        self._turn_start[id(game)] = time.perf_counter()
+        self._games_started.inc()
+        self._active_tables.inc()
+
+    def on_move(self, game, player, old_position):
+        """
+        Counts the game as started at its first move.
+        """
+        if id(game) not in self._turn_start:
+            self._start(game)
+
+    def on_turn_end(self, game, player):
+        """
+        Observes the latency of the turn.
+        """
+        now = time.perf_counter()
+        start = self._turn_start.get(id(game))
+        if start is not None:
+            self._turn_latency.observe(now - start)
+        self._turn_start[id(game)] = now
+
+    def on_undo(self, game, player):
+        """
+        Starts the turn again, it was taken back
+        and its time isn't a turn played.
+        """
+        if id(game) in self._turn_start:
+            self._turn_start[id(game)] = time.perf_counter()
+
+    def on_redo(self, game, player):
+        """
+        Starts the next turn again, see on_undo.
+        """
+        self.on_undo(game, player)
+
+    def on_bankrupt(self, game, player):
+        """
+        Counts the bankruptcy.
+        """
+        self._bankruptcies.inc()
+
+    def on_game_end(self, game):
+        """
+        Counts the game as finished.
+        """
+        if self._turn_start.pop(id(game), None) is not None:
+            self._active_tables.dec()
+        self._games_finished.inc()
+        self._rounds.observe(game.current_round())
+
+    def add_busy_time(self, seconds):
+        """
+        Adds the time a worker spent playing games.
+        :param seconds: The time in seconds.
+        """
+        self._worker_busy.inc(seconds)
+
+    def set_workers(self, workers):
+        """
+        Set the number of worker processes.
+        :param workers: The number of workers.
+        """
+        self._workers.set(workers)
+
+    def queue_result(self, amount=1):
+        """
+        Changes the number of results waiting to be merged.
+        :param amount: 1 for a result that arrived,
+        -1 for a result that was merged.
+        """
+        self._queue_depth.inc(amount)
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class MetricsServer:
+    """
+    The MetricsServer class.
+
+    Serves the metrics of a registry at /metrics over HTTP,
+    in the OpenMetrics text format, for a scraper like Prometheus.
+    """
+    def __init__(self, registry, host="127.0.0.1", port=0):
+        """
+        :param registry: The Registry.
+        :param host: The address to listen on, localhost by default.
+        :param port: The port to listen on, 0 for any free port.
+        """
+        self._server = _Server((host, port), _Handler)
+        self._server.registry = registry
+        self._thread = None
+
+    def address(self):
+        """
+        Get the address of the server.
+        :return: (host, port) tuple.
+        """
+        return self._server.server_address[:2]
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """
+        Stops serving.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+
+class MetricsDumper:
+    """
+    The MetricsDumper class.
+
+    Writes the metrics of a registry to a file
+    in the OpenMetrics text format every interval seconds,
+    replacing the file atomically, for batch runs without a scraper.
+    """
+    def __init__(self, registry, path, interval=DEFAULT_DUMP_INTERVAL):
+        """
+        :param registry: The Registry.
+        :param path: The path of the file.
+        :param interval: The seconds between two dumps.
+        """
+        self._registry = registry
+        self._path = path
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def dump(self):
+        """
+        Writes the metrics now.
+        """
+        temporary = self._path + ".tmp"
+        with open(temporary, "w") as file:
+            file.write(self._registry.render())
+        os.replace(temporary, self._path)
+
+    def start(self):
+        """
+        Starts dumping in a background thread.
+        """
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self._interval):
+            self.dump()
+
+    def close(self):
+        """
+        Stops dumping, after a last dump.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.dump()
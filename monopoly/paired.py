@@ -0,0 +1,259 @@
+import functools
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from monopoly.simulation import (
+    play_game, seed_chunks, DEFAULT_CHUNK_SIZE
+)
+from monopoly.stats import RunningStats
+from monopoly.sweep import DEFAULT_Z
+
+
+class Stream:
+    """
+    The Stream class.
+
+    A seeded source of randomness for the dice or the chance fields.
+    The antithetic stream of the same seed returns the mirrored
+    values: the throw 14 - x instead of x, and the chance from
+    the other end of the list.
+    """
+    def __init__(self, seed, antithetic=False):
+        """
+        :param seed: The seed of the stream, any hashable value
+        accepted by random.Random.
+        :param antithetic: True for the mirrored stream.
+        """
+        self._random = random.Random(seed)
+        self._antithetic = antithetic
+
+    def randint(self, low, high):
+        """
+        Get a random int between low and high (both inclusive).
+        """
+        value = self._random.randint(low, high)
+        if self._antithetic:
+            return low + high - value
+        return value
+
+    def choice(self, values):
+        """
+        Get a random element of a non-empty list.
+        """
+        idx = self._random.randrange(len(values))
+        if self._antithetic:
+            idx = len(values) - 1 - idx
+        return values[idx]
+
+
+class RandomStreams:
+    """
+    The RandomStreams class.
+
+    Independent random streams of a game: one for the dice
+    of every seat and one for the chance fields.
+    Seat 2 throws the same sequence in every game of the seed,
+    no matter how the other players play, and the chance values
+    are drawn in the same order. That's what keeps two variants
+    played with the same streams comparable (common random numbers).
+    """
+    def __init__(self, seed, antithetic=False):
+        """
+        :param seed: The seed of the game.
+        :param antithetic: True for the mirrored streams.
+        """
+        self._seed = seed
+        self._antithetic = antithetic
+
+    def dice_stream(self, seat):
+        """
+        Get the stream of the dice of a seat.
+        :param seat: The index of the player in the order of turns.
+        :return: A new Stream.
+        """
+        return Stream(f"{self._seed}/dice/{seat}", self._antithetic)
+
+    def chance_stream(self):
+        """
+        Get the stream of the chance fields.
+        :return: A new Stream.
+        """
+        return Stream(f"{self._seed}/chance", self._antithetic)
+
+
+def _seat_win_score(seat, game):
+    winners = game.find_winners()
+    if len(winners) == 1 and winners[0] is game.players()[seat]:
+        return 1.0
+    return 0.0
+
+
+def seat_wins(seat):
+    """
+    Metric of the games won by a seat, used to compare policies.
+    :param seat: The index of the player in the order of turns.
+    :return: Function scoring a finished Game with 1.0 if the seat
+    is the only player left, else 0.0.
+    """
+    return functools.partial(_seat_win_score, seat)
+
+
+class PairedResult:
+    """
+    The PairedResult class.
+
+    Results of two variants played on the same random streams.
+    A sample is the difference of the metric of variant B
+    and variant A in the same game (averaged with the antithetic
+    game, when antithetic streams are used).
+    The results of different processes can be merged.
+    """
+    def __init__(self):
+        """
+        Attributes:
+            differences: RunningStats of the paired samples.
+            first, second: RunningStats of the metric of each variant.
+        """
+        self._differences = RunningStats()
+        self._first = RunningStats()
+        self._second = RunningStats()
+
+    def add(self, first, second):
+        """
+        Adds a paired sample.
+        :param first: The metric of variant A.
+        :param second: The metric of variant B.
+        """
+        self._first.add(first)
+        self._second.add(second)
+        self._differences.add(second - first)
+
+    def merge(self, other):
+        """
+        Adds the samples of another PairedResult.
+        :param other: The PairedResult to merge.
+        """
+        self._differences.merge(other._differences)
+        self._first.merge(other._first)
+        self._second.merge(other._second)
+
+    def differences(self):
+        """
+        Get the statistics of the differences B - A.
+        :return: RunningStats.
+        """
+        return self._differences
+
+    def first(self):
+        """
+        Get the statistics of the metric of variant A.
+        :return: RunningStats.
+        """
+        return self._first
+
+    def second(self):
+        """
+        Get the statistics of the metric of variant B.
+        :return: RunningStats.
+        """
+        return self._second
+
+    def mean_difference(self):
+        """
+        Get the estimated difference of the variants, B - A.
+        :return: The mean difference.
+        """
+        return self._differences.mean()
+
+    def interval(self, z=DEFAULT_Z):
+        """
+        Get the confidence interval of the difference.
+        :param z: The number of standard errors on each side.
+        :return: (low, high) tuple.
+        """
+        margin = z * self._differences.stderr()
+        return self.mean_difference() - margin, self.mean_difference() + margin
+
+    def is_significant(self, z=DEFAULT_Z):
+        """
+        Check if the confidence interval excludes 0.
+        :param z: The number of standard errors on each side.
+        :return: True if the variants differ significantly, else False.
+        """
+        low, high = self.interval(z)
+        return low > 0 or high < 0
+
+    def variance_reduction(self):
+        """
+        Get how many times fewer games the paired comparison needs
+        than comparing two independent samples of the same size.
+        :return: The ratio of the variances, None if the paired
+        variance is 0.
+        """
+        paired = self._differences.variance()
+        if paired == 0:
+            return None
+        return (self._first.variance() + self._second.variance()) / paired
+
+
+def compare(seeds, first, second, metric, antithetic=False):
+    """
+    Plays both variants on the random streams of every seed.
+    :param seeds: Iterable of game seeds.
+    :param first: SimulationConfig of variant A.
+    :param second: SimulationConfig of variant B.
+    :param metric: Function scoring a finished Game, for example
+    seat_wins(0) or the objectives of monopoly.sweep.
+    :param antithetic: True to also play each seed on the antithetic
+    streams and use the average of the two games as the sample.
+    :return: PairedResult.
+    """
+    result = PairedResult()
+    for seed in seeds:
+        variants = [True, False] if antithetic else [False]
+        first_score = 0.0
+        second_score = 0.0
+        for mirrored in variants:
+            streams = RandomStreams(seed, mirrored)
+            first_score += metric(play_game(seed, first, streams=streams))
+            second_score += metric(play_game(seed, second, streams=streams))
+        result.add(first_score / len(variants), second_score / len(variants))
+    return result
+
+
+def _compare_range(first_seed, games, first, second, metric, antithetic):
+    return compare(
+        range(first_seed, first_seed + games), first, second, metric,
+        antithetic
+    )
+
+
+def compare_batch(games, first, second, metric, antithetic=False,
+                  first_seed=0, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Runs compare on a pool of worker processes.
+    :param games: The number of seeds.
+    :param first: SimulationConfig of variant A.
+    :param second: SimulationConfig of variant B.
+    :param metric: Picklable function scoring a finished Game.
+    :param antithetic: True to use antithetic pairs of streams.
+    :param first_seed: The first seed, 0 by default.
+    :param workers: The number of processes, one per CPU by default.
+    :param chunk_size: The number of seeds a worker plays at a time.
+    :return: PairedResult of all the seeds.
+    """
+    chunks = seed_chunks(first_seed, games, chunk_size)
+    result = PairedResult()
+    with ProcessPoolExecutor(workers) as pool:
+        partials = pool.map(
+            _compare_range,
+            [start for start, _ in chunks],
+            [count for _, count in chunks],
+            [first] * len(chunks),
+            [second] * len(chunks),
+            [metric] * len(chunks),
+            [antithetic] * len(chunks),
+        )
+        for partial in partials:
+            result.merge(partial)
+    return result
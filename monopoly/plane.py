@@ -6,7 +6,8 @@ class Card:
     It has all the attributes a real card from the game would have.
     Objects of this class are crucial to the gameplay.
     """
-    def __init__(self, name, color=None, price=None, fee=0, card_type="FIELD"):
+    def __init__(self, name, color=None, price=None, fee=0, card_type="FIELD",
+                 rules=None):
         """
         Initializes a card object.
         :param name: The name of the card, the only required argument.
@@ -15,6 +16,8 @@ class Card:
         :param fee: The fee for landing on the card, 0 by default.
         :param card_type: The type of card - used do determine property cards,
         from utility card that have different importance to the game.
+        :param rules: Rules with the rent multipliers and the house price
+        ratio, DEFAULT_RULES by default.
 
         Attributes:
             houses: Number of houses on a property card.
@@ -31,8 +34,9 @@ class Card:
         self._fee = fee
         self._houses = 0
         self._owner = None
+        self._rules = rules if rules is not None else DEFAULT_RULES
         if price:
-            self._house_price = price / 2
+            self._house_price = price * self._rules.house_price_ratio()
         else:
             self._house_price = None
         self._hotel = None
@@ -98,6 +102,12 @@ class Card:
         """
         self._hotel = 1
 
+    def remove_hotel(self):
+        """
+        Removes the hotel of a card, used to undo building it.
+        """
+        self._hotel = None
+
     def possible_num_houses(self):
         """
         Get the maximum number of houses that can be built on the card.
@@ -107,6 +117,13 @@ class Card:
         """
         return 4 - self._houses
 
+    def base_fee(self):
+        """
+        Get the fee of the card the rent multipliers multiply.
+        :return: The base fee.
+        """
+        return self._fee
+
     def set_owner(self, player):
         """
         Set the owner of the card.
@@ -119,20 +136,15 @@ class Card:
         Get the fee for landing on the card.
         The fee varies by the number of houses,
         or the presence of a hotel on a card.
+        The multipliers for each number of houses and the hotel
+        come from the rules.
         :return: The fee paid for landing on the card.
         """
-        if self._houses == 0:
-            return self._fee
-        if self._houses == 1:
-            return self._fee * 5
-        if self._houses == 2:
-            return self._fee * 15
-        if self._houses == 3:
-            return self._fee * 30
-        if self._houses == 4:
-            return self._fee * 40
+        multipliers = self._rules.rent_multipliers()
+        if self._houses is not None and 0 <= self._houses <= 4:
+            return self._fee * multipliers[self._houses]
         if self._hotel:
-            return self._fee * 50
+            return self._fee * multipliers[5]
 
     def color(self):
         """
@@ -196,11 +208,124 @@ CHANCES = [
     -1000000
 ]
 
+
+class Rules:
+    """
+    The Rules class.
+
+    The tunable amounts of the game, so variants of the rules
+    can be played without changing the module constants.
+    """
+    def __init__(self, starting_cash=15000000, lap_bonus=2000000,
+                 start_payout=2000000, chances=None,
+                 rent_multipliers=(1, 5, 15, 30, 40, 50),
+                 house_price_ratio=0.5):
+        """
+        Initializes the rules, the defaults are the standard game.
+        :param starting_cash: The cash every player starts with.
+        :param lap_bonus: The amount earned for completing a lap.
+        :param start_payout: The amount earned for landing on Start.
+        :param chances: List of possible chance values, CHANCES by default.
+        :param rent_multipliers: Multipliers of the fee of a card
+        with 0, 1, 2, 3 and 4 houses and with a hotel.
+        :param house_price_ratio: Price of a house (and hotel)
+        as a fraction of the price of the card.
+        """
+        self._starting_cash = starting_cash
+        self._lap_bonus = lap_bonus
+        self._start_payout = start_payout
+        self._chances = list(chances) if chances is not None else CHANCES
+        self._rent_multipliers = tuple(rent_multipliers)
+        self._house_price_ratio = house_price_ratio
+
+    def starting_cash(self):
+        """
+        Get the cash every player starts with.
+        :return: The starting cash.
+        """
+        return self._starting_cash
+
+    def lap_bonus(self):
+        """
+        Get the amount earned for completing a lap.
+        :return: The lap bonus.
+        """
+        return self._lap_bonus
+
+    def start_payout(self):
+        """
+        Get the amount earned for landing on the Start field.
+        :return: The Start payout.
+        """
+        return self._start_payout
+
+    def chances(self):
+        """
+        Get the possible chance values.
+        :return: List of chance values.
+        """
+        return self._chances
+
+    def rent_multipliers(self):
+        """
+        Get the fee multipliers for 0-4 houses and a hotel.
+        :return: Tuple of 6 multipliers.
+        """
+        return self._rent_multipliers
+
+    def house_price_ratio(self):
+        """
+        Get the price of a house as a fraction of the card price.
+        :return: The house price ratio.
+        """
+        return self._house_price_ratio
+
+    def settings(self):
+        """
+        Get all the amounts of the rules.
+        :return: Dictionary of the constructor arguments.
+        """
+        return {
+            "starting_cash": self._starting_cash,
+            "lap_bonus": self._lap_bonus,
+            "start_payout": self._start_payout,
+            "chances": list(self._chances),
+            "rent_multipliers": list(self._rent_multipliers),
+            "house_price_ratio": self._house_price_ratio,
+        }
+
+    def replace(self, **changes):
+        """
+        Create new rules with some of the amounts changed.
+        :param changes: Keyword arguments of the constructor.
+        :return: The new Rules.
+        """
+        settings = self.settings()
+        settings.update(changes)
+        return Rules(**settings)
+
+    def key(self):
+        """
+        Get a text describing all the amounts.
+        Equal rules always have the same key.
+        :return: The description of the rules.
+        """
+        settings = self.settings()
+        return ";".join(f"{name}={settings[name]}" for name in sorted(settings))  # noqa
+
+
+"""
+The rules of the standard game.
+"""
+DEFAULT_RULES = Rules()
+
 """
 All the cards used in the game.
 Their order is important, as its set for the whole game.
 
 The order they are in is the same as in the Monopoly World game.
+Games play on copies made by new_board, these cards are never
+owned or built on.
 """
 CARDS = [
     Card("Start", card_type="START"),
@@ -251,21 +376,40 @@ The variable that stores the length of the game plane.
 PLANE_LENGTH = len(CARDS)
 
 
+def new_board(rules=None):
+    """
+    Creates a fresh copy of CARDS, with no owners and no houses.
+    CARDS is only the template of the board: every game
+    needs cards of its own, so games played one after another
+    or in threads of the same process don't change each other's board.
+    :param rules: Rules of the new cards, DEFAULT_RULES by default.
+    :return: A list of new Card objects, in the order of CARDS.
+    """
+    return [
+        Card(
+            card.name(), card.color(), card.price(), card._fee, card.type(),
+            rules
+        )
+        for card in CARDS
+    ]
+
+
 class Plane:
     """
     The Plane class.
 
     Used to represent the Monopoly board.
     """
-    def __init__(self):
+    def __init__(self, fields=None):
         """
         Initializes a Plane object.
+        :param fields: The cards of the board, a new_board() by default.
         Attributes:
             field_count: Number of fields on the plane
             fields: Objects of the Card class, representing board fields.
         """
         self._field_count = PLANE_LENGTH
-        self._fields = CARDS
+        self._fields = fields if fields is not None else new_board()
 
     def get_field_from_position(self, position):
         """
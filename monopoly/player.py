@@ -1,4 +1,4 @@
-from monopoly.plane import PLANE_LENGTH
+from monopoly.plane import PLANE_LENGTH, DEFAULT_RULES
 
 
 class NotEnoughMoneyException(Exception):
@@ -22,17 +22,21 @@ class Player:
 
     Used to represent a player (user).
     """
-    def __init__(self, name):
+    def __init__(self, name, rules=None):
         """
         Initializes a Player object.
         :param name: The name of the player.
+        :param rules: Rules with the starting cash and the lap bonus,
+        DEFAULT_RULES by default.
         Attributes:
             cash: the bank balance of each player.
-        Every player is created with the starting balance of 15000000.
+        Every player is created with the starting balance of the rules,
+        15000000 in the standard game.
             cards: list of players owned cards.
             position: player's position on the game plane.
         """
-        self._cash = 15000000
+        self._rules = rules if rules is not None else DEFAULT_RULES
+        self._cash = self._rules.starting_cash()
         self._name = name
         self._cards = []
         self._position = 1
@@ -51,6 +55,13 @@ class Player:
         """
         return self._cash
 
+    def cards(self):
+        """
+        Get the cards the player owns.
+        :return: List of the player's cards.
+        """
+        return self._cards
+
     def position(self):
         """
         Get the current position of the player on the plane.
@@ -58,6 +69,13 @@ class Player:
         """
         return self._position
 
+    def set_position(self, position):
+        """
+        Put the player on a position, used to undo a move.
+        :param position: The position on the plane.
+        """
+        self._position = position
+
     def is_in_game(self):
         """
         Check if the player is still in the game.
@@ -164,6 +182,17 @@ class Player:
         self._cash -= amount
         player.earn(amount)
 
+    def pay_bank(self, amount):
+        """
+        Make a payment to the bank, used for taxes and chances.
+        Unlike change_balance, it doesn't refuse the payment
+        when the player can't afford it. The balance drops
+        to zero or below, which takes the player out of the game.
+        A negative amount is paid out to the player.
+        :param amount: The amount to be paid.
+        """
+        self._cash -= amount
+
     def buy_card(self, card):
         """
         Buys a card from the plane.
@@ -175,6 +204,24 @@ class Player:
         self._cards.append(card)
         card.set_owner(self)
 
+    def take_card(self, card):
+        """
+        Adds a card to the player's cards without paying for it,
+        used to redo a purchase.
+        :param card: The card.
+        """
+        self._cards.append(card)
+        card.set_owner(self)
+
+    def give_up_card(self, card):
+        """
+        Removes a card from the player's cards, leaving it without
+        an owner, used to undo a purchase.
+        :param card: The card.
+        """
+        self._cards.remove(card)
+        card.set_owner(None)
+
     def make_move(self, dice):
         """
         Moves the player forward on the plane.
@@ -194,7 +241,7 @@ class Player:
         move = dice.make_throw()
         self._position += move
         if self._position >= PLANE_LENGTH:
-            self.earn(2000000)
+            self.earn(self._rules.lap_bonus())
             self._position -= PLANE_LENGTH
         return self._position
 
@@ -0,0 +1,282 @@
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from monopoly.simulation import (
+    DEFAULT_CHUNK_SIZE, _simulate_range, play_game, seed_chunks
+)
+from monopoly.stats import GameAggregator
+
+"""
+Default seconds between two samples of the stacks.
+"""
+DEFAULT_INTERVAL = 0.001
+
+"""
+Methods of Game that are phases of a game. A sample is annotated
+with the innermost phase on its stack, the methods of the displays
+are the display phase and the rest is other.
+"""
+PHASES = ("play_a_round", "check_card", "calculate_round_stats")
+LANDED_PREFIX = "landed_"
+DISPLAY_PHASE = "display"
+OTHER_PHASE = "other"
+
+"""
+Functions that wait for the keyboard, a sample in them isn't counted.
+"""
+INPUT_FUNCTIONS = ("get_yes_or_no", "input_number")
+
+
+def _qualname(frame):
+    """
+    Get the qualified name of a frame's function, with its class.
+    Before Python 3.11 the code has no co_qualname, the class
+    is the one of the frame's self that defines the function.
+    """
+    code = frame.f_code
+    name = getattr(code, "co_qualname", None)
+    if name is not None:
+        return name
+    if "self" in code.co_varnames[:1]:
+        for owner in type(frame.f_locals.get("self")).__mro__:
+            if code.co_name in vars(owner):
+                return f"{owner.__qualname__}.{code.co_name}"
+    return code.co_name
+
+
+def _frame_name(frame):
+    return f"{frame.f_globals.get('__name__', '?')}.{_qualname(frame)}"
+
+
+def _phase(frame):
+    """
+    Get the phase of a frame, None if it isn't one.
+    """
+    owner, _, method = _qualname(frame).rpartition(".")
+    if owner == "Game" and (method in PHASES
+                            or method.startswith(LANDED_PREFIX)):
+        return method
+    if owner.endswith("Display"):
+        return DISPLAY_PHASE
+    return None
+
+
+def collapse(frame, root=None):
+    """
+    Get the collapsed stack of a frame, annotated by its phase:
+    "phase;outermost frame;...;innermost frame".
+    :param frame: The innermost frame.
+    :param root: The frame where the stack starts, the outermost
+    frame of the thread by default.
+    :return: The collapsed stack, None if the frame waits
+    for the keyboard.
+    """
+    names = []
+    phase = None
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name in INPUT_FUNCTIONS and (
+                frame.f_globals.get("__name__") == "monopoly.input"):
+            return None
+        if phase is None:
+            phase = _phase(frame)
+        names.append(_frame_name(frame))
+        if frame is root:
+            break
+        frame = frame.f_back
+    names.append(phase if phase is not None else OTHER_PHASE)
+    return ";".join(reversed(names))
+
+
+class _Sampling:
+    """
+    Context manager of StackSampler.sampling.
+    """
+    def __init__(self, sampler):
+        self._sampler = sampler
+
+    def __enter__(self):
+        self._sampler._add(threading.get_ident(), sys._getframe(1))
+        return self._sampler
+
+    def __exit__(self, *exc_info):
+        self._sampler._remove(threading.get_ident())
+        return False
+
+
+class StackSampler:
+    """
+    The StackSampler class.
+
+    A sampling profiler of the games: a background thread
+    reads the stacks of the threads playing a sampled game
+    every interval seconds and counts the collapsed stacks
+    (see collapse), the format flame graph tools read.
+    Only the code run inside sampling() is sampled, so a batch
+    can profile some of its games and play the others at full speed:
+    the thread sleeps while no game is sampled.
+    Samples waiting for the keyboard are left out,
+    so an interactive game shows only the work of the engine.
+    While a game is sampled, the interpreter switches threads
+    every interval seconds, so the sampling thread gets its turns.
+    """
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        """
+        :param interval: The seconds between two samples.
+        Attributes:
+            counts: Counter of collapsed stack to its samples.
+            targets: dictionary of the id of every sampled thread
+            to the frame its stacks start at.
+            active: event set while a thread is sampled.
+            stopped: event set to stop the thread.
+            switch_interval: the thread switch interval
+            of the interpreter before the sampling started.
+        """
+        self._interval = interval
+        self._counts = Counter()
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._stopped = threading.Event()
+        self._switch_interval = None
+        self._thread = None
+
+    def sampling(self):
+        """
+        Samples the current thread, from the caller's frame,
+        inside a with statement.
+        :return: Context manager.
+        """
+        return _Sampling(self)
+
+    def _add(self, thread, root):
+        with self._lock:
+            self._targets[thread] = root
+            if self._switch_interval is None:
+                self._switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(min(self._switch_interval,
+                                          self._interval))
+            self._active.set()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _remove(self, thread):
+        with self._lock:
+            self._targets.pop(thread, None)
+            if not self._targets:
+                self._active.clear()
+                sys.setswitchinterval(self._switch_interval)
+                self._switch_interval = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._active.wait()
+            if self._stopped.wait(self._interval):
+                break
+            with self._lock:
+                targets = dict(self._targets)
+            frames = sys._current_frames()
+            for thread, root in targets.items():
+                frame = frames.get(thread)
+                if frame is None:
+                    continue
+                stack = collapse(frame, root)
+                if stack is not None:
+                    self._counts[stack] += 1
+
+    def stop(self):
+        """
+        Stops the background thread.
+        """
+        self._stopped.set()
+        self._active.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def counts(self):
+        """
+        Get the samples of every stack.
+        :return: Counter of collapsed stack to its samples.
+        """
+        return Counter(self._counts)
+
+    def merge(self, counts):
+        """
+        Adds the samples of another sampler, of another process.
+        :param counts: Counter of collapsed stack to its samples.
+        """
+        self._counts.update(counts)
+
+    def write(self, path):
+        """
+        Writes the samples in the collapsed stack format,
+        a line "stack samples" for every stack.
+        :param path: The path of the file.
+        """
+        with open(path, "w") as file:
+            for stack, count in sorted(self._counts.items()):
+                file.write(f"{stack} {count}\n")
+
+
+def _simulate_range_profiled(first_seed, games, config, profile_games,
+                             interval):
+    """
+    Plays a chunk of games like _simulate_range, sampling the first
+    profile_games of them.
+    :return: (GameAggregator, Counter of the samples) tuple.
+    """
+    sampler = StackSampler(interval)
+    aggregator = GameAggregator(config.players_count(), config.max_rounds())
+    try:
+        for seed in range(first_seed, first_seed + games):
+            if seed < first_seed + profile_games:
+                with sampler.sampling():
+                    play_game(seed, config, [aggregator])
+            else:
+                play_game(seed, config, [aggregator])
+    finally:
+        sampler.stop()
+    return aggregator, sampler.counts()
+
+
+def profile_batch(games, config, profile_games=1, first_seed=0,
+                  workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                  interval=DEFAULT_INTERVAL):
+    """
+    Plays games like run_batch, with the first profile_games of them
+    sampled by a StackSampler in their worker process.
+    The result of the games is the same as the one of run_batch.
+    :param games: The number of games.
+    :param config: SimulationConfig of the games.
+    :param profile_games: The number of games to profile.
+    :param first_seed: The seed of the first game.
+    :param workers: The number of processes, one per CPU by default.
+    :param chunk_size: The number of games a worker plays at a time.
+    :param interval: The seconds between two samples.
+    :return: (GameAggregator, StackSampler with the samples) tuple.
+    """
+    aggregator = GameAggregator(config.players_count(), config.max_rounds())
+    sampler = StackSampler(interval)
+    last_profiled = first_seed + profile_games
+    with ProcessPoolExecutor(workers) as pool:
+        futures = []
+        for start, count in seed_chunks(first_seed, games, chunk_size):
+            if start < last_profiled:
+                futures.append(pool.submit(
+                    _simulate_range_profiled, start, count, config,
+                    last_profiled - start, interval
+                ))
+            else:
+                futures.append(pool.submit(_simulate_range, start, count,
+                                           config))
+        for future in futures:
+            partial = future.result()
+            if isinstance(partial, tuple):
+                partial, counts = partial
+                sampler.merge(counts)
+            aggregator.merge(partial)
+    return aggregator, sampler
@@ -0,0 +1,145 @@
+import functools
+
+import numpy as np
+
+from monopoly.game import DICE_MIN, DICE_MAX
+from monopoly.plane import PLANE_LENGTH
+
+"""
+Default number of turns of the reachability tables.
+"""
+DEFAULT_TURNS = 12
+
+
+def transition_matrix():
+    """
+    Get the probabilities of moving between the positions in a turn,
+    with the throws of Dice.make_throw and the wrap-around
+    of Player.make_move.
+    :return: [PLANE_LENGTH, PLANE_LENGTH] array, [start, end].
+    """
+    throws = np.arange(DICE_MIN, DICE_MAX + 1)
+    matrix = np.zeros((PLANE_LENGTH, PLANE_LENGTH))
+    for start in range(PLANE_LENGTH):
+        matrix[start, (start + throws) % PLANE_LENGTH] += 1 / len(throws)
+    return matrix
+
+
+def field_position(field):
+    """
+    Get the position of the players standing on a field.
+    :param field: Index of the field in Plane.fields().
+    :return: The position, see Plane.get_field_from_position.
+    """
+    return (field + 1) % PLANE_LENGTH
+
+
+class ReachabilityTables:
+    """
+    The ReachabilityTables class.
+
+    Probabilities of a player landing on the positions of the board
+    in their next turns. Chance and tax fields don't move
+    the players, so the positions only depend on the dice.
+    Arrays indexed [start position, position, turns - 1]:
+        landing: probability of ending the turn-th turn on the position.
+        expected: expected number of landings on the position
+        during the first turns.
+        reach: probability of landing on the position at least once
+        during the first turns.
+    """
+    def __init__(self, turns=DEFAULT_TURNS):
+        """
+        :param turns: The number of turns of the tables.
+        """
+        self._turns = turns
+        matrix = transition_matrix()
+        shape = (PLANE_LENGTH, PLANE_LENGTH, turns)
+        self.landing = np.zeros(shape)
+        self.reach = np.zeros(shape)
+        state = np.eye(PLANE_LENGTH)
+        positions = np.arange(PLANE_LENGTH)
+        avoiding = np.repeat(state[None], PLANE_LENGTH, axis=0)
+        for turn in range(turns):
+            state = state @ matrix
+            self.landing[:, :, turn] = state
+            avoiding = avoiding @ matrix
+            avoiding[positions, :, positions] = 0
+            self.reach[:, :, turn] = 1 - avoiding.sum(axis=2).T
+        self.expected = np.cumsum(self.landing, axis=2)
+        for table in (self.landing, self.reach, self.expected):
+            table.flags.writeable = False
+
+    def turns(self):
+        """
+        Get the number of turns of the tables.
+        :return: The number of turns.
+        """
+        return self._turns
+
+    def column(self, turns):
+        """
+        Get the index of the tables' last axis for a number of turns.
+        :param turns: The number of turns, between 1 and turns().
+        :return: The index.
+        """
+        if not 1 <= turns <= self._turns:
+            raise ValueError(
+                f"turns has to be between 1 and {self._turns}, not {turns}"
+            )
+        return turns - 1
+
+
+@functools.lru_cache(maxsize=None)
+def reachability_tables(turns=DEFAULT_TURNS):
+    """
+    Get the tables of a number of turns,
+    computed once and shared by all the callers.
+    :param turns: The number of turns of the tables.
+    :return: ReachabilityTables.
+    """
+    return ReachabilityTables(turns)
+
+
+def landing_chances(game, player, turns=DEFAULT_TURNS):
+    """
+    Get the probability of a player landing on every card
+    in their next turns.
+    :param game: The Game.
+    :param player: The player.
+    :param turns: The number of turns.
+    :return: Dictionary of Card to probability.
+    """
+    tables = reachability_tables(max(turns, DEFAULT_TURNS))
+    row = tables.reach[player.position(), :, tables.column(turns)]
+    return {
+        card: row[field_position(field)]
+        for field, card in enumerate(game.plane().fields())
+    }
+
+
+def expected_incoming_rent(game, turns=DEFAULT_TURNS, owner=None):
+    """
+    Get the rent the owned cards are expected to collect
+    from the players' next turns, with the current fees,
+    from the current positions of the players still in the game.
+    :param game: The Game.
+    :param turns: The number of turns of every player.
+    :param owner: The player whose cards are returned,
+    every owned card by default.
+    :return: Dictionary of Card to expected rent.
+    """
+    tables = reachability_tables(max(turns, DEFAULT_TURNS))
+    column = tables.column(turns)
+    rents = {}
+    players = [player for player in game.players() if player.is_in_game()]
+    for field, card in enumerate(game.plane().fields()):
+        if card.owner() is None or owner not in (None, card.owner()):
+            continue
+        position = field_position(field)
+        landings = sum(
+            tables.expected[player.position(), position, column]
+            for player in players if player is not card.owner()
+        )
+        rents[card] = landings * card.fee()
+    return rents
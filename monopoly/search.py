@@ -0,0 +1,431 @@
+import copy
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from monopoly.book import book_key
+from monopoly.bot import BotPolicy
+from monopoly.state import (
+    TranspositionCache, encode, game_state, card_level, loser_places
+)
+from monopoly.vector import VectorGame, BUY, HOUSES, HOTEL
+
+"""
+Default settings of MonteCarloSearch: the most rollouts of a decision,
+the rollouts played at once, the rounds a rollout lasts,
+the seconds a decision may take and the UCB exploration constant.
+"""
+DEFAULT_ROLLOUTS = 4000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_HORIZON = 50
+DEFAULT_TIME_BUDGET = 0.5
+DEFAULT_EXPLORATION = 0.7
+
+"""
+Default number of decisions kept in the transposition cache.
+"""
+DEFAULT_CACHE_SIZE = 10000
+
+
+class SearchRoot:
+    """
+    The SearchRoot class.
+
+    A copy of a Game at a decision, in the form the rollouts start from.
+    It holds plain values and arrays only, so it's cheap to send
+    to worker processes.
+    """
+    def __init__(self, game, card, player, kind):
+        """
+        :param game: The Game.
+        :param card: The card the decision is about.
+        :param player: The deciding player.
+        :param kind: The decision, BUY, HOUSES or HOTEL.
+        Attributes:
+            state: GameState of the game, see monopoly.state.
+            places: place of every player in the losers list, -1
+            for the players still in the game.
+            field: field index of the card.
+            round, max_rounds: the current round and the round limit.
+            rules: the Rules of the game.
+        """
+        players = game.players()
+        self.seat = players.index(player)
+        self.state = game_state(game, self.seat)
+        self.places = loser_places(game)
+        self.kind = kind
+        self.field = game.plane().fields().index(card)
+        self.price = card.price()
+        self.house_price = card.house_price()
+        self.level = card_level(card)
+        self.round = game.current_round()
+        self.max_rounds = game.max_rounds()
+        self.rules = game.rules()
+
+    def actions(self):
+        """
+        Get the actions of the decision that the player can afford,
+        the actions of VectorGame.decide.
+        :return: List of actions, [0] when there's nothing to choose.
+        """
+        cash = self.state.cash[self.seat]
+        if self.kind == BUY:
+            highest = int(cash >= self.price)
+        elif self.kind == HOUSES:
+            highest = min(4 - self.level, cash // self.house_price)
+        else:
+            highest = int(cash >= self.house_price)
+        return list(range(max(highest, 0) + 1))
+
+    def key(self):
+        """
+        Get the key of the decision in the transposition cache.
+        The cash of the state key is bucketed, so the key also holds
+        the highest affordable action: decisions sharing a key
+        always have the same actions.
+        :return: The state key followed by the kind, the field
+        and the highest action.
+        """
+        return encode(self.state) + bytes(
+            [self.kind, self.field, self.actions()[-1]]
+        )
+
+
+def wealth_shares(engine):
+    """
+    Scores the games of an engine for every seat:
+    0 for the players out of the game, else the player's share
+    of the wealth (cash and the price of cards and buildings)
+    of the players still in the game, 1 for the only player left.
+    :param engine: The VectorGame.
+    :return: [games, players] array of scores.
+    """
+    board = engine.board()
+    alive = engine.alive()
+    values = board.prices + board.house_prices * engine.level
+    owned = engine.owner[:, :, None] == np.arange(engine.players_count())
+    wealth = engine.cash + (owned * values[:, :, None]).sum(axis=1)
+    wealth = np.where(alive, np.maximum(wealth, 1), 0)
+    return wealth / np.maximum(wealth.sum(axis=1), 1)[:, None]
+
+
+def rollout_scores(engine, seat):
+    """
+    Scores the games of a rollout engine for a seat, see wealth_shares.
+    :param engine: The VectorGame.
+    :param seat: The seat to score.
+    :return: Array of scores, one per game.
+    """
+    return wealth_shares(engine)[:, seat]
+
+
+def allocate(counts, totals, batch_size, exploration):
+    """
+    Splits a batch of rollouts between the actions with UCB1,
+    giving chunks of the batch to the action with the highest
+    upper bound, counting the rollouts already given to it.
+    :param counts: Array of the rollouts of every action so far.
+    :param totals: Array of the sums of their scores.
+    :param batch_size: The number of rollouts to split.
+    :param exploration: The exploration constant.
+    :return: Array of the rollouts of every action.
+    """
+    actions_count = len(counts)
+    if counts.min() == 0:
+        shares = np.full(actions_count, batch_size // actions_count)
+        shares[:batch_size % actions_count] += 1
+        return shares
+    means = totals / counts
+    shares = np.zeros(actions_count, np.int64)
+    chunk = max(1, batch_size // (4 * actions_count))
+    left = batch_size
+    while left > 0:
+        visits = counts + shares
+        bounds = means + exploration * np.sqrt(
+            math.log(visits.sum()) / visits
+        )
+        best = int(np.argmax(bounds))
+        given = min(chunk, left)
+        shares[best] += given
+        left -= given
+    return shares
+
+
+def search_root(root, actions, rollouts, batch_size, horizon, reserve,
+                exploration, time_budget, seed=None, counts=None,
+                totals=None):
+    """
+    Plays batches of rollouts of the actions until the rollouts
+    or the time budget run out, at least one batch.
+    A rollout answers the decision with its action and plays on
+    with the BotPolicy of every seat for horizon rounds.
+    :param root: SearchRoot of the decision.
+    :param actions: List of the actions to try.
+    :param rollouts: The most rollouts to play.
+    :param batch_size: The number of rollouts played at once.
+    :param horizon: The number of rounds a rollout lasts at most.
+    :param reserve: Cash reserve of the bots of the rollouts.
+    :param exploration: The UCB exploration constant.
+    :param time_budget: The most seconds to spend.
+    :param seed: Seed of the rollouts.
+    :param counts, totals: Results to start from, zeros by default.
+    :return: (counts, totals) arrays of the actions.
+    """
+    deadline = time.perf_counter() + time_budget
+    if counts is None:
+        counts = np.zeros(len(actions), np.int64)
+        totals = np.zeros(len(actions))
+    max_rounds = root.round + horizon
+    if root.max_rounds:
+        max_rounds = min(max_rounds, root.max_rounds)
+    engine = VectorGame(batch_size, root.state.players_count(), root.rules,
+                        max_rounds, reserve, seed=seed)
+    games = np.arange(batch_size)
+    played = 0
+    while True:
+        shares = allocate(counts, totals, batch_size, exploration)
+        engine.load(root.state, root.places, root.round)
+        engine.pending[:] = root.kind
+        engine.pending_field[:] = root.field
+        choices = np.repeat(np.arange(len(actions)), shares)
+        engine.decide(games, np.asarray(actions)[choices])
+        engine.advance()
+        scores = rollout_scores(engine, root.seat)
+        counts += shares
+        totals += np.bincount(choices, scores, len(actions))
+        played += batch_size
+        if played >= rollouts or time.perf_counter() >= deadline:
+            return counts, totals
+
+
+class MonteCarloSearch:
+    """
+    The MonteCarloSearch class.
+
+    Chooses the decisions of a player by playing short rollouts
+    of the game after every possible answer with VectorGame,
+    many rollouts at once. The rollouts are spread between the answers
+    with UCB1, so the promising ones get most of them, and the answer
+    with the most rollouts is chosen.
+    Results are kept in a TranspositionCache, so a decision met again
+    in a similar state continues from the rollouts played before.
+    With workers, every process searches the decision on its own
+    for the time budget and the results are added up
+    (root parallelization).
+    With a DecisionBook, decisions found in the book aren't searched
+    and the searched ones are added to it, so the rollouts
+    are spent on positions new to the book.
+    """
+    def __init__(self, rollouts=DEFAULT_ROLLOUTS,
+                 batch_size=DEFAULT_BATCH_SIZE, horizon=DEFAULT_HORIZON,
+                 time_budget=DEFAULT_TIME_BUDGET,
+                 exploration=DEFAULT_EXPLORATION, reserve=0,
+                 cache_size=DEFAULT_CACHE_SIZE, workers=None, seed=None,
+                 book=None):
+        """
+        :param rollouts: The most rollouts of a decision.
+        :param batch_size: The number of rollouts played at once.
+        :param horizon: The number of rounds a rollout lasts at most.
+        :param time_budget: The most seconds a decision takes.
+        :param exploration: The UCB exploration constant.
+        :param reserve: Cash reserve of the bots of the rollouts.
+        :param cache_size: The number of decisions kept in the cache.
+        :param workers: The number of worker processes,
+        None to search in this process.
+        :param seed: Seed of the rollouts.
+        :param book: DecisionBook shared with other games
+        and processes, None to search every decision.
+        Attributes:
+            cache: the TranspositionCache.
+            pool: the worker processes, started at the first search.
+            searches: the number of decisions searched.
+        """
+        self._rollouts = rollouts
+        self._batch_size = batch_size
+        self._horizon = horizon
+        self._time_budget = time_budget
+        self._exploration = exploration
+        self._reserve = reserve
+        self._cache = TranspositionCache(cache_size)
+        self._workers = workers
+        self._pool = None
+        self._rng = np.random.default_rng(seed)
+        self._searches = 0
+        self._book = book
+
+    def key(self):
+        """
+        Get a text describing the search settings.
+        :return: The description of the search.
+        """
+        return (
+            f"MonteCarloSearch(rollouts={self._rollouts},"
+            f"horizon={self._horizon},time_budget={self._time_budget},"
+            f"reserve={self._reserve})"
+        )
+
+    def cache(self):
+        """
+        Get the transposition cache.
+        :return: The TranspositionCache.
+        """
+        return self._cache
+
+    def book(self):
+        """
+        Get the decision book.
+        :return: The DecisionBook, None without a book.
+        """
+        return self._book
+
+    def searches(self):
+        """
+        Get the number of decisions that needed rollouts.
+        :return: The number of searches.
+        """
+        return self._searches
+
+    def clone(self):
+        """
+        Copies the search with its state: the cache and the random
+        generator are copied, so the copy decides like this search
+        would and searching with it doesn't change this one.
+        The worker processes and the book are shared.
+        :return: The new MonteCarloSearch.
+        """
+        if self._workers is not None and self._pool is None:
+            self._pool = ProcessPoolExecutor(self._workers)
+        memo = {id(value): value for value in (self._pool, self._book)}
+        return copy.deepcopy(self, memo)
+
+    def close(self):
+        """
+        Stops the worker processes.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def search(self, root):
+        """
+        Searches a decision.
+        :param root: SearchRoot of the decision.
+        :return: (actions, counts, totals) tuple, the list of actions
+        and the arrays of their rollouts and score sums.
+        """
+        actions = root.actions()
+        if len(actions) == 1:
+            return actions, np.zeros(1, np.int64), np.zeros(1)
+        key = root.key()
+        cached = self._cache.get(key)
+        if cached is None or len(cached[0]) != len(actions):
+            counts = np.zeros(len(actions), np.int64)
+            totals = np.zeros(len(actions))
+        else:
+            counts, totals = (array.copy() for array in cached)
+        rollouts = self._rollouts - int(counts.sum())
+        if rollouts > 0:
+            self._searches += 1
+            settings = (self._batch_size, self._horizon, self._reserve,
+                        self._exploration, self._time_budget)
+            if self._workers is None:
+                counts, totals = search_root(
+                    root, actions, rollouts, *settings,
+                    self._rng.integers(2 ** 63), counts, totals
+                )
+            else:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(self._workers)
+                share = -(-rollouts // self._workers)
+                results = self._pool.map(
+                    search_root,
+                    *zip(*[
+                        (root, actions, share, *settings,
+                         self._rng.integers(2 ** 63))
+                        for _ in range(self._workers)
+                    ])
+                )
+                for worker_counts, worker_totals in results:
+                    counts += worker_counts
+                    totals += worker_totals
+            self._cache.put(key, (counts, totals))
+        return actions, counts, totals
+
+    def decide(self, game, card, player, kind):
+        """
+        Chooses the answer of a decision of a Game.
+        :param game: The Game.
+        :param card: The card the decision is about.
+        :param player: The deciding player.
+        :param kind: The decision, BUY, HOUSES or HOTEL.
+        :return: The action, see VectorGame.decide.
+        """
+        root = SearchRoot(game, card, player, kind)
+        if self._book is not None:
+            key = book_key(game, card, player, kind)
+            action = self._book.get(key)
+            if action is not None and action in root.actions():
+                return action
+        actions, counts, totals = self.search(root)
+        means = totals / np.maximum(counts, 1)
+        best = max(range(len(actions)), key=lambda idx: (counts[idx], means[idx]))  # noqa
+        if self._book is not None and len(actions) > 1:
+            self._book.put(key, actions[best])
+        return actions[best]
+
+
+class SearchPolicy(BotPolicy):
+    """
+    The SearchPolicy class.
+
+    A bot policy that decides by MonteCarloSearch.
+    Needs NumPy, like the VectorGame the rollouts are played with.
+    """
+    def __init__(self, search=None):
+        """
+        :param search: The MonteCarloSearch, one with the default
+        settings by default.
+        """
+        super().__init__()
+        self._search = search if search is not None else MonteCarloSearch()
+
+    def search(self):
+        """
+        Get the search of the policy.
+        :return: The MonteCarloSearch.
+        """
+        return self._search
+
+    def key(self):
+        """
+        Get a text describing the policy and its search.
+        :return: The description of the policy.
+        """
+        return f"SearchPolicy({self._search.key()})"
+
+    def clone(self):
+        """
+        Get a policy with a clone of the search, see MonteCarloSearch.clone.
+        :return: The new SearchPolicy.
+        """
+        return SearchPolicy(self._search.clone())
+
+    def wants_card(self, game, card, player):
+        """
+        Searches if the player buys the card.
+        """
+        return self._search.decide(game, card, player, BUY) > 0
+
+    def houses_to_build(self, game, card, player):
+        """
+        Searches how many houses the player builds.
+        """
+        return self._search.decide(game, card, player, HOUSES)
+
+    def wants_hotel(self, game, card, player):
+        """
+        Searches if the player builds the hotel.
+        """
+        return self._search.decide(game, card, player, HOTEL) > 0
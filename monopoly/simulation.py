@@ -0,0 +1,378 @@
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from monopoly.bot import BotInput, BotPolicy
+from monopoly.display import HeadlessDisplay
+from monopoly.game import Dice, Game
+from monopoly.metrics import GameMetrics
+from monopoly.plane import Plane, DEFAULT_RULES, new_board
+from monopoly.stats import GameAggregator
+
+"""
+Number of rounds after which a simulated game is stopped.
+Games of bots that keep a cash reserve can go on forever.
+"""
+DEFAULT_MAX_ROUNDS = 1000
+
+"""
+Number of games simulated by a worker process at a time.
+"""
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class SimulationConfig:
+    """
+    The SimulationConfig class.
+
+    Settings shared by every game of a simulation.
+    """
+    def __init__(self, players_count=4, max_rounds=DEFAULT_MAX_ROUNDS,
+                 policies=None, rules=None):
+        """
+        Initializes the settings.
+        :param players_count: The number of players in a game, 4 by default.
+        :param max_rounds: The round limit of a game.
+        :param policies: List of BotPolicy objects, one per seat,
+        a default BotPolicy for every seat by default.
+        :param rules: Rules of the games, DEFAULT_RULES by default.
+        """
+        if policies is None:
+            policies = [BotPolicy()] * players_count
+        self._players_count = players_count
+        self._max_rounds = max_rounds
+        self._policies = policies
+        self._rules = rules if rules is not None else DEFAULT_RULES
+
+    def players_count(self):
+        """
+        Get the number of players in a game.
+        :return: The number of players.
+        """
+        return self._players_count
+
+    def max_rounds(self):
+        """
+        Get the round limit of a game.
+        :return: The round limit.
+        """
+        return self._max_rounds
+
+    def policies(self):
+        """
+        Get the policies of the seats.
+        :return: List of BotPolicy objects.
+        """
+        return self._policies
+
+    def rules(self):
+        """
+        Get the rules of the games.
+        :return: The Rules.
+        """
+        return self._rules
+
+    def key(self):
+        """
+        Get a text describing all the settings.
+        Equal settings always have the same key.
+        :return: The description of the settings.
+        """
+        policies = ",".join(policy.key() for policy in self._policies)
+        key = f"players={self._players_count};max_rounds={self._max_rounds};policies={policies}"  # noqa
+        if self._rules.key() != DEFAULT_RULES.key():
+            key += f";rules={self._rules.key()}"
+        return key
+
+
+def new_game(seed, config, streams=None):
+    """
+    Creates a game of bots that doesn't print anything.
+    Each game has its own board and its own random number generator,
+    so the same seed always plays the same game.
+    :param seed: The seed of the game's random number generator.
+    :param config: SimulationConfig of the game.
+    :param streams: Optional object with the random streams of the game,
+    with a chance_stream() method and a dice_stream(seat) method
+    (see monopoly.paired.RandomStreams). The seed is ignored if given.
+    :return: The Game, with the players initialized.
+    """
+    bot = BotInput(config.players_count(), config.policies())
+    rules = config.rules()
+    if streams is None:
+        rng = random.Random(seed)
+        dice = None
+    else:
+        rng = streams.chance_stream()
+        dice = [
+            Dice(streams.dice_stream(seat))
+            for seat in range(config.players_count())
+        ]
+    game = Game(
+        HeadlessDisplay(), bot, Plane(new_board(rules)), rng,
+        config.max_rounds(), rules, dice
+    )
+    game.init_game()
+    bot.attach(game)
+    return game
+
+
+def play_game(seed, config, listeners=(), streams=None):
+    """
+    Plays a whole simulated game.
+    :param seed: The seed of the game.
+    :param config: SimulationConfig of the game.
+    :param listeners: Objects to add as listeners of the game.
+    :param streams: Optional random streams of the game, see new_game.
+    :return: The finished Game.
+    """
+    game = new_game(seed, config, streams)
+    for listener in listeners:
+        game.add_listener(listener)
+    game.play_game()
+    return game
+
+
+def simulate(seeds, config, listeners=()):
+    """
+    Plays a game for every seed and aggregates the results.
+    :param seeds: Iterable of game seeds.
+    :param config: SimulationConfig of the games.
+    :param listeners: Other objects to add as listeners of every game.
+    :return: GameAggregator with the results of the games.
+    """
+    aggregator = GameAggregator(config.players_count(), config.max_rounds())
+    for seed in seeds:
+        play_game(seed, config, [aggregator, *listeners])
+    return aggregator
+
+
+def _simulate_range(first_seed, games, config):
+    return simulate(range(first_seed, first_seed + games), config)
+
+
+def _simulate_range_measured(first_seed, games, config):
+    """
+    Plays a chunk of games like _simulate_range, with the metrics
+    of this worker process.
+    :return: (GameAggregator, snapshot of the metrics) tuple.
+    """
+    start = time.perf_counter()
+    metrics = GameMetrics()
+    aggregator = simulate(range(first_seed, first_seed + games), config,
+                          [metrics])
+    metrics.add_busy_time(time.perf_counter() - start)
+    return aggregator, metrics.registry().snapshot()
+
+
+def seed_chunks(first_seed, games, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Splits a range of seeds into chunks.
+    :param first_seed: The seed of the first game.
+    :param games: The number of games.
+    :param chunk_size: The maximal number of games in a chunk.
+    :return: List of (first seed, number of games) pairs.
+    """
+    chunks = []
+    for start in range(first_seed, first_seed + games, chunk_size):
+        chunks.append((start, min(chunk_size, first_seed + games - start)))
+    return chunks
+
+
+def run_batch(games, config, first_seed=0, workers=None,
+              chunk_size=DEFAULT_CHUNK_SIZE, metrics=None):
+    """
+    Plays games with consecutive seeds on a pool of worker processes.
+    Every worker aggregates its chunk of seeds,
+    the partial results are merged in the calling process.
+    The result doesn't depend on the number of workers.
+    :param games: The number of games.
+    :param config: SimulationConfig of the games.
+    :param first_seed: The seed of the first game, 0 by default.
+    :param workers: The number of processes, one per CPU by default.
+    :param chunk_size: The number of games a worker plays at a time.
+    :param metrics: GameMetrics to add the metrics of the workers to,
+    as their chunks are merged, None to not measure the games.
+    :return: GameAggregator with the results of all the games.
+    """
+    chunks = seed_chunks(first_seed, games, chunk_size)
+    aggregator = GameAggregator(config.players_count(), config.max_rounds())
+    task = _simulate_range if metrics is None else _simulate_range_measured
+    with ProcessPoolExecutor(workers) as pool:
+        if metrics is not None:
+            metrics.set_workers(
+                workers if workers is not None else os.cpu_count()
+            )
+        futures = [pool.submit(task, start, count, config)
+                   for start, count in chunks]
+        if metrics is not None:
+            for future in futures:
+                future.add_done_callback(
+                    lambda _: metrics.queue_result(1)
+                )
+        try:
+            for future in futures:
+                partial = future.result()
+                if metrics is not None:
+                    partial, snapshot = partial
+                    metrics.registry().merge(snapshot)
+                    metrics.queue_result(-1)
+                aggregator.merge(partial)
+        finally:
+            if metrics is not None:
+                metrics.set_workers(0)
+    return aggregator
+
+
+def free_threaded():
+    """
+    Check if the interpreter runs threads in parallel,
+    a free-threaded build of Python with the GIL disabled.
+    :return: True if threads run in parallel.
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def run_threaded(games, config, first_seed=0, workers=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, metrics=None):
+    """
+    Plays games with consecutive seeds like run_batch, on a pool
+    of threads of this process: nothing is pickled and the workers
+    don't copy the memory of the process.
+    Every game has its own board and random generator, every chunk
+    plays with its own clones of the policies (see BotPolicy.clone),
+    like the copy of the config a process of run_batch gets,
+    and aggregates into its own GameAggregator, so the threads share
+    no mutable state until the chunks are merged, in the order
+    of their seeds. The result is the same as the one of run_batch.
+    The threads play in parallel only on a free-threaded build
+    of Python, see free_threaded.
+    :param games: The number of games.
+    :param config: SimulationConfig of the games.
+    :param first_seed: The seed of the first game, 0 by default.
+    :param workers: The number of threads, one per CPU by default.
+    :param chunk_size: The number of games a worker plays at a time.
+    :param metrics: GameMetrics measuring the games of all the threads,
+    None to not measure the games.
+    :return: GameAggregator with the results of all the games.
+    """
+    chunks = seed_chunks(first_seed, games, chunk_size)
+    aggregator = GameAggregator(config.players_count(), config.max_rounds())
+    workers = workers if workers is not None else os.cpu_count()
+    listeners = [metrics] if metrics is not None else []
+
+    def chunk_config():
+        clones = {}
+        for policy in config.policies():
+            if id(policy) not in clones:
+                clones[id(policy)] = policy.clone()
+        return SimulationConfig(
+            config.players_count(), config.max_rounds(),
+            [clones[id(policy)] for policy in config.policies()],
+            config.rules()
+        )
+
+    def play_chunk(start, count, chunk_config):
+        begin = time.perf_counter()
+        partial = simulate(range(start, start + count), chunk_config,
+                           listeners)
+        if metrics is not None:
+            metrics.add_busy_time(time.perf_counter() - begin)
+        return partial
+
+    with ThreadPoolExecutor(workers) as pool:
+        if metrics is not None:
+            metrics.set_workers(workers)
+        try:
+            futures = [pool.submit(play_chunk, start, count, chunk_config())
+                       for start, count in chunks]
+            for future in futures:
+                aggregator.merge(future.result())
+        finally:
+            if metrics is not None:
+                metrics.set_workers(0)
+    return aggregator
+
+
+def main(argv=None, prog=None):
+    """
+    Simulates games of bots from the command line
+    and prints the win rates and the game length.
+    :param argv: The arguments, the ones of the program by default.
+    :param prog: The name of the program in the help, the name
+    of the script by default.
+    :return: GameAggregator of the games, the ResultsStore
+    they were recorded in with --store.
+    """
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Simulate games of bots.")
+    parser.add_argument("games", type=int, help="the number of games")
+    parser.add_argument("--players", type=int, default=4,
+                        help="the number of players in a game")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_MAX_ROUNDS,
+                        help="the round limit of a game")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="the seed of the first game")
+    parser.add_argument("--workers", type=int,
+                        help="the number of processes, one per CPU by default")
+    parser.add_argument(
+        "--threads", action="store_true",
+        help="play on a pool of threads instead of processes,"
+        " they run in parallel on a free-threaded build of Python"
+    )
+    parser.add_argument(
+        "--profile", metavar="FILE",
+        help="write the sampled stacks of the profiled games"
+        " in the collapsed format of flame graphs"
+    )
+    parser.add_argument("--profile-games", type=int, default=1,
+                        help="the number of games to profile")
+    parser.add_argument(
+        "--store", metavar="DIR",
+        help="record the games into the results store in the directory"
+        " instead of printing their stats"
+    )
+    parser.add_argument(
+        "--job", metavar="DIR",
+        help="play the games as a job saved in the directory,"
+        " running the same command again continues an interrupted job"
+    )
+    args = parser.parse_args(argv)
+    config = SimulationConfig(args.players, args.rounds)
+    if args.store:
+        from monopoly.store import record_batch
+        store = record_batch(args.store, args.games, config, args.seed,
+                             args.workers)
+        print(f"Recorded {args.games} games in {store.path()}")
+        return store
+    if args.profile:
+        from monopoly.profiling import profile_batch
+        aggregator, sampler = profile_batch(
+            args.games, config, args.profile_games, args.seed, args.workers
+        )
+        sampler.write(args.profile)
+    elif args.job:
+        from monopoly.jobs import run_job
+        try:
+            aggregator = run_job(args.job, args.games, config, args.seed,
+                                 args.workers)
+        except ValueError as error:
+            parser.error(str(error))
+    elif args.threads:
+        aggregator = run_threaded(args.games, config, args.seed,
+                                  args.workers)
+    else:
+        aggregator = run_batch(args.games, config, args.seed, args.workers)
+    print(f"Games: {aggregator.games()}")
+    for seat, rate in enumerate(aggregator.win_rates()):
+        print(f"Player {seat + 1} win rate: {rate:.3f}")
+    print(f"Mean rounds: {aggregator.rounds().mean():.1f}")
+    return aggregator
+
+
+if __name__ == "__main__":
+    main()
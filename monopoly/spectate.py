@@ -0,0 +1,387 @@
+import asyncio
+import json
+from collections import deque
+
+"""
+Default number of messages waiting for a subscriber.
+A subscriber that falls further behind gets the changes of the state
+coalesced into one message instead of every event.
+"""
+DEFAULT_QUEUE_SIZE = 64
+
+
+def encode_message(message):
+    """
+    Serializes a message for the spectators, a line of JSON.
+    :param message: Dictionary of the message.
+    :return: The line, bytes.
+    """
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def _player_state(player):
+    return {"position": player.position(), "cash": player.cash()}
+
+
+def _card_state(card):
+    owner = card.owner()
+    return {
+        "owner": owner.name() if owner is not None else None,
+        "houses": card.houses(),
+        "hotel": bool(card.hotel()),
+    }
+
+
+class Subscription:
+    """
+    The Subscription class.
+
+    The stream of a game's events for one spectator,
+    created by SpectatorHub.subscribe.
+    At most queue_size messages wait for the spectator.
+    When the queue is full the following events aren't queued:
+    the state they changed (positions and cash of the players,
+    owners and buildings of the cards, the round) is merged
+    into one pending change, delivered as a single "state" message
+    when the queue is empty again. So a slow spectator takes
+    a bounded amount of memory and catches up with the game
+    instead of falling further behind.
+    """
+    def __init__(self, hub, queue_size):
+        """
+        :param hub: The SpectatorHub.
+        :param queue_size: The most messages waiting in the queue.
+        Attributes:
+            queue: the serialized messages waiting.
+            pending: the coalesced changes of the state, a dictionary
+            of (section, name) to the newest value.
+            coalesced: the number of events merged into changes.
+            closed: True after the game ended or the subscription
+            was closed.
+            ready: event set when there's something to get.
+        """
+        self._hub = hub
+        self._queue_size = queue_size
+        self._queue = deque()
+        self._pending = {}
+        self._coalesced = 0
+        self._closed = False
+        self._ready = asyncio.Event()
+
+    def coalesced(self):
+        """
+        Get the number of events the spectator got
+        as coalesced changes instead of messages.
+        :return: The number of events.
+        """
+        return self._coalesced
+
+    def _deliver(self, data, delta):
+        """
+        Queues a message, or merges its changes if the queue is full
+        or changes are already pending, so they stay in order.
+        """
+        if self._closed:
+            return
+        if self._pending or len(self._queue) >= self._queue_size:
+            self._pending.update(delta)
+            self._coalesced += 1
+        else:
+            self._queue.append(data)
+        self._ready.set()
+
+    def _end(self):
+        self._closed = True
+        self._ready.set()
+
+    def _state_message(self):
+        """
+        Serializes the pending changes as a "state" message.
+        """
+        message = {"type": "state", "players": {}, "cards": {}}
+        for (section, name), value in self._pending.items():
+            if name is None:
+                message[section] = value
+            else:
+                message[section][name] = value
+        self._pending = {}
+        return encode_message(message)
+
+    async def get(self):
+        """
+        Waits for the next message.
+        :return: The serialized message, None when the stream ended.
+        """
+        while True:
+            if self._queue:
+                return self._queue.popleft()
+            if self._pending:
+                return self._state_message()
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+    def close(self):
+        """
+        Stops the subscription.
+        """
+        self._hub.unsubscribe(self)
+        self._end()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        data = await self.get()
+        if data is None:
+            raise StopAsyncIteration
+        return data
+
+
+class SpectatorHub:
+    """
+    The SpectatorHub class.
+
+    Streams a game's events to any number of spectators.
+    It's a listener of the game (see Game.add_listener):
+    every move, purchase, rent, building, bankruptcy, turn taken
+    back or played again, round summary and the end of the game
+    is serialized once,
+    in the thread playing the game, and the same bytes
+    are handed to every Subscription on the asyncio event loop.
+    The game can be played in another thread, see play_watched.
+    """
+    def __init__(self, loop=None, queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        :param loop: The event loop of the spectators,
+        the running loop by default.
+        :param queue_size: The queue size of every Subscription.
+        Attributes:
+            subscriptions: the current subscriptions.
+            published: the number of published events.
+            closed: True after the streams ended.
+        """
+        self._loop = loop if loop is not None else asyncio.get_running_loop()
+        self._queue_size = queue_size
+        self._subscriptions = []
+        self._published = 0
+        self._closed = False
+
+    def subscribe(self):
+        """
+        Adds a spectator, called on the event loop.
+        The spectator gets the events published after this call,
+        a subscription after the end of the game gets none.
+        :return: Subscription.
+        """
+        subscription = Subscription(self, self._queue_size)
+        if self._closed:
+            subscription._end()
+        else:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Removes a spectator, called on the event loop.
+        :param subscription: The Subscription.
+        """
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def subscriptions(self):
+        """
+        Get the number of spectators.
+        :return: The number of subscriptions.
+        """
+        return len(self._subscriptions)
+
+    def published(self):
+        """
+        Get the number of published events, each serialized once.
+        :return: The number of events.
+        """
+        return self._published
+
+    def publish(self, message, delta):
+        """
+        Serializes an event and hands it to every spectator.
+        Can be called from any thread.
+        :param message: Dictionary of the event.
+        :param delta: Dictionary of the state the event changed,
+        (section, name) to the new value, name is None
+        for the state that isn't about a player or a card.
+        """
+        data = encode_message(message)
+        self._published += 1
+        self._loop.call_soon_threadsafe(self._fan_out, data, delta)
+
+    def _fan_out(self, data, delta):
+        for subscription in self._subscriptions:
+            subscription._deliver(data, delta)
+
+    def close(self):
+        """
+        Ends the stream of every spectator.
+        Can be called from any thread.
+        """
+        self._loop.call_soon_threadsafe(self._close)
+
+    def _close(self):
+        self._closed = True
+        for subscription in self._subscriptions:
+            subscription._end()
+        self._subscriptions = []
+
+    def on_move(self, game, player, old_position):
+        """
+        Publishes a move.
+        """
+        self.publish(
+            {"type": "move", "round": game.current_round(),
+             "player": player.name(), "from": old_position,
+             "to": player.position(), "cash": player.cash()},
+            {("players", player.name()): _player_state(player)},
+        )
+
+    def on_buy(self, game, card, player):
+        """
+        Publishes a purchase.
+        """
+        self.publish(
+            {"type": "buy", "player": player.name(), "card": card.name(),
+             "price": card.price(), "cash": player.cash()},
+            {("players", player.name()): _player_state(player),
+             ("cards", card.name()): _card_state(card)},
+        )
+
+    def on_rent(self, game, card, player, amount):
+        """
+        Publishes a payment of rent.
+        """
+        owner = card.owner()
+        self.publish(
+            {"type": "rent", "player": player.name(), "owner": owner.name(),
+             "card": card.name(), "amount": amount},
+            {("players", player.name()): _player_state(player),
+             ("players", owner.name()): _player_state(owner)},
+        )
+
+    def on_build(self, game, card, player):
+        """
+        Publishes houses or a hotel built.
+        """
+        self.publish(
+            {"type": "build", "player": player.name(), "card": card.name(),
+             "houses": card.houses(), "hotel": bool(card.hotel()),
+             "cash": player.cash()},
+            {("players", player.name()): _player_state(player),
+             ("cards", card.name()): _card_state(card)},
+        )
+
+    def on_bankrupt(self, game, player):
+        """
+        Publishes a bankruptcy.
+        """
+        self.publish(
+            {"type": "bankrupt", "player": player.name()},
+            {("players", player.name()): _player_state(player)},
+        )
+
+    def on_undo(self, game, player):
+        """
+        Publishes a turn taken back.
+        """
+        self._publish_rewind("undo", game, player)
+
+    def on_redo(self, game, player):
+        """
+        Publishes a turn played again.
+        """
+        self._publish_rewind("redo", game, player)
+
+    def _publish_rewind(self, kind, game, player):
+        """
+        Publishes a turn taken back or played again with the state
+        of every player and card, any of them may have changed.
+        """
+        delta = {("round", None): game.current_round()}
+        for other in game.players():
+            delta[("players", other.name())] = _player_state(other)
+        for card in game.plane().fields():
+            delta[("cards", card.name())] = _card_state(card)
+        self.publish(
+            {"type": kind, "round": game.current_round(),
+             "player": player.name()},
+            delta,
+        )
+
+    def on_round_end(self, game, round_stats):
+        """
+        Publishes the round summary the display refreshes with.
+        """
+        players = []
+        delta = {("round", None): round_stats.round()}
+        for stat in round_stats.player_stats():
+            players.append({
+                "name": stat.name(), "position": stat.position(),
+                "cash": stat.cash(), "win_chance": stat.win_chance(),
+            })
+            delta[("players", stat.name())] = {
+                "position": stat.position(), "cash": stat.cash()
+            }
+        self.publish(
+            {"type": "round", "round": round_stats.round(),
+             "players": players},
+            delta,
+        )
+
+    def on_game_end(self, game):
+        """
+        Publishes the winners and ends the streams.
+        """
+        winners = [player.name() for player in game.find_winners()]
+        self.publish({"type": "end", "winners": winners},
+                     {("winners", None): winners})
+        self.close()
+
+
+async def play_watched(game, hub):
+    """
+    Plays a game in a worker thread while its events
+    are streamed to the spectators of the hub.
+    :param game: The initialized Game, its input can't be the keyboard
+    of the event loop's thread.
+    :param hub: The SpectatorHub.
+    :return: The finished Game.
+    """
+    game.add_listener(hub)
+    await asyncio.to_thread(game.play_game)
+    return game
+
+
+async def serve_spectators(hub, host="127.0.0.1", port=0):
+    """
+    Streams the events of the hub to every TCP client
+    connecting to the address, as lines of JSON.
+    A client that reads slowly makes its writes wait,
+    so its Subscription coalesces the events it can't keep up with.
+    :param hub: The SpectatorHub.
+    :param host: The address to listen on.
+    :param port: The port to listen on, 0 for any free port.
+    :return: The started asyncio.Server.
+    """
+    async def stream(reader, writer):
+        subscription = hub.subscribe()
+        try:
+            async for data in subscription:
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            subscription.close()
+            writer.close()
+
+    return await asyncio.start_server(stream, host, port)
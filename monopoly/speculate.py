@@ -0,0 +1,410 @@
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from monopoly.game import DICE_MIN, DICE_MAX, FixedDice
+from monopoly.input import Input
+from monopoly.plane import PLANE_LENGTH
+from monopoly.state import game_state, BUY, HOUSES, HOTEL
+
+
+def decision_key(game, card, player, kind):
+    """
+    Get a key of a decision that is equal only for the same position,
+    with the exact cash of the players.
+    :param game: The Game.
+    :param card: The card the decision is about.
+    :param player: The deciding player.
+    :param kind: The decision, BUY, HOUSES or HOTEL.
+    :return: Hashable tuple.
+    """
+    seat = game.players().index(player)
+    state = game_state(game, seat)
+    return (
+        kind, game.plane().fields().index(card), seat,
+        tuple(state.positions), tuple(state.cash), tuple(state.owners),
+        tuple(state.levels),
+    )
+
+
+def pending_decision(card, player):
+    """
+    Get the decision a player is asked about after landing on a card,
+    the first one Game.check_card asks.
+    :param card: The card the player landed on.
+    :param player: The player.
+    :return: BUY, HOUSES or HOTEL, None if there's nothing to decide.
+    """
+    if card.owner() is None:
+        return BUY if card.type() == "FIELD" else None
+    if card.owner() is not player:
+        return None
+    if player.can_build_hotel(card):
+        return HOTEL
+    if player.can_build_houses(card):
+        return HOUSES
+    return None
+
+
+def policy_answer(policy, game, card, player, kind):
+    """
+    Asks a policy about a decision.
+    :return: The answer of wants_card, houses_to_build or wants_hotel.
+    """
+    if kind == BUY:
+        return policy.wants_card(game, card, player)
+    if kind == HOUSES:
+        return policy.houses_to_build(game, card, player)
+    return policy.wants_hotel(game, card, player)
+
+
+def apply_answer(game, field, seat, kind, amount):
+    """
+    Carries out a "yes" answer in a game, like Game.landed_buyable_field
+    and Game.landed_own_card.
+    :param game: The Game, usually a copy.
+    :param field: The field index of the card.
+    :param seat: The seat of the player.
+    :param kind: The decision, BUY, HOUSES or HOTEL.
+    :param amount: The number of houses.
+    :return: True, False if the player can't afford it.
+    """
+    card = game.plane().fields()[field]
+    player = game.players()[seat]
+    price = card.price() if kind == BUY else card.house_price() * amount
+    if not player.has_enough_money_to_pay(price):
+        return False
+    if kind == BUY:
+        player.buy_card(card)
+    elif kind == HOTEL:
+        player.build_hotel(card)
+    else:
+        player.build_houses(card, amount)
+    return True
+
+
+def play_throw(game, seat, throw, chance=None):
+    """
+    Moves a player by a throw and settles the landing,
+    like Game.move_player, if it needs no decision.
+    :param game: The Game, usually a copy.
+    :param seat: The seat of the player.
+    :param throw: The number thrown.
+    :param chance: The chance drawn if the player lands on a chance field.
+    :return: True, False if the landing needs a decision,
+    or a chance that isn't given.
+    """
+    player = game.players()[seat]
+    if not player.is_in_game():
+        return True
+    position = player.make_move(FixedDice(throw))
+    card = game.plane().get_field_from_position(position)
+    if pending_decision(card, player) is not None:
+        return False
+    if card.owner() is not None and card.owner() is not player:
+        player.pay_another_player(card.owner(), card.fee())
+    elif card.owner() is not None:
+        return True
+    elif card.type() == "TAX":
+        player.pay_bank(card.fee())
+    elif card.type() == "CHANCE":
+        if chance is None:
+            return False
+        player.pay_bank(chance)
+    elif card.type() == "START":
+        player.earn(game.rules().start_payout())
+    return True
+
+
+class SpeculativeInput(Input):
+    """
+    The SpeculativeInput class.
+
+    Input of a table where humans and bots play together.
+    The humans are asked at the keyboard, the bots answer
+    with their policies.
+    While a human is thinking at a prompt, a background thread
+    works out the decisions of the next bot in advance:
+    for every answer the human can give at the prompt, or every throw
+    of the human's dice at the menu, and every throw of the bot's dice,
+    it plays the bot's move on a copy of the game and asks the policy.
+    When the bot gets to decide, the answer for the real position
+    is taken from these results.
+    The positions have to match exactly, so the decisions
+    are the same ones the bot would make without speculation.
+
+    Every answer of the human is worked out by its own job, so the jobs
+    run on all the workers. A job asks a clone of the bot's policy
+    (see BotPolicy.clone) per position, taken when the speculation
+    started, so the policy itself is asked only by the real decisions
+    and never waits for the background threads. When the real decision
+    is found in the results, the clone that answered it replaces
+    the policy of the bot, so a policy with a state (the random
+    generator and the cache of a SearchPolicy) goes on from the state
+    it would have without speculation.
+    """
+    def __init__(self, policies, human=None, workers=1):
+        """
+        :param policies: List with the BotPolicy of every seat,
+        None for the seats of humans.
+        :param human: Input asking the humans, a new Input by default.
+        :param workers: The number of background threads.
+        Attributes:
+            game: the game, set by attach().
+            turn: the seat whose turn it is.
+            results: (answer, clone of the policy that answered)
+            pairs worked out in advance, by decision_key.
+            generation: number of the current speculation, the
+            background jobs of older ones stop.
+            lock: lock of the results, the generation and the counts.
+            hits, misses: bot decisions found in the results or not.
+            houses: the number of houses decided by the last bot
+            ask_player_to_buy_houses, returned by ask_number_houses.
+        """
+        self._policies = policies
+        self._human = human if human is not None else Input()
+        self._pool = ThreadPoolExecutor(workers)
+        self._game = None
+        self._turn = 0
+        self._results = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._houses = 0
+
+    def attach(self, game):
+        """
+        Starts following the turns of the game.
+        Has to be called after the players are initialized.
+        :param game: The Game.
+        """
+        self._game = game
+        game.add_listener(self)
+
+    def close(self):
+        """
+        Stops the speculation and the background threads.
+        """
+        with self._lock:
+            self._generation += 1
+        self._pool.shutdown(wait=True)
+
+    def hit_rate(self):
+        """
+        Get the fraction of bot decisions answered in advance.
+        :return: The hit rate, 0.0 before the first decision.
+        """
+        decisions = self._hits + self._misses
+        return self._hits / decisions if decisions else 0.0
+
+    def policy(self, player):
+        """
+        Get the policy of a player.
+        :param player: The player.
+        :return: The BotPolicy, None for a human.
+        """
+        return self._policies[self._game.players().index(player)]
+
+    def on_turn_end(self, game, player):
+        """
+        Passes the turn to the next seat.
+        """
+        self._turn = (game.players().index(player) + 1) % len(self._policies)
+
+    def on_undo(self, game, player):
+        """
+        Gives the turn back to the player, whose turn was taken back,
+        and drops the answers worked out for the old position.
+        """
+        self._turn = game.players().index(player)
+        with self._lock:
+            self._generation += 1
+            self._results = {}
+
+    def on_redo(self, game, player):
+        """
+        Passes the turn to the seat after the player,
+        whose turn was played again.
+        """
+        self.on_turn_end(game, player)
+        with self._lock:
+            self._generation += 1
+            self._results = {}
+
+    def ask_player_to_buy_card(self, card, player):
+        """
+        Asks the human or the bot if they buy the card.
+        """
+        if self.policy(player) is not None:
+            return "y" if self._decide(BUY, card, player) else "n"
+        self._speculate([None, self._answer(card, player, BUY)])
+        return self._human.ask_player_to_buy_card(card, player)
+
+    def ask_to_take_back(self, card, player):
+        """
+        Asks the human if they take back their answer,
+        bots don't.
+        """
+        if self.policy(player) is not None:
+            return "n"
+        return self._human.ask_to_take_back(card, player)
+
+    def ask_player_to_buy_houses(self, card, player):
+        """
+        Asks the human or the bot if they build houses.
+        The number of houses of a bot is kept for ask_number_houses.
+        """
+        if self.policy(player) is not None:
+            self._houses = self._decide(HOUSES, card, player)
+            return "y" if self._houses > 0 else "n"
+        self._speculate([None])
+        return self._human.ask_player_to_buy_houses(card, player)
+
+    def ask_number_houses(self, card, player):
+        """
+        Asks the human how many houses they build,
+        or returns the number decided by the bot.
+        """
+        if self.policy(player) is not None:
+            return self._houses
+        self._speculate([
+            self._answer(card, player, HOUSES, houses)
+            for houses in range(1, card.possible_num_houses() + 1)
+        ])
+        return self._human.ask_number_houses(card, player)
+
+    def ask_player_to_buy_hotel(self, card, player):
+        """
+        Asks the human or the bot if they build a hotel.
+        """
+        if self.policy(player) is not None:
+            return "y" if self._decide(HOTEL, card, player) else "n"
+        self._speculate([None, self._answer(card, player, HOTEL)])
+        return self._human.ask_player_to_buy_hotel(card, player)
+
+    def ask_for_number_of_players(self):
+        """
+        Get the number of seats.
+        :return: The number of players, as an int.
+        """
+        return len(self._policies)
+
+    def choose_menu_option(self, menu_description, options):
+        """
+        Asks the human at the menu, bots always roll the dice and move.
+        """
+        if self._game is None:
+            return self._human.choose_menu_option(menu_description, options)
+        if self._policies[self._turn] is not None:
+            return 0
+        self._speculate(self._throws(self._turn))
+        return self._human.choose_menu_option(menu_description, options)
+
+    def _decide(self, kind, card, player):
+        """
+        Get the answer of a bot, worked out in advance if possible.
+        Stops the speculation, its other results won't be needed.
+        """
+        key = decision_key(self._game, card, player, kind)
+        with self._lock:
+            self._generation += 1
+            results = self._results
+            self._results = {}
+        if key in results:
+            self._hits += 1
+            answer, policy = results[key]
+            self._policies[self._game.players().index(player)] = policy
+            return answer
+        self._misses += 1
+        return policy_answer(
+            self.policy(player), self._game, card, player, kind
+        )
+
+    def _answer(self, card, player, kind, amount=1):
+        """
+        Get a "yes" answer of a human that the background thread
+        can carry out on a copy of the game, see apply_answer.
+        """
+        return functools.partial(
+            apply_answer, field=self._game.plane().fields().index(card),
+            seat=self._game.players().index(player), kind=kind,
+            amount=amount
+        )
+
+    def _throws(self, seat):
+        """
+        Get the throws of a human as answers, see play_throw.
+        A throw landing on a chance field gives one answer
+        for every chance value.
+        """
+        player = self._game.players()[seat]
+        chances = sorted(set(self._game.rules().chances()))
+        answers = []
+        for throw in range(DICE_MIN, DICE_MAX + 1):
+            position = (player.position() + throw) % PLANE_LENGTH
+            card = self._game.plane().get_field_from_position(position)
+            draws = [None]
+            if card.owner() is None and card.type() == "CHANCE":
+                draws = chances
+            answers.extend(
+                functools.partial(play_throw, seat=seat, throw=throw,
+                                  chance=chance)
+                for chance in draws
+            )
+        return answers
+
+    def _speculate(self, answers):
+        """
+        Starts working out the next bot's decisions after each answer
+        of the human in the background.
+        :param answers: List of the answers, functions carrying out
+        an answer on a copy of the game and returning False if it
+        can't be done (see apply_answer and play_throw),
+        None for an answer that changes nothing (a refusal).
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        game = self._game.copy()
+        players = game.players()
+        bot = None
+        for step in range(1, len(players)):
+            candidate = (self._turn + step) % len(players)
+            if players[candidate].is_in_game():
+                bot = candidate
+                break
+        if bot is None or self._policies[bot] is None:
+            return
+        policy = self._policies[bot].clone()
+        for answer in answers:
+            self._pool.submit(self._run, generation, game, bot, policy,
+                              answer)
+
+    def _run(self, generation, game, bot, policy, answer):
+        """
+        Plays every throw of the bot after an answer and asks
+        a clone of its policy, until a newer speculation starts.
+        """
+        answered = game.copy()
+        if answer is not None and not answer(answered):
+            return
+        for throw in range(DICE_MIN, DICE_MAX + 1):
+            if self._generation != generation:
+                return
+            player = answered.players()[bot]
+            position = (player.position() + throw) % PLANE_LENGTH
+            card = answered.plane().get_field_from_position(position)
+            if pending_decision(card, player) is None:
+                continue
+            copy = answered.copy()
+            player = copy.players()[bot]
+            position = player.make_move(FixedDice(throw))
+            card = copy.plane().get_field_from_position(position)
+            kind = pending_decision(card, player)
+            key = decision_key(copy, card, player, kind)
+            clone = policy.clone()
+            result = policy_answer(clone, copy, card, player, kind)
+            with self._lock:
+                if self._generation == generation:
+                    self._results[key] = (result, clone)
@@ -0,0 +1,425 @@
+import bisect
+import random
+import struct
+from collections import OrderedDict
+
+from monopoly.plane import PLANE_LENGTH
+
+"""
+Layout of a state key: 7 little-endian 64-bit words.
+
+words 0-2: owner of every field, 4 bits each (0 - nobody,
+seat + 1 - the player), 16 fields per word.
+words 3-4: building level of every field, 3 bits each
+(0-4 houses, 5 - hotel), 21 fields per word.
+word 5: position of every player, 6 bits each,
+and the seat to move next in bits 48-50.
+word 6: cash bucket of every player, 8 bits each.
+"""
+MAX_PLAYERS = 8
+OWNER_BITS = 4
+OWNERS_PER_WORD = 16
+LEVEL_BITS = 3
+LEVELS_PER_WORD = 21
+LEVEL_WORD = 3
+POSITION_BITS = 6
+POSITION_WORD = 5
+SEAT_SHIFT = 48
+CASH_BITS = 8
+CASH_WORD = 6
+KEY_WORDS = 7
+KEY_FORMAT = f"<{KEY_WORDS}Q"
+KEY_BYTES = 8 * KEY_WORDS
+
+"""
+Building level of a card with a hotel, levels 0-4 are houses.
+"""
+HOTEL_LEVEL = 5
+
+"""
+Kinds of decisions, the questions Input asks during a turn.
+BUY - ask_player_to_buy_card, HOUSES - ask_player_to_buy_houses
+with ask_number_houses, HOTEL - ask_player_to_buy_hotel.
+"""
+NO_DECISION = 0
+BUY = 1
+HOUSES = 2
+HOTEL = 3
+
+"""
+Colors whose fields can't have houses.
+"""
+UNBUILDABLE_COLORS = ("transport", "power")
+
+"""
+Cash is stored in geometric buckets: 0 for no cash, 1 below
+CASH_UNIT, then CASH_STEPS buckets for every doubling of the cash.
+CASH_THRESHOLDS are the lower bounds of buckets 2 to 255.
+"""
+CASH_UNIT = 100000
+CASH_STEPS = 8
+CASH_THRESHOLDS = [
+    int(CASH_UNIT * 2 ** (step / CASH_STEPS)) for step in range(254)
+]
+
+
+def cash_bucket(cash):
+    """
+    Get the bucket of an amount of cash.
+    :param cash: The cash of a player.
+    :return: Bucket between 0 and 255.
+    """
+    if cash <= 0:
+        return 0
+    return 1 + bisect.bisect_right(CASH_THRESHOLDS, cash)
+
+
+def bucket_cash(bucket):
+    """
+    Get the smallest amount of cash of a bucket.
+    :param bucket: Bucket between 0 and 255.
+    :return: The cash.
+    """
+    if bucket <= 1:
+        return bucket
+    return CASH_THRESHOLDS[bucket - 2]
+
+
+def card_level(card):
+    """
+    Get the building level of a card.
+    :param card: The Card.
+    :return: The number of houses, or HOTEL_LEVEL for a hotel.
+    """
+    if card.hotel():
+        return HOTEL_LEVEL
+    return card.houses() or 0
+
+
+def game_state(game, seat=0):
+    """
+    Reads the state of a Game into the form used by the encoder.
+    :param game: The Game.
+    :param seat: The seat to move next.
+    :return: GameState.
+    """
+    players = game.players()
+    seats = {player: idx for idx, player in enumerate(players)}
+    owners = []
+    levels = []
+    for card in game.plane().fields():
+        owners.append(seats[card.owner()] if card.owner() else -1)
+        levels.append(card_level(card))
+    return GameState(
+        [player.position() for player in players],
+        [player.cash() for player in players],
+        owners, levels, seat
+    )
+
+
+def loser_places(game):
+    """
+    Get the place of every player in the losers list of a Game.
+    :param game: The Game.
+    :return: List with the index of every player in Game.losers(),
+    -1 for the players that haven't lost.
+    """
+    losers = game.losers()
+    return [
+        losers.index(player) if player in losers else -1
+        for player in game.players()
+    ]
+
+
+class GameState:
+    """
+    The GameState class.
+
+    Plain lists describing a position of the game, indexed by seat
+    and by field index (position - 1 on the Plane).
+    """
+    def __init__(self, positions, cash, owners, levels, seat=0):
+        """
+        :param positions: Position of every player.
+        :param cash: Cash of every player.
+        :param owners: Seat of the owner of every field, -1 if nobody.
+        :param levels: Building level of every field.
+        :param seat: The seat to move next.
+        """
+        self.positions = list(positions)
+        self.cash = list(cash)
+        self.owners = list(owners)
+        self.levels = list(levels)
+        self.seat = seat
+
+    def players_count(self):
+        """
+        Get the number of players.
+        :return: The number of players.
+        """
+        return len(self.positions)
+
+
+def encode(state):
+    """
+    Packs a state into a fixed-size key.
+    Cash is stored as its bucket, so states whose players have
+    similar cash share the key.
+    :param state: GameState with at most MAX_PLAYERS players.
+    :return: KEY_BYTES long bytes.
+    """
+    words = [0] * KEY_WORDS
+    for field in range(PLANE_LENGTH):
+        word, slot = divmod(field, OWNERS_PER_WORD)
+        words[word] |= (state.owners[field] + 1) << (OWNER_BITS * slot)
+        word, slot = divmod(field, LEVELS_PER_WORD)
+        words[LEVEL_WORD + word] |= state.levels[field] << (LEVEL_BITS * slot)
+    positions = state.seat << SEAT_SHIFT
+    buckets = 0
+    for seat in range(state.players_count()):
+        positions |= state.positions[seat] << (POSITION_BITS * seat)
+        buckets |= cash_bucket(state.cash[seat]) << (CASH_BITS * seat)
+    words[POSITION_WORD] = positions
+    words[CASH_WORD] = buckets
+    return struct.pack(KEY_FORMAT, *words)
+
+
+def decode(key, players_count):
+    """
+    Unpacks a key made by encode.
+    The cash of the players is the smallest amount of their bucket.
+    :param key: The key.
+    :param players_count: The number of players of the state.
+    :return: GameState.
+    """
+    words = struct.unpack(KEY_FORMAT, key)
+    owner_mask = (1 << OWNER_BITS) - 1
+    level_mask = (1 << LEVEL_BITS) - 1
+    owners = []
+    levels = []
+    for field in range(PLANE_LENGTH):
+        word, slot = divmod(field, OWNERS_PER_WORD)
+        owners.append((words[word] >> (OWNER_BITS * slot) & owner_mask) - 1)
+        word, slot = divmod(field, LEVELS_PER_WORD)
+        levels.append(
+            words[LEVEL_WORD + word] >> (LEVEL_BITS * slot) & level_mask
+        )
+    position_mask = (1 << POSITION_BITS) - 1
+    cash_mask = (1 << CASH_BITS) - 1
+    positions = []
+    cash = []
+    for seat in range(players_count):
+        positions.append(
+            words[POSITION_WORD] >> (POSITION_BITS * seat) & position_mask
+        )
+        cash.append(bucket_cash(words[CASH_WORD] >> (CASH_BITS * seat) & cash_mask))  # noqa
+    seat = words[POSITION_WORD] >> SEAT_SHIFT & (MAX_PLAYERS - 1)
+    return GameState(positions, cash, owners, levels, seat)
+
+
+class ZobristHash:
+    """
+    The ZobristHash class.
+
+    64-bit hash of a game state, the XOR of a random number
+    for every part of the state (a player on a position,
+    an owner of a field, a level of a field, a cash bucket
+    of a player and the seat to move).
+    Added as a listener of a Game, it's updated incrementally
+    when a player moves, buys a card or builds, and the cash
+    buckets and the seat are updated at the end of every turn.
+    Between the turns the value equals hash(game_state(game, seat)).
+    """
+    def __init__(self, players_count, seed=0):
+        """
+        :param players_count: The number of players.
+        :param seed: Seed of the random numbers, hashes made with
+        the same seed can be compared.
+        """
+        rng = random.Random(seed)
+
+        def table(rows, columns):
+            return [
+                [rng.getrandbits(64) for _ in range(columns)]
+                for _ in range(rows)
+            ]
+        self._players_count = players_count
+        self._positions = table(players_count, PLANE_LENGTH)
+        self._owners = table(PLANE_LENGTH, players_count + 1)
+        self._levels = table(PLANE_LENGTH, HOTEL_LEVEL + 1)
+        self._buckets = table(players_count, 1 << CASH_BITS)
+        self._seats = table(1, players_count)[0]
+        self._value = 0
+        self._state = None
+        self._seat_of = {}
+        self._field_of = {}
+
+    def hash(self, state):
+        """
+        Computes the hash of a state from scratch.
+        :param state: GameState.
+        :return: The 64-bit hash.
+        """
+        value = self._seats[state.seat]
+        for seat in range(self._players_count):
+            value ^= self._positions[seat][state.positions[seat]]
+            value ^= self._buckets[seat][cash_bucket(state.cash[seat])]
+        for field in range(PLANE_LENGTH):
+            value ^= self._owners[field][state.owners[field] + 1]
+            value ^= self._levels[field][state.levels[field]]
+        return value
+
+    def attach(self, game, seat=0):
+        """
+        Computes the hash of the game and starts following it.
+        :param game: The Game, with the players initialized.
+        :param seat: The seat to move next.
+        """
+        self._seat_of = {
+            player: idx for idx, player in enumerate(game.players())
+        }
+        self._field_of = {
+            id(card): idx for idx, card in enumerate(game.plane().fields())
+        }
+        self.sync(game, seat)
+        game.add_listener(self)
+
+    def sync(self, game, seat):
+        """
+        Computes the hash of the game again from scratch,
+        when the game changed without the events that update it.
+        :param game: The followed Game.
+        :param seat: The seat to move next.
+        """
+        self._value = self.hash(game_state(game, seat))
+        self._state = game_state(game, seat)
+        self._state.cash = [cash_bucket(cash) for cash in self._state.cash]
+
+    def value(self):
+        """
+        Get the current hash.
+        :return: The 64-bit hash.
+        """
+        return self._value
+
+    def on_move(self, game, player, old_position):
+        """
+        Moves the player's number to the new position.
+        """
+        seat = self._seat_of[player]
+        old = self._state.positions[seat]
+        new = player.position()
+        self._value ^= self._positions[seat][old] ^ self._positions[seat][new]
+        self._state.positions[seat] = new
+
+    def on_buy(self, game, card, player):
+        """
+        Changes the owner of the field.
+        """
+        field = self._field_of[id(card)]
+        old = self._state.owners[field] + 1
+        new = self._seat_of[player] + 1
+        self._value ^= self._owners[field][old] ^ self._owners[field][new]
+        self._state.owners[field] = new - 1
+
+    def on_build(self, game, card, player):
+        """
+        Changes the building level of the field.
+        """
+        field = self._field_of[id(card)]
+        old = self._state.levels[field]
+        new = card_level(card)
+        self._value ^= self._levels[field][old] ^ self._levels[field][new]
+        self._state.levels[field] = new
+
+    def on_turn_end(self, game, player):
+        """
+        Updates the cash buckets that changed and passes the seat.
+        """
+        state = self._state
+        for seat, other in enumerate(game.players()):
+            bucket = cash_bucket(other.cash())
+            if bucket != state.cash[seat]:
+                buckets = self._buckets[seat]
+                self._value ^= buckets[state.cash[seat]] ^ buckets[bucket]
+                state.cash[seat] = bucket
+        seat = (self._seat_of[player] + 1) % self._players_count
+        self._value ^= self._seats[state.seat] ^ self._seats[seat]
+        state.seat = seat
+
+    def on_undo(self, game, player):
+        """
+        Computes the hash again with the player to move,
+        their turn was taken back.
+        """
+        self.sync(game, self._seat_of[player])
+
+    def on_redo(self, game, player):
+        """
+        Computes the hash again with the next seat to move,
+        the player's turn was played again.
+        """
+        self.sync(game, (self._seat_of[player] + 1) % self._players_count)
+
+
+class TranspositionCache:
+    """
+    The TranspositionCache class.
+
+    Results of searched states, shared by the searches that meet
+    the same key. The least recently used entries are dropped
+    when the cache is full, which bounds its memory.
+    """
+    def __init__(self, capacity):
+        """
+        :param capacity: The most entries kept.
+        Attributes:
+            entries: OrderedDict of key to the cached result,
+            from the least recently used.
+            hits, misses: number of lookups that found an entry or not.
+        """
+        self._capacity = capacity
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        """
+        Looks up a result.
+        :param key: The key.
+        :return: The result, None if the key isn't cached.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        """
+        Stores a result, dropping the least recently used entry
+        when the cache is full.
+        :param key: The key.
+        :param entry: The result, anything but None.
+        """
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+
+    def size(self):
+        """
+        Get the number of cached results.
+        :return: The number of entries.
+        """
+        return len(self._entries)
+
+    def hit_rate(self):
+        """
+        Get the fraction of lookups that found an entry.
+        :return: The hit rate, 0.0 before the first lookup.
+        """
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
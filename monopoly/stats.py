@@ -0,0 +1,463 @@
+import math
+
+from monopoly.plane import PLANE_LENGTH
+
+
+class RunningStats:
+    """
+    The RunningStats class.
+
+    Keeps the count, mean, variance, minimum and maximum
+    of a stream of numbers in constant memory (Welford's algorithm).
+    Two RunningStats can be merged, so partial results
+    computed by different processes add up to the same statistics.
+    """
+    def __init__(self):
+        """
+        Initializes empty statistics.
+        Attributes:
+            count: number of values added.
+            mean: mean of the values.
+            m2: sum of squared differences from the mean.
+            min: the smallest value, None when empty.
+            max: the largest value, None when empty.
+        """
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = None
+        self._max = None
+
+    def add(self, value):
+        """
+        Add a value to the statistics.
+        :param value: The number to add.
+        """
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+        if self._min is None or value < self._min:
+            self._min = value
+        if self._max is None or value > self._max:
+            self._max = value
+
+    def merge(self, other):
+        """
+        Add the values of another RunningStats to these statistics.
+        :param other: The RunningStats to merge.
+        """
+        if other._count == 0:
+            return
+        if self._count == 0:
+            self._count = other._count
+            self._mean = other._mean
+            self._m2 = other._m2
+            self._min = other._min
+            self._max = other._max
+            return
+        count = self._count + other._count
+        delta = other._mean - self._mean
+        self._mean += delta * other._count / count
+        self._m2 += other._m2 + delta * delta * self._count * other._count / count  # noqa
+        self._count = count
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+
+    def count(self):
+        """
+        Get the number of values added.
+        :return: The count.
+        """
+        return self._count
+
+    def mean(self):
+        """
+        Get the mean of the values.
+        :return: The mean, 0.0 when empty.
+        """
+        return self._mean
+
+    def variance(self):
+        """
+        Get the sample variance of the values.
+        :return: The variance, 0.0 when there are less than 2 values.
+        """
+        if self._count < 2:
+            return 0.0
+        return self._m2 / (self._count - 1)
+
+    def stdev(self):
+        """
+        Get the sample standard deviation of the values.
+        :return: The standard deviation.
+        """
+        return math.sqrt(self.variance())
+
+    def stderr(self):
+        """
+        Get the standard error of the mean.
+        :return: The standard error, 0.0 when there are no values.
+        """
+        if self._count == 0:
+            return 0.0
+        return self.stdev() / math.sqrt(self._count)
+
+    def min(self):
+        """
+        Get the smallest value.
+        :return: The minimum, None when empty.
+        """
+        return self._min
+
+    def max(self):
+        """
+        Get the largest value.
+        :return: The maximum, None when empty.
+        """
+        return self._max
+
+
+class Histogram:
+    """
+    The Histogram class.
+
+    Counts values in equal-width bins between low and high.
+    Values outside of the range are counted as underflow or overflow.
+    Histograms with the same bins can be merged.
+    """
+    def __init__(self, low, high, bins):
+        """
+        Initializes an empty histogram.
+        :param low: The lower edge of the first bin.
+        :param high: The upper edge of the last bin.
+        :param bins: The number of bins.
+        """
+        self._low = low
+        self._high = high
+        self._width = (high - low) / bins
+        self._counts = [0] * bins
+        self._underflow = 0
+        self._overflow = 0
+
+    def add(self, value):
+        """
+        Count a value in its bin.
+        :param value: The number to count.
+        """
+        if value < self._low:
+            self._underflow += 1
+        elif value >= self._high:
+            self._overflow += 1
+        else:
+            self._counts[int((value - self._low) / self._width)] += 1
+
+    def merge(self, other):
+        """
+        Add the counts of another histogram with the same bins.
+        :param other: The Histogram to merge.
+        :raise: ValueError if the bins of the histograms differ.
+        """
+        if (self._low, self._high, len(self._counts)) != (
+                other._low, other._high, len(other._counts)):
+            raise ValueError("Can't merge histograms with different bins.")
+        for idx, count in enumerate(other._counts):
+            self._counts[idx] += count
+        self._underflow += other._underflow
+        self._overflow += other._overflow
+
+    def counts(self):
+        """
+        Get the counts of the bins.
+        :return: List of counts, one per bin.
+        """
+        return self._counts
+
+    def edges(self):
+        """
+        Get the edges of the bins.
+        :return: List of len(counts) + 1 numbers.
+        """
+        return [
+            self._low + idx * self._width
+            for idx in range(len(self._counts) + 1)
+        ]
+
+    def underflow(self):
+        """
+        Get the number of values below the first bin.
+        :return: The underflow count.
+        """
+        return self._underflow
+
+    def overflow(self):
+        """
+        Get the number of values above the last bin.
+        :return: The overflow count.
+        """
+        return self._overflow
+
+
+class QuantileSketch:
+    """
+    The QuantileSketch class.
+
+    Estimates quantiles of a stream with a bounded relative error
+    (the DDSketch algorithm). Values are counted in buckets
+    whose width grows geometrically, so the memory depends on
+    the range of the values and not on how many were added.
+    Sketches with the same accuracy merge exactly.
+    """
+    def __init__(self, relative_accuracy=0.01):
+        """
+        Initializes an empty sketch.
+        :param relative_accuracy: The maximal relative error
+        of the returned quantiles, 1% by default.
+        Attributes:
+            positive: bucket counts of the positive values.
+            negative: bucket counts of the absolute negative values.
+            zeros: the number of zeros.
+        """
+        self._relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive = {}
+        self._negative = {}
+        self._zeros = 0
+        self._count = 0
+
+    def _bucket(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _bucket_value(self, bucket):
+        return 2 * self._gamma ** bucket / (self._gamma + 1)
+
+    def add(self, value):
+        """
+        Add a value to the sketch.
+        :param value: The number to add.
+        """
+        self._count += 1
+        if value > 0:
+            bucket = self._bucket(value)
+            self._positive[bucket] = self._positive.get(bucket, 0) + 1
+        elif value < 0:
+            bucket = self._bucket(-value)
+            self._negative[bucket] = self._negative.get(bucket, 0) + 1
+        else:
+            self._zeros += 1
+
+    def merge(self, other):
+        """
+        Add the values of another sketch with the same accuracy.
+        :param other: The QuantileSketch to merge.
+        :raise: ValueError if the accuracies differ.
+        """
+        if self._relative_accuracy != other._relative_accuracy:
+            raise ValueError("Can't merge sketches with different accuracy.")
+        for bucket, count in other._positive.items():
+            self._positive[bucket] = self._positive.get(bucket, 0) + count
+        for bucket, count in other._negative.items():
+            self._negative[bucket] = self._negative.get(bucket, 0) + count
+        self._zeros += other._zeros
+        self._count += other._count
+
+    def count(self):
+        """
+        Get the number of values added.
+        :return: The count.
+        """
+        return self._count
+
+    def quantile(self, q):
+        """
+        Estimate a quantile of the added values.
+        :param q: The quantile, between 0 and 1.
+        :return: The estimated value, None when the sketch is empty.
+        """
+        if self._count == 0:
+            return None
+        rank = q * (self._count - 1)
+        seen = 0
+        for bucket in sorted(self._negative, reverse=True):
+            seen += self._negative[bucket]
+            if seen > rank:
+                return -self._bucket_value(bucket)
+        seen += self._zeros
+        if seen > rank:
+            return 0
+        for bucket in sorted(self._positive):
+            seen += self._positive[bucket]
+            if seen > rank:
+                return self._bucket_value(bucket)
+        return self._bucket_value(max(self._positive))
+
+
+class GameAggregator:
+    """
+    The GameAggregator class.
+
+    Collects the results of many games without keeping the games.
+    It is added as a listener to every game of a batch,
+    and updates the distributions when a game ends:
+    wins per seat, rounds to finish, order of bankruptcies,
+    final cash and rent income per field.
+    Aggregators of different processes can be merged.
+    """
+    def __init__(self, players_count, max_rounds=1000):
+        """
+        Initializes an empty aggregator.
+        :param players_count: The number of players in every game.
+        :param max_rounds: The upper edge of the rounds histogram.
+        Attributes:
+            games: number of finished games.
+            unfinished: games stopped by the round limit
+            with more than one player left.
+            wins: games won by each seat.
+            bankruptcies: bankruptcies[seat][place] counts the games
+            in which the seat was the place-th player to go bankrupt.
+            rounds: RunningStats and Histogram of the game length.
+            final_cash: RunningStats and QuantileSketch of the cash
+            every player ended the game with.
+            field_rent: RunningStats of the rent collected on each field
+            during a game.
+            game_rent: rent collected on each field in the current game.
+        """
+        self._players_count = players_count
+        self._games = 0
+        self._unfinished = 0
+        self._wins = [0] * players_count
+        self._bankruptcies = [
+            [0] * players_count for _ in range(players_count)
+        ]
+        self._rounds = RunningStats()
+        self._rounds_histogram = Histogram(0, max_rounds + 1, max_rounds + 1)
+        self._final_cash = RunningStats()
+        self._final_cash_sketch = QuantileSketch()
+        self._field_rent = [RunningStats() for _ in range(PLANE_LENGTH)]
+        self._game_rent = [0] * PLANE_LENGTH
+
+    def on_rent(self, game, card, player, amount):
+        """
+        Adds the rent to the income of the field the player stands on.
+        """
+        self._game_rent[(player.position() - 1) % PLANE_LENGTH] += amount
+
+    def on_game_end(self, game):
+        """
+        Adds the results of the game that just ended.
+        """
+        players = game.players()
+        winners = game.find_winners()
+        self._games += 1
+        if len(winners) == 1:
+            self._wins[players.index(winners[0])] += 1
+        else:
+            self._unfinished += 1
+        for place, player in enumerate(game.losers()):
+            self._bankruptcies[players.index(player)][place] += 1
+        self._rounds.add(game.current_round())
+        self._rounds_histogram.add(game.current_round())
+        for player in players:
+            self._final_cash.add(player.cash())
+            self._final_cash_sketch.add(player.cash())
+        for idx, rent in enumerate(self._game_rent):
+            self._field_rent[idx].add(rent)
+        self._game_rent = [0] * PLANE_LENGTH
+
+    def merge(self, other):
+        """
+        Adds the results collected by another aggregator.
+        :param other: GameAggregator with the same number of players.
+        :raise: ValueError if the number of players differs.
+        """
+        if self._players_count != other._players_count:
+            raise ValueError(
+                "Can't merge results of games with different player counts."
+            )
+        self._games += other._games
+        self._unfinished += other._unfinished
+        for seat in range(self._players_count):
+            self._wins[seat] += other._wins[seat]
+            for place in range(self._players_count):
+                self._bankruptcies[seat][place] += other._bankruptcies[seat][place]  # noqa
+        self._rounds.merge(other._rounds)
+        self._rounds_histogram.merge(other._rounds_histogram)
+        self._final_cash.merge(other._final_cash)
+        self._final_cash_sketch.merge(other._final_cash_sketch)
+        for idx in range(PLANE_LENGTH):
+            self._field_rent[idx].merge(other._field_rent[idx])
+
+    def games(self):
+        """
+        Get the number of games collected.
+        :return: The number of games.
+        """
+        return self._games
+
+    def unfinished(self):
+        """
+        Get the number of games stopped by the round limit.
+        :return: The number of unfinished games.
+        """
+        return self._unfinished
+
+    def wins(self):
+        """
+        Get the number of games won by each seat.
+        :return: List of win counts, one per seat.
+        """
+        return self._wins
+
+    def win_rates(self):
+        """
+        Get the share of all games won by each seat.
+        :return: List of win rates, one per seat.
+        """
+        if self._games == 0:
+            return [0.0] * self._players_count
+        return [wins / self._games for wins in self._wins]
+
+    def bankruptcies(self):
+        """
+        Get the bankruptcy order counts.
+        :return: bankruptcies[seat][place], the number of games in which
+        the seat was the place-th (from 0) player to go bankrupt.
+        """
+        return self._bankruptcies
+
+    def rounds(self):
+        """
+        Get the statistics of the game length in rounds.
+        :return: RunningStats of the rounds.
+        """
+        return self._rounds
+
+    def rounds_histogram(self):
+        """
+        Get the distribution of the game length in rounds.
+        :return: Histogram with a bin for every round number.
+        """
+        return self._rounds_histogram
+
+    def final_cash(self):
+        """
+        Get the statistics of the cash players end the games with.
+        :return: RunningStats of the final cash.
+        """
+        return self._final_cash
+
+    def final_cash_quantile(self, q):
+        """
+        Estimate a quantile of the cash players end the games with.
+        :param q: The quantile, between 0 and 1.
+        :return: The estimated cash.
+        """
+        return self._final_cash_sketch.quantile(q)
+
+    def field_rent(self):
+        """
+        Get the statistics of the rent collected on each field in a game.
+        :return: List of RunningStats, one per field.
+        """
+        return self._field_rent
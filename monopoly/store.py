@@ -0,0 +1,576 @@
+import fcntl
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from monopoly.simulation import play_game, seed_chunks, DEFAULT_CHUNK_SIZE
+
+"""
+Columns of the tables of a ResultsStore, as (name, NumPy dtype) pairs.
+
+games: one row per game. winners is a bit mask of the seats
+still in the game at the end.
+rounds: one row per player per round, the state shown by
+the round summary.
+"""
+SCHEMAS = {
+    "games": [
+        ("seed", "<i8"),
+        ("config", "<i4"),
+        ("players", "<i1"),
+        ("rounds", "<i4"),
+        ("winners", "<i2"),
+    ],
+    "rounds": [
+        ("seed", "<i8"),
+        ("config", "<i4"),
+        ("round", "<i4"),
+        ("seat", "<i1"),
+        ("position", "<i1"),
+        ("cash", "<i8"),
+    ],
+}
+
+"""
+Version of the file layout, written to every table header.
+"""
+FORMAT_VERSION = 1
+
+"""
+Number of buffered rows after which a ResultsWriter appends to the store.
+"""
+DEFAULT_FLUSH_ROWS = 100000
+
+
+class StoreLock:
+    """
+    The StoreLock class.
+
+    Exclusive lock on a store directory, shared by all processes.
+    Used as a context manager around every change of the store.
+    """
+    def __init__(self, path):
+        """
+        :param path: The directory of the store.
+        """
+        self._path = os.path.join(path, ".lock")
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self._path, "a")
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+def _write_json(path, data):
+    """
+    Replaces a JSON file atomically, readers see the old
+    or the new content, never a partial one.
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "w") as file:
+        json.dump(data, file)
+    os.replace(temporary, path)
+
+
+def _read_json(path, default):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return default
+
+
+class Table:
+    """
+    The Table class.
+
+    A table of a ResultsStore. Every column is a separate binary file
+    that is read as a NumPy memmap, so scanning a column
+    only reads that column from the disk.
+    The header (header.json) holds the schema and the number of rows.
+    Rows past that number belong to an interrupted append
+    and are overwritten by the next one.
+    Every append also writes a sorted run of the index of its rows
+    (index-<first row>-<rows>.bin), listed in the header,
+    and merges it with the runs before it like a log-structured
+    merge tree, see lookup.
+    """
+    def __init__(self, path, name, schema):
+        """
+        Opens the table, creating its directory and header if needed.
+        :param path: The directory of the store.
+        :param name: The name of the table.
+        :param schema: List of (column name, dtype) pairs.
+        :raise: ValueError if the existing header has another schema.
+        """
+        self._store_path = path
+        self._path = os.path.join(path, name)
+        self._name = name
+        self._schema = [(column, np.dtype(dtype)) for column, dtype in schema]
+        self._header_path = os.path.join(self._path, "header.json")
+        os.makedirs(self._path, exist_ok=True)
+        header = self._read_header()
+        columns = [[column, dtype.str] for column, dtype in self._schema]
+        if header is None:
+            with StoreLock(path):
+                if self._read_header() is None:
+                    _write_json(self._header_path, {
+                        "version": FORMAT_VERSION,
+                        "columns": columns,
+                        "rows": 0,
+                    })
+        elif header["columns"] != columns:
+            raise ValueError(f"Table {name} has a different schema.")
+        self._runs = {}
+
+    def _read_header(self):
+        return _read_json(self._header_path, None)
+
+    def _column_path(self, column):
+        return os.path.join(self._path, column + ".bin")
+
+    def name(self):
+        """
+        Get the name of the table.
+        :return: The table name.
+        """
+        return self._name
+
+    def columns(self):
+        """
+        Get the names of the columns.
+        :return: List of column names.
+        """
+        return [column for column, _ in self._schema]
+
+    def rows(self):
+        """
+        Get the number of rows written by finished appends.
+        :return: The number of rows.
+        """
+        return self._read_header()["rows"]
+
+    def append(self, data):
+        """
+        Appends rows to the table.
+        Can be called by many processes at the same time,
+        the rows of one call are always stored next to each other.
+        :param data: Dictionary of column name to a sequence of values,
+        all of the same length.
+        :return: The number of the first appended row.
+        """
+        arrays = [
+            np.ascontiguousarray(data[column], dtype=dtype)
+            for column, dtype in self._schema
+        ]
+        with StoreLock(self._store_path):
+            header = self._read_header()
+            first_row = header["rows"]
+            for (column, dtype), array in zip(self._schema, arrays):
+                path = self._column_path(column)
+                mode = "r+b" if os.path.exists(path) else "w+b"
+                with open(path, mode) as file:
+                    file.seek(first_row * dtype.itemsize)
+                    file.write(array.tobytes())
+                    file.truncate()
+            header["rows"] = first_row + len(arrays[0])
+            self._write_index(header)
+        return first_row
+
+    def column(self, column):
+        """
+        Get a read-only view of a column, backed by its file.
+        :param column: The name of the column.
+        :return: NumPy array (memmap) with a value for every row.
+        """
+        dtype = dict(self._schema)[column]
+        rows = self.rows()
+        if rows == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(
+            self._column_path(column), dtype=dtype, mode="r", shape=(rows,)
+        )
+
+    def scan(self, column, chunk_rows=1 << 20):
+        """
+        Iterates over a column in chunks of rows,
+        for analyses that don't fit in memory at once.
+        :param column: The name of the column.
+        :param chunk_rows: The number of rows in a chunk.
+        :return: Generator of NumPy arrays.
+        """
+        values = self.column(column)
+        for start in range(0, len(values), chunk_rows):
+            yield values[start:start + chunk_rows]
+
+    def _read_rows(self, column, start, end):
+        dtype = dict(self._schema)[column]
+        return np.fromfile(self._column_path(column), dtype=dtype,
+                           count=end - start, offset=start * dtype.itemsize)
+
+    def _run_path(self, first_row, count):
+        return os.path.join(self._path, f"index-{first_row}-{count}.bin")
+
+    def _write_run(self, first_row, count, configs, seeds, rows):
+        """
+        Writes a run of the index: the config, seed and row number
+        of the rows, sorted by config and seed, one after another.
+        """
+        order = np.lexsort((seeds, configs))
+        run = np.stack([configs[order], seeds[order], rows[order]])
+        path = self._run_path(first_row, count)
+        run.astype("<i8").tofile(path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+    def _update_index(self, header):
+        """
+        Indexes the rows of the header that aren't in a run yet,
+        as a new run, and merges the newest runs while the last one
+        is at least half as long as the one before it, so a table
+        has a few runs of very different lengths and every row
+        is merged a few times. Called with the store lock held,
+        the header is changed in place and written by the caller.
+        :return: List of the files of the replaced runs, removed
+        by the caller after writing the header.
+        """
+        runs = header.setdefault("runs", [])
+        indexed = sum(count for _, count in runs)
+        rows = header["rows"]
+        if indexed < rows:
+            self._write_run(
+                indexed, rows - indexed,
+                *(self._read_rows(column, indexed, rows).astype("<i8")
+                  for column in ("config", "seed")),
+                np.arange(indexed, rows, dtype="<i8"),
+            )
+            runs.append([indexed, rows - indexed])
+        stale = []
+        old_rows = header.pop("index_rows", None)
+        if old_rows is not None:
+            stale.append(os.path.join(self._path, f"index-{old_rows}.bin"))
+        while len(runs) > 1 and 2 * runs[-1][1] >= runs[-2][1]:
+            older, newer = runs[-2], runs[-1]
+            merged = np.concatenate(
+                [self._read_run(*older), self._read_run(*newer)], axis=1
+            )
+            self._write_run(older[0], older[1] + newer[1], *merged)
+            runs[-2:] = [[older[0], older[1] + newer[1]]]
+            for first_row, count in (older, newer):
+                stale.append(self._run_path(first_row, count))
+                self._runs.pop((first_row, count), None)
+        return stale
+
+    def _write_index(self, header):
+        """
+        Updates the index and writes the header, with the store lock held.
+        """
+        stale = self._update_index(header)
+        _write_json(self._header_path, header)
+        for path in stale:
+            os.remove(path)
+
+    def _read_run(self, first_row, count):
+        """
+        Get a run of the index as a [3, count] memmap of the configs,
+        seeds and row numbers, kept open between lookups.
+        """
+        key = (first_row, count)
+        if key not in self._runs:
+            self._runs[key] = np.memmap(
+                self._run_path(first_row, count), dtype="<i8", mode="r",
+                shape=(3, count)
+            )
+        return self._runs[key]
+
+    def lookup(self, seed, config):
+        """
+        Finds the rows of a game, by a binary search
+        in every run of the index, sorted by config and seed.
+        The runs are read as memmaps, so a search reads only
+        the pages it visits. A table written before the index
+        had runs is indexed on its first lookup.
+        :param seed: The seed of the game.
+        :param config: The config id of the game.
+        :return: Sorted NumPy array of row numbers.
+        """
+        header = self._read_header()
+        if header["rows"] == 0:
+            return np.zeros(0, dtype="<i8")
+        if sum(count for _, count in header.get("runs", [])) < header["rows"]:
+            with StoreLock(self._store_path):
+                header = self._read_header()
+                self._write_index(header)
+        runs = [tuple(run) for run in header["runs"]]
+        self._runs = {run: self._runs[run] for run in runs
+                      if run in self._runs}
+        try:
+            found = []
+            for first_row, count in runs:
+                configs, seeds, rows = self._read_run(first_row, count)
+                start = np.searchsorted(configs, config, "left")
+                end = np.searchsorted(configs, config, "right")
+                first = start + np.searchsorted(seeds[start:end], seed, "left")
+                last = start + np.searchsorted(seeds[start:end], seed, "right")
+                found.append(rows[first:last])
+        except FileNotFoundError:
+            return self.lookup(seed, config)
+        return np.sort(np.concatenate(found))
+
+
+class ResultsStore:
+    """
+    The ResultsStore class.
+
+    Directory with the results of simulated games,
+    stored by columns in the tables described by SCHEMAS.
+    Simulation configs are registered in configs.json
+    and identified in the tables by a small integer id.
+    """
+    def __init__(self, path):
+        """
+        Opens the store, creating it if it doesn't exist.
+        :param path: The directory of the store.
+        """
+        self._path = path
+        os.makedirs(path, exist_ok=True)
+        self._configs_path = os.path.join(path, "configs.json")
+        self._tables = {
+            name: Table(path, name, schema)
+            for name, schema in SCHEMAS.items()
+        }
+
+    def path(self):
+        """
+        Get the directory of the store.
+        :return: The path.
+        """
+        return self._path
+
+    def table(self, name):
+        """
+        Get a table of the store.
+        :param name: "games" or "rounds".
+        :return: The Table.
+        """
+        return self._tables[name]
+
+    def configs(self):
+        """
+        Get the registered configs.
+        :return: Dictionary of config key to config id.
+        """
+        return _read_json(self._configs_path, {})
+
+    def config_id(self, config):
+        """
+        Get the id of a config, registering it when it's new.
+        :param config: SimulationConfig.
+        :return: The config id.
+        """
+        key = config.key()
+        configs = self.configs()
+        if key in configs:
+            return configs[key]
+        with StoreLock(self._path):
+            configs = self.configs()
+            if key not in configs:
+                configs[key] = len(configs)
+                _write_json(self._configs_path, configs)
+        return configs[key]
+
+    def game(self, seed, config):
+        """
+        Reads the record of a game.
+        :param seed: The seed of the game.
+        :param config: SimulationConfig of the game.
+        :return: Dictionary of column name to value, None if not stored.
+        """
+        table = self._tables["games"]
+        rows = table.lookup(seed, self.config_id(config))
+        if len(rows) == 0:
+            return None
+        return {
+            column: table.column(column)[rows[0]].item()
+            for column in table.columns()
+        }
+
+    def rounds(self, seed, config):
+        """
+        Reads the per-round records of a game.
+        :param seed: The seed of the game.
+        :param config: SimulationConfig of the game.
+        :return: Dictionary of column name to NumPy array.
+        """
+        table = self._tables["rounds"]
+        rows = table.lookup(seed, self.config_id(config))
+        return {
+            column: np.asarray(table.column(column)[rows])
+            for column in table.columns()
+        }
+
+    def summary(self):
+        """
+        Sums up the stored games of every config,
+        reading only the columns of the games table it needs.
+        A seat wins a game when it's still in the game at the end.
+        :return: Dictionary of config key to a dictionary with
+        the number of "games", the "win_rates" of the seats
+        and the "mean_rounds" of a game.
+        """
+        table = self._tables["games"]
+        config_ids = np.asarray(table.column("config"))
+        players = np.asarray(table.column("players"))
+        rounds = np.asarray(table.column("rounds"))
+        winners = np.asarray(table.column("winners"))
+        summary = {}
+        for key, config_id in self.configs().items():
+            rows = config_ids == config_id
+            games = int(np.count_nonzero(rows))
+            if games == 0:
+                continue
+            seats = int(players[rows].max())
+            won = (winners[rows, np.newaxis] >> np.arange(seats)) & 1
+            summary[key] = {
+                "games": games,
+                "win_rates": won.mean(axis=0).tolist(),
+                "mean_rounds": float(rounds[rows].mean()),
+            }
+        return summary
+
+
+class ResultsWriter:
+    """
+    The ResultsWriter class.
+
+    Game listener that records the games into a ResultsStore.
+    The rows are buffered in memory and appended
+    when there are enough of them, or when flush() is called.
+    A game is never split between two appends.
+    """
+    def __init__(self, store, config, record_rounds=True,
+                 flush_rows=DEFAULT_FLUSH_ROWS):
+        """
+        :param store: The ResultsStore to write to.
+        :param config: SimulationConfig of the recorded games.
+        :param record_rounds: False to record only the games table.
+        :param flush_rows: Number of buffered rows that triggers an append.
+        Attributes:
+            seed: seed of the game being recorded, set by start_game().
+            games, rounds: buffered rows, a list of values per column.
+        """
+        self._store = store
+        self._config_id = store.config_id(config)
+        self._record_rounds = record_rounds
+        self._flush_rows = flush_rows
+        self._seed = None
+        self._games = {column: [] for column, _ in SCHEMAS["games"]}
+        self._rounds = {column: [] for column, _ in SCHEMAS["rounds"]}
+
+    def start_game(self, seed):
+        """
+        Sets the seed of the game about to be recorded.
+        :param seed: The seed of the game.
+        """
+        self._seed = seed
+
+    def on_round_end(self, game, round_stats):
+        """
+        Buffers a row for every player of the round summary.
+        """
+        if not self._record_rounds:
+            return
+        rounds = self._rounds
+        for seat, player_stat in enumerate(round_stats.player_stats()):
+            rounds["seed"].append(self._seed)
+            rounds["config"].append(self._config_id)
+            rounds["round"].append(round_stats.round())
+            rounds["seat"].append(seat)
+            rounds["position"].append(player_stat.position())
+            rounds["cash"].append(player_stat.cash())
+
+    def on_game_end(self, game):
+        """
+        Buffers the row of the game, appends the buffers when they are full.
+        """
+        winners = 0
+        for seat, player in enumerate(game.players()):
+            if player.is_in_game():
+                winners |= 1 << seat
+        games = self._games
+        games["seed"].append(self._seed)
+        games["config"].append(self._config_id)
+        games["players"].append(len(game.players()))
+        games["rounds"].append(game.current_round())
+        games["winners"].append(winners)
+        if len(self._rounds["seed"]) + len(games["seed"]) >= self._flush_rows:
+            self.flush()
+
+    def flush(self):
+        """
+        Appends the buffered rows to the store.
+        """
+        for name, buffer in (("rounds", self._rounds),
+                             ("games", self._games)):
+            if buffer["seed"]:
+                self._store.table(name).append(buffer)
+                for values in buffer.values():
+                    values.clear()
+
+
+def record(store, seeds, config, record_rounds=True):
+    """
+    Plays a game for every seed and records them into the store.
+    :param store: The ResultsStore.
+    :param seeds: Iterable of game seeds.
+    :param config: SimulationConfig of the games.
+    :param record_rounds: False to record only the games table.
+    """
+    writer = ResultsWriter(store, config, record_rounds)
+    for seed in seeds:
+        writer.start_game(seed)
+        play_game(seed, config, [writer])
+    writer.flush()
+
+
+def _record_range(path, first_seed, games, config, record_rounds):
+    record(
+        ResultsStore(path), range(first_seed, first_seed + games), config,
+        record_rounds
+    )
+
+
+def record_batch(path, games, config, first_seed=0, workers=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, record_rounds=True):
+    """
+    Plays games with consecutive seeds on a pool of worker processes,
+    every worker appends its games directly to the store.
+    :param path: The directory of the store.
+    :param games: The number of games.
+    :param config: SimulationConfig of the games.
+    :param first_seed: The seed of the first game, 0 by default.
+    :param workers: The number of processes, one per CPU by default.
+    :param chunk_size: The number of games a worker plays at a time.
+    :param record_rounds: False to record only the games table.
+    :return: The ResultsStore.
+    """
+    store = ResultsStore(path)
+    store.config_id(config)
+    chunks = seed_chunks(first_seed, games, chunk_size)
+    with ProcessPoolExecutor(workers) as pool:
+        list(pool.map(
+            _record_range,
+            [path] * len(chunks),
+            [start for start, _ in chunks],
+            [count for _, count in chunks],
+            [config] * len(chunks),
+            [record_rounds] * len(chunks),
+        ))
+    return store
@@ -0,0 +1,274 @@
+import functools
+import itertools
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from monopoly.plane import DEFAULT_RULES
+from monopoly.simulation import SimulationConfig, play_game, seed_chunks
+from monopoly.stats import RunningStats
+
+"""
+Number of standard deviations of the confidence intervals
+used to drop sweep points, 1.96 for 95% intervals.
+"""
+DEFAULT_Z = 1.96
+
+"""
+Number of games of a point a worker plays at a time, a stage
+of a point is split into chunks so it runs on many workers.
+"""
+DEFAULT_SWEEP_CHUNK_SIZE = 25
+
+
+def finished_score(game):
+    """
+    Objective that prefers rules under which games end.
+    :param game: A finished Game.
+    :return: 1.0 if one player won before the round limit, else 0.0.
+    """
+    return 1.0 if len(game.find_winners()) == 1 else 0.0
+
+
+def _length_score(target, game):
+    return -abs(game.current_round() - target)
+
+
+def length_objective(target):
+    """
+    Objective that prefers games of a given length.
+    :param target: The wanted number of rounds.
+    :return: Function scoring a finished Game with minus the distance
+    of its number of rounds from the target.
+    """
+    return functools.partial(_length_score, target)
+
+
+def grid_points(space):
+    """
+    Creates the rules of every combination of the swept values.
+    :param space: Dictionary of Rules argument name to list of values.
+    :return: List of Rules.
+    """
+    names = sorted(space)
+    return [
+        DEFAULT_RULES.replace(**dict(zip(names, values)))
+        for values in itertools.product(*(space[name] for name in names))
+    ]
+
+
+def random_points(space, count, seed=0):
+    """
+    Creates rules with randomly chosen values.
+    :param space: Dictionary of Rules argument name to a list of values
+    to choose from, or a (low, high) tuple of a range.
+    Ranges of ints give ints, other ranges give floats.
+    :param count: The number of rules to create.
+    :param seed: The seed of the random choices.
+    :return: List of Rules.
+    """
+    rng = random.Random(seed)
+    points = []
+    for _ in range(count):
+        values = {}
+        for name in sorted(space):
+            choices = space[name]
+            if isinstance(choices, tuple):
+                low, high = choices
+                if isinstance(low, int) and isinstance(high, int):
+                    values[name] = rng.randint(low, high)
+                else:
+                    values[name] = rng.uniform(low, high)
+            else:
+                values[name] = rng.choice(choices)
+        points.append(DEFAULT_RULES.replace(**values))
+    return points
+
+
+def evaluate(rules, first_seed, games, objective, players_count=4,
+             max_rounds=None):
+    """
+    Plays games under the rules and scores them.
+    :param rules: The Rules to evaluate.
+    :param first_seed: The seed of the first game.
+    :param games: The number of games.
+    :param objective: Function scoring a finished Game, higher is better.
+    :param players_count: The number of players in a game.
+    :param max_rounds: The round limit, the simulation default by default.
+    :return: RunningStats of the scores.
+    """
+    if max_rounds is None:
+        config = SimulationConfig(players_count, rules=rules)
+    else:
+        config = SimulationConfig(players_count, max_rounds, rules=rules)
+    scores = RunningStats()
+    for seed in range(first_seed, first_seed + games):
+        scores.add(objective(play_game(seed, config)))
+    return scores
+
+
+class SweepPoint:
+    """
+    The SweepPoint class.
+
+    The rules of a point of the sweep and the scores of its games.
+    """
+    def __init__(self, rules):
+        """
+        :param rules: The Rules of the point.
+        Attributes:
+            scores: RunningStats of the game scores.
+            dropped_at: number of the stage after which the point
+            was dropped, None while it's still evaluated.
+        """
+        self._rules = rules
+        self._scores = RunningStats()
+        self._dropped_at = None
+
+    def rules(self):
+        """
+        Get the rules of the point.
+        :return: The Rules.
+        """
+        return self._rules
+
+    def scores(self):
+        """
+        Get the statistics of the scores.
+        :return: RunningStats of the scores.
+        """
+        return self._scores
+
+    def dropped_at(self):
+        """
+        Get the stage after which the point was dropped.
+        :return: The stage number, None if it wasn't dropped.
+        """
+        return self._dropped_at
+
+    def interval(self, z=DEFAULT_Z):
+        """
+        Get the confidence interval of the mean score.
+        :param z: The number of standard errors on each side.
+        :return: (low, high) tuple.
+        """
+        mean = self._scores.mean()
+        margin = z * self._scores.stderr()
+        return mean - margin, mean + margin
+
+
+class Sweep:
+    """
+    The Sweep class.
+
+    Evaluates rule variants with batches of simulated games
+    on a pool of worker processes.
+    The points are evaluated in stages. After every stage
+    the points whose confidence interval lies entirely below
+    the interval of the best point are dropped,
+    so the games are spent on the promising ones.
+    Every point plays the same seeds in a stage, which makes
+    the comparison between the points fairer. The seeds of a stage
+    are played in chunks, like run_batch, and the scores of the chunks
+    of a point are merged in their order.
+    """
+    def __init__(self, points, objective=finished_score, players_count=4,
+                 max_rounds=None, games_per_stage=200, max_stages=10,
+                 z=DEFAULT_Z, first_seed=0,
+                 chunk_size=DEFAULT_SWEEP_CHUNK_SIZE):
+        """
+        :param points: List of Rules to evaluate,
+        see grid_points and random_points.
+        :param objective: Function scoring a finished Game, higher is
+        better. It has to be picklable (a module level function
+        or a functools.partial of one).
+        :param players_count: The number of players in a game.
+        :param max_rounds: The round limit, the simulation default by default.
+        :param games_per_stage: The number of games of a point per stage.
+        :param max_stages: The number of stages after which
+        the sweep stops even if more points are left.
+        :param z: Number of standard errors of the confidence intervals.
+        :param first_seed: The seed of the first game.
+        :param chunk_size: The number of games of a point
+        a worker plays at a time.
+        """
+        self._points = [SweepPoint(rules) for rules in points]
+        self._objective = objective
+        self._players_count = players_count
+        self._max_rounds = max_rounds
+        self._games_per_stage = games_per_stage
+        self._max_stages = max_stages
+        self._z = z
+        self._first_seed = first_seed
+        self._chunk_size = chunk_size
+        self._stage = 0
+
+    def points(self):
+        """
+        Get all the points of the sweep.
+        :return: List of SweepPoint objects.
+        """
+        return self._points
+
+    def active_points(self):
+        """
+        Get the points that haven't been dropped.
+        :return: List of SweepPoint objects.
+        """
+        return [point for point in self._points if point.dropped_at() is None]
+
+    def run_stage(self, pool=None):
+        """
+        Plays a stage of games for every active point
+        and drops the points that are clearly worse than the best one.
+        :param pool: Executor to run the games on,
+        they are played in this process if None.
+        """
+        active = self.active_points()
+        first_seed = self._first_seed + self._stage * self._games_per_stage
+        chunks = seed_chunks(first_seed, self._games_per_stage,
+                             self._chunk_size)
+        tasks = [(point, start, count)
+                 for point in active for start, count in chunks]
+        arguments = (
+            [point.rules() for point, _, _ in tasks],
+            [start for _, start, _ in tasks],
+            [count for _, _, count in tasks],
+            [self._objective] * len(tasks),
+            [self._players_count] * len(tasks),
+            [self._max_rounds] * len(tasks),
+        )
+        mapper = pool.map if pool is not None else map
+        for (point, _, _), scores in zip(tasks, mapper(evaluate, *arguments)):
+            point.scores().merge(scores)
+        self._stage += 1
+        best_low = max(point.interval(self._z)[0] for point in active)
+        for point in active:
+            if point.interval(self._z)[1] < best_low:
+                point._dropped_at = self._stage
+
+    def run(self, workers=None):
+        """
+        Runs stages until one point is left or max_stages is reached.
+        :param workers: The number of processes, one per CPU by default.
+        :return: The points sorted from the best mean score.
+        """
+        with ProcessPoolExecutor(workers) as pool:
+            while (self._stage < self._max_stages
+                   and len(self.active_points()) > 1):
+                self.run_stage(pool)
+        return self.ranking()
+
+    def ranking(self):
+        """
+        Get the points sorted by their mean score,
+        the points that were not dropped first.
+        :return: List of SweepPoint objects.
+        """
+        return sorted(
+            self._points,
+            key=lambda point: (
+                point.dropped_at() is not None,
+                -(point.dropped_at() or 0),
+                -point.scores().mean(),
+            ),
+        )
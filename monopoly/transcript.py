@@ -0,0 +1,192 @@
+import json
+import random
+
+from monopoly.display import HeadlessDisplay
+from monopoly.game import Game
+from monopoly.input import Input
+from monopoly.plane import Plane, new_board
+
+"""
+Version of the transcript format, written to the first line.
+"""
+TRANSCRIPT_VERSION = 1
+
+
+class RecordingInput(Input):
+    """
+    The RecordingInput class.
+
+    Asks the players at the keyboard, like Input, and writes every
+    answer with its prompt to a transcript, a file of JSON lines.
+    The first line holds the seed of the game's random number
+    generator, so ReplayInput and replay_game can play the same game
+    again without anyone at the keyboard.
+    It also tells if the players could take back their answers,
+    which asks them more questions, see Game.take_back_turn.
+    Every answer is written as soon as it's given,
+    so the transcript of an interrupted session is kept.
+    """
+    def __init__(self, path, seed, input=None, take_back=False):
+        """
+        :param path: The path of the transcript.
+        :param seed: The seed of the game's random number generator.
+        :param input: Input asking the players, a new Input by default.
+        :param take_back: True if the game asks the players to take back
+        their answers.
+        """
+        self._input = input if input is not None else Input()
+        self._file = open(path, "w")
+        self._write({"version": TRANSCRIPT_VERSION, "seed": seed,
+                     "take_back": take_back})
+
+    def _write(self, record):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        """
+        Closes the transcript.
+        """
+        self._file.close()
+
+    def yes_or_no(self, prompt):
+        """
+        Asks the question and records the answer.
+        """
+        answer = self._input.yes_or_no(prompt)
+        self._write({"kind": "yes_or_no", "prompt": prompt,
+                     "answer": answer})
+        return answer
+
+    def number(self, prompt, min, max):
+        """
+        Asks for the number and records the answer.
+        """
+        answer = self._input.number(prompt, min, max)
+        self._write({"kind": "number", "prompt": prompt, "answer": answer})
+        return answer
+
+
+class ReplayInput(Input):
+    """
+    The ReplayInput class.
+
+    Gives the answers of a transcript written by RecordingInput,
+    in their order, without any keyboard input.
+    The prompts are compared with the recorded ones,
+    so a game that takes another course than the recorded one
+    stops at the first different question.
+    """
+    def __init__(self, path):
+        """
+        :param path: The path of the transcript.
+        :raise: ValueError if the file isn't a transcript
+        of a known version.
+        Attributes:
+            seed: the seed of the recorded game.
+            take_back: True if the recorded game asked the players
+            to take back their answers.
+            answers: the recorded answers.
+            next: index of the next answer.
+        """
+        with open(path) as file:
+            records = [json.loads(line) for line in file if line.strip()]
+        if not records or records[0].get("version") != TRANSCRIPT_VERSION:
+            raise ValueError(f"{path} isn't a transcript.")
+        self._seed = records[0]["seed"]
+        self._take_back = records[0].get("take_back", False)
+        self._answers = records[1:]
+        self._next = 0
+
+    def seed(self):
+        """
+        Get the seed of the recorded game.
+        :return: The seed.
+        """
+        return self._seed
+
+    def take_back(self):
+        """
+        Check if the recorded game asked the players to take back
+        their answers.
+        :return: True if it did.
+        """
+        return self._take_back
+
+    def remaining(self):
+        """
+        Get the number of answers not given yet.
+        :return: The number of answers.
+        """
+        return len(self._answers) - self._next
+
+    def _answer(self, kind, prompt):
+        """
+        Get the next answer, checking that it answers the question.
+        :raise: ValueError if the transcript ended or its next answer
+        is for another question.
+        """
+        if self._next == len(self._answers):
+            raise ValueError(f"The transcript has no answer to: {prompt}")
+        record = self._answers[self._next]
+        if record["kind"] != kind or record["prompt"] != prompt:
+            raise ValueError(
+                f"Answer {self._next + 1} of the transcript is for"
+                f" {record['prompt']!r}, not {prompt!r}"
+            )
+        self._next += 1
+        return record["answer"]
+
+    def yes_or_no(self, prompt):
+        """
+        Gives the recorded answer to a yes or no question.
+        """
+        return self._answer("yes_or_no", prompt)
+
+    def number(self, prompt, min, max):
+        """
+        Gives the recorded number.
+        """
+        return self._answer("number", prompt)
+
+
+def record_game(path, display, seed=None, input=None, take_back=False):
+    """
+    Plays a game at the keyboard and records it.
+    :param path: The path of the transcript.
+    :param display: The Display of the game.
+    :param seed: The seed of the game, a random one by default.
+    :param input: Input asking the players, a new Input by default.
+    :param take_back: True to let the players take back their answers,
+    see Game.take_back_turn.
+    :return: The finished Game.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    recorder = RecordingInput(path, seed, input, take_back)
+    try:
+        game = Game(display, recorder, Plane(new_board()),
+                    random.Random(seed), take_back=take_back)
+        game.init_game()
+        game.play_game()
+    finally:
+        recorder.close()
+    return game
+
+
+def replay_game(path, display=None):
+    """
+    Plays a recorded game again.
+    :param path: The path of the transcript.
+    :param display: The Display of the game, one that doesn't print
+    anything by default.
+    :return: The finished Game.
+    :raise: ValueError if the game doesn't follow the transcript.
+    """
+    replay = ReplayInput(path)
+    game = Game(display if display is not None else HeadlessDisplay(),
+                replay, Plane(new_board()), random.Random(replay.seed()),
+                take_back=replay.take_back())
+    game.init_game()
+    game.play_game()
+    return game
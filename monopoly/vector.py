@@ -0,0 +1,631 @@
+import numpy as np
+
+from monopoly.batch import (
+    DECISION_KINDS, FEATURES, SEAT, CASH, PRICE, HOUSE_PRICE, FEE, LEVEL,
+    GROUP_OWNED, OPPONENTS_CASH, ROUND
+)
+from monopoly.game import DICE_MIN, DICE_MAX
+from monopoly.plane import DEFAULT_RULES, PLANE_LENGTH, new_board
+from monopoly.state import (
+    NO_DECISION, BUY, HOUSES, HOTEL, HOTEL_LEVEL, UNBUILDABLE_COLORS,
+    CASH_BITS, CASH_THRESHOLDS, CASH_WORD, KEY_WORDS, LEVEL_BITS, LEVEL_WORD,
+    LEVELS_PER_WORD, OWNER_BITS, OWNERS_PER_WORD, POSITION_BITS,
+    POSITION_WORD, SEAT_SHIFT
+)
+
+"""
+Kinds of fields, the values of BoardTables.kinds.
+"""
+FIELD = 0
+TAX = 1
+CHANCE = 2
+PARKING = 3
+START = 4
+KINDS = {"FIELD": FIELD, "TAX": TAX, "CHANCE": CHANCE,
+         "PARKING": PARKING, "START": START}
+
+
+class BoardTables:
+    """
+    The BoardTables class.
+
+    The cards of the board and the amounts of the rules as NumPy
+    arrays indexed by the field index (position - 1 on the Plane).
+    """
+    def __init__(self, rules=None):
+        """
+        :param rules: Rules of the game, DEFAULT_RULES by default.
+        Attributes:
+            kinds: kind of every field (FIELD, TAX, ...).
+            prices, fees, house_prices: amounts of every field, 0 if none.
+            groups: index of the color group of every buildable field,
+            -1 for the others.
+            group_members: [field, group] matrix of the group membership.
+            group_sizes: number of cards of each group needed to build.
+        """
+        self._rules = rules if rules is not None else DEFAULT_RULES
+        cards = new_board(self._rules)
+        colors = []
+        for card in cards:
+            color = card.color()
+            if (card.is_property() and color not in UNBUILDABLE_COLORS
+                    and color not in colors):
+                colors.append(color)
+        self._colors = colors
+        self.kinds = np.array([KINDS[card.type()] for card in cards], np.int8)
+        self.prices = np.array([card.price() or 0 for card in cards], np.int64)
+        self.fees = np.array([card._fee for card in cards], np.int64)
+        self.house_prices = np.array(
+            [card.house_price() or 0 for card in cards], np.int64
+        )
+        self.groups = np.array(
+            [colors.index(card.color()) if card.color() in colors else -1
+             for card in cards], np.int64
+        )
+        self.group_members = np.zeros((PLANE_LENGTH, len(colors)), np.int64)
+        for field, group in enumerate(self.groups):
+            if group >= 0:
+                self.group_members[field, group] = 1
+        self.group_sizes = self.group_members.sum(axis=0)
+        self.multipliers = np.array(self._rules.rent_multipliers(), np.int64)
+        self.chances = np.array(self._rules.chances(), np.int64)
+
+    def rules(self):
+        """
+        Get the rules of the tables.
+        :return: The Rules.
+        """
+        return self._rules
+
+    def colors(self):
+        """
+        Get the colors of the buildable groups, in the order of the indices.
+        :return: List of color names.
+        """
+        return self._colors
+
+
+_CASH_THRESHOLDS = np.array(CASH_THRESHOLDS, np.int64)
+
+
+def _pack(values, bits, per_word):
+    """
+    Packs rows of small ints into 64-bit words, per_word values a word,
+    the first value in the lowest bits.
+    """
+    count, length = values.shape
+    words = -(-length // per_word)
+    padded = np.zeros((count, words * per_word), np.uint64)
+    padded[:, :length] = values
+    shifts = (bits * np.arange(per_word)).astype(np.uint64)
+    return np.bitwise_or.reduce(
+        padded.reshape(count, words, per_word) << shifts, axis=2
+    )
+
+
+class VectorGame:
+    """
+    The VectorGame class.
+
+    Plays many games at once, with the state of all of them
+    in NumPy arrays, so a turn of every game is a few array operations
+    instead of a Python loop over the games.
+    The rules are the same as the ones of Game and Player:
+    positions wrap like in Player.make_move, taxes and chances are paid
+    to the bank, a player with no cash left is out of the game
+    and the game ends at the start of a round with less than 2 players
+    or at the round limit.
+
+    Decisions of the seats in decision_seats are left pending
+    for the caller to answer with decide() or decide_pending().
+    The other seats are bots answered by a BatchPolicy: every turn
+    their decisions are grouped by kind and each group is answered
+    by a single call of the policy.
+    """
+    def __init__(self, games, players_count=4, rules=None,
+                 max_rounds=1000, reserves=0, decision_seats=(), seed=None,
+                 policy=None):
+        """
+        :param games: The number of games played at once.
+        :param players_count: The number of players in every game.
+        :param rules: Rules of the games, DEFAULT_RULES by default.
+        :param max_rounds: The round limit of a game.
+        :param reserves: Cash reserve of the bots, one for all seats
+        or a list with one per seat.
+        :param decision_seats: Seats whose decisions are answered
+        by the caller. A game ends when one of them goes bankrupt.
+        :param seed: Seed of the NumPy random generator.
+        :param policy: BatchPolicy of the bots, by default they decide
+        like a ReservePolicy with the reserves, without building
+        the feature matrix.
+        """
+        self._board = BoardTables(rules)
+        self._games = games
+        self._players_count = players_count
+        self._max_rounds = max_rounds
+        self._reserves = np.broadcast_to(
+            np.asarray(reserves, np.int64), (players_count,)
+        ).copy()
+        self._decision_seats = np.zeros(players_count, bool)
+        self._decision_seats[list(decision_seats)] = True
+        self._rng = np.random.default_rng(seed)
+        self._policy = policy
+        self.position = np.zeros((games, players_count), np.int64)
+        self.cash = np.zeros((games, players_count), np.int64)
+        self.owner = np.zeros((games, PLANE_LENGTH), np.int64)
+        self.level = np.zeros((games, PLANE_LENGTH), np.int64)
+        self.seat = np.zeros(games, np.int64)
+        self.round = np.zeros(games, np.int64)
+        self.done = np.zeros(games, bool)
+        self.eliminated = np.zeros((games, players_count), np.int64)
+        self.losers = np.zeros(games, np.int64)
+        self.pending = np.zeros(games, np.int64)
+        self.pending_field = np.zeros(games, np.int64)
+        self.reset()
+
+    def board(self):
+        """
+        Get the board tables of the games.
+        :return: The BoardTables.
+        """
+        return self._board
+
+    def games(self):
+        """
+        Get the number of games played at once.
+        :return: The number of games.
+        """
+        return self._games
+
+    def players_count(self):
+        """
+        Get the number of players in every game.
+        :return: The number of players.
+        """
+        return self._players_count
+
+    def max_rounds(self):
+        """
+        Get the round limit of a game.
+        :return: The round limit.
+        """
+        return self._max_rounds
+
+    def reseed(self, seed):
+        """
+        Restarts the random generator of the games.
+        :param seed: The new seed.
+        """
+        self._rng = np.random.default_rng(seed)
+
+    def reset(self, games=None):
+        """
+        Starts new games, like Game.init_players: every player
+        at position 1 with the starting cash, no cards owned.
+        :param games: Indices or mask of the games to restart, all by default.
+        """
+        if games is None:
+            games = slice(None)
+        self.position[games] = 1
+        self.cash[games] = self._board.rules().starting_cash()
+        self.owner[games] = -1
+        self.level[games] = 0
+        self.seat[games] = 0
+        self.round[games] = 0
+        self.done[games] = False
+        self.eliminated[games] = -1
+        self.losers[games] = 0
+        self.pending[games] = NO_DECISION
+        self.pending_field[games] = 0
+
+    def load(self, state, places, round_number, games=None):
+        """
+        Sets games to a position of a Game, at the start of the turn
+        of state.seat.
+        :param state: GameState of the position, see monopoly.state.
+        :param places: Place of every player in the losers list,
+        -1 for the players still in the game, see loser_places.
+        :param round_number: The current round of the game.
+        :param games: Indices or mask of the games, all by default.
+        """
+        if games is None:
+            games = slice(None)
+        self.reset(games)
+        self.position[games] = state.positions
+        self.cash[games] = state.cash
+        self.owner[games] = state.owners
+        self.level[games] = state.levels
+        self.seat[games] = state.seat
+        self.round[games] = round_number
+        self.eliminated[games] = places
+        self.losers[games] = sum(place >= 0 for place in places)
+
+    def alive(self):
+        """
+        Get which players are still in the game (cash above 0).
+        :return: [games, players] boolean array.
+        """
+        return self.cash > 0
+
+    def winners(self):
+        """
+        Get the players still in the game, like Game.find_winners.
+        :return: [games, players] boolean array.
+        """
+        return self.alive()
+
+    def keys(self, games=None):
+        """
+        Packs the states of games into the keys of monopoly.state.encode,
+        row.tobytes() of a game equals the key of the same Game state.
+        :param games: Indices of the games, all by default.
+        :return: [games, KEY_WORDS] uint64 array.
+        """
+        if games is None:
+            games = np.arange(self._games)
+        count = len(games)
+        keys = np.zeros((count, KEY_WORDS), "<u8")
+        keys[:, :LEVEL_WORD] = _pack(
+            self.owner[games] + 1, OWNER_BITS, OWNERS_PER_WORD
+        )
+        keys[:, LEVEL_WORD:POSITION_WORD] = _pack(
+            self.level[games], LEVEL_BITS, LEVELS_PER_WORD
+        )
+        keys[:, POSITION_WORD] = _pack(
+            self.position[games], POSITION_BITS, self._players_count
+        )[:, 0] | (self.seat[games].astype(np.uint64) << np.uint64(SEAT_SHIFT))  # noqa
+        cash = self.cash[games]
+        buckets = np.where(
+            cash > 0, 1 + np.searchsorted(_CASH_THRESHOLDS, cash, "right"), 0
+        )
+        keys[:, CASH_WORD] = _pack(buckets, CASH_BITS, self._players_count)[:, 0]  # noqa
+        return keys
+
+    def throw(self, count):
+        """
+        Throws the dice of count games, like Dice.make_throw.
+        :param count: The number of throws.
+        :return: Array of ints between 2 and 12.
+        """
+        return self._rng.integers(DICE_MIN, DICE_MAX + 1, count)
+
+    def draw_chances(self, count):
+        """
+        Draws the chance values of count games.
+        :param count: The number of chances.
+        :return: Array of chance values.
+        """
+        chances = self._board.chances
+        return chances[self._rng.integers(0, len(chances), count)]
+
+    def fee(self, games, fields):
+        """
+        Get the fee of fields, like Card.fee.
+        :param games: Array of game indices.
+        :param fields: Array of field indices, one per game.
+        :return: Array of fees.
+        """
+        board = self._board
+        levels = self.level[games, fields]
+        return board.fees[fields] * board.multipliers[levels]
+
+    def has_monopoly(self, games, seats, fields):
+        """
+        Check if the players own the whole color group of the fields,
+        the condition of Player.can_build_houses.
+        :param games: Array of game indices.
+        :param seats: Array of seats, one per game.
+        :param fields: Array of field indices, one per game.
+        :return: Boolean array.
+        """
+        board = self._board
+        groups = board.groups[fields]
+        owned = (self.owner[games] == seats[:, None]).astype(np.int64)
+        counts = owned @ board.group_members
+        buildable = groups >= 0
+        groups = np.where(buildable, groups, 0)
+        return buildable & (
+            counts[np.arange(len(games)), groups] == board.group_sizes[groups]
+        )
+
+    def features(self, games, seats, fields, columns=None):
+        """
+        Builds the feature matrix of decisions, see monopoly.batch.FEATURES.
+        :param games: Array of game indices.
+        :param seats: Array of the deciding seats.
+        :param fields: Array of the field indices.
+        :param columns: The features to build, all by default,
+        the others are 0.
+        :return: [decisions, FEATURES] float64 array.
+        """
+        board = self._board
+        count = len(games)
+        columns = set(columns if columns is not None
+                      else range(len(FEATURES)))
+        features = np.zeros((count, len(FEATURES)))
+        features[:, SEAT] = seats
+        features[:, CASH] = self.cash[games, seats]
+        features[:, PRICE] = board.prices[fields]
+        features[:, HOUSE_PRICE] = board.house_prices[fields]
+        features[:, LEVEL] = self.level[games, fields]
+        if FEE in columns:
+            features[:, FEE] = self.fee(games, fields)
+        if GROUP_OWNED in columns:
+            groups = board.groups[fields]
+            owned = (self.owner[games] == seats[:, None]).astype(np.int64)
+            counts = owned @ board.group_members
+            buildable = groups >= 0
+            groups = np.where(buildable, groups, 0)
+            features[:, GROUP_OWNED] = np.where(
+                buildable,
+                counts[np.arange(count), groups] / board.group_sizes[groups],
+                0,
+            )
+        if OPPONENTS_CASH in columns:
+            cash = np.maximum(self.cash[games], 0)
+            features[:, OPPONENTS_CASH] = (
+                cash.sum(axis=1) - cash[np.arange(count), seats]
+            )
+        if ROUND in columns:
+            features[:, ROUND] = self.round[games]
+        return features
+
+    def _decide(self, policy, games, seats, kinds, fields):
+        """
+        Answers decisions with a policy, a call for every kind.
+        """
+        actions = np.zeros(len(games), np.int64)
+        for kind in DECISION_KINDS:
+            chosen = kinds == kind
+            if not chosen.any():
+                continue
+            args = (games[chosen], seats[chosen], kinds[chosen],
+                    fields[chosen])
+            actions[chosen] = policy.decide(
+                kind,
+                self.features(games[chosen], seats[chosen], fields[chosen],
+                              policy.columns()),
+                self.effective_actions(*args)
+            )
+        return actions
+
+    def default_decisions(self, games, seats, kinds, fields):
+        """
+        Decisions of the policy of the bots, or of BotPolicy
+        with the reserve of each seat when the game has no policy.
+        :param games: Array of game indices.
+        :param seats: Array of the deciding seats.
+        :param kinds: Array of decision kinds (BUY, HOUSES, HOTEL).
+        :param fields: Array of the field indices.
+        :return: Array of actions: 1 to buy or build the hotel,
+        the number of houses for HOUSES, 0 to refuse.
+        """
+        if self._policy is not None:
+            return self._decide(self._policy, games, seats, kinds, fields)
+        board = self._board
+        cash = self.cash[games, seats] - self._reserves[seats]
+        house_prices = np.maximum(board.house_prices[fields], 1)
+        buy = (cash - board.prices[fields] > 0).astype(np.int64)
+        houses = np.clip(
+            (cash - 1) // house_prices, 0, 4 - self.level[games, fields]
+        )
+        hotel = (cash - house_prices > 0).astype(np.int64)
+        return np.where(
+            kinds == BUY, buy, np.where(kinds == HOUSES, houses, hotel)
+        )
+
+    def apply_decisions(self, games, seats, kinds, fields, actions):
+        """
+        Carries out decisions, like Player.buy_card, build_houses
+        and build_hotel. A decision the player can't afford is refused,
+        the number of houses is cut to the ones the player can pay for.
+        :param games: Array of game indices.
+        :param seats: Array of the deciding seats.
+        :param kinds: Array of decision kinds.
+        :param fields: Array of the field indices.
+        :param actions: Array of actions, see default_decisions.
+        """
+        board = self._board
+        cash = self.cash[games, seats]
+        prices = board.prices[fields]
+        house_prices = board.house_prices[fields]
+        levels = self.level[games, fields]
+        buy = (kinds == BUY) & (actions > 0) & (cash >= prices)
+        hotel = (kinds == HOTEL) & (actions > 0) & (cash >= house_prices)
+        houses = np.where(
+            kinds == HOUSES,
+            np.clip(actions, 0, 4 - levels),
+            0,
+        )
+        houses = np.minimum(houses, cash // np.maximum(house_prices, 1))
+        cost = buy * prices + hotel * house_prices + houses * house_prices
+        self.cash[games, seats] = cash - cost
+        self.owner[games[buy], fields[buy]] = seats[buy]
+        self.level[games, fields] = np.where(
+            hotel, HOTEL_LEVEL, levels + houses
+        )
+
+    def effective_actions(self, games, seats, kinds, fields):
+        """
+        Get the highest action that has an effect in decisions:
+        1 for an affordable card or hotel, the number of houses
+        that can be built and paid for.
+        :param games: Array of game indices.
+        :param seats: Array of the deciding seats.
+        :param kinds: Array of decision kinds.
+        :param fields: Array of the field indices.
+        :return: Array of the highest effective actions.
+        """
+        board = self._board
+        cash = self.cash[games, seats]
+        house_prices = np.maximum(board.house_prices[fields], 1)
+        buy = (cash >= board.prices[fields]).astype(np.int64)
+        levels = self.level[games, fields]
+        houses = np.minimum(4 - levels, cash // house_prices)
+        hotel = (cash >= house_prices).astype(np.int64)
+        return np.select(
+            [kinds == BUY, kinds == HOUSES, kinds == HOTEL],
+            [buy, np.maximum(houses, 0), hotel],
+            0,
+        )
+
+    def legal_actions(self, games):
+        """
+        Get the highest action that has an effect in the pending
+        decisions of the games, see effective_actions.
+        :param games: Array of game indices.
+        :return: Array of the highest effective actions, 0 when
+        there's nothing to decide.
+        """
+        return self.effective_actions(
+            games, self.seat[games], self.pending[games],
+            self.pending_field[games]
+        )
+
+    def _start_turns(self, games):
+        """
+        Ends the games that are over at the start of a round,
+        starts a new round in the others, like Game.play_game.
+        :return: The games that go on.
+        """
+        starting = self.seat[games] == 0
+        if not starting.any():
+            return games
+        starts = games[starting]
+        over = (
+            ((self.cash[starts] > 0).sum(axis=1) < 2)
+            | (self.round[starts] >= self._max_rounds)
+        )
+        self.done[starts[over]] = True
+        self.round[starts[~over]] += 1
+        going_on = np.ones(len(games), bool)
+        going_on[np.flatnonzero(starting)[over]] = False
+        return games[going_on]
+
+    def _end_turns(self, games):
+        """
+        Records the bankruptcy of the players that just moved,
+        like Game.check_if_player_lose_in_this_round,
+        and passes the turn to the next seat.
+        """
+        seats = self.seat[games]
+        lost = (self.cash[games, seats] <= 0) & (
+            self.eliminated[games, seats] < 0
+        )
+        lost_games = games[lost]
+        self.eliminated[lost_games, seats[lost]] = self.losers[lost_games]
+        self.losers[lost_games] += 1
+        self.done[lost_games[self._decision_seats[seats[lost]]]] = True
+        self.seat[games] = (seats + 1) % self._players_count
+
+    def play_turns(self, games):
+        """
+        Plays the turn of the current seat in every given game,
+        like Game.move_player. Pending decisions of decision_seats
+        stop the turn until decide() is called.
+        :param games: Array of indices of games that are neither
+        done nor waiting for a decision.
+        """
+        games = self._start_turns(games)
+        seats = self.seat[games]
+        moving = self.cash[games, seats] > 0
+        self._end_turns(games[~moving])
+        games = games[moving]
+        seats = seats[moving]
+        if len(games) == 0:
+            return
+        board = self._board
+        rules = board.rules()
+        positions = self.position[games, seats] + self.throw(len(games))
+        lap = positions >= PLANE_LENGTH
+        self.cash[games[lap], seats[lap]] += rules.lap_bonus()
+        positions[lap] -= PLANE_LENGTH
+        self.position[games, seats] = positions
+        fields = (positions - 1) % PLANE_LENGTH
+        owners = self.owner[games, fields]
+        kinds = board.kinds[fields]
+
+        rent = (owners >= 0) & (owners != seats)
+        fees = self.fee(games[rent], fields[rent])
+        self.cash[games[rent], seats[rent]] -= fees
+        self.cash[games[rent], owners[rent]] += fees
+
+        free = owners < 0
+        tax = free & (kinds == TAX)
+        self.cash[games[tax], seats[tax]] -= board.fees[fields[tax]]
+        chance = free & (kinds == CHANCE)
+        self.cash[games[chance], seats[chance]] -= self.draw_chances(
+            chance.sum()
+        )
+        start = free & (kinds == START)
+        self.cash[games[start], seats[start]] += rules.start_payout()
+
+        decisions = np.zeros(len(games), np.int64)
+        decisions[free & (kinds == FIELD)] = BUY
+        mine = owners == seats
+        levels = self.level[games, fields]
+        decisions[mine & (levels == 4)] = HOTEL
+        build = mine & (levels < 4)
+        if build.any():
+            build[build] = self.has_monopoly(
+                games[build], seats[build], fields[build]
+            )
+            decisions[build] = HOUSES
+
+        waiting = (decisions != NO_DECISION) & self._decision_seats[seats]
+        self.pending[games[waiting]] = decisions[waiting]
+        self.pending_field[games[waiting]] = fields[waiting]
+
+        bots = (decisions != NO_DECISION) & ~waiting
+        if bots.any():
+            args = (games[bots], seats[bots], decisions[bots], fields[bots])
+            self.apply_decisions(*args, self.default_decisions(*args))
+        self._end_turns(games[~waiting])
+
+    def decide(self, games, actions):
+        """
+        Answers the pending decisions of games and finishes their turns.
+        :param games: Array of indices of games waiting for a decision.
+        :param actions: Array of actions, see default_decisions.
+        """
+        seats = self.seat[games]
+        self.apply_decisions(
+            games, seats, self.pending[games], self.pending_field[games],
+            np.asarray(actions, np.int64)
+        )
+        self.pending[games] = NO_DECISION
+        self._end_turns(games)
+
+    def decide_pending(self, policy, games=None):
+        """
+        Answers the pending decisions of games with a policy,
+        a call of the policy for every kind of decision,
+        and finishes their turns.
+        :param policy: The BatchPolicy.
+        :param games: Indices of the games, all by default.
+        """
+        if games is None:
+            games = np.arange(self._games)
+        games = np.asarray(games, np.int64)
+        games = games[self.pending[games] != NO_DECISION]
+        if len(games) == 0:
+            return
+        self.decide(games, self._decide(
+            policy, games, self.seat[games], self.pending[games],
+            self.pending_field[games]
+        ))
+
+    def advance(self, games=None):
+        """
+        Plays turns until each of the games is over
+        or waiting for a decision.
+        :param games: Indices of the games, all by default.
+        """
+        if games is None:
+            games = np.arange(self._games)
+        games = np.asarray(games, np.int64)
+        while True:
+            games = games[~self.done[games] & (self.pending[games] == 0)]
+            if len(games) == 0:
+                return
+            self.play_turns(games)
@@ -0,0 +1,13 @@
+from monopoly.simulation import SimulationConfig, new_game
+
+
+def decision_game(seed=0, players_count=2):
+    game = new_game(seed, SimulationConfig(players_count, max_rounds=200))
+    game.play_a_round()
+    return game
+
+
+def free_card(game):
+    for card in game.plane().fields():
+        if card.type() == "FIELD" and card.owner() is None:
+            return card
@@ -0,0 +1,82 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from monopoly.batch import (  # noqa: E402
+    CASH, FEATURES, NETWORK_INPUTS, BatchPolicy, LinearPolicy, ReservePolicy,
+    network_inputs, random_mlp
+)
+from monopoly.vector import BUY, HOUSES, VectorGame  # noqa: E402
+
+
+class RecordingPolicy(BatchPolicy):
+    def __init__(self):
+        self.calls = []
+
+    def decide(self, kind, features, legal):
+        self.calls.append((kind, features, legal))
+        return legal
+
+
+def test_pending_decisions_are_grouped_by_kind():
+    engine = VectorGame(64, 3, decision_seats=[0], seed=4, max_rounds=60)
+    policy = RecordingPolicy()
+    decided = 0
+    while not engine.done.all():
+        engine.advance()
+        waiting = np.flatnonzero(engine.pending != 0)
+        if len(waiting) == 0:
+            break
+        cash = engine.cash[waiting, 0]
+        calls = len(policy.calls)
+        engine.decide_pending(policy)
+        step = policy.calls[calls:]
+        assert len({kind for kind, _, _ in step}) == len(step)
+        assert sum(len(features) for _, features, _ in step) == len(waiting)
+        assert sorted(np.concatenate(
+            [features[:, CASH] for _, features, _ in step]
+        )) == sorted(cash)
+        decided += len(waiting)
+    assert decided > 0
+    assert {kind for kind, _, _ in policy.calls} >= {BUY, HOUSES}
+
+
+def test_reserve_policy_is_the_default():
+    default = VectorGame(32, 3, max_rounds=80, reserves=[0, 2000000, 0],
+                         seed=9)
+    explicit = VectorGame(32, 3, max_rounds=80, seed=9,
+                          policy=ReservePolicy([0, 2000000, 0]))
+    default.advance()
+    explicit.advance()
+    assert (default.cash == explicit.cash).all()
+    assert (default.level == explicit.level).all()
+
+
+def test_linear_policy_bias_decides():
+    refusing = VectorGame(16, 3, max_rounds=40, seed=2,
+                          policy=LinearPolicy(np.zeros(NETWORK_INPUTS), -1))
+    refusing.advance()
+    assert (refusing.owner == -1).all()
+    buying = VectorGame(16, 3, max_rounds=40, seed=2,
+                        policy=LinearPolicy(np.zeros(NETWORK_INPUTS), 9))
+    buying.advance()
+    assert (buying.owner >= 0).any()
+    assert (buying.level > 0).any()
+
+
+def test_mlp_actions_are_legal():
+    policy = random_mlp((8, 8), seed=3)
+    rng = np.random.default_rng(0)
+    features = rng.uniform(0, 2000000, (50, len(FEATURES)))
+    legal = rng.integers(0, 5, 50)
+    actions = policy.decide(HOUSES, features, legal)
+    assert actions.shape == (50,)
+    assert ((actions >= 0) & (actions <= legal)).all()
+    inputs = network_inputs(BUY, features, 1000000)
+    assert inputs.shape == (50, NETWORK_INPUTS)
+    assert (inputs[:, -3:] == [1, 0, 0]).all()
+
+
+def test_batch_policy_needs_decide():
+    with pytest.raises(TypeError):
+        BatchPolicy()
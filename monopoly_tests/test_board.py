@@ -0,0 +1,84 @@
+import io
+
+from monopoly.board import BoardDisplay, cell_place, move_to
+from monopoly.display import GameStats
+from monopoly.plane import PLANE_LENGTH, Card, Plane, new_board
+from monopoly.player import Player
+
+
+def stats(round_number, players):
+    game_state = GameStats()
+    game_state.set_round(round_number)
+    for player in players:
+        game_state.set_player_stats(player)
+    return game_state
+
+
+def test_cells_go_around_the_square():
+    places = [cell_place(position) for position in range(1, PLANE_LENGTH + 1)]
+    assert len(set(places)) == PLANE_LENGTH
+    assert places[0] == (10, 10)
+    assert places[10] == (10, 0)
+    assert places[20] == (0, 0)
+    assert places[30] == (0, 10)
+    assert all(0 in place or 10 in place for place in places)
+
+
+def test_redraw_writes_only_the_changes():
+    plane = Plane(new_board())
+    players = [Player("Player 1"), Player("Player 2")]
+    terminal = io.StringIO()
+    display = BoardDisplay(plane, terminal)
+    display.refresh_game_round_stats(stats(1, players))
+    first = display.written()
+    assert "Istanb" in terminal.getvalue()
+
+    display.refresh_game_round_stats(stats(1, players))
+    assert display.written() == first
+
+    card = plane.get_field_from_position(2)
+    card.set_owner(players[1])
+    card.add_houses(2)
+    terminal.truncate(0)
+    terminal.seek(0)
+    display.show_fields([])
+    row, column = cell_place(2)
+    assert terminal.getvalue() == (
+        "\x1b7" + move_to(row * 2 + 2, column * 7 + 1) + "22    " + "\x1b8"
+    )
+
+
+def test_moves_rewrite_the_cells_and_the_stats():
+    plane = Plane([Card("Start", card_type="START")]
+                  + [Card(f"Field {number}", "grey", 1000, 100)
+                     for number in range(2, PLANE_LENGTH + 1)])
+    players = [Player("Player 1"), Player("Player 2")]
+    terminal = io.StringIO()
+    display = BoardDisplay(plane, terminal)
+    display.refresh_game_round_stats(stats(1, players))
+    assert "1 Player 1: position: 1" in terminal.getvalue()
+
+    players[0].set_position(5)
+    terminal.truncate(0)
+    terminal.seek(0)
+    display.refresh_game_round_stats(stats(2, players))
+    output = terminal.getvalue()
+    assert "  2   " in output
+    assert ". 1   " in output
+    assert "Round #: 2" in output
+    assert "Player 2" not in output
+    assert len(output) < 300
+
+
+def test_player_on_the_last_field_is_drawn():
+    plane = Plane(new_board())
+    players = [Player("Player 1"), Player("Player 2")]
+    players[1].set_position(0)
+    terminal = io.StringIO()
+    display = BoardDisplay(plane, terminal)
+    display.refresh_game_round_stats(stats(1, players))
+    assert plane.get_field_from_position(0).name() == "Dubai"
+    row, column = cell_place(PLANE_LENGTH)
+    assert move_to(row * 2 + 2, column * 7 + 1) + ". 2   " in (
+        terminal.getvalue()
+    )
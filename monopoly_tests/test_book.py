@@ -0,0 +1,105 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from monopoly.book import DecisionBook, book_key  # noqa: E402
+from monopoly.bot import BotPolicy  # noqa: E402
+from monopoly.search import MonteCarloSearch, SearchPolicy  # noqa: E402
+from monopoly.simulation import SimulationConfig, run_batch  # noqa: E402
+from monopoly.vector import BUY  # noqa: E402
+from monopoly_tests.decisions import decision_game, free_card  # noqa: E402
+
+
+def key(number):
+    return number.to_bytes(16, "little")
+
+
+def test_book_keeps_decisions(tmp_path):
+    path = str(tmp_path / "book.bin")
+    book = DecisionBook(path, capacity=64, tag="bot")
+    assert book.get(key(1)) is None
+    book.put(key(1), 3)
+    book.put(key(2), 0)
+    assert book.get(key(1)) == 3
+    assert book.get(key(2)) == 0
+    assert book.size() == 2
+    assert book.hit_rate() == 2 / 3
+    book.flush()
+    reopened = DecisionBook(path, tag="bot")
+    assert reopened.capacity() == 64
+    assert reopened.get(key(1)) == 3
+    stats = reopened.stats()
+    assert stats["total_hits"] == 2
+    assert stats["total_lookups"] == 3
+    with pytest.raises(ValueError):
+        DecisionBook(path, tag="other bot")
+
+
+def test_book_evicts_least_used(tmp_path):
+    book = DecisionBook(str(tmp_path / "book.bin"), capacity=4, ways=4)
+    book.put(key(0), 1)
+    for _ in range(3):
+        book.get(key(0))
+    for number in range(1, 20):
+        book.put(key(number), 0)
+    assert book.size() == 4
+    assert book.get(key(0)) == 1
+    assert book.get(key(1)) is None
+    assert book.get(key(19)) == 0
+
+
+def put_in_child(book, number):
+    book.put(key(number), number % 2)
+    return book.get(key(number))
+
+
+def test_book_shared_by_processes(tmp_path):
+    book = DecisionBook(str(tmp_path / "book.bin"), capacity=256)
+    assert pickle.loads(pickle.dumps(book)).path() == book.path()
+    with ProcessPoolExecutor(2) as pool:
+        results = list(pool.map(put_in_child, [book] * 10, range(10)))
+    assert results == [number % 2 for number in range(10)]
+    assert [book.get(key(number)) for number in range(10)] == results
+
+
+def test_book_key_is_coarse():
+    game = decision_game()
+    card = free_card(game)
+    first, second = game.players()
+    keys = book_key(game, card, first, BUY)
+    first._cash += 1
+    assert book_key(game, card, first, BUY) == keys
+    first._position, second._position = second.position(), first.position()
+    assert book_key(game, card, first, BUY) == keys
+    first._cash *= 3
+    assert book_key(game, card, first, BUY) != keys
+
+
+def test_search_skips_decisions_in_book(tmp_path):
+    book = DecisionBook(str(tmp_path / "book.bin"), capacity=1024)
+    search = MonteCarloSearch(rollouts=100, batch_size=50, horizon=5, seed=0,
+                              book=book)
+    game = decision_game()
+    card = free_card(game)
+    player = game.players()[0]
+    action = search.decide(game, card, player, BUY)
+    assert search.searches() == 1
+    fresh = MonteCarloSearch(rollouts=100, batch_size=50, horizon=5, seed=1,
+                             book=DecisionBook(book.path()))
+    assert fresh.decide(game, card, player, BUY) == action
+    assert fresh.searches() == 0
+    assert fresh.book().hit_rate() == 1.0
+
+
+def test_book_shared_by_simulation_workers(tmp_path):
+    book = DecisionBook(str(tmp_path / "book.bin"), capacity=4096)
+    search = MonteCarloSearch(rollouts=50, batch_size=50, horizon=5, seed=0,
+                              book=book)
+    config = SimulationConfig(
+        2, max_rounds=10, policies=[SearchPolicy(search), BotPolicy()]
+    )
+    run_batch(4, config, workers=2)
+    assert book.size() > 0
@@ -0,0 +1,81 @@
+import subprocess
+import sys
+
+import pytest
+
+from monopoly.cli import main, startup_time
+from monopoly.display import HeadlessDisplay
+from monopoly.input import Input
+from monopoly.transcript import record_game
+
+HEAVY_MODULES = ["numpy", "multiprocessing", "http.server", "asyncio"]
+
+
+class QuittingPlayers(Input):
+    def __init__(self, rounds):
+        self._menus = 0
+        self._rounds = rounds
+
+    def yes_or_no(self, prompt):
+        return "y"
+
+    def number(self, prompt, min, max):
+        if prompt.startswith("Welcome"):
+            return 2
+        if prompt.startswith("Enter the number of houses"):
+            return min
+        self._menus += 1
+        return 2 if self._menus > 2 * self._rounds else 0
+
+
+@pytest.mark.parametrize("command", ["play", "replay"])
+def test_light_commands_import_no_heavy_modules(command):
+    code = (
+        "import sys\n"
+        "from monopoly.cli import main\n"
+        "try:\n"
+        f"    main([{command!r}, '--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print([name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+    )
+    output = subprocess.run([sys.executable, "-c", code], check=True,
+                            capture_output=True, text=True).stdout
+    assert output.splitlines()[-1] == "[]"
+
+
+def test_replay_prints_the_end_of_the_game(tmp_path, capsys):
+    path = str(tmp_path / "session.jsonl")
+    recorded = record_game(path, HeadlessDisplay(), seed=7,
+                           input=QuittingPlayers(5))
+    replayed = main(["replay", path, "--quiet"])
+    assert replayed.current_round() == recorded.current_round()
+    assert "Winners:" in capsys.readouterr().out
+
+
+def test_simulate_into_a_store_and_analyze_it(tmp_path, capsys):
+    pytest.importorskip("numpy")
+    store = str(tmp_path / "store")
+    main(["simulate", "6", "--players", "2", "--rounds", "20",
+          "--workers", "1", "--store", store])
+    summary = main(["analyze", store])
+    output = capsys.readouterr().out
+    assert "Games: 6" in output
+    assert "Player 2 win rate" in output
+    assert list(summary.values())[0]["games"] == 6
+
+
+def test_startup_time_of_an_interpreter():
+    assert 0 < startup_time(["-c", "pass"], runs=2) < 10
+
+
+def test_simulate_as_a_job_continues_it(tmp_path, capsys):
+    job = str(tmp_path / "job")
+    arguments = ["simulate", "6", "--players", "2", "--rounds", "20",
+                 "--workers", "1", "--job", job]
+    first = main(arguments)
+    again = main(arguments)
+    assert "Games: 6" in capsys.readouterr().out
+    assert again.win_rates() == first.win_rates()
+    with pytest.raises(SystemExit):
+        main(arguments[:1] + ["7"] + arguments[2:])
@@ -0,0 +1,78 @@
+import socket
+import threading
+
+import pytest
+
+from monopoly.cluster import (
+    Coordinator, run_cluster, run_worker, send_message, receive_message
+)
+from monopoly.simulation import SimulationConfig, simulate
+
+
+CONFIG = SimulationConfig(players_count=2, max_rounds=60)
+
+
+def connect(coordinator):
+    return socket.create_connection(coordinator.address())
+
+
+def start_worker(coordinator):
+    thread = threading.Thread(target=run_worker,
+                              args=coordinator.address(), daemon=True)
+    thread.start()
+    return thread
+
+
+def test_cluster_matches_simulate():
+    result = run_cluster(10, CONFIG, workers=3, first_seed=4, chunk_size=3,
+                         timeout=60)
+    single = simulate(range(4, 14), CONFIG)
+    assert result.games() == 10
+    assert result.wins() == single.wins()
+    assert result.rounds().max() == single.rounds().max()
+
+
+def test_lost_worker_chunk_is_leased_again():
+    coordinator = Coordinator(6, CONFIG, chunk_size=2)
+    coordinator.start()
+    try:
+        with connect(coordinator) as lost:
+            send_message(lost, ("lease",))
+            reply = receive_message(lost)
+            assert reply[:4] == ("chunk", 0, 0, 2)
+        worker = start_worker(coordinator)
+        result = coordinator.wait(timeout=30)
+        worker.join(timeout=10)
+    finally:
+        coordinator.close()
+    assert result.games() == 6
+    assert coordinator.progress() == (3, 3)
+
+
+def test_expired_lease_and_duplicate_result():
+    coordinator = Coordinator(4, CONFIG, chunk_size=2, lease_timeout=0.1)
+    coordinator.start()
+    try:
+        with connect(coordinator) as slow:
+            send_message(slow, ("lease",))
+            assert receive_message(slow)[1] == 0
+            worker = start_worker(coordinator)
+            result = coordinator.wait(timeout=30)
+            send_message(slow, ("result", 0, simulate(range(0, 2), CONFIG)))
+            assert receive_message(slow) == ("ok",)
+            send_message(slow, ("lease",))
+            assert receive_message(slow) == ("done",)
+        worker.join(timeout=10)
+    finally:
+        coordinator.close()
+    assert result.games() == 4
+    assert coordinator.duplicates() == 1
+
+
+def test_wait_times_out():
+    coordinator = Coordinator(2, CONFIG)
+    try:
+        with pytest.raises(TimeoutError):
+            coordinator.wait(timeout=0.01)
+    finally:
+        coordinator.close()
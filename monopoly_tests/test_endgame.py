@@ -0,0 +1,94 @@
+import pytest
+
+from monopoly.bot import BotPolicy
+from monopoly.endgame import (
+    EndgameSolver, EndgameState, EndgamePolicy, endgame_state, is_endgame,
+    adjudicate
+)
+from monopoly.plane import DEFAULT_RULES, new_board
+from monopoly.simulation import SimulationConfig, new_game
+from monopoly.state import BUY, HOUSES, HOTEL_LEVEL
+
+
+def empty_state(cash=(15000000, 15000000), positions=(1, 1), seat=0):
+    return EndgameState(positions, cash, [-1] * 40, [0] * 40, seat)
+
+
+def test_state_is_a_key():
+    first = empty_state()
+    second = empty_state()
+    assert first == second
+    assert hash(first) == hash(second)
+    assert first.replace(seat=1) != first
+    assert first.replace(seat=1).seat == 1
+    assert first.seat == 0
+
+
+def test_finished_game_is_exact():
+    solver = EndgameSolver()
+    values, exact = solver.solve(empty_state(cash=(100, 0)))
+    assert values == (1.0, 0.0)
+    assert exact
+    values, exact = solver.solve(empty_state(cash=(0, 0)))
+    assert values == (0.0, 0.0)
+
+
+def test_forced_loss():
+    rules = DEFAULT_RULES.replace(chances=[100])
+    owners = [0 if card.is_property() else -1 for card in new_board(rules)]
+    state = EndgameState((1, 0), (15000000, 1), owners, [0] * 40, 1)
+    solver = EndgameSolver(rules, depth=1)
+    values, exact = solver.solve(state)
+    assert not exact
+    assert values[0] >= 10 / 11
+    assert values[1] <= 1 / 11
+    assert sum(values) == pytest.approx(1)
+
+
+def test_decisions():
+    solver = EndgameSolver(depth=1)
+    state = empty_state(positions=(3, 1))
+    assert solver.options(state, BUY, 1) == [0, 1]
+    assert solver.options(state.replace(cash=(100, 1)), BUY, 1) == [0]
+    assert solver.options(state.replace(cash=(500000, 1)), HOUSES, 1) == [
+        0, 1, 2
+    ]
+    values = solver.decision_values(state, BUY, 2)
+    assert set(values) == {0, 1}
+    assert solver.best_action(state, BUY, 2) in (0, 1)
+    levels = [0] * 40
+    levels[1] = HOTEL_LEVEL
+    owners = [-1] * 40
+    owners[1] = 0
+    rich = state.replace(owners=owners, levels=levels)
+    assert solver.solve(rich.replace(seat=1))[0][0] > solver.solve(
+        state.replace(seat=1)
+    )[0][0]
+
+
+def test_table_is_bounded():
+    solver = EndgameSolver(depth=3, table_size=50)
+    solver.solve(empty_state())
+    assert solver.table().size() == 50
+    assert solver.nodes() > 50
+
+
+def test_endgame_of_game():
+    game = new_game(0, SimulationConfig(2, max_rounds=50))
+    assert not is_endgame(game)
+    assert is_endgame(game, free_cards=40)
+    state = endgame_state(game)
+    assert state.cash == (15000000, 15000000)
+    probabilities, exact = adjudicate(game, EndgameSolver(depth=1))
+    assert set(probabilities) == set(game.players())
+    assert sum(probabilities.values()) == pytest.approx(1)
+    assert not exact
+
+
+def test_endgame_policy_plays_game():
+    policy = EndgamePolicy(EndgameSolver(depth=1), free_cards=40)
+    config = SimulationConfig(2, max_rounds=20, policies=[policy, BotPolicy()])
+    game = new_game(1, config)
+    game.play_game()
+    assert game.current_round() > 0
+    assert config.key().startswith("players=2;max_rounds=20;policies=Endgame")
@@ -0,0 +1,71 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from monopoly.env import (  # noqa: E402
+    VectorEnv, MonopolyEnv, ACTIONS_COUNT, MAX_RESTARTS, observation_size
+)
+
+
+def test_reset_observations():
+    env = VectorEnv(16, players_count=3, max_rounds=50, seed=0)
+    observations, info = env.reset()
+    assert observations.shape == (16, observation_size(3))
+    assert observations.dtype == np.float32
+    assert env.observation_shape() == observations.shape
+    mask = info["action_mask"]
+    assert mask.shape == (16, ACTIONS_COUNT)
+    assert mask[:, 0].all()
+    assert (env.engine().pending != 0).all()
+
+
+def test_steps_until_games_end():
+    env = VectorEnv(32, players_count=2, max_rounds=30, seed=1)
+    observations, info = env.reset()
+    finished = 0
+    for _ in range(200):
+        actions = (info["action_mask"] * np.arange(ACTIONS_COUNT)).max(axis=1)
+        observations, rewards, terminated, truncated, info = env.step(actions)
+        assert not (terminated & truncated).any()
+        assert (rewards[~terminated] == 0).all()
+        assert set(rewards[terminated]) <= {-1.0, 1.0}
+        if (terminated | truncated).any():
+            assert "final_observation" in info
+        finished += (terminated | truncated).sum()
+        assert (env.engine().pending != 0).all()
+    assert finished > 0
+
+
+def test_same_seed_same_observations():
+    first = VectorEnv(4, max_rounds=20)
+    second = VectorEnv(4, max_rounds=20)
+    assert (first.reset(seed=3)[0] == second.reset(seed=3)[0]).all()
+    actions = np.ones(4, np.int64)
+    assert (first.step(actions)[0] == second.step(actions)[0]).all()
+
+
+def test_single_env():
+    env = MonopolyEnv(players_count=2, max_rounds=20, seed=2)
+    observation, info = env.reset()
+    assert observation.shape == (observation_size(2),)
+    assert info["action_mask"].shape == (ACTIONS_COUNT,)
+    observation, reward, terminated, truncated, info = env.step(1)
+    assert observation.shape == (observation_size(2),)
+    assert isinstance(reward, float)
+    assert isinstance(terminated, bool)
+
+
+def test_games_that_never_reach_a_decision_raise():
+    with pytest.raises(ValueError):
+        VectorEnv(2, max_rounds=0)
+    env = VectorEnv(2, max_rounds=5, seed=0)
+    engine = env.engine()
+    tries = []
+
+    def end_at_once(games=None):
+        tries.append(games)
+        engine.done[games] = True
+    engine.advance = end_at_once
+    with pytest.raises(ValueError):
+        env.reset()
+    assert len(tries) == MAX_RESTARTS
@@ -0,0 +1,95 @@
+import random
+
+from monopoly.bot import BotPolicy, ParametricPolicy
+from monopoly.evolve import (
+    Evolution, ParameterSpace, evaluate_genome, seat_score
+)
+from monopoly.simulation import SimulationConfig, play_game
+
+
+def cash(policy, seed):
+    config = SimulationConfig(3, max_rounds=60, policies=[policy] * 3)
+    return [player.cash() for player in play_game(seed, config).players()]
+
+
+def test_default_parametric_policy_plays_like_bot_policy():
+    for seed in range(3):
+        assert cash(ParametricPolicy(500000), seed) == cash(
+            BotPolicy(500000), seed
+        )
+
+
+def test_parametric_policy_settings():
+    policy = ParametricPolicy(1000000, {"brown": 1.0}, {"grey": 0.0})
+    assert policy.buy_priority("brown") == 1.0
+    assert policy.buy_priority("grey") == 0.0
+    assert policy.aggressiveness("grey") == 0.0
+    assert policy.aggressiveness("brown") == 1.0
+    assert "brown=1" in policy.key()
+
+
+def test_parameter_space():
+    space = ParameterSpace()
+    names = space.names()
+    assert names[0] == "cash_reserve"
+    assert "buy_priority.transport" in names
+    assert "aggressiveness.transport" not in names
+    assert "aggressiveness.blue" in names
+    assert len(space.bounds()) == len(names)
+    genome = space.clip([-5, 2.0] + [0.12345] * (len(names) - 2))
+    assert genome[:3] == (0, 1.0, 0.123)
+    assert space.random_genome(random.Random(1)) == space.random_genome(
+        random.Random(1)
+    )
+    policy = space.policy(genome)
+    assert policy.cash_reserve() == 0
+    assert policy.buy_priority("brown") == 1.0
+
+
+def test_seat_score():
+    config = SimulationConfig(2, max_rounds=5)
+    game = play_game(0, config)
+    assert seat_score(game, 0) + seat_score(game, 1) == 1.0
+
+
+def evolution(checkpoint=None):
+    return Evolution(ParameterSpace(), population_size=6, elite=2, games=6,
+                     players_count=2, max_rounds=40, seed=3,
+                     checkpoint=checkpoint)
+
+
+def test_evolution_keeps_elite_and_reuses_fitness():
+    run = evolution()
+    best = []
+    for _ in range(3):
+        run.run_generation()
+        best.append(run.best()[1])
+    assert best == sorted(best)
+    assert run.generation() == 3
+    assert run.evaluations() < 3 * 6
+    run.evaluate()
+    assert all(run.fitness(genome) is not None for genome in run.population())
+    genome, fitness = run.best()
+    assert evaluate_genome(ParameterSpace(), genome, 0, 6, 2, 40) == fitness
+
+
+def test_evolution_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / "evolution.json")
+    uninterrupted = evolution()
+    for _ in range(3):
+        uninterrupted.run_generation()
+    first = evolution(path)
+    first.run_generation()
+    first.run_generation()
+    resumed = evolution(path)
+    assert resumed.generation() == 2
+    resumed.run_generation()
+    assert resumed.population() == uninterrupted.population()
+    assert resumed.best() == uninterrupted.best()
+
+
+def test_evolution_on_worker_pool():
+    run = evolution()
+    genome, fitness = run.run(2, workers=2)
+    assert run.generation() == 2
+    assert run.fitness(genome) == fitness
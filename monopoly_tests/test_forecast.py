@@ -0,0 +1,81 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from monopoly.display import GameStats  # noqa: E402
+from monopoly.forecast import Estimate, WinForecast, win_shares  # noqa: E402,E501
+from monopoly.simulation import SimulationConfig, new_game  # noqa: E402
+from monopoly.vector import VectorGame  # noqa: E402
+
+
+def test_estimate():
+    estimate = Estimate(2)
+    estimate.add(np.array([[1.0, 0.0], [0.0, 1.0], [1.0, 0.0], [1.0, 0.0]]))
+    assert estimate.count() == 4
+    (first, first_margin), (second, second_margin) = estimate.chances(1)
+    assert first == pytest.approx(0.75)
+    assert second == pytest.approx(0.25)
+    assert first_margin == pytest.approx(np.sqrt(0.1875 / 4))
+
+
+def test_forecast_annotates_round_stats():
+    game = new_game(0, SimulationConfig(3, max_rounds=20))
+    forecast = WinForecast(batch_size=64, horizon=10, wait=5.0, seed=0)
+    forecast.attach(game)
+    shown = []
+
+    class Recorder:
+        def on_round_end(self, game, round_stats):
+            shown.append([stat.win_chance() for stat in round_stats.player_stats()])  # noqa
+
+    game.add_listener(Recorder())
+    try:
+        for _ in range(3):
+            game.play_a_round()
+    finally:
+        forecast.stop()
+    assert len(shown) == 3
+    for chances in shown:
+        assert all(chance is not None for chance in chances)
+        assert sum(chance for chance, _ in chances) == pytest.approx(1)
+        assert all(margin >= 0 for _, margin in chances)
+
+
+def test_turn_end_restarts_rollouts():
+    game = new_game(1, SimulationConfig(2, max_rounds=20))
+    forecast = WinForecast(batch_size=32, horizon=5, max_rollouts=64, seed=0)
+    forecast.attach(game)
+    try:
+        first = forecast.estimate()
+        game.play_a_round()
+        assert forecast.estimate() is not first
+        stats = GameStats()
+        for player in game.players():
+            stats.set_player_stats(player)
+        forecast.on_round_end(game, stats)
+        assert forecast.estimate().count() <= 64
+    finally:
+        forecast.stop()
+    assert forecast._thread is None
+
+
+def test_win_shares_split_the_win_between_the_players_left():
+    engine = VectorGame(2, 3)
+    engine.cash[0] = [100, 0, 5000]
+    engine.cash[1] = [10, 20, 30000]
+    assert (win_shares(engine)[0] == [0.5, 0, 0.5]).all()
+    assert win_shares(engine)[1] == pytest.approx([1 / 3] * 3)
+
+
+def test_positions_with_other_rounds_left_keep_apart():
+    game = new_game(2, SimulationConfig(2, max_rounds=20))
+    forecast = WinForecast(batch_size=16, horizon=10, max_rollouts=16,
+                           seed=0)
+    forecast._restart(game, 0)
+    early = forecast.estimate()
+    game._current_round = 15
+    forecast._restart(game, 0)
+    assert forecast.estimate() is not early
+    game._current_round = 0
+    forecast._restart(game, 0)
+    assert forecast.estimate() is early
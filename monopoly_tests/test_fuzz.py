@@ -0,0 +1,56 @@
+import random
+
+from monopoly.fuzz import Choices, Fuzzer, run_case
+from monopoly.plane import PLANE_LENGTH
+from monopoly.player import Player
+
+
+def test_choices_continue_with_zeros():
+    choices = Choices([13, 4])
+    assert choices.randint(2, 12) == 4
+    assert choices.choice(["a", "b", "c"]) == "b"
+    assert choices.draw(5) == 0
+    assert choices.values() == [2, 1, 0]
+
+
+def test_rules_keep_the_invariants():
+    fuzzer = Fuzzer(steps=200)
+    assert fuzzer.run(20) is None
+    assert fuzzer.cases() == 20
+    assert fuzzer.turns() > 0
+
+
+def test_case_replays_from_its_values():
+    failure, _ = run_case(None, random.Random(121), affordable_only=False)
+    assert failure.kind() == "NotEnoughMoneyException"
+    replayed, _ = run_case(failure.values(), affordable_only=False)
+    assert replayed.kind() == failure.kind()
+    assert replayed.step() == failure.step()
+    assert replayed.values() == failure.values()
+
+
+def test_money_leak_is_found_and_shrunk(monkeypatch):
+    def pay_another_player(self, player, amount):
+        self._cash -= amount
+        player.earn(amount - 1)
+
+    monkeypatch.setattr(Player, "pay_another_player", pay_another_player)
+    failure = Fuzzer(steps=200).run(20)
+    assert failure.kind() == "money"
+    assert len(failure.values()) < 30
+    replayed, _ = run_case(failure.values(), steps=failure.step() + 1)
+    assert replayed.kind() == "money"
+
+
+def test_wrong_lap_is_found(monkeypatch):
+    def make_move(self, dice):
+        self._position += dice.make_throw()
+        if self._position > PLANE_LENGTH:
+            self.earn(self._rules.lap_bonus())
+            self._position -= PLANE_LENGTH
+        return self._position
+
+    monkeypatch.setattr(Player, "make_move", make_move)
+    failure = Fuzzer(steps=200).run(20)
+    assert failure.kind() == "position"
+    assert "at 40" in failure.message()
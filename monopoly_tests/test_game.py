@@ -1,6 +1,14 @@
-from monopoly.game import Game
+import random
+
+from monopoly.bot import BotInput
+from monopoly.game import (
+    FixedDice, Game, money_unit, pack_varint, unpack_varint
+)
 from monopoly.display import Display
 from monopoly.input import Input
+from monopoly.plane import DEFAULT_RULES, Plane, new_board
+from monopoly.simulation import HeadlessDisplay
+from monopoly.state import ZobristHash, game_state
 
 
 def test_constructor():
@@ -122,4 +130,188 @@ def test_field_list(monkeypatch):
     game._input = input
     monkeypatch.setattr(input, "ask_for_number_of_players", players_4)
     game.init_game()
-    assert len(game.field_list()) == 40
\ No newline at end of file
+    assert len(game.field_list()) == 40
+
+
+def game_snapshot(game):
+    return (
+        [(player.position(), player.cash(), list(player.cards()))
+         for player in game.players()],
+        [(card.owner(), card.houses(), card.hotel())
+         for card in game.plane().fields()],
+        list(game.losers()),
+        game.current_round(),
+    )
+
+
+class Snapshots:
+    def __init__(self):
+        self.snapshots = []
+
+    def on_turn_end(self, game, player):
+        self.snapshots.append(game_snapshot(game))
+
+
+def test_undo_and_redo_every_turn():
+    bot = BotInput(3)
+    game = Game(HeadlessDisplay(), bot, Plane(new_board()),
+                random.Random(4), max_rounds=150, history=True)
+    game.init_game()
+    bot.attach(game)
+    start = game_snapshot(game)
+    snapshots = Snapshots()
+    game.add_listener(snapshots)
+    game.play_game()
+    turns = len(snapshots.snapshots)
+    assert game.history_bytes() <= 7 * turns
+    assert game.can_redo() is False
+    for snapshot in reversed(snapshots.snapshots):
+        assert game_snapshot(game) == snapshot
+        assert game.undo() is True
+    assert game.undo() is False
+    assert game_snapshot(game)[:3] == start[:3]
+    for snapshot in snapshots.snapshots:
+        assert game.redo() is True
+        assert game_snapshot(game) == snapshot
+    assert game.redo() is False
+
+
+def test_varints_and_money_unit():
+    for value in [0, 1, -1, 63, -64, 64, 2000000, -2000000, 10 ** 15]:
+        data = b"." + pack_varint(value)
+        assert unpack_varint(data, 1) == (value, len(data))
+    assert len(pack_varint(-400)) == 2
+    plane = Plane(new_board())
+    unit = money_unit(plane, DEFAULT_RULES)
+    assert unit > 1
+    assert DEFAULT_RULES.lap_bonus() % unit == 0
+    assert all((card.price() or 0) % unit == 0 for card in plane.fields())
+    assert money_unit(plane, DEFAULT_RULES.replace(lap_bonus=0.5)) == 1
+
+
+def test_history_is_opt_in():
+    game = Game(HeadlessDisplay(), BotInput(2), Plane(new_board()),
+                random.Random(1))
+    game.init_game()
+    game._input.attach(game)
+    game.play_a_round()
+    assert game.history_bytes() == 0
+    assert game.can_undo() is False
+
+
+class MisclickInput(Input):
+    def __init__(self):
+        self.menu = [0, 0]
+        self.buy = ["y", "n", "n"]
+        self.take_back = ["y", "n", "n"]
+
+    def ask_for_number_of_players(self):
+        return 2
+
+    def choose_menu_option(self, menu_description, options):
+        return self.menu.pop(0)
+
+    def ask_player_to_buy_card(self, card, player):
+        return self.buy.pop(0)
+
+    def ask_to_take_back(self, card, player):
+        return self.take_back.pop(0)
+
+
+class TurnEvents:
+    def __init__(self):
+        self.events = []
+
+    def on_turn_end(self, game, player):
+        self.events.append(("turn", player.name()))
+
+    def on_undo(self, game, player):
+        self.events.append(("undo", player.name()))
+
+    def on_redo(self, game, player):
+        self.events.append(("redo", player.name()))
+
+
+def test_take_back_a_misclick():
+    input = MisclickInput()
+    game = Game(HeadlessDisplay(), input, Plane(new_board()),
+                random.Random(0), take_back=True)
+    game.init_game()
+    events = TurnEvents()
+    game.add_listener(events)
+    first, second = game.players()
+    game._dice = FixedDice(3)
+    game.play_a_round()
+    assert input.menu == []
+    assert input.buy == []
+    assert input.take_back == []
+    assert first.cards() == []
+    assert first.cash() == game.rules().starting_cash()
+    assert first.position() == 4
+    assert second.position() == 4
+    assert game.current_round() == 1
+    assert game.can_redo() is False
+    assert events.events == [("undo", first.name()), ("turn", first.name()),
+                             ("turn", second.name())]
+
+
+class IndecisiveInput(MisclickInput):
+    def __init__(self, take_backs):
+        self.take_backs = take_backs
+        self.asked = 0
+
+    def choose_menu_option(self, menu_description, options):
+        return 0
+
+    def ask_player_to_buy_card(self, card, player):
+        return "y"
+
+    def ask_to_take_back(self, card, player):
+        self.asked += 1
+        return "y" if self.asked <= self.take_backs else "n"
+
+
+def test_take_back_is_opt_in():
+    input = IndecisiveInput(0)
+    game = Game(HeadlessDisplay(), input, Plane(new_board()),
+                random.Random(0), history=True)
+    game.init_game()
+    game._dice = FixedDice(3)
+    game.play_a_round()
+    assert input.asked == 0
+    assert game.players()[0].cards() != []
+
+
+def test_take_back_many_times_in_a_loop():
+    input = IndecisiveInput(3000)
+    game = Game(HeadlessDisplay(), input, Plane(new_board()),
+                random.Random(0), take_back=True)
+    game.init_game()
+    first = game.players()[0]
+    game._dice = FixedDice(3)
+    game.play_a_round()
+    assert input.asked == 3001
+    assert len(first.cards()) == 1
+    assert first.position() == 4
+
+
+def test_undo_and_redo_keep_listeners_in_sync():
+    game = Game(HeadlessDisplay(), BotInput(3), Plane(new_board()),
+                random.Random(2), history=True)
+    game.init_game()
+    game._input.attach(game)
+    zobrist = ZobristHash(3)
+    zobrist.attach(game)
+    events = TurnEvents()
+    game.add_listener(events)
+    for _ in range(3):
+        game.play_a_round()
+    last = game.players()[-1]
+    assert zobrist.value() == zobrist.hash(game_state(game, 0))
+    events.events = []
+    assert game.undo() is True
+    assert events.events == [("undo", last.name())]
+    assert zobrist.value() == zobrist.hash(game_state(game, 2))
+    assert game.redo() is True
+    assert events.events == [("undo", last.name()), ("redo", last.name())]
+    assert zobrist.value() == zobrist.hash(game_state(game, 0))
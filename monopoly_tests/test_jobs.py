@@ -0,0 +1,68 @@
+import os
+import pickle
+
+import pytest
+
+from monopoly.jobs import Job, run_job, write_atomically
+from monopoly.simulation import SimulationConfig, run_batch
+
+
+CONFIG = SimulationConfig(players_count=3, max_rounds=80)
+
+
+def test_write_atomically(tmp_path):
+    path = str(tmp_path / "file.bin")
+    write_atomically(path, b"old")
+    write_atomically(path, b"new")
+    with open(path, "rb") as file:
+        assert file.read() == b"new"
+    assert os.listdir(tmp_path) == ["file.bin"]
+
+
+def test_interrupted_job_resumes_bit_identical(tmp_path):
+    path = str(tmp_path / "job")
+    expected = run_batch(11, CONFIG, first_seed=5, workers=2, chunk_size=2)
+    job = Job(path, 11, CONFIG, first_seed=5, chunk_size=2)
+    assert job.run(workers=2, max_chunks=2) is None
+    assert job.finished_chunks() == [0, 1]
+    resumed = Job(path, 11, CONFIG, first_seed=5, chunk_size=2)
+    assert resumed.finished_chunks() == [0, 1]
+    assert resumed.aggregate().games() == 4
+    assert resumed.run(workers=2, max_chunks=1) is None
+    result = run_job(path, 11, CONFIG, first_seed=5, workers=2,
+                     chunk_size=2)
+    assert result.games() == 11
+    assert pickle.dumps(result) == pickle.dumps(expected)
+    assert sorted(os.listdir(path)) == ["aggregate-6.pkl", "manifest.json"]
+    assert Job(path, 11, CONFIG, first_seed=5, chunk_size=2).is_done()
+
+
+def test_chunks_finished_out_of_order_wait_for_merge(tmp_path):
+    job = Job(str(tmp_path), 6, CONFIG, chunk_size=2)
+    job._save(1, run_batch(2, CONFIG, first_seed=2, workers=1))
+    assert job.finished_chunks() == [1]
+    assert job.aggregate().games() == 0
+    resumed = Job(str(tmp_path), 6, CONFIG, chunk_size=2)
+    result = resumed.run(workers=1)
+    assert pickle.dumps(result) == pickle.dumps(
+        run_batch(6, CONFIG, workers=1, chunk_size=2)
+    )
+
+
+def test_leftovers_of_a_crash_are_ignored(tmp_path):
+    job = Job(str(tmp_path), 4, CONFIG, chunk_size=2)
+    with open(tmp_path / "chunk-0.pkl", "wb") as file:
+        file.write(b"partial")
+    with open(tmp_path / "manifest.json.tmp", "wb") as file:
+        file.write(b"{")
+    result = job.run(workers=1)
+    assert result.games() == 4
+    assert "manifest.json.tmp" not in os.listdir(tmp_path)
+
+
+def test_other_job_in_directory(tmp_path):
+    Job(str(tmp_path), 4, CONFIG)
+    with pytest.raises(ValueError):
+        Job(str(tmp_path), 5, CONFIG)
+    with pytest.raises(ValueError):
+        Job(str(tmp_path), 4, SimulationConfig(players_count=2))
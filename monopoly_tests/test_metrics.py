@@ -0,0 +1,110 @@
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from monopoly.metrics import (
+    CONTENT_TYPE, GameMetrics, MetricsDumper, MetricsServer, Registry
+)
+from monopoly.simulation import SimulationConfig, play_game, run_batch
+
+
+CONFIG = SimulationConfig(players_count=3, max_rounds=60)
+
+
+def test_threads_update_their_own_shards():
+    registry = Registry()
+    counter = registry.counter("things", "Things.")
+    gauge = registry.gauge("level", "Level.")
+
+    def work():
+        for _ in range(1000):
+            counter.inc()
+            gauge.inc(2)
+        gauge.dec(1000)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value() == 4000
+    assert gauge.value() == 4000
+    assert registry.counter("things", "Things.") is counter
+    with pytest.raises(ValueError):
+        registry.gauge("things", "Things.")
+    text = registry.render()
+    assert "# TYPE things counter\n" in text
+    assert "things_total 4000\n" in text
+    assert "level 4000\n" in text
+    assert text.endswith("# EOF\n")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("size", "Sizes.", (1, 10))
+    for value in (0.5, 1, 5, 50):
+        histogram.observe(value)
+    other = Registry()
+    other.histogram("size", "Sizes.", (1, 10)).observe(7)
+    registry.merge(other.snapshot())
+    text = registry.render()
+    assert 'size_bucket{le="1"} 2\n' in text
+    assert 'size_bucket{le="10"} 4\n' in text
+    assert 'size_bucket{le="+Inf"} 5\n' in text
+    assert "size_sum 63.5\n" in text
+    assert "size_count 5\n" in text
+
+
+def test_game_metrics_listen_to_games():
+    metrics = GameMetrics()
+    games = [play_game(seed, CONFIG, [metrics]) for seed in range(3)]
+    snapshot = metrics.registry().snapshot()
+    assert snapshot["monopoly_games_started"] == [3]
+    assert snapshot["monopoly_games_finished"] == [3]
+    assert snapshot["monopoly_active_tables"] == [0]
+    assert snapshot["monopoly_rounds_per_game"][-1] == 3
+    assert snapshot["monopoly_rounds_per_game"][-2] == sum(
+        game.current_round() for game in games
+    )
+    assert snapshot["monopoly_bankruptcies"] == [
+        sum(len(game.losers()) for game in games)
+    ]
+    assert snapshot["monopoly_turn_latency_seconds"][-1] > 0
+
+
+def test_batch_merges_the_metrics_of_the_workers():
+    metrics = GameMetrics()
+    measured = run_batch(9, CONFIG, workers=2, chunk_size=2, metrics=metrics)
+    expected = run_batch(9, CONFIG, workers=2, chunk_size=2)
+    assert measured.games() == expected.games() == 9
+    assert measured.wins() == expected.wins()
+    snapshot = metrics.registry().snapshot()
+    assert snapshot["monopoly_games_finished"] == [9]
+    assert snapshot["monopoly_result_queue_depth"] == [0]
+    assert snapshot["monopoly_workers"] == [0]
+    assert snapshot["monopoly_worker_busy_seconds"][0] > 0
+
+
+def test_server_and_dumper(tmp_path):
+    metrics = GameMetrics()
+    play_game(0, CONFIG, [metrics])
+    server = MetricsServer(metrics.registry())
+    server.start()
+    try:
+        host, port = server.address()
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as reply:
+            assert reply.headers["Content-Type"] == CONTENT_TYPE
+            text = reply.read().decode()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://{host}:{port}/other")
+    finally:
+        server.close()
+    assert "monopoly_games_finished_total 1\n" in text
+    path = str(tmp_path / "metrics.txt")
+    dumper = MetricsDumper(metrics.registry(), path, interval=0.01)
+    dumper.start()
+    dumper.close()
+    with open(path) as file:
+        assert file.read() == metrics.registry().render()
@@ -0,0 +1,73 @@
+from monopoly.paired import (
+    Stream, RandomStreams, PairedResult, compare, compare_batch, seat_wins
+)
+from monopoly.simulation import SimulationConfig, new_game, play_game
+from monopoly.bot import BotPolicy
+from monopoly.plane import CHANCES
+import pytest
+
+
+def test_antithetic_stream_mirrors_values():
+    stream = Stream(5)
+    mirrored = Stream(5, antithetic=True)
+    for _ in range(20):
+        assert stream.randint(2, 12) + mirrored.randint(2, 12) == 14
+        assert CHANCES.index(stream.choice(CHANCES)) == (
+            9 - CHANCES.index(mirrored.choice(CHANCES))
+        )
+
+
+def test_seat_dice_do_not_depend_on_other_seats():
+    streams = RandomStreams(3)
+    two = new_game(3, SimulationConfig(players_count=2), streams=streams)
+    four = new_game(3, SimulationConfig(players_count=4), streams=streams)
+    for _ in range(10):
+        assert two.dice_for(two.players()[1]).make_throw() == (
+            four.dice_for(four.players()[1]).make_throw()
+        )
+
+
+def test_same_streams_same_game():
+    config = SimulationConfig(players_count=3, max_rounds=50)
+    first = play_game(0, config, streams=RandomStreams(8))
+    second = play_game(1, config, streams=RandomStreams(8))
+    assert [p.cash() for p in first.players()] == [
+        p.cash() for p in second.players()
+    ]
+
+
+def test_paired_result():
+    result = PairedResult()
+    result.add(1.0, 1.0)
+    result.add(0.0, 1.0)
+    result.add(1.0, 0.0)
+    result.add(0.0, 1.0)
+    assert result.mean_difference() == 0.25
+    low, high = result.interval()
+    assert low < 0.25 < high
+    assert result.is_significant() is False
+    other = PairedResult()
+    other.merge(result)
+    assert other.differences().count() == 4
+
+
+def test_compare_identical_variants():
+    config = SimulationConfig(players_count=2, max_rounds=50)
+    result = compare(range(5), config, config, seat_wins(0))
+    assert result.differences().count() == 5
+    assert result.mean_difference() == 0
+    assert result.differences().variance() == 0
+
+
+def test_compare_batch_matches_compare():
+    first = SimulationConfig(players_count=2, max_rounds=40)
+    policies = [BotPolicy(5000000), BotPolicy()]
+    second = SimulationConfig(2, 40, policies)
+    single = compare(range(6), first, second, seat_wins(0), antithetic=True)
+    batch = compare_batch(
+        6, first, second, seat_wins(0), antithetic=True, workers=2,
+        chunk_size=3
+    )
+    assert batch.differences().count() == 6
+    assert batch.second().mean() == pytest.approx(single.second().mean())
+    assert batch.mean_difference() == pytest.approx(single.mean_difference())
@@ -83,7 +83,11 @@ def test_if_plane_length_40():
 def test_plane_field_count():
     board = Plane()
     assert board._field_count == 40
-    assert board._fields == CARDS
+    assert [card.name() for card in board._fields] == [
+        card.name() for card in CARDS
+    ]
+    assert board._fields[1] is not CARDS[1]
+    assert Plane().fields()[1] is not board._fields[1]
 
 
 def test_position():
@@ -0,0 +1,107 @@
+import random
+import sys
+from types import SimpleNamespace
+
+from monopoly.game import Game
+from monopoly.input import Input, get_yes_or_no
+from monopoly.plane import Plane, new_board
+from monopoly.profiling import StackSampler, collapse, profile_batch
+from monopoly.simulation import (
+    HeadlessDisplay, SimulationConfig, play_game, run_batch
+)
+
+
+class StackInput(Input):
+    def __init__(self):
+        self.stacks = []
+
+    def ask_for_number_of_players(self):
+        return 2
+
+    def ask_player_to_buy_card(self, card, player):
+        self.stacks.append(collapse(sys._getframe()))
+        return "n"
+
+
+def test_stacks_are_annotated_by_phase():
+    input = StackInput()
+    game = Game(HeadlessDisplay(), input, Plane(new_board()),
+                random.Random(0))
+    game.init_game()
+    game.check_card(game.plane().fields()[1], game.players()[0])
+    phase, *frames = input.stacks[0].split(";")
+    assert phase == "landed_buyable_field"
+    assert frames[-3:-1] == [
+        "monopoly.game.Game.check_card",
+        "monopoly.game.Game.landed_buyable_field",
+    ]
+    assert frames[-1].endswith("StackInput.ask_player_to_buy_card")
+
+
+def test_phases_without_qualified_names_of_the_code():
+    game = Game(HeadlessDisplay())
+    outer = SimpleNamespace(
+        f_code=SimpleNamespace(co_name="check_card",
+                               co_varnames=("self", "card", "player")),
+        f_globals={"__name__": "monopoly.game"},
+        f_locals={"self": game}, f_back=None
+    )
+    inner = SimpleNamespace(
+        f_code=SimpleNamespace(co_name="show_message",
+                               co_varnames=("self", "msg")),
+        f_globals={"__name__": "monopoly.display"},
+        f_locals={"self": HeadlessDisplay()}, f_back=outer
+    )
+    assert collapse(outer) == "check_card;monopoly.game.Game.check_card"
+    assert collapse(inner) == (
+        "display;monopoly.game.Game.check_card;"
+        "monopoly.display.HeadlessDisplay.show_message"
+    )
+
+
+def test_keyboard_waits_are_left_out(monkeypatch):
+    stacks = []
+
+    def keyboard(prompt):
+        stacks.append(collapse(sys._getframe()))
+        return "y"
+
+    monkeypatch.setattr("builtins.input", keyboard)
+    assert get_yes_or_no("Buy? ") == "y"
+    assert stacks == [None]
+
+
+def test_sampler_samples_only_inside_sampling():
+    config = SimulationConfig(players_count=3, max_rounds=300)
+    sampler = StackSampler(interval=0.0005)
+    try:
+        play_game(0, config)
+        assert sampler.counts() == {}
+        with sampler.sampling():
+            for seed in range(20):
+                play_game(seed, config)
+    finally:
+        sampler.stop()
+    counts = sampler.counts()
+    assert sum(counts.values()) > 0
+    assert all(stack.split(";")[1].endswith(
+        "test_sampler_samples_only_inside_sampling") for stack in counts)
+
+
+def test_profile_batch_plays_the_same_games(tmp_path):
+    config = SimulationConfig(players_count=3, max_rounds=300)
+    aggregator, sampler = profile_batch(12, config, profile_games=8,
+                                        workers=2, chunk_size=4,
+                                        interval=0.0005)
+    expected = run_batch(12, config, workers=2, chunk_size=4)
+    assert aggregator.wins() == expected.wins()
+    assert aggregator.rounds().mean() == expected.rounds().mean()
+    path = str(tmp_path / "stacks.txt")
+    sampler.write(path)
+    with open(path) as file:
+        lines = file.read().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert "monopoly.profiling._simulate_range_profiled" in stack
@@ -0,0 +1,77 @@
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from monopoly.reach import (  # noqa: E402
+    ReachabilityTables, reachability_tables, transition_matrix,
+    expected_incoming_rent, landing_chances, field_position
+)
+from monopoly.simulation import SimulationConfig, new_game  # noqa: E402
+
+
+def test_transition_matrix():
+    matrix = transition_matrix()
+    assert np.allclose(matrix.sum(axis=1), 1)
+    assert matrix[1, 3] == pytest.approx(1 / 11)
+    assert matrix[1, 2] == 0
+    assert matrix[39, 1] == pytest.approx(1 / 11)
+    assert matrix[39, 11] == pytest.approx(1 / 11)
+
+
+def test_tables():
+    tables = ReachabilityTables(6)
+    assert tables.landing.shape == (40, 40, 6)
+    assert np.allclose(tables.landing.sum(axis=1), 1)
+    assert np.allclose(tables.reach[:, :, 0], tables.landing[:, :, 0])
+    assert (tables.reach <= tables.expected + 1e-12).all()
+    assert (np.diff(tables.reach, axis=2) >= -1e-12).all()
+    assert tables.reach[0, 5, 1] == pytest.approx(
+        1 / 11 + sum(1 / 121 for throw in range(2, 4))
+    )
+    with pytest.raises(ValueError):
+        tables.column(7)
+
+
+def test_tables_match_simulation():
+    tables = reachability_tables(4)
+    rng = random.Random(0)
+    games = 20000
+    landed = np.zeros(40)
+    for _ in range(games):
+        position = 7
+        seen = set()
+        for _ in range(4):
+            position = (position + rng.randint(2, 12)) % 40
+            seen.add(position)
+        landed[list(seen)] += 1
+    assert np.abs(landed / games - tables.reach[7, :, 3]).max() < 0.015
+
+
+def test_tables_are_cached():
+    assert reachability_tables(3) is reachability_tables(3)
+
+
+def test_expected_incoming_rent():
+    game = new_game(0, SimulationConfig(3, max_rounds=100))
+    first, second, third = game.players()
+    fields = game.plane().fields()
+    first.buy_card(fields[5])
+    second.buy_card(fields[9])
+    rents = expected_incoming_rent(game, 3)
+    assert set(rents) == {fields[5], fields[9]}
+    tables = reachability_tables()
+    landings = (tables.expected[1, field_position(5), 2] * 2)
+    assert rents[fields[5]] == pytest.approx(landings * fields[5].fee())
+    assert set(expected_incoming_rent(game, 3, second)) == {fields[9]}
+    third._cash = 0
+    rents = expected_incoming_rent(game, 3)
+    assert rents[fields[5]] == pytest.approx(landings / 2 * fields[5].fee())
+
+
+def test_landing_chances():
+    game = new_game(0, SimulationConfig(2, max_rounds=100))
+    chances = landing_chances(game, game.players()[0], 1)
+    fields = game.plane().fields()
+    assert chances[fields[2]] == pytest.approx(1 / 11)
+    assert chances[fields[1]] == 0
@@ -0,0 +1,122 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from monopoly.bot import BotPolicy  # noqa: E402
+from monopoly.search import (  # noqa: E402
+    MonteCarloSearch, SearchPolicy, SearchRoot, allocate, search_root
+)
+from monopoly.simulation import SimulationConfig, new_game  # noqa: E402
+from monopoly.vector import BUY, HOUSES  # noqa: E402
+from monopoly_tests.decisions import decision_game, free_card  # noqa: E402
+
+
+def test_allocate():
+    shares = allocate(np.zeros(3, np.int64), np.zeros(3), 100, 0.7)
+    assert list(shares) == [34, 33, 33]
+    counts = np.array([100, 100])
+    shares = allocate(counts, np.array([90.0, 10.0]), 100, 0.7)
+    assert shares.sum() == 100
+    assert shares[0] > shares[1]
+
+
+def test_search_root_actions():
+    game = decision_game()
+    player = game.players()[0]
+    card = free_card(game)
+    root = SearchRoot(game, card, player, BUY)
+    assert root.actions() == [0, 1]
+    assert root.state.cash[0] == player.cash()
+    player._cash = card.price() - 1
+    assert SearchRoot(game, card, player, BUY).actions() == [0]
+    player._cash = 3 * card.house_price()
+    assert SearchRoot(game, card, player, HOUSES).actions() == [0, 1, 2, 3]
+
+
+def test_search_root_plays_rollouts():
+    game = decision_game()
+    root = SearchRoot(game, free_card(game), game.players()[0], BUY)
+    counts, totals = search_root(root, [0, 1], 200, 100, 5, 0, 0.7, 10.0,
+                                 seed=1)
+    assert counts.sum() == 200
+    assert (totals >= 0).all() and (totals <= counts).all()
+
+
+def test_search_uses_cache():
+    game = decision_game()
+    search = MonteCarloSearch(rollouts=100, batch_size=50, horizon=5, seed=0)
+    card = free_card(game)
+    player = game.players()[0]
+    actions, counts, _ = search.search(SearchRoot(game, card, player, BUY))
+    assert actions == [0, 1]
+    assert counts.sum() == 100
+    assert search.searches() == 1
+    assert search.decide(game, card, player, BUY) in actions
+    assert search.searches() == 1
+    assert search.cache().hit_rate() == 0.5
+
+
+def test_clone_searches_like_the_search_without_changing_it():
+    game = decision_game()
+    search = MonteCarloSearch(rollouts=100, batch_size=50, horizon=5, seed=0)
+    card = free_card(game)
+    player = game.players()[0]
+    root = SearchRoot(game, card, player, BUY)
+    clone = SearchPolicy(search).clone().search()
+    _, cloned, _ = clone.search(root)
+    assert search.searches() == 0
+    assert search.cache().size() == 0
+    _, counts, _ = search.search(root)
+    assert (counts == cloned).all()
+
+
+def test_time_budget_stops_search():
+    game = decision_game()
+    search = MonteCarloSearch(rollouts=10 ** 9, batch_size=50, horizon=5,
+                              time_budget=0.0)
+    root = SearchRoot(game, free_card(game), game.players()[0], BUY)
+    _, counts, _ = search.search(root)
+    assert counts.sum() == 50
+
+
+def test_root_parallel_search():
+    game = decision_game()
+    search = MonteCarloSearch(rollouts=200, batch_size=50, horizon=5,
+                              workers=2, seed=0)
+    try:
+        root = SearchRoot(game, free_card(game), game.players()[0], BUY)
+        _, counts, _ = search.search(root)
+    finally:
+        search.close()
+    assert counts.sum() == 200
+
+
+def test_search_policy_plays_game():
+    search = MonteCarloSearch(rollouts=100, batch_size=50, horizon=5, seed=0)
+    config = SimulationConfig(
+        2, max_rounds=30, policies=[SearchPolicy(search), BotPolicy()]
+    )
+    game = new_game(3, config)
+    game.play_game()
+    assert search.searches() > 0
+    assert config.key().startswith("players=2;max_rounds=30;policies=Search")
+
+
+def test_cash_in_one_bucket_keeps_the_actions_apart():
+    game = decision_game()
+    player = game.players()[0]
+    istanbul, ankara = game.plane().fields()[1], game.plane().fields()[3]
+    for card in (istanbul, ankara):
+        card.set_owner(player)
+    search = MonteCarloSearch(rollouts=100, batch_size=50, horizon=5, seed=0)
+    player._cash = 4 * istanbul.house_price()
+    rich = SearchRoot(game, istanbul, player, HOUSES)
+    player._cash -= 1
+    poorer = SearchRoot(game, istanbul, player, HOUSES)
+    assert rich.actions() == [0, 1, 2, 3, 4]
+    assert poorer.actions() == [0, 1, 2, 3]
+    assert rich.key() != poorer.key()
+    for root in (rich, poorer, rich, poorer):
+        actions, counts, totals = search.search(root)
+        assert len(counts) == len(totals) == len(actions)
+    assert search.searches() == 2
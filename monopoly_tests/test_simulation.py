@@ -0,0 +1,113 @@
+import copy
+import random
+
+from monopoly.simulation import (
+    SimulationConfig, new_game, play_game, run_batch, run_threaded,
+    simulate, seed_chunks
+)
+from monopoly.bot import BotPolicy
+from monopoly.display import HeadlessDisplay
+from monopoly.game import Dice, Game
+from monopoly.plane import Card, CARDS
+from monopoly.player import Player
+
+
+def test_new_game_has_own_board():
+    game = new_game(0, SimulationConfig(players_count=3))
+    assert len(game.players()) == 3
+    assert game.plane().fields() is not CARDS
+    assert len(game.plane().fields()) == 40
+
+
+def test_same_seed_same_game():
+    config = SimulationConfig(players_count=3, max_rounds=100)
+    first = play_game(7, config)
+    second = play_game(7, config)
+    assert first.current_round() == second.current_round()
+    assert [p.cash() for p in first.players()] == [
+        p.cash() for p in second.players()
+    ]
+
+
+def test_game_stops_at_max_rounds():
+    policies = [BotPolicy(cash_reserve=10 ** 12)] * 2
+    config = SimulationConfig(2, max_rounds=5, policies=policies)
+    game = play_game(0, config)
+    assert game.current_round() == 5
+    assert len(game.find_winners()) == 2
+    for card in game.plane().fields():
+        assert card.owner() is None
+
+
+def test_bot_policy_keeps_reserve():
+    policy = BotPolicy(cash_reserve=14000000)
+    player = Player("Jurek")
+    cheap = Card("Istanbul", "brown", 350000, 35000)
+    expensive = Card("Dubai", "blue", 3250000, 325000)
+    assert policy.wants_card(None, cheap, player) is True
+    assert policy.wants_card(None, expensive, player) is False
+    assert policy.houses_to_build(None, cheap, player) == 4
+    assert policy.houses_to_build(None, expensive, player) == 0
+
+
+def test_seed_chunks():
+    assert seed_chunks(10, 25, 10) == [(10, 10), (20, 10), (30, 5)]
+
+
+def test_run_batch_matches_simulate():
+    config = SimulationConfig(players_count=2, max_rounds=100)
+    batch = run_batch(6, config, first_seed=3, workers=2, chunk_size=2)
+    single = simulate(range(3, 9), config)
+    assert batch.games() == 6
+    assert batch.wins() == single.wins()
+    assert batch.rounds().max() == single.rounds().max()
+
+
+def test_run_threaded_matches_run_batch():
+    config = SimulationConfig(players_count=3, max_rounds=150)
+    threaded = run_threaded(24, config, first_seed=5, workers=8,
+                            chunk_size=3)
+    batch = run_batch(24, config, first_seed=5, workers=2, chunk_size=3)
+    assert threaded.games() == 24
+    assert threaded.wins() == batch.wins()
+    assert threaded.bankruptcies() == batch.bankruptcies()
+    assert threaded.rounds().mean() == batch.rounds().mean()
+
+
+class AlternatingPolicy(BotPolicy):
+    def __init__(self):
+        super().__init__()
+        self.decisions = 0
+
+    def clone(self):
+        return copy.copy(self)
+
+    def wants_card(self, game, card, player):
+        self.decisions += 1
+        return self.decisions % 2 == 1 and super().wants_card(
+            game, card, player
+        )
+
+
+def test_run_threaded_clones_stateful_policies():
+    policy = AlternatingPolicy()
+    config = SimulationConfig(players_count=3, max_rounds=100,
+                              policies=[policy, policy, BotPolicy()])
+    batch = run_batch(12, config, first_seed=2, workers=2, chunk_size=2)
+    for _ in range(2):
+        threaded = run_threaded(12, config, first_seed=2, workers=6,
+                                chunk_size=2)
+        assert threaded.wins() == batch.wins()
+        assert vars(threaded.final_cash()) == vars(batch.final_cash())
+        assert ([vars(stats) for stats in threaded.field_rent()]
+                == [vars(stats) for stats in batch.field_rent()])
+    assert policy.decisions == 0
+
+
+def test_games_share_no_random_state():
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    Game(HeadlessDisplay()).dice_for(None).make_throw()
+    Dice().make_throw()
+    assert random.random() == expected
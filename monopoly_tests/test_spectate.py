@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+from monopoly.simulation import SimulationConfig, new_game
+from monopoly.spectate import SpectatorHub, play_watched, serve_spectators
+
+
+CONFIG = SimulationConfig(players_count=3, max_rounds=40)
+
+
+async def read_all(subscription):
+    return [data async for data in subscription]
+
+
+def test_every_spectator_gets_the_same_serialized_events():
+    async def watch():
+        hub = SpectatorHub(queue_size=100000)
+        subscriptions = [hub.subscribe() for _ in range(3)]
+        readers = [asyncio.create_task(read_all(subscription))
+                   for subscription in subscriptions]
+        game = await play_watched(new_game(7, CONFIG), hub)
+        return hub, game, await asyncio.gather(*readers)
+
+    hub, game, streams = asyncio.run(watch())
+    assert len(streams[0]) == hub.published()
+    for stream in streams[1:]:
+        assert all(data is first for data, first in zip(stream, streams[0]))
+    messages = [json.loads(data) for data in streams[0]]
+    assert {message["type"] for message in messages} >= {
+        "move", "buy", "rent", "round", "end"
+    }
+    rounds = [message for message in messages if message["type"] == "round"]
+    assert rounds[-1]["round"] == game.current_round()
+    assert messages[-1] == {
+        "type": "end",
+        "winners": [player.name() for player in game.find_winners()],
+    }
+
+
+def test_slow_spectator_gets_coalesced_state():
+    async def watch():
+        hub = SpectatorHub(queue_size=5)
+        subscription = hub.subscribe()
+        game = await play_watched(new_game(7, CONFIG), hub)
+        return hub, game, subscription, await read_all(subscription)
+
+    hub, game, subscription, stream = asyncio.run(watch())
+    assert len(stream) == 6
+    assert subscription.coalesced() == hub.published() - 5
+    state = json.loads(stream[-1])
+    assert state["type"] == "state"
+    assert state["round"] == game.current_round()
+    for player in game.players():
+        assert state["players"][player.name()] == {
+            "position": player.position(), "cash": player.cash()
+        }
+    assert state["winners"] == [
+        player.name() for player in game.find_winners()
+    ]
+
+
+def test_spectators_watch_over_tcp():
+    async def watch():
+        hub = SpectatorHub()
+        server = await serve_spectators(hub)
+        host, port = server.sockets[0].getsockname()[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        while hub.subscriptions() == 0:
+            await asyncio.sleep(0.01)
+        await play_watched(new_game(3, CONFIG), hub)
+        lines = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            lines.append(json.loads(line))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return lines
+
+    lines = asyncio.run(watch())
+    assert lines[0]["type"] == "move"
+    assert lines[-1]["type"] in ("end", "state")
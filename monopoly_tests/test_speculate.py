@@ -0,0 +1,125 @@
+import copy
+import random
+import time
+
+from monopoly.bot import BotPolicy
+from monopoly.game import Game
+from monopoly.input import Input
+from monopoly.plane import Plane, new_board
+from monopoly.simulation import HeadlessDisplay
+from monopoly.speculate import (
+    SpeculativeInput, FixedDice, decision_key, pending_decision, apply_answer
+)
+from monopoly.state import BUY, HOUSES
+
+
+class ThinkingHuman(Input):
+    def __init__(self, seed, think=0.0):
+        self._rng = random.Random(seed)
+        self._think = think
+
+    def _answer(self):
+        time.sleep(self._think)
+        return self._rng.choice(["y", "n"])
+
+    def ask_player_to_buy_card(self, card, player):
+        if player.cash() < card.price():
+            return "n"
+        return self._answer()
+
+    def ask_player_to_buy_houses(self, card, player):
+        if player.cash() < card.house_price() * card.possible_num_houses():
+            return "n"
+        return self._answer()
+
+    def ask_number_houses(self, card, player):
+        return card.possible_num_houses()
+
+    def ask_player_to_buy_hotel(self, card, player):
+        if player.cash() < card.house_price():
+            return "n"
+        return self._answer()
+
+    def choose_menu_option(self, menu_description, options):
+        time.sleep(self._think)
+        return 0
+
+
+class AlternatingPolicy(BotPolicy):
+    def __init__(self):
+        super().__init__()
+        self.decisions = 0
+
+    def clone(self):
+        return copy.copy(self)
+
+    def wants_card(self, game, card, player):
+        self.decisions += 1
+        return self.decisions % 2 == 1 and super().wants_card(
+            game, card, player
+        )
+
+
+def play(seed, speculate, think=0.0, policy=None):
+    bot_input = SpeculativeInput(
+        [None, policy if policy is not None else BotPolicy()],
+        ThinkingHuman(seed, think), workers=3
+    )
+    if not speculate:
+        bot_input._speculate = lambda answers: None
+    game = Game(HeadlessDisplay(), bot_input, Plane(new_board()),
+                random.Random(seed), 20)
+    game.init_game()
+    bot_input.attach(game)
+    try:
+        game.play_game()
+    finally:
+        bot_input.close()
+    return game, bot_input
+
+
+def test_speculation_keeps_decisions():
+    for seed in range(2):
+        game, speculative = play(seed, True, 0.05)
+        plain, _ = play(seed, False)
+        assert [p.cash() for p in game.players()] == [
+            p.cash() for p in plain.players()
+        ]
+        assert [card.owner() is None for card in game.plane().fields()] == [
+            card.owner() is None for card in plain.plane().fields()
+        ]
+        assert speculative.hit_rate() > 0
+
+
+def test_speculation_keeps_the_state_of_a_policy():
+    game, speculative = play(3, True, 0.05, AlternatingPolicy())
+    plain, plain_input = play(3, False, policy=AlternatingPolicy())
+    assert [p.cash() for p in game.players()] == [
+        p.cash() for p in plain.players()
+    ]
+    assert speculative.hit_rate() > 0
+    bot = game.players()[1]
+    assert (speculative.policy(bot).decisions
+            == plain_input.policy(plain.players()[1]).decisions)
+
+
+def test_pending_decision_and_keys():
+    game = Game(HeadlessDisplay(), ThinkingHuman(0), Plane(new_board()))
+    game._players_count = 2
+    game.init_players()
+    first, second = game.players()
+    fields = game.plane().fields()
+    assert pending_decision(fields[1], first) == BUY
+    assert pending_decision(fields[0], first) is None
+    assert apply_answer(game, 1, 0, BUY, 1)
+    assert apply_answer(game, 3, 0, BUY, 1)
+    assert pending_decision(fields[1], second) is None
+    assert pending_decision(fields[1], first) == HOUSES
+    copy = game.copy()
+    assert decision_key(copy, copy.plane().fields()[1], copy.players()[0],
+                        HOUSES) == decision_key(game, fields[1], first, HOUSES)
+    copy.players()[1].make_move(FixedDice(5))
+    assert decision_key(copy, copy.plane().fields()[1], copy.players()[0],
+                        HOUSES) != decision_key(game, fields[1], first, HOUSES)
+    first._cash = 0
+    assert not apply_answer(game, 5, 0, BUY, 1)
@@ -0,0 +1,124 @@
+import pytest
+
+from monopoly.simulation import SimulationConfig, new_game
+from monopoly.state import (
+    GameState, TranspositionCache, ZobristHash, encode, decode, game_state,
+    cash_bucket, bucket_cash, KEY_BYTES
+)
+
+
+def played_game(seed, rounds, players_count=4):
+    game = new_game(seed, SimulationConfig(players_count, max_rounds=rounds))
+    game.play_game()
+    return game
+
+
+def test_cash_buckets():
+    assert cash_bucket(-5) == 0
+    assert cash_bucket(0) == 0
+    assert cash_bucket(99999) == 1
+    assert cash_bucket(100000) == 2
+    assert cash_bucket(200000) == 10
+    for cash in (1, 100000, 12345678, 15000000, 10 ** 12):
+        bucket = cash_bucket(cash)
+        assert bucket_cash(bucket) <= cash
+        assert cash_bucket(bucket_cash(bucket)) == bucket
+    assert cash_bucket(10 ** 20) == 255
+
+
+def test_encode_decode():
+    owners = [-1] * 40
+    owners[1] = 2
+    owners[39] = 7
+    levels = [0] * 40
+    levels[1] = 5
+    levels[39] = 3
+    state = GameState([1, 0, 39] + [5] * 5, [15000000, 0, -3] + [1] * 5,
+                      owners, levels, 6)
+    key = encode(state)
+    assert len(key) == KEY_BYTES
+    decoded = decode(key, 8)
+    assert decoded.positions == state.positions
+    assert decoded.owners == owners
+    assert decoded.levels == levels
+    assert decoded.seat == 6
+    assert decoded.cash[1:3] == [0, 0]
+    assert encode(decoded) == key
+
+
+def test_similar_cash_shares_key():
+    game = played_game(3, 20)
+    state = game_state(game)
+    key = encode(state)
+    state.cash = [cash + 1 for cash in state.cash]
+    assert encode(state) == key
+
+
+def test_game_state():
+    game = played_game(1, 30)
+    state = game_state(game, 2)
+    players = game.players()
+    assert state.positions == [player.position() for player in players]
+    for field, card in enumerate(game.plane().fields()):
+        if card.owner() is None:
+            assert state.owners[field] == -1
+        else:
+            assert players[state.owners[field]] is card.owner()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_zobrist_matches_full_hash(seed):
+    game = new_game(seed, SimulationConfig(3, max_rounds=150))
+    zobrist = ZobristHash(3, seed=7)
+    zobrist.attach(game)
+    checked = []
+
+    class Checker:
+        def on_turn_end(self, game, player):
+            seat = (game.players().index(player) + 1) % 3
+            full = zobrist.hash(game_state(game, seat))
+            assert zobrist.value() == full
+            checked.append(full)
+
+    game.add_listener(Checker())
+    game.play_game()
+    assert len(checked) > 3
+    assert len(set(checked)) > 1
+
+
+def test_zobrist_depends_on_seed():
+    state = game_state(played_game(0, 10))
+    assert ZobristHash(4, 1).hash(state) != ZobristHash(4, 2).hash(state)
+    assert ZobristHash(4, 1).hash(state) == ZobristHash(4, 1).hash(state)
+
+
+def test_vector_keys_match_encode():
+    np = pytest.importorskip("numpy")
+    from monopoly.vector import VectorGame
+    games = [played_game(seed, 40, 3) for seed in range(4)]
+    engine = VectorGame(len(games), 3)
+    for idx, game in enumerate(games):
+        state = game_state(game, idx % 3)
+        engine.position[idx] = state.positions
+        engine.cash[idx] = state.cash
+        engine.owner[idx] = state.owners
+        engine.level[idx] = state.levels
+        engine.seat[idx] = state.seat
+    keys = engine.keys()
+    assert keys.dtype == np.uint64
+    for idx, game in enumerate(games):
+        assert keys[idx].tobytes() == encode(game_state(game, idx % 3))
+    assert engine.keys(np.array([2]))[0].tobytes() == keys[2].tobytes()
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TranspositionCache(2)
+    cache.put(b"a", 1)
+    cache.put(b"b", 2)
+    assert cache.get(b"a") == 1
+    cache.put(b"c", 3)
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") == 1
+    assert cache.get(b"c") == 3
+    assert cache.size() == 2
+    assert cache.hit_rate() == 0.75
@@ -0,0 +1,113 @@
+from monopoly.stats import (
+    RunningStats, Histogram, QuantileSketch, GameAggregator
+)
+from monopoly.simulation import SimulationConfig, play_game, simulate
+import statistics
+import pytest
+
+
+def test_running_stats():
+    values = [3, 1, 4, 1, 5, 9, 2, 6]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert stats.count() == 8
+    assert stats.mean() == pytest.approx(statistics.mean(values))
+    assert stats.variance() == pytest.approx(statistics.variance(values))
+    assert stats.min() == 1
+    assert stats.max() == 9
+
+
+def test_running_stats_merge():
+    values = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3]
+    first = RunningStats()
+    second = RunningStats()
+    for value in values[:3]:
+        first.add(value)
+    for value in values[3:]:
+        second.add(value)
+    first.merge(second)
+    first.merge(RunningStats())
+    assert first.count() == 10
+    assert first.mean() == pytest.approx(statistics.mean(values))
+    assert first.variance() == pytest.approx(statistics.variance(values))
+    assert first.min() == 1
+    assert first.max() == 9
+
+
+def test_histogram():
+    histogram = Histogram(0, 10, 5)
+    for value in [-1, 0, 1, 2, 9.9, 10, 15]:
+        histogram.add(value)
+    assert histogram.counts() == [2, 1, 0, 0, 1]
+    assert histogram.underflow() == 1
+    assert histogram.overflow() == 2
+    assert histogram.edges() == [0, 2, 4, 6, 8, 10]
+    other = Histogram(0, 10, 5)
+    other.add(5)
+    histogram.merge(other)
+    assert histogram.counts() == [2, 1, 1, 0, 1]
+    with pytest.raises(ValueError):
+        histogram.merge(Histogram(0, 10, 2))
+
+
+def test_quantile_sketch_accuracy():
+    sketch = QuantileSketch(0.01)
+    values = list(range(-500, 1500))
+    for value in values:
+        sketch.add(value)
+    assert sketch.count() == 2000
+    assert sketch.quantile(0.5) == pytest.approx(499, rel=0.01)
+    assert sketch.quantile(0.9) == pytest.approx(1299, rel=0.01)
+    assert sketch.quantile(0.1) == pytest.approx(-301, rel=0.01)
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_quantile_sketch_merge_is_lossless():
+    whole = QuantileSketch()
+    first = QuantileSketch()
+    second = QuantileSketch()
+    for value in range(1, 1000):
+        whole.add(value * 1000)
+        if value % 2:
+            first.add(value * 1000)
+        else:
+            second.add(value * 1000)
+    first.merge(second)
+    for q in [0, 0.25, 0.5, 0.75, 1]:
+        assert first.quantile(q) == whole.quantile(q)
+
+
+def test_aggregator_collects_games():
+    config = SimulationConfig(players_count=3, max_rounds=100)
+    aggregator = simulate(range(10), config)
+    assert aggregator.games() == 10
+    assert sum(aggregator.wins()) + aggregator.unfinished() == 10
+    assert aggregator.rounds().count() == 10
+    assert aggregator.final_cash().count() == 30
+    assert sum(aggregator.rounds_histogram().counts()) == 10
+    assert len(aggregator.field_rent()) == 40
+    assert aggregator.field_rent()[0].max() == 0
+
+
+def test_aggregator_merge_matches_single_pass():
+    config = SimulationConfig(players_count=2, max_rounds=200)
+    whole = simulate(range(6), config)
+    merged = simulate(range(3), config)
+    merged.merge(simulate(range(3, 6), config))
+    assert merged.games() == whole.games()
+    assert merged.wins() == whole.wins()
+    assert merged.bankruptcies() == whole.bankruptcies()
+    assert merged.rounds().mean() == pytest.approx(whole.rounds().mean())
+    assert merged.final_cash_quantile(0.5) == whole.final_cash_quantile(0.5)
+    with pytest.raises(ValueError):
+        merged.merge(GameAggregator(3))
+
+
+def test_aggregator_bankruptcy_order():
+    config = SimulationConfig(players_count=2, max_rounds=200)
+    aggregator = GameAggregator(2, 200)
+    game = play_game(0, config, [aggregator])
+    for place, player in enumerate(game.losers()):
+        seat = game.players().index(player)
+        assert aggregator.bankruptcies()[seat][place] == 1
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from monopoly.store import ResultsStore, record, record_batch  # noqa: E402
+from monopoly.simulation import SimulationConfig, play_game  # noqa: E402
+
+
+def test_append_and_read_columns(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    games = store.table("games")
+    assert games.rows() == 0
+    first = games.append({
+        "seed": [1, 2], "config": [0, 0], "players": [2, 2],
+        "rounds": [10, 20], "winners": [1, 2],
+    })
+    second = games.append({
+        "seed": [3], "config": [0], "players": [2],
+        "rounds": [30], "winners": [3],
+    })
+    assert (first, second) == (0, 2)
+    assert games.rows() == 3
+    assert list(games.column("rounds")) == [10, 20, 30]
+    reopened = ResultsStore(str(tmp_path)).table("games")
+    assert list(reopened.column("seed")) == [1, 2, 3]
+    chunks = list(reopened.scan("rounds", chunk_rows=2))
+    assert [list(chunk) for chunk in chunks] == [[10, 20], [30]]
+
+
+def test_config_ids(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    first = store.config_id(SimulationConfig(players_count=2))
+    second = store.config_id(SimulationConfig(players_count=3))
+    assert first != second
+    assert store.config_id(SimulationConfig(players_count=2)) == first
+    assert ResultsStore(str(tmp_path)).configs() == store.configs()
+
+
+def test_record_and_lookup(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    config = SimulationConfig(players_count=2, max_rounds=50)
+    record(store, [5, 3, 4], config)
+    game = play_game(3, config)
+    row = store.game(3, config)
+    assert row["rounds"] == game.current_round()
+    assert row["players"] == 2
+    rounds = store.rounds(3, config)
+    assert len(rounds["round"]) == 2 * game.current_round()
+    assert list(rounds["cash"][-2:]) == [p.cash() for p in game.players()]
+    assert store.game(99, config) is None
+
+
+def test_record_batch_from_many_workers(tmp_path):
+    config = SimulationConfig(players_count=2, max_rounds=30)
+    store = record_batch(
+        str(tmp_path), 8, config, workers=3, chunk_size=2,
+        record_rounds=False,
+    )
+    games = store.table("games")
+    assert games.rows() == 8
+    assert sorted(games.column("seed")) == list(range(8))
+    assert store.table("rounds").rows() == 0
+    for seed in range(8):
+        assert len(games.lookup(seed, store.config_id(config))) == 1
+
+
+def test_summary_of_every_config(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    short = SimulationConfig(players_count=2, max_rounds=5)
+    record(store, range(6), short, record_rounds=False)
+    record(store, range(4), SimulationConfig(players_count=3, max_rounds=30),
+           record_rounds=False)
+    summary = store.summary()
+    assert summary[short.key()]["games"] == 6
+    assert summary[short.key()]["mean_rounds"] <= 5
+    assert summary[short.key()]["win_rates"] == [1.0, 1.0]
+    rates = [entry["win_rates"] for entry in summary.values()]
+    assert sorted(len(seats) for seats in rates) == [2, 3]
+
+
+def test_index_runs_are_merged_as_rows_are_appended(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    games = store.table("games")
+    for seed in range(20, 0, -1):
+        games.append({
+            "seed": [seed, seed], "config": [seed % 2, 2], "players": [2, 2],
+            "rounds": [seed, seed], "winners": [1, 1],
+        })
+    runs = games._read_header()["runs"]
+    assert len(runs) <= 5
+    assert sum(count for _, count in runs) == 40
+    assert list(games.lookup(7, 1)) == [26]
+    assert list(games.lookup(20, 2)) == [1]
+    assert len(games.lookup(7, 0)) == 0
+    assert len(list(tmp_path.glob("games/index-*.bin"))) == len(runs)
+
+
+def test_table_without_index_runs_is_indexed_on_lookup(tmp_path):
+    store = ResultsStore(str(tmp_path))
+    config = SimulationConfig(players_count=2, max_rounds=10)
+    record(store, [4, 2, 9], config, record_rounds=False)
+    games = store.table("games")
+    header = games._read_header()
+    del header["runs"]
+    (tmp_path / "games" / "header.json").write_text(json.dumps(header))
+    for path in tmp_path.glob("games/index-*.bin"):
+        path.unlink()
+    fresh = ResultsStore(str(tmp_path))
+    assert fresh.game(9, config)["seed"] == 9
+    assert len(fresh.table("games")._read_header()["runs"]) == 1
@@ -0,0 +1,91 @@
+import pytest
+
+from monopoly.sweep import (
+    Sweep, grid_points, random_points, evaluate, finished_score,
+    length_objective
+)
+from monopoly.plane import Rules, Card, DEFAULT_RULES, new_board
+from monopoly.player import Player
+from monopoly.game import Dice
+
+
+def test_rules_defaults():
+    rules = Rules()
+    assert rules.starting_cash() == 15000000
+    assert rules.lap_bonus() == 2000000
+    assert rules.start_payout() == 2000000
+    assert rules.rent_multipliers() == (1, 5, 15, 30, 40, 50)
+    assert rules.key() == DEFAULT_RULES.key()
+    assert rules.replace(lap_bonus=1).key() != rules.key()
+
+
+def test_rules_change_cards_and_players(monkeypatch):
+    rules = Rules(
+        starting_cash=100, lap_bonus=7,
+        rent_multipliers=(1, 2, 3, 4, 5, 6), house_price_ratio=0.25
+    )
+    card = Card("Warsaw", "grey", 1000000, 100000, rules=rules)
+    assert card.house_price() == 250000
+    card.add_houses(2)
+    assert card.fee() == 300000
+    dice = Dice()
+    monkeypatch.setattr(dice, "make_throw", lambda: 45)
+    player = Player("Jurek", rules)
+    assert player.cash() == 100
+    player.make_move(dice)
+    assert player.cash() == 107
+    assert new_board(rules)[9].house_price() == 250000
+
+
+def test_grid_points():
+    points = grid_points({"lap_bonus": [1, 2], "starting_cash": [3, 4, 5]})
+    assert len(points) == 6
+    assert points[0].lap_bonus() == 1
+    assert points[0].starting_cash() == 3
+    assert points[-1].lap_bonus() == 2
+    assert points[-1].starting_cash() == 5
+
+
+def test_random_points():
+    space = {"lap_bonus": (0, 10), "house_price_ratio": (0.1, 0.9),
+             "rent_multipliers": [(1, 2, 3, 4, 5, 6)]}
+    points = random_points(space, 5, seed=1)
+    assert len(points) == 5
+    for rules in points:
+        assert 0 <= rules.lap_bonus() <= 10
+        assert isinstance(rules.lap_bonus(), int)
+        assert 0.1 <= rules.house_price_ratio() <= 0.9
+        assert rules.rent_multipliers() == (1, 2, 3, 4, 5, 6)
+    assert random_points(space, 5, seed=1)[0].key() == points[0].key()
+
+
+def test_evaluate():
+    scores = evaluate(DEFAULT_RULES, 0, 4, finished_score, 2, 50)
+    assert scores.count() == 4
+    assert 0 <= scores.mean() <= 1
+    lengths = evaluate(DEFAULT_RULES, 0, 4, length_objective(50), 2, 50)
+    assert lengths.max() <= 0
+
+
+def test_sweep_drops_bad_points():
+    rich = DEFAULT_RULES.replace(starting_cash=10 ** 12)
+    poor = DEFAULT_RULES.replace(starting_cash=1000000)
+    sweep = Sweep(
+        [rich, poor], finished_score, players_count=2, max_rounds=40,
+        games_per_stage=10, max_stages=3
+    )
+    ranking = sweep.run(workers=2)
+    assert ranking[0].rules().key() == poor.key()
+    assert ranking[1].dropped_at() == 1
+    assert len(sweep.active_points()) == 1
+
+
+def test_stage_chunks_merge_to_the_scores_of_one_run():
+    rules = [DEFAULT_RULES, DEFAULT_RULES.replace(lap_bonus=0)]
+    chunked = Sweep(rules, length_objective(20), players_count=2,
+                    max_rounds=30, games_per_stage=7, chunk_size=3)
+    chunked.run_stage()
+    for point, stage_rules in zip(chunked.points(), rules):
+        whole = evaluate(stage_rules, 0, 7, length_objective(20), 2, 30)
+        assert point.scores().count() == 7
+        assert point.scores().mean() == pytest.approx(whole.mean())
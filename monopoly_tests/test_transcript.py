@@ -0,0 +1,72 @@
+import pytest
+
+from monopoly.input import Input
+from monopoly.simulation import HeadlessDisplay
+from monopoly.transcript import (
+    RecordingInput, ReplayInput, record_game, replay_game
+)
+
+
+class ScriptedPlayers(Input):
+    def __init__(self, rounds):
+        self._menus = 0
+        self._rounds = rounds
+        self._answers = 0
+
+    def yes_or_no(self, prompt):
+        self._answers += 1
+        return "y" if self._answers % 3 else "n"
+
+    def number(self, prompt, min, max):
+        if prompt.startswith("Welcome"):
+            return 3
+        if prompt.startswith("Enter the number of houses"):
+            return max
+        self._menus += 1
+        if self._menus == 5:
+            return 1
+        return 2 if self._menus > 3 * self._rounds else 0
+
+
+def players(game):
+    return [(player.position(), player.cash()) for player in game.players()]
+
+
+@pytest.mark.parametrize("take_back", [False, True])
+def test_replay_plays_the_recorded_game(tmp_path, monkeypatch, take_back):
+    path = str(tmp_path / "session.jsonl")
+    recorded = record_game(path, HeadlessDisplay(), seed=7,
+                           input=ScriptedPlayers(40), take_back=take_back)
+    monkeypatch.setattr("builtins.input", pytest.fail)
+    replay = ReplayInput(path)
+    assert replay.seed() == 7
+    assert replay.take_back() is take_back
+    replayed = replay_game(path)
+    assert replayed.current_round() == recorded.current_round()
+    assert players(replayed) == players(recorded)
+    assert [card.owner() is None for card in replayed.plane().fields()] == [
+        card.owner() is None for card in recorded.plane().fields()
+    ]
+
+
+def test_recording_input_writes_answers(tmp_path):
+    path = str(tmp_path / "answers.jsonl")
+    recorder = RecordingInput(path, 3, ScriptedPlayers(1))
+    assert recorder.ask_for_number_of_players() == 3
+    assert recorder.choose_menu_option("Choose: ", [0, 1, 2]) == 0
+    recorder.close()
+    replay = ReplayInput(path)
+    assert replay.remaining() == 2
+    assert replay.ask_for_number_of_players() == 3
+    with pytest.raises(ValueError):
+        replay.choose_menu_option("Something else: ", [0, 1, 2])
+    assert replay.choose_menu_option("Choose: ", [0, 1, 2]) == 0
+    with pytest.raises(ValueError):
+        replay.ask_for_number_of_players()
+
+
+def test_replay_rejects_other_files(tmp_path):
+    path = tmp_path / "other.jsonl"
+    path.write_text('{"version": 99}\n')
+    with pytest.raises(ValueError):
+        ReplayInput(str(path))
@@ -0,0 +1,104 @@
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from monopoly.vector import (  # noqa: E402
+    VectorGame, BoardTables, BUY, HOUSES, HOTEL, HOTEL_LEVEL
+)
+from monopoly.simulation import SimulationConfig, new_game  # noqa: E402
+
+
+class RecordingRandom(random.Random):
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.throws = []
+        self.chances = []
+
+    def randint(self, low, high):
+        value = super().randint(low, high)
+        self.throws.append(value)
+        return value
+
+    def choice(self, values):
+        value = super().choice(values)
+        self.chances.append(value)
+        return value
+
+
+def replay(engine, throws, chances):
+    throws = iter(throws)
+    chances = iter(chances)
+    engine.throw = lambda count: np.array(
+        [next(throws) for _ in range(count)], np.int64
+    )
+    engine.draw_chances = lambda count: np.array(
+        [next(chances) for _ in range(count)], np.int64
+    )
+
+
+def test_board_tables():
+    board = BoardTables()
+    assert board.prices[1] == 350000
+    assert board.house_prices[1] == 175000
+    assert board.groups[5] == -1
+    assert board.groups[1] == board.groups[3]
+    assert board.group_sizes[board.groups[1]] == 2
+    assert board.group_sizes[board.groups[6]] == 3
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_same_game_as_object_engine(seed):
+    config = SimulationConfig(players_count=3, max_rounds=300)
+    game = new_game(seed, config)
+    rng = RecordingRandom(seed)
+    game._rng = rng
+    game._dice._rng = rng
+    game.play_game()
+    engine = VectorGame(1, 3, max_rounds=300)
+    replay(engine, rng.throws, rng.chances)
+    engine.advance()
+    assert engine.done[0]
+    assert engine.round[0] == game.current_round()
+    assert list(engine.cash[0]) == [p.cash() for p in game.players()]
+    assert list(engine.position[0]) == [p.position() for p in game.players()]
+    for field, card in enumerate(game.plane().fields()):
+        owner = engine.owner[0, field]
+        if card.owner() is None:
+            assert owner == -1
+        else:
+            assert game.players()[owner] is card.owner()
+            level = HOTEL_LEVEL if card.hotel() else card.houses()
+            assert engine.level[0, field] == level
+    for place, player in enumerate(game.losers()):
+        assert engine.eliminated[0, game.players().index(player)] == place
+
+
+def test_decisions_wait_for_decision_seat():
+    engine = VectorGame(8, 2, decision_seats=[0], seed=1)
+    engine.advance()
+    waiting = engine.pending != 0
+    assert waiting.all() or engine.done[~waiting].all()
+    games = np.flatnonzero(waiting)
+    assert (engine.seat[games] == 0).all()
+    assert (engine.pending[games] == BUY).all()
+    fields = engine.pending_field[games]
+    engine.decide(games, np.ones(len(games), np.int64))
+    assert (engine.owner[games, fields] == 0).all()
+    assert (engine.pending[games] == 0).all()
+
+
+def test_apply_decisions_limits_houses():
+    engine = VectorGame(1, 2)
+    games = np.array([0])
+    seats = np.array([0])
+    fields = np.array([1])
+    engine.owner[0, [1, 3]] = 0
+    engine.cash[0, 0] = 400000
+    engine.apply_decisions(games, seats, np.array([HOUSES]), fields,
+                           np.array([4]))
+    assert engine.level[0, 1] == 2
+    assert engine.cash[0, 0] == 50000
+    engine.apply_decisions(games, seats, np.array([HOTEL]), fields,
+                           np.array([1]))
+    assert engine.level[0, 1] == 2